@@ -1,7 +1,9 @@
 # If you change these imports,
 # do not forget to sync the docs at "docs/api"
-from meshkernel.errors import InputError, MeshKernelError
+from meshkernel.async_meshkernel import AsyncMeshKernel
+from meshkernel.errors import InputError, MeshKernelError, ZeroCopyError
 from meshkernel.meshkernel import MeshKernel
+from meshkernel.parallel import MeshKernelPool
 from meshkernel.py_structures import (
     AveragingMethod,
     Contacts,
@@ -17,9 +19,11 @@ from meshkernel.py_structures import (
     Mesh2dLocation,
     MeshRefinementParameters,
     OrthogonalizationParameters,
+    PolygonBatchRefinement,
     ProjectionType,
     ProjectToLandBoundaryOption,
     RefinementType,
+    RegionRefinement,
     SplinesToCurvilinearParameters,
 )
 from meshkernel.version import __version__
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from meshkernel.meshkernel import MeshKernel
+from meshkernel.py_structures import (
+    Contacts,
+    CurvilinearGrid,
+    Mesh1d,
+    Mesh2d,
+    ProjectionType,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMeshKernel:
+    """An asyncio facade of a MeshKernel state, for use within an event loop.
+
+    Every public method of `MeshKernel` is available as a coroutine method with the same arguments,
+    plus an optional keyword-only `timeout` in seconds, for example
+    `await async_mk.mesh2d_compute_orthogonalization(..., timeout=60)`.
+    The native calls run on a dedicated thread, so the event loop is never blocked,
+    and the calls on the state are serialized in the order they are awaited.
+
+    A native call cannot be interrupted. When a call times out, `asyncio.TimeoutError` is raised and
+    the call is left running on the abandoned state, while the facade continues on a new state
+    restored from a snapshot taken before the call: the mesh2d, the mesh1d, the contacts, the curvilinear grid
+    and the options of the state, `clip_geometries`, `thin_samples` and `strict_zero_copy`.
+    Taking the snapshot copies the meshes, so it is only done for calls with a timeout.
+
+    Each timed out call keeps its thread and its state until it finishes. At most `max_abandoned_calls`
+    of them are left running: when the limit is reached, the next call with a timeout waits for one of them
+    to finish.
+
+    A call cancelled without a timeout runs to completion and its changes are kept.
+
+    Args:
+        projection (ProjectionType, optional): The projection type. Default is `ProjectionType.CARTESIAN`.
+        timeout (float, optional): The default timeout of the calls, in seconds. Default is None, no timeout.
+        clip_geometries (bool, optional): The `clip_geometries` option of the state. Default is `False`.
+        thin_samples (bool, optional): The `thin_samples` option of the state. Default is `False`.
+        strict_zero_copy (bool, optional): The `strict_zero_copy` option of the state. Default is `False`.
+        max_abandoned_calls (int, optional): The maximum number of timed out calls left running. Default is `4`.
+    """
+
+    def __init__(
+        self,
+        projection: ProjectionType = ProjectionType.CARTESIAN,
+        timeout: Optional[float] = None,
+        clip_geometries: bool = False,
+        thin_samples: bool = False,
+        strict_zero_copy: bool = False,
+        max_abandoned_calls: int = 4,
+    ):
+        if max_abandoned_calls < 1:
+            raise ValueError("max_abandoned_calls must be at least 1")
+
+        self.projection = projection
+        self.timeout = timeout
+        self.max_abandoned_calls = max_abandoned_calls
+        self._meshkernel = MeshKernel(
+            projection=projection,
+            clip_geometries=clip_geometries,
+            thin_samples=thin_samples,
+            strict_zero_copy=strict_zero_copy,
+        )
+        self._executor = _new_executor()
+        self._lock: Optional[asyncio.Lock] = None
+        self._abandoned_calls: List[Future] = []
+
+    @property
+    def meshkernel(self) -> MeshKernel:
+        """The current MeshKernel state. It changes after a timeout."""
+        return self._meshkernel
+
+    async def run(
+        self, func: Callable, *args, timeout: Optional[float] = None, **kwargs
+    ):
+        """Runs `func(meshkernel, *args, **kwargs)` on the state thread and awaits its result.
+
+        Args:
+            func (Callable): The function, taking the MeshKernel instance as its first argument.
+            args: The positional arguments passed to the function.
+            timeout (float, optional): The timeout in seconds. Default is the timeout of the facade.
+            kwargs: The keyword arguments passed to the function.
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            asyncio.TimeoutError: If the function did not finish in time. The state is restored.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            meshkernel = self._meshkernel
+            executor = self._executor
+
+            snapshot = None
+            if timeout is not None:
+                await self._wait_for_abandoned_calls()
+                snapshot = await loop.run_in_executor(
+                    executor, _StateSnapshot.take, meshkernel
+                )
+
+            call = executor.submit(func, meshkernel, *args, **kwargs)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(call), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "%s timed out after %s s, restoring the state",
+                    getattr(func, "__name__", func),
+                    timeout,
+                )
+                self._abandoned_calls.append(call)
+                await self._restore(snapshot)
+                raise
+
+    async def close(self):
+        """Releases the state thread, after the calls already submitted."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def __aenter__(self) -> AsyncMeshKernel:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __getattr__(self, name: str):
+        method = getattr(MeshKernel, name, None) if not name.startswith("_") else None
+        if not callable(method):
+            raise AttributeError(
+                "'{}' object has no attribute '{}'".format(type(self).__name__, name)
+            )
+
+        @functools.wraps(method)
+        async def call(*args, timeout: Optional[float] = None, **kwargs):
+            return await self.run(method, *args, timeout=timeout, **kwargs)
+
+        return call
+
+    async def _wait_for_abandoned_calls(self):
+        """Waits until fewer than `max_abandoned_calls` timed out calls are still running."""
+        self._abandoned_calls = [
+            call for call in self._abandoned_calls if not call.done()
+        ]
+        while len(self._abandoned_calls) >= self.max_abandoned_calls:
+            logger.warning(
+                "%d timed out calls are still running, waiting for one of them to finish",
+                len(self._abandoned_calls),
+            )
+            await asyncio.wait(
+                [asyncio.wrap_future(call) for call in self._abandoned_calls],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            self._abandoned_calls = [
+                call for call in self._abandoned_calls if not call.done()
+            ]
+
+    async def _restore(self, snapshot: _StateSnapshot):
+        """Abandons the busy state and its thread, and continues on a new state holding the snapshot."""
+        self._executor.shutdown(wait=False)
+        self._executor = _new_executor()
+        self._meshkernel = await asyncio.get_running_loop().run_in_executor(
+            self._executor, snapshot.restore, self.projection
+        )
+
+
+class _StateSnapshot:
+    """The meshes and the options of a MeshKernel state, which can be set on a new state."""
+
+    def __init__(
+        self,
+        mesh2d: Mesh2d,
+        mesh1d: Mesh1d,
+        contacts: Contacts,
+        curvilinear_grid: Optional[CurvilinearGrid],
+        options: Dict[str, bool],
+    ):
+        self.mesh2d = mesh2d
+        self.mesh1d = mesh1d
+        self.contacts = contacts
+        self.curvilinear_grid = curvilinear_grid
+        self.options = options
+
+    @staticmethod
+    def take(meshkernel: MeshKernel) -> _StateSnapshot:
+        """Copies the meshes and the options of a state.
+
+        Args:
+            meshkernel (MeshKernel): The state.
+
+        Returns:
+            _StateSnapshot: The snapshot.
+        """
+        return _StateSnapshot(
+            meshkernel.mesh2d_get(),
+            meshkernel.mesh1d_get(),
+            meshkernel.contacts_get(),
+            (
+                meshkernel.curvilineargrid_get()
+                if meshkernel._curvilineargrid_get_dimensions().num_m > 0
+                else None
+            ),
+            {
+                "clip_geometries": meshkernel.clip_geometries,
+                "thin_samples": meshkernel.thin_samples,
+                "strict_zero_copy": meshkernel.strict_zero_copy,
+            },
+        )
+
+    def restore(self, projection: ProjectionType) -> MeshKernel:
+        """Allocates a new state holding the meshes and the options of the snapshot.
+
+        Args:
+            projection (ProjectionType): The projection of the new state.
+
+        Returns:
+            MeshKernel: The new state.
+        """
+        meshkernel = MeshKernel(projection=projection, **self.options)
+        if self.mesh2d.node_x.size > 0:
+            meshkernel.mesh2d_set(self.mesh2d)
+        if self.mesh1d.node_x.size > 0:
+            meshkernel.mesh1d_set(self.mesh1d)
+        if self.contacts.mesh1d_indices.size > 0:
+            meshkernel.contacts_set(self.contacts)
+        if self.curvilinear_grid is not None:
+            meshkernel.curvilinear_set(self.curvilinear_grid)
+        return meshkernel
+
+
+def _new_executor() -> ThreadPoolExecutor:
+    """Creates the thread running the native calls on a state."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="meshkernel-async")
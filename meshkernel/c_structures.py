@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import os
 from ctypes import POINTER, Structure, c_double, c_int, c_void_p
+from typing import Optional
 
 import numpy as np
 from numpy.ctypeslib import as_ctypes
 
 from meshkernel.errors import InputError
+from meshkernel.marshalling import as_contiguous_array
 from meshkernel.py_structures import (
+    CURVILINEAR_GRID_FILE_PREFIX,
+    MESH2D_FILE_PREFIX,
     Contacts,
     CurvilinearGrid,
     CurvilinearParameters,
@@ -19,7 +24,7 @@ from meshkernel.py_structures import (
     OrthogonalizationParameters,
     SplinesToCurvilinearParameters,
 )
-from meshkernel.utils import to_contiguous_numpy_array
+from meshkernel.utils import allocate_array
 
 
 class CMesh2d(Structure):
@@ -95,17 +100,41 @@ class CMesh2d(Structure):
         c_mesh2d = CMesh2d()
 
         # Set the pointers
-        c_mesh2d.edge_faces = as_ctypes(mesh2d.edge_faces)
-        c_mesh2d.edge_nodes = as_ctypes(mesh2d.edge_nodes)
-        c_mesh2d.face_edges = as_ctypes(mesh2d.face_edges)
-        c_mesh2d.face_nodes = as_ctypes(mesh2d.face_nodes)
-        c_mesh2d.nodes_per_face = as_ctypes(mesh2d.nodes_per_face)
-        c_mesh2d.node_x = as_ctypes(mesh2d.node_x)
-        c_mesh2d.node_y = as_ctypes(mesh2d.node_y)
-        c_mesh2d.edge_x = as_ctypes(mesh2d.edge_x)
-        c_mesh2d.edge_y = as_ctypes(mesh2d.edge_y)
-        c_mesh2d.face_x = as_ctypes(mesh2d.face_x)
-        c_mesh2d.face_y = as_ctypes(mesh2d.face_y)
+        c_mesh2d.edge_faces = as_ctypes(
+            as_contiguous_array(mesh2d.edge_faces, np.int32, "Mesh2d.edge_faces")
+        )
+        c_mesh2d.edge_nodes = as_ctypes(
+            as_contiguous_array(mesh2d.edge_nodes, np.int32, "Mesh2d.edge_nodes")
+        )
+        c_mesh2d.face_edges = as_ctypes(
+            as_contiguous_array(mesh2d.face_edges, np.int32, "Mesh2d.face_edges")
+        )
+        c_mesh2d.face_nodes = as_ctypes(
+            as_contiguous_array(mesh2d.face_nodes, np.int32, "Mesh2d.face_nodes")
+        )
+        c_mesh2d.nodes_per_face = as_ctypes(
+            as_contiguous_array(
+                mesh2d.nodes_per_face, np.int32, "Mesh2d.nodes_per_face"
+            )
+        )
+        c_mesh2d.node_x = as_ctypes(
+            as_contiguous_array(mesh2d.node_x, np.double, "Mesh2d.node_x")
+        )
+        c_mesh2d.node_y = as_ctypes(
+            as_contiguous_array(mesh2d.node_y, np.double, "Mesh2d.node_y")
+        )
+        c_mesh2d.edge_x = as_ctypes(
+            as_contiguous_array(mesh2d.edge_x, np.double, "Mesh2d.edge_x")
+        )
+        c_mesh2d.edge_y = as_ctypes(
+            as_contiguous_array(mesh2d.edge_y, np.double, "Mesh2d.edge_y")
+        )
+        c_mesh2d.face_x = as_ctypes(
+            as_contiguous_array(mesh2d.face_x, np.double, "Mesh2d.face_x")
+        )
+        c_mesh2d.face_y = as_ctypes(
+            as_contiguous_array(mesh2d.face_y, np.double, "Mesh2d.face_y")
+        )
 
         # Set the sizes
         c_mesh2d.num_nodes = mesh2d.node_x.size
@@ -115,26 +144,38 @@ class CMesh2d(Structure):
 
         return c_mesh2d
 
-    def allocate_memory(self) -> Mesh2d:
+    def allocate_memory(self, memmap_directory: Optional[str] = None) -> Mesh2d:
         r"""Allocate data according to the parameters with the \"num\_\" prefix.
         The pointers are then set to the freshly allocated memory.
         The memory is owned by the Mesh2d instance which is returned by this method.
 
+        Args:
+            memmap_directory (str, optional): If set, the arrays are allocated as memory-mapped `.npy` files
+                                              in this directory, which can be reopened with `Mesh2d.from_directory`.
+
         Returns:
             Mesh2d: The object owning the allocated memory.
         """
 
-        edge_nodes = np.empty(self.num_edges * 2, dtype=np.int32)
-        face_nodes = np.empty(self.num_face_nodes, dtype=np.int32)
-        nodes_per_face = np.empty(self.num_faces, dtype=np.int32)
-        node_x = np.empty(self.num_nodes, dtype=np.double)
-        node_y = np.empty(self.num_nodes, dtype=np.double)
-        edge_x = np.empty(self.num_edges, dtype=np.double)
-        edge_y = np.empty(self.num_edges, dtype=np.double)
-        face_x = np.empty(self.num_faces, dtype=np.double)
-        face_y = np.empty(self.num_faces, dtype=np.double)
-        edge_faces = np.empty(self.num_edges * 2, dtype=np.int32)
-        face_edges = np.empty(self.num_face_nodes, dtype=np.int32)
+        def allocate(name, size, dtype):
+            memmap_path = None
+            if memmap_directory is not None:
+                memmap_path = os.path.join(
+                    memmap_directory, MESH2D_FILE_PREFIX + name + ".npy"
+                )
+            return allocate_array(size, dtype, memmap_path)
+
+        edge_nodes = allocate("edge_nodes", self.num_edges * 2, np.int32)
+        face_nodes = allocate("face_nodes", self.num_face_nodes, np.int32)
+        nodes_per_face = allocate("nodes_per_face", self.num_faces, np.int32)
+        node_x = allocate("node_x", self.num_nodes, np.double)
+        node_y = allocate("node_y", self.num_nodes, np.double)
+        edge_x = allocate("edge_x", self.num_edges, np.double)
+        edge_y = allocate("edge_y", self.num_edges, np.double)
+        face_x = allocate("face_x", self.num_faces, np.double)
+        face_y = allocate("face_y", self.num_faces, np.double)
+        edge_faces = allocate("edge_faces", self.num_edges * 2, np.int32)
+        face_edges = allocate("face_edges", self.num_face_nodes, np.int32)
 
         self.edge_nodes = as_ctypes(edge_nodes)
         self.face_nodes = as_ctypes(face_nodes)
@@ -209,13 +250,17 @@ class CGeometryList(Structure):
         c_geometry_list.inner_outer_separator = geometry_list.inner_outer_separator
         c_geometry_list.n_coordinates = geometry_list.x_coordinates.size
         c_geometry_list.x_coordinates = as_ctypes(
-            to_contiguous_numpy_array(geometry_list.x_coordinates)
+            as_contiguous_array(
+                geometry_list.x_coordinates, np.double, "GeometryList.x_coordinates"
+            )
         )
         c_geometry_list.y_coordinates = as_ctypes(
-            to_contiguous_numpy_array(geometry_list.y_coordinates)
+            as_contiguous_array(
+                geometry_list.y_coordinates, np.double, "GeometryList.y_coordinates"
+            )
         )
         c_geometry_list.values = as_ctypes(
-            to_contiguous_numpy_array(geometry_list.values)
+            as_contiguous_array(geometry_list.values, np.double, "GeometryList.values")
         )
 
         return c_geometry_list
@@ -452,9 +497,15 @@ class CMesh1d(Structure):
         c_mesh1d = CMesh1d()
 
         # Set the pointers
-        c_mesh1d.edge_nodes = as_ctypes(mesh1d.edge_nodes)
-        c_mesh1d.node_x = as_ctypes(mesh1d.node_x)
-        c_mesh1d.node_y = as_ctypes(mesh1d.node_y)
+        c_mesh1d.edge_nodes = as_ctypes(
+            as_contiguous_array(mesh1d.edge_nodes, np.int32, "Mesh1d.edge_nodes")
+        )
+        c_mesh1d.node_x = as_ctypes(
+            as_contiguous_array(mesh1d.node_x, np.double, "Mesh1d.node_x")
+        )
+        c_mesh1d.node_y = as_ctypes(
+            as_contiguous_array(mesh1d.node_y, np.double, "Mesh1d.node_y")
+        )
 
         # Set the sizes
         c_mesh1d.num_nodes = mesh1d.node_x.size
@@ -518,8 +569,16 @@ class CContacts(Structure):
 
         c_contacts = CContacts()
 
-        c_contacts.mesh1d_indices = as_ctypes(contacts.mesh1d_indices)
-        c_contacts.mesh2d_indices = as_ctypes(contacts.mesh2d_indices)
+        c_contacts.mesh1d_indices = as_ctypes(
+            as_contiguous_array(
+                contacts.mesh1d_indices, np.int32, "Contacts.mesh1d_indices"
+            )
+        )
+        c_contacts.mesh2d_indices = as_ctypes(
+            as_contiguous_array(
+                contacts.mesh2d_indices, np.int32, "Contacts.mesh2d_indices"
+            )
+        )
         c_contacts.num_contacts = contacts.mesh1d_indices.size
 
         return c_contacts
@@ -581,8 +640,16 @@ class CCurvilinearGrid(Structure):
         c_curvilinear_grid = CCurvilinearGrid()
 
         # Set the pointers
-        c_curvilinear_grid.node_x = as_ctypes(curvilinear_grid.node_x)
-        c_curvilinear_grid.node_y = as_ctypes(curvilinear_grid.node_y)
+        c_curvilinear_grid.node_x = as_ctypes(
+            as_contiguous_array(
+                curvilinear_grid.node_x, np.double, "CurvilinearGrid.node_x"
+            )
+        )
+        c_curvilinear_grid.node_y = as_ctypes(
+            as_contiguous_array(
+                curvilinear_grid.node_y, np.double, "CurvilinearGrid.node_y"
+            )
+        )
 
         # Set the sizes
         c_curvilinear_grid.num_m = curvilinear_grid.num_m
@@ -590,17 +657,37 @@ class CCurvilinearGrid(Structure):
 
         return c_curvilinear_grid
 
-    def allocate_memory(self) -> CurvilinearGrid:
+    def allocate_memory(
+        self, memmap_directory: Optional[str] = None
+    ) -> CurvilinearGrid:
         r"""Allocate data according to the parameters with the \"num\_\" prefix.
         The pointers are then set to the freshly allocated memory.
         The memory is owned by the CurvilinearGrid instance which is returned by this method.
 
+        Args:
+            memmap_directory (str, optional): If set, the arrays are allocated as memory-mapped `.npy` files
+                                              in this directory, which can be reopened with
+                                              `CurvilinearGrid.from_directory`.
+
         Returns:
             CurvilinearGrid: The object owning the allocated memory.
         """
 
-        node_x = np.empty(self.num_m * self.num_n, dtype=np.double)
-        node_y = np.empty(self.num_m * self.num_n, dtype=np.double)
+        node_x, node_y = (
+            allocate_array(
+                self.num_m * self.num_n,
+                np.double,
+                (
+                    None
+                    if memmap_directory is None
+                    else os.path.join(
+                        memmap_directory, CURVILINEAR_GRID_FILE_PREFIX + name + ".npy"
+                    )
+                ),
+                shape=(self.num_n, self.num_m),
+            )
+            for name in ("node_x", "node_y")
+        )
 
         self.node_x = as_ctypes(node_x)
         self.node_y = as_ctypes(node_y)
@@ -789,7 +876,11 @@ class CGriddedSamples(Structure):
         else:
             num_x = len(gridded_samples.x_coordinates)
             c_gridded_samples.x_coordinates = as_ctypes(
-                to_contiguous_numpy_array(gridded_samples.x_coordinates)
+                as_contiguous_array(
+                    gridded_samples.x_coordinates,
+                    np.double,
+                    "GriddedSamples.x_coordinates",
+                )
             )
 
         if len(gridded_samples.y_coordinates) == 0:
@@ -798,7 +889,11 @@ class CGriddedSamples(Structure):
         else:
             num_y = len(gridded_samples.y_coordinates)
             c_gridded_samples.y_coordinates = as_ctypes(
-                to_contiguous_numpy_array(gridded_samples.y_coordinates)
+                as_contiguous_array(
+                    gridded_samples.y_coordinates,
+                    np.double,
+                    "GriddedSamples.y_coordinates",
+                )
             )
 
         c_gridded_samples.num_x = num_x
@@ -806,9 +901,13 @@ class CGriddedSamples(Structure):
         c_gridded_samples.x_origin = gridded_samples.x_origin
         c_gridded_samples.y_origin = gridded_samples.y_origin
         c_gridded_samples.cell_size = gridded_samples.cell_size
-        c_gridded_samples.values = to_contiguous_numpy_array(
-            gridded_samples.values
-        ).ctypes.data_as(c_void_p)
+        # The structure only holds the address of the values, so it keeps a reference to them
+        c_gridded_samples._values = as_contiguous_array(
+            gridded_samples.values,
+            gridded_samples.values.dtype,
+            "GriddedSamples.values",
+        )
+        c_gridded_samples.values = c_gridded_samples._values.ctypes.data_as(c_void_p)
         c_gridded_samples.value_type = gridded_samples.value_type
 
         return c_gridded_samples
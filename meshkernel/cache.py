@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from enum import Enum
+from typing import Optional, Union
+
+import numpy as np
+
+from meshkernel.meshkernel import MeshKernel
+from meshkernel.py_structures import MESH2D_ARRAY_NAMES, CurvilinearGrid, Mesh2d
+from meshkernel.shared_memory import pack_arrays, packed_nbytes, unpack_arrays
+
+logger = logging.getLogger(__name__)
+
+# The extension of the cached mesh files
+_CACHE_FILE_EXTENSION = ".mkmesh"
+
+# The name of the array holding the number of nodes along n and m of a cached curvilinear grid
+_CURVILINEAR_SHAPE = "curvilinear_shape"
+
+
+class MeshCache:
+    """A persistent content-addressed cache of the meshes generated by MeshKernel methods.
+
+    `call` runs a method generating a mesh2d, such as `mesh2d_make_global` or
+    `mesh2d_make_triangular_mesh_from_polygon`, and stores the resulting mesh2d in a file named
+    after a hash of the method name, its arguments, the projection of the state and the version
+    of the MeshKernel library. When the same call is made again, even in another process,
+    the cached mesh2d is set on the state with `mesh2d_set` instead.
+    The methods whose name starts with `curvilinear_`, such as `curvilinear_compute_transfinite_from_splines`,
+    generate a curvilinear grid instead, which is stored and set with `curvilinear_set`.
+    Only methods whose result is a pure function of their arguments should be cached:
+    the mesh held by the state is not part of the key.
+
+    The files hold the arrays in the packed format of `meshkernel.shared_memory` and are memory-mapped
+    when read. When the files exceed `max_bytes` in total, the least recently used ones are removed.
+
+    Args:
+        directory (str): The directory of the cache files, created if needed.
+        max_bytes (int, optional): The maximum total size of the cache files. Default is 1 GiB.
+
+    Attributes:
+        hits (int): The number of calls restored from the cache.
+        misses (int): The number of calls computed and stored.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def call(self, meshkernel: MeshKernel, method_name: str, *args, **kwargs) -> bool:
+        """Runs a mesh2d or curvilinear grid generating method of a MeshKernel instance,
+        or restores its cached result.
+
+        Args:
+            meshkernel (MeshKernel): The state.
+            method_name (str): The name of the MeshKernel method.
+            args: The positional arguments of the method.
+            kwargs: The keyword arguments of the method.
+
+        Returns:
+            bool: Whether the result was restored from the cache.
+        """
+        key = self.key(meshkernel, method_name, *args, **kwargs)
+
+        curvilinear = method_name.startswith("curvilinear_")
+
+        mesh = self.get(key)
+        if mesh is not None:
+            if curvilinear:
+                meshkernel.curvilinear_set(mesh)
+            else:
+                meshkernel.mesh2d_set(mesh)
+            self.hits += 1
+            logger.debug("Cache hit for %s: %s", method_name, key)
+            return True
+
+        getattr(meshkernel, method_name)(*args, **kwargs)
+        if curvilinear:
+            self.put(key, meshkernel.curvilineargrid_get())
+        else:
+            self.put(key, meshkernel.mesh2d_get())
+        self.misses += 1
+        logger.debug("Cache miss for %s: %s", method_name, key)
+        return False
+
+    def key(self, meshkernel: MeshKernel, method_name: str, *args, **kwargs) -> str:
+        """Computes the cache key of a call.
+
+        Args:
+            meshkernel (MeshKernel): The state.
+            method_name (str): The name of the MeshKernel method.
+            args: The positional arguments of the method.
+            kwargs: The keyword arguments of the method.
+
+        Returns:
+            str: The hexadecimal key.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        _update_digest(digest, meshkernel.get_meshkernel_version())
+        _update_digest(digest, meshkernel.get_projection())
+        _update_digest(digest, method_name)
+        _update_digest(digest, args)
+        _update_digest(digest, kwargs)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Union[Mesh2d, CurvilinearGrid]]:
+        """Gets a cached mesh2d or curvilinear grid and marks it as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Union[Mesh2d, CurvilinearGrid]: The mesh2d or the curvilinear grid, whose arrays are
+                                            copy-on-write memory maps of the file,
+                                            or None if the key is not cached.
+        """
+        path = self._path(key)
+        try:
+            arrays = unpack_arrays(np.memmap(path, dtype=np.uint8, mode="c"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+        os.utime(path)
+        if _CURVILINEAR_SHAPE in arrays:
+            num_n, num_m = arrays[_CURVILINEAR_SHAPE]
+            return CurvilinearGrid(arrays["node_x"], arrays["node_y"], num_m, num_n)
+        return Mesh2d(**arrays)
+
+    def put(self, key: str, mesh: Union[Mesh2d, CurvilinearGrid]):
+        """Stores a mesh2d or a curvilinear grid, then evicts the least recently used files
+        if the cache is too large.
+
+        Args:
+            key (str): The cache key.
+            mesh (Union[Mesh2d, CurvilinearGrid]): The mesh2d or the curvilinear grid.
+        """
+        if isinstance(mesh, CurvilinearGrid):
+            arrays = {
+                "node_x": mesh.node_x,
+                "node_y": mesh.node_y,
+                _CURVILINEAR_SHAPE: np.array([mesh.num_n, mesh.num_m], dtype=np.int64),
+            }
+        else:
+            arrays = {name: getattr(mesh, name) for name in MESH2D_ARRAY_NAMES}
+        buffer = bytearray(packed_nbytes(arrays))
+        pack_arrays(buffer, arrays)
+
+        # Write to a temporary file first, so readers never see a partial file
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(buffer)
+            os.replace(temporary_path, self._path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used files until the cache fits in `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(_CACHE_FILE_EXTENSION):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+            logger.debug("Evicted %s from the mesh cache", path)
+
+    @property
+    def total_bytes(self) -> int:
+        """The total size of the cache files."""
+        return sum(
+            entry.stat().st_size
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(_CACHE_FILE_EXTENSION)
+        )
+
+    def clear(self):
+        """Removes all the cache files."""
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(_CACHE_FILE_EXTENSION):
+                os.remove(entry.path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _CACHE_FILE_EXTENSION)
+
+
+def _update_digest(digest, value):
+    """Feeds an unambiguous encoding of a value to a hash.
+
+    Arrays are hashed with their dtype and shape, enumerations by value, and objects such as
+    the parameter classes and `GeometryList` by their class name and public attributes.
+    The arrays are always hashed again rather than through the cached `content_hash`,
+    so a key reflects arrays modified in place.
+
+    Args:
+        digest: The hash object.
+        value: The value, possibly nested in tuples, lists and dictionaries.
+    """
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest.update("ndarray:{}:{}:".format(array.dtype.str, array.shape).encode())
+        digest.update(memoryview(array).cast("B"))
+    elif isinstance(value, Enum):
+        digest.update("{}:{!r};".format(type(value).__name__, value.value).encode())
+    elif isinstance(value, (tuple, list)):
+        digest.update("{}:{}(".format(type(value).__name__, len(value)).encode())
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b")")
+    elif isinstance(value, dict):
+        digest.update("dict:{}(".format(len(value)).encode())
+        for item_key in sorted(value):
+            _update_digest(digest, item_key)
+            _update_digest(digest, value[item_key])
+        digest.update(b")")
+    elif hasattr(value, "__dict__"):
+        _update_digest(digest, type(value).__qualname__)
+        _update_digest(
+            digest,
+            {
+                name: attribute
+                for name, attribute in vars(value).items()
+                if not name.startswith("_")
+                and name not in getattr(value, "_transient_attributes", ())
+            },
+        )
+    else:
+        digest.update("{}:{!r};".format(type(value).__name__, value).encode())
@@ -0,0 +1,678 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from meshkernel.meshkernel import MeshKernel
+from meshkernel.parallel import BatchResult, MeshKernelPool, run_batch
+from meshkernel.py_structures import (
+    AveragingMethod,
+    DeleteMeshOption,
+    GeometryList,
+    Mesh2d,
+    Mesh2dLocation,
+    ProjectionType,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Tile:
+    """A rectangular subdomain of a mesh2d.
+
+    The faces whose circumcenter lies in the core rectangle belong to the tile.
+    The halo rectangle extends the core on all sides and holds the neighbouring faces
+    the processing of the tile needs to see.
+
+    Attributes:
+        index (int): The index of the tile.
+        bounds (tuple): The core rectangle, as (x_min, y_min, x_max, y_max).
+        halo_bounds (tuple): The halo rectangle, as (x_min, y_min, x_max, y_max).
+    """
+
+    def __init__(self, index: int, bounds: tuple, halo_bounds: tuple):
+        self.index = index
+        self.bounds = bounds
+        self.halo_bounds = halo_bounds
+
+    @property
+    def polygon(self) -> GeometryList:
+        """The closed polygon of the core rectangle."""
+        return _rectangle(*self.bounds)
+
+    @property
+    def halo_polygon(self) -> GeometryList:
+        """The closed polygon of the halo rectangle."""
+        return _rectangle(*self.halo_bounds)
+
+    def __repr__(self):
+        return "Tile(index={}, bounds={}, halo_bounds={})".format(
+            self.index, self.bounds, self.halo_bounds
+        )
+
+
+class DecompositionResult:
+    """The outcome of `run_decomposed`.
+
+    Attributes:
+        mesh2d (Mesh2d): The reassembled mesh2d.
+        tiles (List[Tile]): The tiles the mesh2d was decomposed into.
+        batch (BatchResult): The per-tile timings of the parallel processing.
+        assembly_time (float): The time spent reassembling the tiles, in seconds.
+    """
+
+    def __init__(
+        self,
+        mesh2d: Mesh2d,
+        tiles: List[Tile],
+        batch: BatchResult,
+        assembly_time: float,
+    ):
+        self.mesh2d = mesh2d
+        self.tiles = tiles
+        self.batch = batch
+        self.assembly_time = assembly_time
+
+    def __repr__(self):
+        return "DecompositionResult(num_tiles={}, num_nodes={}, wall_time={:.3f}s, assembly_time={:.3f}s)".format(
+            len(self.tiles),
+            self.mesh2d.node_x.size,
+            self.batch.wall_time,
+            self.assembly_time,
+        )
+
+
+def make_tiles(
+    mesh2d: Mesh2d, num_x: int, num_y: int, halo_width: Optional[float] = None
+) -> List[Tile]:
+    """Splits the bounding box of a mesh2d into a regular grid of overlapping tiles.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d to decompose.
+        num_x (int): The number of tiles along x.
+        num_y (int): The number of tiles along y.
+        halo_width (float, optional): The width of the halo around each tile.
+                                      Default is three times the mean edge length.
+
+    Returns:
+        List[Tile]: The tiles, row by row from the lower left corner.
+
+    Raises:
+        ValueError: If the number of tiles is smaller than one or the mesh has no nodes.
+    """
+    if num_x < 1 or num_y < 1:
+        raise ValueError("The number of tiles must be at least 1 along x and y")
+    if mesh2d.node_x.size == 0:
+        raise ValueError("The mesh2d has no nodes")
+
+    if halo_width is None:
+        halo_width = 3.0 * _mean_edge_length(mesh2d)
+
+    # Enlarge the bounding box slightly, so the boundary faces fall inside the outer tiles
+    x_min, x_max = float(np.min(mesh2d.node_x)), float(np.max(mesh2d.node_x))
+    y_min, y_max = float(np.min(mesh2d.node_y)), float(np.max(mesh2d.node_y))
+    margin = 1e-6 * max(x_max - x_min, y_max - y_min, 1.0)
+    x_edges = np.linspace(x_min - margin, x_max + margin, num_x + 1).tolist()
+    y_edges = np.linspace(y_min - margin, y_max + margin, num_y + 1).tolist()
+
+    tiles = []
+    for j in range(num_y):
+        for i in range(num_x):
+            bounds = (x_edges[i], y_edges[j], x_edges[i + 1], y_edges[j + 1])
+            halo_bounds = (
+                bounds[0] - halo_width,
+                bounds[1] - halo_width,
+                bounds[2] + halo_width,
+                bounds[3] + halo_width,
+            )
+            tiles.append(Tile(len(tiles), bounds, halo_bounds))
+    return tiles
+
+
+def run_decomposed(
+    mesh2d: Mesh2d,
+    func: Callable,
+    tiles: List[Tile],
+    workers: Optional[int] = None,
+    projection: ProjectionType = ProjectionType.CARTESIAN,
+    search_fraction: float = 0.4,
+    merging_distance: float = 1e-3,
+    mp_context=None,
+) -> DecompositionResult:
+    """Processes a mesh2d tile by tile on worker processes and stitches the tiles back together.
+
+    Each worker cuts its tile out of the mesh2d with `mesh2d_delete` and `invert_deletion`,
+    keeping the faces whose circumcenter lies in the halo rectangle, and calls `func(meshkernel, tile)`
+    with the cut mesh set on the state, for example to refine or orthogonalize it.
+    `func` must be picklable, i.e. defined at module level, and must not delete nodes.
+    If `func` adds no nodes, it must not reorder them either: afterwards, the nodes outside the faces
+    of the core are moved back to their original position, so both sides of a seam agree.
+    If `func` adds nodes, for example a refinement, it may replace and renumber the nodes,
+    and it must give the same faces on both sides of a seam, as local operations do.
+    Finally, the mesh is cut down to the faces whose center lies in the core rectangle,
+    with half-open bounds, so a face centered on a seam belongs to a single tile.
+
+    The tiles are reassembled with `mesh2d_connect_meshes`, which also connects the hanging nodes
+    of tiles refined differently along a seam, and the duplicated seam nodes are merged
+    with `mesh2d_merge_nodes_with_merging_distance`.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d to process.
+        func (Callable): The processing of a tile, taking a MeshKernel instance and the tile.
+        tiles (List[Tile]): The tiles, for example from `make_tiles`.
+        workers (int, optional): The number of worker processes. Default is the number of CPUs.
+        projection (ProjectionType, optional): The projection of the mesh2d. Default is `ProjectionType.CARTESIAN`.
+        search_fraction (float, optional): The search fraction used to connect the tiles. Default is `0.4`.
+        merging_distance (float, optional): The distance below which seam nodes are merged. Default is `1e-3`.
+        mp_context (optional): The multiprocessing context used to start the workers.
+
+    Returns:
+        DecompositionResult: The reassembled mesh2d and the per-tile timings.
+
+    Raises:
+        Exception: The exception raised by the processing of the first failed tile.
+    """
+    batch = run_batch(
+        _process_tile,
+        [(mesh2d, tile, func) for tile in tiles],
+        workers=workers,
+        projection=projection,
+        mp_context=mp_context,
+    )
+    if batch.errors:
+        index = min(batch.errors)
+        logger.error("The processing of tile %d failed", index)
+        raise batch.errors[index]
+
+    start = time.perf_counter()
+    meshkernel = MeshKernel(projection=projection)
+    parts = [part for part in batch.results if part.node_x.size > 0]
+    if parts:
+        meshkernel.mesh2d_set(parts[0])
+        for part in parts[1:]:
+            meshkernel.mesh2d_connect_meshes(part, search_fraction)
+        meshkernel.mesh2d_merge_nodes_with_merging_distance(
+            GeometryList(), merging_distance
+        )
+    result = DecompositionResult(
+        meshkernel.mesh2d_get(), tiles, batch, time.perf_counter() - start
+    )
+
+    logger.debug("Decomposed run: %s", result)
+    return result
+
+
+class TiledInterpolation:
+    """The outcome of `interpolate_tiled`.
+
+    Attributes:
+        interpolated (GeometryList): The coordinates of the mesh locations and their interpolated values.
+        tiles (List[Tile]): The tiles the locations and the samples were partitioned into.
+        run_times (List[float]): For each tile, the time spent selecting its samples and interpolating them.
+        num_samples (List[int]): For each tile, the number of samples in its halo.
+        num_locations (List[int]): For each tile, the number of locations of its halo mesh interpolated by the kernel.
+        memory_estimate (List[int]): For each tile, an estimate of its memory use in bytes: the summed sizes of the
+                                     arrays of the halo mesh, of the samples and of the interpolated values passed to
+                                     and returned by the kernel. It is not a measurement, the memory allocated inside
+                                     the kernel and the temporary arrays are not counted.
+        wall_time (float): The wall-clock time of the whole interpolation, in seconds.
+    """
+
+    def __init__(self, interpolated: GeometryList, tiles: List[Tile]):
+        self.interpolated = interpolated
+        self.tiles = tiles
+        self.run_times: List[float] = [0.0] * len(tiles)
+        self.num_samples: List[int] = [0] * len(tiles)
+        self.num_locations: List[int] = [0] * len(tiles)
+        self.memory_estimate: List[int] = [0] * len(tiles)
+        self.wall_time: float = 0.0
+
+    def __repr__(self):
+        return "TiledInterpolation(num_tiles={}, num_locations={}, max_memory_estimate={} bytes, wall_time={:.3f}s)".format(
+            len(self.tiles),
+            self.interpolated.x_coordinates.size,
+            max(self.memory_estimate, default=0),
+            self.wall_time,
+        )
+
+
+def interpolate_tiled(
+    mesh2d: Mesh2d,
+    samples: GeometryList,
+    location_type: Mesh2dLocation,
+    num_x: int,
+    num_y: int,
+    averaging_method: Optional[AveragingMethod] = None,
+    relative_search_size: float = 1.01,
+    min_samples: int = 1,
+    halo_width: Optional[float] = None,
+    num_states: Optional[int] = None,
+    projection: ProjectionType = ProjectionType.CARTESIAN,
+    float_invalid_value: Optional[float] = None,
+) -> TiledInterpolation:
+    """Interpolates samples on the locations of a mesh2d tile by tile, concurrently.
+
+    Each tile is interpolated on a separate MeshKernel state holding only its halo mesh,
+    the faces whose circumcenter lies in the halo rectangle of the tiles made by `make_tiles`, and with the samples
+    in the halo rectangle only. The tiles without samples are not interpolated. The interpolation uses `mesh2d_averaging_interpolation` if `averaging_method`
+    is given, otherwise `mesh2d_triangulation_interpolation`. Each location takes the value computed
+    by the tile whose core contains it. The nodes, the locations and the samples of a tile are found with
+    range queries on arrays sorted along x, so the work of each tile scales with the tile, not with the mesh.
+
+    The mesh2d is set once on a state to get the coordinates of all its locations,
+    then the tiles share the states through a `MeshKernelPool`.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d to interpolate on.
+        samples (GeometryList): The samples to interpolate.
+        location_type (Mesh2dLocation): The location type on which to interpolate.
+        num_x (int): The number of tiles along x.
+        num_y (int): The number of tiles along y.
+        averaging_method (AveragingMethod, optional): The averaging method. Default is None,
+                                                      for a triangulation interpolation.
+        relative_search_size (float, optional): The relative search size of the averaging. Default is `1.01`.
+        min_samples (int, optional): The minimum number of samples of the averaging. Default is `1`.
+        halo_width (float, optional): The width of the halo around each tile. Default is the search radius
+                                      of the averaging, `relative_search_size` times the longest edge,
+                                      or three times the longest edge for a triangulation interpolation.
+        num_states (int, optional): The number of concurrent states. Default is the number of CPUs.
+        projection (ProjectionType, optional): The projection of the mesh2d. Default is `ProjectionType.CARTESIAN`.
+        float_invalid_value (float, optional): The value of the locations without an interpolated value,
+                                               those no tile owns and those the kernel could not interpolate.
+                                               Default is the invalid value of the MeshKernel library.
+
+    Returns:
+        TiledInterpolation: The interpolated values, aligned with the mesh locations, and the per-tile statistics.
+    """
+    start = time.perf_counter()
+    if halo_width is None:
+        factor = 3.0 if averaging_method is None else relative_search_size
+        halo_width = factor * _max_edge_length(mesh2d)
+    tiles = make_tiles(mesh2d, num_x, num_y, halo_width)
+
+    result = TiledInterpolation(GeometryList(), tiles)
+    with MeshKernelPool(num_states=num_states, projection=projection) as pool:
+        full_mesh2d, library_invalid_value = pool.submit(
+            _get_full_mesh2d, mesh2d
+        ).result()
+        if float_invalid_value is None:
+            float_invalid_value = library_invalid_value
+
+        location_x, location_y = _location_coordinates(full_mesh2d, location_type)
+        if location_type == Mesh2dLocation.FACES:
+            location_keys = _face_keys(full_mesh2d, np.arange(full_mesh2d.node_x.size))
+        else:
+            location_keys = np.stack((location_x, location_y), axis=1)
+
+        edge_nodes = full_mesh2d.edge_nodes.reshape(-1, 2)
+        node_edges, node_edge_offsets = _node_edges(edge_nodes, full_mesh2d.node_x.size)
+        nodes = _SortedPoints(full_mesh2d.node_x, full_mesh2d.node_y)
+        locations = _SortedPoints(location_x, location_y)
+        sample_points = _SortedPoints(samples.x_coordinates, samples.y_coordinates)
+
+        def interpolate(meshkernel: MeshKernel, tile: Tile):
+            tile_start = time.perf_counter()
+            halo_nodes = nodes.query(tile.halo_bounds)
+            halo_edges = np.unique(
+                node_edges[
+                    _ragged_range(
+                        node_edge_offsets[halo_nodes],
+                        node_edge_offsets[halo_nodes + 1],
+                    )
+                ]
+            )
+            halo_mesh2d = _select_edges(full_mesh2d, edge_nodes[halo_edges])
+
+            inside = sample_points.query(tile.halo_bounds)
+            tile_samples = GeometryList(
+                x_coordinates=samples.x_coordinates[inside],
+                y_coordinates=samples.y_coordinates[inside],
+                values=samples.values[inside],
+            )
+            result.num_samples[tile.index] = tile_samples.x_coordinates.size
+            if tile_samples.x_coordinates.size == 0 or halo_mesh2d.node_x.size == 0:
+                # The kernel rejects empty samples, the locations of the tile keep the invalid value
+                result.run_times[tile.index] = time.perf_counter() - tile_start
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.double)
+
+            # Keep the whole faces in the halo only, the kernel does not accept the dangling edges
+            # of the halo nodes
+            meshkernel.mesh2d_set(halo_mesh2d)
+            meshkernel.mesh2d_delete(
+                tile.halo_polygon,
+                DeleteMeshOption.FACES_WITH_INCLUDED_CIRCUMCENTERS,
+                True,
+            )
+            halo_faces = _face_sides(meshkernel.mesh2d_get())
+            if halo_faces.node_x.size == 0:
+                result.run_times[tile.index] = time.perf_counter() - tile_start
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.double)
+            meshkernel.mesh2d_set(halo_faces)
+
+            if averaging_method is None:
+                interpolated = meshkernel.mesh2d_triangulation_interpolation(
+                    tile_samples, location_type
+                )
+            else:
+                interpolated = meshkernel.mesh2d_averaging_interpolation(
+                    tile_samples,
+                    location_type,
+                    averaging_method,
+                    relative_search_size,
+                    min_samples,
+                )
+
+            # Match the locations owned by the tile with the locations of the halo mesh
+            owned = locations.query(tile.bounds)
+            if location_type == Mesh2dLocation.FACES:
+                # The faces are identified by their nodes, the state may renumber the nodes of the halo mesh
+                tile_mesh2d = meshkernel.mesh2d_get()
+                used_nodes = np.unique(edge_nodes[halo_edges])
+                node_match = _match_rows(
+                    np.stack((tile_mesh2d.node_x, tile_mesh2d.node_y), axis=1),
+                    np.stack(
+                        (
+                            full_mesh2d.node_x[used_nodes],
+                            full_mesh2d.node_y[used_nodes],
+                        ),
+                        axis=1,
+                    ),
+                )
+                # A node without an exact match gets an id no face key of the full mesh contains,
+                # so its faces are not matched and keep no value, like the unmatched locations below
+                node_ids = np.where(
+                    node_match >= 0, used_nodes[np.maximum(node_match, 0)], -2
+                )
+                tile_keys = _face_keys(tile_mesh2d, node_ids)
+            else:
+                # Nodes and edge centers are computed from the same node coordinates, they match exactly
+                tile_keys = np.stack(
+                    (interpolated.x_coordinates, interpolated.y_coordinates), axis=1
+                )
+            match = _match_rows(location_keys[owned], tile_keys)
+            found = match >= 0
+
+            result.run_times[tile.index] = time.perf_counter() - tile_start
+            result.num_locations[tile.index] = interpolated.values.size
+            # The summed array sizes, not a measurement of the memory used
+            result.memory_estimate[tile.index] = (
+                halo_mesh2d.node_x.nbytes
+                + halo_mesh2d.node_y.nbytes
+                + halo_mesh2d.edge_nodes.nbytes
+                + tile_samples.x_coordinates.nbytes * 3
+                + interpolated.values.nbytes * 3
+            )
+            return owned[found], interpolated.values[match[found]]
+
+        futures = [pool.submit(interpolate, tile) for tile in tiles]
+
+        values = np.full(location_x.size, float_invalid_value, dtype=np.double)
+        for future in futures:
+            owned, owned_values = future.result()
+            owned_values[owned_values == library_invalid_value] = float_invalid_value
+            values[owned] = owned_values
+
+    result.interpolated = GeometryList(
+        x_coordinates=location_x, y_coordinates=location_y, values=values
+    )
+    result.wall_time = time.perf_counter() - start
+    logger.debug("Tiled interpolation: %s", result)
+    return result
+
+
+def _get_full_mesh2d(meshkernel: MeshKernel, mesh2d: Mesh2d) -> tuple:
+    """Sets a mesh2d on a state and gets it back with its edge and face centers, and the library invalid value."""
+    meshkernel.mesh2d_set(mesh2d)
+    return meshkernel.mesh2d_get(), meshkernel._float_invalid_value
+
+
+def _process_tile(meshkernel: MeshKernel, job: tuple) -> Mesh2d:
+    """Cuts a tile with its halo out of the mesh2d, processes it and cuts it down to its core.
+
+    Args:
+        meshkernel (MeshKernel): The state of the worker process.
+        job (tuple): The mesh2d, the tile and the processing function.
+
+    Returns:
+        Mesh2d: The processed faces of the core of the tile.
+    """
+    mesh2d, tile, func = job
+
+    meshkernel.mesh2d_set(_clip_edges(mesh2d, tile.halo_bounds))
+    meshkernel.mesh2d_delete(
+        tile.halo_polygon, DeleteMeshOption.FACES_WITH_INCLUDED_CIRCUMCENTERS, True
+    )
+    halo_mesh2d = _face_sides(meshkernel.mesh2d_get())
+    if halo_mesh2d.node_x.size == 0:
+        return halo_mesh2d
+
+    # Renumber the state like `halo_mesh2d`, so the node indices below refer to it
+    meshkernel.mesh2d_set(halo_mesh2d)
+    halo_mesh2d = meshkernel.mesh2d_get()
+    frozen = _frozen_nodes(halo_mesh2d, tile.bounds)
+
+    func(meshkernel, tile)
+
+    processed = meshkernel.mesh2d_get()
+    num_nodes = halo_mesh2d.node_x.size
+    if processed.node_x.size < num_nodes:
+        raise ValueError(
+            "The processing of tile {} removed nodes, which cannot be frozen".format(
+                tile.index
+            )
+        )
+    if processed.node_x.size == num_nodes:
+        # Without new nodes, the nodes keep their index and the frozen nodes are moved back
+        frozen = np.flatnonzero(frozen)
+        processed.node_x[frozen] = halo_mesh2d.node_x[frozen]
+        processed.node_y[frozen] = halo_mesh2d.node_y[frozen]
+        meshkernel.mesh2d_set(processed)
+        processed = meshkernel.mesh2d_get()
+    # Otherwise the processing, for example a refinement, may have replaced and renumbered the nodes.
+    # Both sides of a seam agree because the processing is the same on the same faces
+
+    # The faces are assigned with half-open bounds, so a face centered on a seam belongs to a single tile
+    return _face_sides(
+        processed, _inside(processed.face_x, processed.face_y, tile.bounds)
+    )
+
+
+def _frozen_nodes(mesh2d: Mesh2d, bounds: tuple) -> np.ndarray:
+    """Gets the nodes not exclusively used by faces of the core, i.e. the halo and seam nodes.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d with its faces, as returned by `mesh2d_get`.
+        bounds (tuple): The core rectangle.
+
+    Returns:
+        np.ndarray: The boolean mask of the frozen nodes.
+    """
+    outside_faces = ~_inside(mesh2d.face_x, mesh2d.face_y, bounds)
+    face_node_outside = np.repeat(outside_faces, mesh2d.nodes_per_face)
+
+    frozen = np.ones(mesh2d.node_x.size, dtype=bool)
+    frozen[mesh2d.face_nodes] = False
+    frozen[mesh2d.face_nodes[face_node_outside]] = True
+    return frozen
+
+
+def _face_sides(mesh2d: Mesh2d, faces: Optional[np.ndarray] = None) -> Mesh2d:
+    """Removes the edges which are not the side of a face, left over by cutting the mesh, and the unused nodes.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d with its faces, as returned by `mesh2d_get`.
+        faces (np.ndarray, optional): The boolean mask of the faces to keep. Default is None, all faces.
+
+    Returns:
+        Mesh2d: The mesh2d with the sides of its faces and their nodes.
+    """
+    # The sides of each face connect consecutive nodes, the last one back to the first one
+    face_offsets = np.cumsum(mesh2d.nodes_per_face) - mesh2d.nodes_per_face
+    next_face_node = np.arange(1, mesh2d.face_nodes.size + 1)
+    next_face_node[face_offsets + mesh2d.nodes_per_face - 1] = face_offsets
+    sides = np.sort(
+        np.stack([mesh2d.face_nodes, mesh2d.face_nodes[next_face_node]], axis=1),
+        axis=1,
+    ).astype(np.int64)
+    if faces is not None:
+        sides = sides[np.repeat(faces, mesh2d.nodes_per_face)]
+
+    edge_nodes = mesh2d.edge_nodes.reshape(-1, 2)
+    edges = np.sort(edge_nodes, axis=1).astype(np.int64)
+    num_nodes = mesh2d.node_x.size
+    edge_nodes = edge_nodes[
+        np.isin(
+            edges[:, 0] * num_nodes + edges[:, 1], sides[:, 0] * num_nodes + sides[:, 1]
+        )
+    ]
+    return _select_edges(mesh2d, edge_nodes)
+
+
+def _clip_edges(mesh2d: Mesh2d, bounds: tuple) -> Mesh2d:
+    """Keeps the edges with a node in a rectangle, to reduce the mesh set on a worker state before the exact cut.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d.
+        bounds (tuple): The rectangle.
+
+    Returns:
+        Mesh2d: The mesh2d with the selected edges and their nodes.
+    """
+    edge_nodes = mesh2d.edge_nodes.reshape(-1, 2)
+    inside_nodes = _inside(mesh2d.node_x, mesh2d.node_y, bounds)
+    return _select_edges(mesh2d, edge_nodes[inside_nodes[edge_nodes].any(axis=1)])
+
+
+def _select_edges(mesh2d: Mesh2d, edge_nodes: np.ndarray) -> Mesh2d:
+    """Gets the mesh2d made of the given edges of a mesh2d and their nodes.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d.
+        edge_nodes (np.ndarray): The selected edges, as node index pairs of shape (num_edges, 2).
+
+    Returns:
+        Mesh2d: The mesh2d with the selected edges and their nodes, renumbered.
+    """
+    used_nodes, inverse = np.unique(edge_nodes, return_inverse=True)
+    return Mesh2d(
+        node_x=mesh2d.node_x[used_nodes],
+        node_y=mesh2d.node_y[used_nodes],
+        edge_nodes=inverse.reshape(-1).astype(np.int32),
+    )
+
+
+def _location_coordinates(mesh2d: Mesh2d, location_type: Mesh2dLocation) -> tuple:
+    """Gets the coordinates of the locations of a type, from a mesh2d returned by `mesh2d_get`."""
+    if location_type == Mesh2dLocation.NODES:
+        return mesh2d.node_x, mesh2d.node_y
+    if location_type == Mesh2dLocation.EDGES:
+        return mesh2d.edge_x, mesh2d.edge_y
+    return mesh2d.face_x, mesh2d.face_y
+
+
+def _face_keys(mesh2d: Mesh2d, node_ids: np.ndarray) -> np.ndarray:
+    """Identifies the faces of a mesh2d by the sorted ids of their nodes.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d with its faces, as returned by `mesh2d_get`.
+        node_ids (np.ndarray): The id of each node of the mesh2d.
+
+    Returns:
+        np.ndarray: For each face, the sorted ids of its nodes, padded with -1 to the largest face.
+    """
+    nodes_per_face = mesh2d.nodes_per_face.astype(np.int64)
+    num_faces = nodes_per_face.size
+    width = int(nodes_per_face.max()) if num_faces > 0 else 0
+    face_starts = np.cumsum(nodes_per_face) - nodes_per_face
+    face = np.repeat(np.arange(num_faces), nodes_per_face)
+    position = np.arange(face.size) - np.repeat(face_starts, nodes_per_face)
+
+    keys = np.full((num_faces, width), -1, dtype=np.int64)
+    keys[face, position] = np.asarray(node_ids, dtype=np.int64)[mesh2d.face_nodes]
+    return np.sort(keys, axis=1)
+
+
+def _match_rows(reference: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Gets, for each row of `reference`, the index of the equal row of `query`, or -1 if there is none."""
+    if reference.shape[0] == 0 or query.shape[0] == 0:
+        return np.full(reference.shape[0], -1, dtype=np.int64)
+
+    _, inverse = np.unique(
+        np.concatenate((reference, query)), axis=0, return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+    position = np.full(inverse.max() + 1, -1, dtype=np.int64)
+    position[inverse[reference.shape[0] :]] = np.arange(query.shape[0])
+    return position[inverse[: reference.shape[0]]]
+
+
+def _node_edges(edge_nodes: np.ndarray, num_nodes: int) -> tuple:
+    """Gets the edges of each node, as the edge indices sorted by node and the offsets of each node in them."""
+    flat_nodes = edge_nodes.reshape(-1)
+    order = np.argsort(flat_nodes, kind="stable")
+    offsets = np.searchsorted(flat_nodes[order], np.arange(num_nodes + 1))
+    return order // 2, offsets
+
+
+def _ragged_range(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenates the ranges `[starts[i], ends[i])`."""
+    sizes = ends - starts
+    total = int(sizes.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    range_starts = np.cumsum(sizes) - sizes
+    return np.arange(total) + np.repeat(starts - range_starts, sizes)
+
+
+class _SortedPoints:
+    """Points sorted along x, so the points in a rectangle are found by scanning its x-range only."""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self._order = np.argsort(x, kind="stable")
+        self._x = np.asarray(x)[self._order]
+        self._y = np.asarray(y)[self._order]
+
+    def query(self, bounds: tuple) -> np.ndarray:
+        """Gets the sorted indices of the points inside a rectangle, as `_inside` selects them."""
+        first, last = np.searchsorted(self._x, [bounds[0], bounds[2]])
+        y = self._y[first:last]
+        return np.sort(self._order[first:last][(y >= bounds[1]) & (y < bounds[3])])
+
+
+def _inside(x: np.ndarray, y: np.ndarray, bounds: tuple) -> np.ndarray:
+    """Gets the mask of the points inside a rectangle (x_min, y_min, x_max, y_max)."""
+    return (x >= bounds[0]) & (x < bounds[2]) & (y >= bounds[1]) & (y < bounds[3])
+
+
+def _rectangle(x_min: float, y_min: float, x_max: float, y_max: float) -> GeometryList:
+    """Gets the closed polygon of a rectangle."""
+    return GeometryList(
+        x_coordinates=np.array([x_min, x_max, x_max, x_min, x_min], dtype=np.double),
+        y_coordinates=np.array([y_min, y_min, y_max, y_max, y_min], dtype=np.double),
+    )
+
+
+def _edge_lengths(mesh2d: Mesh2d) -> np.ndarray:
+    """Gets the lengths of the edges of a mesh2d."""
+    edge_nodes = mesh2d.edge_nodes.reshape(-1, 2)
+    return np.hypot(
+        mesh2d.node_x[edge_nodes[:, 1]] - mesh2d.node_x[edge_nodes[:, 0]],
+        mesh2d.node_y[edge_nodes[:, 1]] - mesh2d.node_y[edge_nodes[:, 0]],
+    )
+
+
+def _max_edge_length(mesh2d: Mesh2d) -> float:
+    """Gets the length of the longest edge of a mesh2d, or 1 if it has none."""
+    if mesh2d.edge_nodes.size == 0:
+        return 1.0
+    return float(np.max(_edge_lengths(mesh2d)))
+
+
+def _mean_edge_length(mesh2d: Mesh2d) -> float:
+    """Gets the mean length of the edges of a mesh2d, or 1 if it has none."""
+    if mesh2d.edge_nodes.size == 0:
+        return 1.0
+    return float(np.mean(_edge_lengths(mesh2d)))
@@ -11,6 +11,10 @@ class InputError(Error):
     """Exception raised for errors in the input."""
 
 
+class ZeroCopyError(InputError):
+    """Exception raised when an input would be copied while copies are forbidden."""
+
+
 class MeshKernelError(Error):
     """Exception raised for errors occurring in the MeshKernel library."""
 
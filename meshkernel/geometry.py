@@ -0,0 +1,932 @@
+from __future__ import annotations
+
+import logging
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from numpy import ndarray
+
+from meshkernel.polygons import PolygonRings
+from meshkernel.py_structures import GeometryList, Mesh1d, Mesh2d
+from meshkernel.utils import get_ring_ranges
+
+logger = logging.getLogger(__name__)
+
+# The automatic simplification tolerance and thinning cell size, as a fraction of the median mesh2d edge length
+_AUTO_TOLERANCE_FACTOR = 0.25
+
+# The clipping margin, as a fraction of the largest side of the mesh extent
+_CLIP_MARGIN_FACTOR = 0.1
+
+# The mean number of samples per cell above which the samples are thinned to the mesh resolution
+_AUTO_THIN_DENSITY = 4.0
+
+
+def simplify_geometry_list(
+    geometry_list: GeometryList,
+    tolerance: Union[float, str],
+    preserve_topology: bool = True,
+    mesh2d: Optional[Mesh2d] = None,
+) -> GeometryList:
+    """Simplifies the rings of a GeometryList with the Douglas-Peucker algorithm, keeping its separators.
+
+    The first and last vertices of each ring are always kept. The rings are simplified all at once:
+    each iteration finds the farthest vertex of all the pending segments of all the rings, and splits
+    the segments whose farthest vertex is farther than the tolerance.
+
+    A ring is closed when its last vertex repeats its first one. With `preserve_topology`, a closed ring
+    keeps at least three distinct vertices, so no polygon collapses. Otherwise the closed rings collapsing
+    to fewer than three distinct vertices are removed, with their holes for an outer ring.
+    Intersections created between the simplified rings are not checked.
+
+    Args:
+        geometry_list (GeometryList): The polygons or polylines.
+        tolerance (Union[float, str]): The maximum distance between a removed vertex and the simplified ring,
+                                       or "auto" for a quarter of the median edge length of `mesh2d`.
+        preserve_topology (bool, optional): Whether the closed rings are kept as valid polygons. Default is `True`.
+        mesh2d (Mesh2d, optional): The mesh2d the geometries are used with, required for the "auto" tolerance.
+
+    Returns:
+        GeometryList: The simplified geometries, with the values of the kept vertices.
+    """
+    tolerance = _resolve_tolerance(tolerance, mesh2d)
+    x = geometry_list.x_coordinates
+    y = geometry_list.y_coordinates
+    starts, ends, geometry_index, ring_position = get_ring_ranges(
+        x, geometry_list.geometry_separator, geometry_list.inner_outer_separator
+    )
+
+    # The separators are kept, the vertices only when the simplification needs them
+    keep = (x == geometry_list.geometry_separator) | (
+        x == geometry_list.inner_outer_separator
+    )
+    keep[starts] = True
+    keep[ends - 1] = True
+
+    segment_start, segment_end = starts, ends - 1
+    while True:
+        pending = segment_end - segment_start > 1
+        segment_start, segment_end = segment_start[pending], segment_end[pending]
+        if segment_start.size == 0:
+            break
+
+        farthest, distance = _farthest_vertices(
+            x, y, segment_start, segment_end, segment_start + 1, segment_end
+        )
+        split = distance > tolerance
+        keep[farthest[split]] = True
+        segment_start, segment_end = (
+            np.concatenate((segment_start[split], farthest[split])),
+            np.concatenate((farthest[split], segment_end[split])),
+        )
+
+    closed = (
+        (ends - starts >= 4) & (x[starts] == x[ends - 1]) & (y[starts] == y[ends - 1])
+    )
+    kept_count = np.concatenate(([0], np.cumsum(keep)))
+    collapsed = closed & (kept_count[ends] - kept_count[starts] < 4)
+
+    if preserve_topology:
+        _keep_triangles(x, y, starts[collapsed], ends[collapsed], keep)
+    else:
+        # A collapsed outer ring removes its polygon
+        removed = np.isin(
+            geometry_index, geometry_index[collapsed & (ring_position == 0)]
+        )
+        removed |= collapsed
+        in_removed_ring = np.zeros(x.size + 1, dtype=np.int64)
+        np.add.at(in_removed_ring, starts[removed], 1)
+        np.add.at(in_removed_ring, ends[removed], -1)
+        keep[np.cumsum(in_removed_ring[:-1]) > 0] = False
+
+    indices = _normalize_separators(
+        x,
+        np.flatnonzero(keep),
+        geometry_list.geometry_separator,
+        geometry_list.inner_outer_separator,
+    )
+    logger.debug(
+        "Simplified %d vertices to %d with tolerance %g",
+        x.size,
+        indices.size,
+        tolerance,
+    )
+    return GeometryList(
+        x_coordinates=x[indices],
+        y_coordinates=y[indices],
+        values=(
+            geometry_list.values[indices]
+            if geometry_list.values.size
+            else geometry_list.values
+        ),
+        geometry_separator=geometry_list.geometry_separator,
+        inner_outer_separator=geometry_list.inner_outer_separator,
+    )
+
+
+def _resolve_tolerance(tolerance: Union[float, str], mesh2d: Optional[Mesh2d]) -> float:
+    """Gets the numeric simplification tolerance."""
+    if isinstance(tolerance, str):
+        if tolerance != "auto":
+            raise ValueError("tolerance must be a number or 'auto'")
+        return _AUTO_TOLERANCE_FACTOR * median_edge_length(mesh2d)
+
+    if tolerance < 0.0:
+        raise ValueError("tolerance must not be negative")
+    return float(tolerance)
+
+
+def _farthest_vertices(
+    x: ndarray,
+    y: ndarray,
+    segment_start: ndarray,
+    segment_end: ndarray,
+    range_start: ndarray,
+    range_end: ndarray,
+):
+    """Finds, for each segment, the vertex of a non-empty index range farthest from the segment.
+
+    Args:
+        x (ndarray): The x-coordinates of the vertices.
+        y (ndarray): The y-coordinates of the vertices.
+        segment_start (ndarray): The index of the first vertex of each segment.
+        segment_end (ndarray): The index of the last vertex of each segment.
+        range_start (ndarray): The first index of the vertices searched for each segment.
+        range_end (ndarray): The end index (exclusive) of the vertices searched for each segment.
+
+    Returns:
+        tuple: The index of the farthest vertex of each segment, and its distance to the segment.
+    """
+    segment, vertex = _expand_ranges(range_start, range_end)
+    offsets = np.flatnonzero(np.diff(segment, prepend=-1))
+
+    start_x, start_y = x[segment_start][segment], y[segment_start][segment]
+    delta_x = x[segment_end][segment] - start_x
+    delta_y = y[segment_end][segment] - start_y
+    squared_length = delta_x * delta_x + delta_y * delta_y
+
+    # The projection on the segment, clamped to its ends, so degenerate segments measure the distance to a point
+    projection = np.divide(
+        (x[vertex] - start_x) * delta_x + (y[vertex] - start_y) * delta_y,
+        squared_length,
+        out=np.zeros(segment.size),
+        where=squared_length > 0.0,
+    )
+    projection = np.clip(projection, 0.0, 1.0)
+    distance = np.hypot(
+        start_x + projection * delta_x - x[vertex],
+        start_y + projection * delta_y - y[vertex],
+    )
+
+    maximum = np.maximum.reduceat(distance, offsets)
+    is_maximum = np.flatnonzero(distance == maximum[segment])
+    _, first = np.unique(segment[is_maximum], return_index=True)
+    return vertex[is_maximum[first]], maximum
+
+
+def _keep_triangles(
+    x: ndarray, y: ndarray, starts: ndarray, ends: ndarray, keep: ndarray
+):
+    """Keeps three distinct vertices of closed rings: the first one, the vertex farthest from it,
+    and the vertex farthest from the segment between them."""
+    if starts.size == 0:
+        return
+
+    first_vertex = starts
+    second_vertex, _ = _farthest_vertices(
+        x, y, first_vertex, first_vertex, starts, ends
+    )
+    third_vertex, _ = _farthest_vertices(
+        x, y, first_vertex, second_vertex, starts, ends
+    )
+    keep[second_vertex] = True
+    keep[third_vertex] = True
+
+
+def _normalize_separators(
+    x: ndarray,
+    indices: ndarray,
+    geometry_separator: float,
+    inner_outer_separator: float,
+) -> ndarray:
+    """Removes the leading, trailing and repeated separators left by removed rings.
+
+    A run of separators is replaced by its first geometry separator, if any, else by its first separator.
+
+    Args:
+        x (ndarray): The x-coordinates.
+        indices (ndarray): The kept indices.
+        geometry_separator (float): The value used as a separator in the coordinates.
+        inner_outer_separator (float): The value used to separate the inner part of a polygon from its outer part.
+
+    Returns:
+        ndarray: The normalized kept indices.
+    """
+    values = x[indices]
+    is_geometry_separator = values == geometry_separator
+    is_separator = is_geometry_separator | (values == inner_outer_separator)
+    if not np.any(is_separator):
+        return indices
+
+    # Rank the separators of each run, geometry separators first, and keep the first one
+    run_start = is_separator & ~np.concatenate(([False], is_separator[:-1]))
+    run = np.cumsum(run_start) - 1
+    separator_positions = np.flatnonzero(is_separator)
+    order = np.lexsort(
+        (
+            separator_positions,
+            ~is_geometry_separator[separator_positions],
+            run[separator_positions],
+        )
+    )
+    _, first = np.unique(run[separator_positions[order]], return_index=True)
+    kept = ~is_separator
+    kept[separator_positions[order[first]]] = True
+
+    # Separators before the first vertex or after the last one delimit nothing
+    vertices = np.flatnonzero(~is_separator)
+    if vertices.size == 0:
+        return indices[:0]
+    kept[: vertices[0]] = False
+    kept[vertices[-1] + 1 :] = False
+    return indices[kept]
+
+
+def clip_geometry_list(
+    geometry_list: GeometryList,
+    bounds: Tuple[float, float, float, float],
+    polygons: bool = True,
+    spherical: bool = False,
+) -> GeometryList:
+    """Clips the rings of a GeometryList to a rectangle.
+
+    The rings whose bounding box does not intersect the rectangle are found with the R-tree
+    of the rings and removed. The others are clipped all at once: the polygons with the Sutherland-Hodgman
+    algorithm, one side of the rectangle at a time, the polylines segment by segment with the Liang-Barsky
+    algorithm, each part inside the rectangle becoming a separate polyline.
+    A polygon is removed with its holes when its outer ring is removed. The values are not kept.
+
+    With spherical coordinates, the rings intersecting the rectangle shifted by 360 degrees of longitude
+    are kept unclipped.
+
+    Args:
+        geometry_list (GeometryList): The polygons or polylines.
+        bounds (Tuple[float, float, float, float]): The minimum x, minimum y, maximum x and maximum y of the rectangle.
+        polygons (bool, optional): Whether the rings are polygons, or polylines. Default is `True`.
+        spherical (bool, optional): Whether the coordinates are longitudes and latitudes. Default is `False`.
+
+    Returns:
+        GeometryList: The clipped geometries.
+    """
+    rings = PolygonRings.of(geometry_list)
+    x_min, y_min, x_max, y_max = bounds
+    shifts = np.array([0.0, -360.0, 360.0] if spherical else [0.0])
+    box_index, ring_index = rings.rings_intersecting_boxes(
+        x_min + shifts,
+        np.full(shifts.size, y_min),
+        x_max + shifts,
+        np.full(shifts.size, y_max),
+    )
+    num_rings = rings.starts.size
+    whole = np.zeros(num_rings, dtype=bool)
+    whole[ring_index[box_index > 0]] = True
+    clipped = np.zeros(num_rings, dtype=bool)
+    clipped[ring_index[box_index == 0]] = True
+    clipped &= ~whole
+
+    x = geometry_list.x_coordinates
+    y = geometry_list.y_coordinates
+    starts, ends = rings.starts, rings.ends
+    is_closed = (
+        (ends - starts >= 2) & (x[starts] == x[ends - 1]) & (y[starts] == y[ends - 1])
+    )
+
+    # The vertices of the unclipped rings
+    whole_owner, whole_index = _expand_ranges(starts[whole], ends[whole])
+    whole_owner = np.flatnonzero(whole)[whole_owner]
+
+    # The vertices of the clipped rings, without the closing vertex of the polygons
+    clipped_ends = ends - (is_closed & polygons)
+    clipped &= clipped_ends > starts
+    owner, index = _expand_ranges(starts[clipped], clipped_ends[clipped])
+    owner = np.flatnonzero(clipped)[owner]
+
+    if polygons:
+        clip_x, clip_y, clip_owner = _clip_polygons(x[index], y[index], owner, bounds)
+        clip_part = clip_owner
+    else:
+        clip_x, clip_y, clip_owner, clip_part = _clip_polylines(
+            x[index], y[index], owner, bounds
+        )
+        clip_part = clip_part + num_rings
+
+    part = np.concatenate((whole_owner, clip_part))
+    part_owner = np.concatenate((whole_owner, clip_owner))
+    part_x = np.concatenate((x[whole_index], clip_x))
+    part_y = np.concatenate((y[whole_index], clip_y))
+
+    if polygons:
+        # Rings clipped to fewer than three vertices are removed, and polygons with their outer ring
+        count = np.bincount(part_owner, minlength=num_rings)
+        kept = (whole & (count > 0)) | (clipped & (count >= 3))
+        is_outer = np.concatenate(([True], np.diff(rings.polygon_index) != 0))
+        outer_kept = np.zeros(rings.num_polygons, dtype=bool)
+        outer_kept[rings.polygon_index[is_outer]] = kept[is_outer]
+        kept &= outer_kept[rings.polygon_index]
+        selected = kept[part_owner]
+        part, part_owner = part[selected], part_owner[selected]
+        part_x, part_y = part_x[selected], part_y[selected]
+
+    order = np.lexsort((part, part_owner))
+    part, part_owner = part[order], part_owner[order]
+    part_x, part_y = part_x[order], part_y[order]
+    if part.size == 0:
+        return GeometryList(
+            geometry_separator=geometry_list.geometry_separator,
+            inner_outer_separator=geometry_list.inner_outer_separator,
+        )
+
+    part_starts = np.flatnonzero(np.diff(part, prepend=-1))
+    part_ends = np.append(part_starts[1:], part.size)
+    first_owner = part_owner[part_starts]
+
+    if polygons:
+        # Close the clipped rings of the closed polygons again
+        reclose = clipped[first_owner] & is_closed[first_owner]
+        part_x = np.insert(part_x, part_ends[reclose], part_x[part_starts[reclose]])
+        part_y = np.insert(part_y, part_ends[reclose], part_y[part_starts[reclose]])
+        part_starts = part_starts + np.concatenate(([0], np.cumsum(reclose)[:-1]))
+
+        same_polygon = np.diff(rings.polygon_index[first_owner]) == 0
+        separators = np.where(
+            same_polygon,
+            geometry_list.inner_outer_separator,
+            geometry_list.geometry_separator,
+        )
+    else:
+        separators = np.full(part_starts.size - 1, geometry_list.geometry_separator)
+
+    return GeometryList(
+        x_coordinates=np.insert(part_x, part_starts[1:], separators),
+        y_coordinates=np.insert(part_y, part_starts[1:], separators),
+        geometry_separator=geometry_list.geometry_separator,
+        inner_outer_separator=geometry_list.inner_outer_separator,
+    )
+
+
+def clip_to_extent(
+    geometry_list: GeometryList,
+    extent: Tuple[float, float, float, float],
+    polygons: bool = True,
+    spherical: bool = False,
+) -> GeometryList:
+    """Clips a GeometryList to the extent of a mesh, enlarged by a margin, and caches the result with the GeometryList.
+
+    The margin is a tenth of the largest side of the extent, so the clipped polygon boundaries stay
+    away from the mesh. The cached result is reused as long as the extent, enlarged by half the margin,
+    remains within the clipping rectangle, so moving the mesh nodes slightly does not clip again.
+    When nothing is left after clipping, the GeometryList is returned unchanged, since an empty
+    GeometryList often selects the whole mesh.
+
+    Args:
+        geometry_list (GeometryList): The polygons or polylines.
+        extent (Tuple[float, float, float, float]): The minimum x, minimum y, maximum x and maximum y of the mesh.
+        polygons (bool, optional): Whether the rings are polygons, or polylines. Default is `True`.
+        spherical (bool, optional): Whether the coordinates are longitudes and latitudes. Default is `False`.
+
+    Returns:
+        GeometryList: The clipped geometries.
+    """
+    if geometry_list.x_coordinates.size == 0:
+        return geometry_list
+
+    x_min, y_min, x_max, y_max = extent
+    margin = _CLIP_MARGIN_FACTOR * max(x_max - x_min, y_max - y_min, 1e-9)
+
+    cache = geometry_list._derived("clipped", lambda _: {})
+    cached = cache.get((polygons, spherical))
+    if cached is not None:
+        (clip_x_min, clip_y_min, clip_x_max, clip_y_max), result = cached
+        half_margin = 0.5 * margin
+        if (
+            clip_x_min <= x_min - half_margin
+            and clip_y_min <= y_min - half_margin
+            and clip_x_max >= x_max + half_margin
+            and clip_y_max >= y_max + half_margin
+        ):
+            return result
+
+    bounds = (x_min - margin, y_min - margin, x_max + margin, y_max + margin)
+    result = clip_geometry_list(geometry_list, bounds, polygons, spherical)
+    if result.x_coordinates.size == 0:
+        result = geometry_list
+    logger.debug(
+        "Clipped %d vertices to %d within %s",
+        geometry_list.x_coordinates.size,
+        result.x_coordinates.size,
+        bounds,
+    )
+    cache[(polygons, spherical)] = (bounds, result)
+    return result
+
+
+def _clip_polygons(
+    x: ndarray,
+    y: ndarray,
+    owner: ndarray,
+    bounds: Tuple[float, float, float, float],
+):
+    """Clips open rings to a rectangle with the Sutherland-Hodgman algorithm, all the rings at once.
+
+    Args:
+        x (ndarray): The x-coordinates of the vertices.
+        y (ndarray): The y-coordinates of the vertices.
+        owner (ndarray): The ring of each vertex, the vertices of a ring being contiguous.
+        bounds (Tuple[float, float, float, float]): The minimum x, minimum y, maximum x and maximum y of the rectangle.
+
+    Returns:
+        tuple: The x-coordinates, the y-coordinates and the ring of the clipped vertices.
+    """
+    x_min, y_min, x_max, y_max = bounds
+    for along_x, limit, keep_greater in (
+        (True, x_min, True),
+        (True, x_max, False),
+        (False, y_min, True),
+        (False, y_max, False),
+    ):
+        if owner.size == 0:
+            break
+
+        coordinate = x if along_x else y
+        inside = coordinate >= limit if keep_greater else coordinate <= limit
+        ring_starts = np.flatnonzero(np.diff(owner, prepend=-1))
+        next_vertex = np.arange(1, owner.size + 1)
+        next_vertex[np.append(ring_starts[1:], owner.size) - 1] = ring_starts
+
+        # Each edge outputs the crossing with the side, if any, then its end vertex, if inside
+        next_inside = inside[next_vertex]
+        crosses = inside != next_inside
+        edge, position = _expand_ranges(
+            np.zeros(owner.size, dtype=np.int64),
+            next_inside.astype(np.int64) + crosses,
+        )
+        is_crossing = crosses[edge] & (position == 0)
+
+        start, end = edge, next_vertex[edge]
+        ratio = np.divide(
+            limit - coordinate[start],
+            coordinate[end] - coordinate[start],
+            out=np.zeros(edge.size),
+            where=is_crossing,
+        )
+        x = np.where(is_crossing, x[start] + ratio * (x[end] - x[start]), x[end])
+        y = np.where(is_crossing, y[start] + ratio * (y[end] - y[start]), y[end])
+        (x if along_x else y)[is_crossing] = limit
+        owner = owner[edge]
+
+    return x, y, owner
+
+
+def _clip_polylines(
+    x: ndarray,
+    y: ndarray,
+    owner: ndarray,
+    bounds: Tuple[float, float, float, float],
+):
+    """Clips polylines to a rectangle with the Liang-Barsky algorithm, all the segments at once.
+
+    Args:
+        x (ndarray): The x-coordinates of the vertices.
+        y (ndarray): The y-coordinates of the vertices.
+        owner (ndarray): The polyline of each vertex, the vertices of a polyline being contiguous.
+        bounds (Tuple[float, float, float, float]): The minimum x, minimum y, maximum x and maximum y of the rectangle.
+
+    Returns:
+        tuple: The x-coordinates, the y-coordinates, the polyline and the part of the clipped vertices,
+               a part being a polyline piece inside the rectangle.
+    """
+    x_min, y_min, x_max, y_max = bounds
+    segment = np.flatnonzero(owner[1:] == owner[:-1])
+    start_x, start_y = x[segment], y[segment]
+    delta_x, delta_y = x[segment + 1] - start_x, y[segment + 1] - start_y
+
+    # The parameters of the part of each segment inside the rectangle
+    entering = np.zeros(segment.size)
+    leaving = np.ones(segment.size)
+    rejected = np.zeros(segment.size, dtype=bool)
+    for direction, distance in (
+        (-delta_x, start_x - x_min),
+        (delta_x, x_max - start_x),
+        (-delta_y, start_y - y_min),
+        (delta_y, y_max - start_y),
+    ):
+        parallel = direction == 0.0
+        rejected |= parallel & (distance < 0.0)
+        ratio = np.divide(
+            distance, direction, out=np.zeros(segment.size), where=~parallel
+        )
+        entering = np.where(direction < 0.0, np.maximum(entering, ratio), entering)
+        leaving = np.where(direction > 0.0, np.minimum(leaving, ratio), leaving)
+
+    kept = ~rejected & (entering <= leaving)
+    segment, entering, leaving = segment[kept], entering[kept], leaving[kept]
+    start_x, start_y = start_x[kept], start_y[kept]
+    delta_x, delta_y = delta_x[kept], delta_y[kept]
+
+    # A part continues through consecutive segments not cut by the rectangle
+    continues = np.zeros(segment.size, dtype=bool)
+    continues[1:] = (
+        (segment[1:] == segment[:-1] + 1)
+        & (leaving[:-1] == 1.0)
+        & (entering[1:] == 0.0)
+    )
+    part_start = ~continues
+    part = np.cumsum(part_start) - 1
+
+    # Each segment outputs its start, if it starts a part, then its end
+    item, position = _expand_ranges(
+        np.zeros(segment.size, dtype=np.int64), 1 + part_start.astype(np.int64)
+    )
+    ratio = np.where(part_start[item] & (position == 0), entering[item], leaving[item])
+    return (
+        start_x[item] + ratio * delta_x[item],
+        start_y[item] + ratio * delta_y[item],
+        owner[segment[item]],
+        part[item],
+    )
+
+
+def _expand_ranges(range_start: ndarray, range_end: ndarray):
+    """Lists the indices of several index ranges.
+
+    Args:
+        range_start (ndarray): The first index of each range.
+        range_end (ndarray): The end index (exclusive) of each range.
+
+    Returns:
+        tuple: The range of each index, and the index.
+    """
+    counts = range_end - range_start
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    owner = np.repeat(np.arange(counts.size), counts)
+    return owner, np.arange(owner.size) - offsets[owner] + range_start[owner]
+
+
+class SampleThinning:
+    """The outcome of `thin_samples`.
+
+    Attributes:
+        samples (GeometryList): The thinned samples, one per occupied cell.
+        num_samples_before (int): The number of samples before the thinning.
+        cell_size (float): The size of the cells.
+    """
+
+    def __init__(
+        self, samples: GeometryList, num_samples_before: int, cell_size: float
+    ):
+        self.samples = samples
+        self.num_samples_before = num_samples_before
+        self.cell_size = cell_size
+
+    @property
+    def num_samples_after(self) -> int:
+        """The number of samples after the thinning."""
+        return int(self.samples.x_coordinates.size)
+
+    @property
+    def reduction_ratio(self) -> float:
+        """The number of samples before the thinning per sample after it."""
+        if self.num_samples_after == 0:
+            return 1.0
+        return self.num_samples_before / self.num_samples_after
+
+    def __repr__(self):
+        return "SampleThinning(samples={} -> {}, ratio={:.2f}, cell_size={:g})".format(
+            self.num_samples_before,
+            self.num_samples_after,
+            self.reduction_ratio,
+            self.cell_size,
+        )
+
+
+def thin_samples(
+    samples: GeometryList,
+    cell_size: Union[float, str],
+    reducer: str = "mean",
+    mesh2d: Optional[Mesh2d] = None,
+) -> SampleThinning:
+    """Thins scattered samples by binning them on a grid and keeping one sample per occupied cell.
+
+    The cells are found by hashing the cell indices of the samples with `np.unique`, so only the
+    occupied cells are stored. The samples of a cell are reduced to:
+
+    - "mean": the mean value, at the mean coordinates of the samples.
+    - "median": the median value, at the coordinates of the sample holding it.
+    - "min" or "max": the minimum or maximum value, at the coordinates of the sample holding it.
+    - "closest": the sample closest to the cell center.
+
+    The separators and the samples with a NaN value are discarded.
+
+    Args:
+        samples (GeometryList): The samples.
+        cell_size (Union[float, str]): The size of the cells, or "auto" for a quarter of
+                                       the median edge length of `mesh2d`.
+        reducer (str, optional): The reduction of the samples of a cell. Default is "mean".
+        mesh2d (Mesh2d, optional): The mesh2d the samples are used with, required for the "auto" cell size.
+
+    Returns:
+        SampleThinning: The thinned samples and the reduction ratio.
+
+    Raises:
+        ValueError: If the cell size or the reducer is invalid, or if the reducer needs values the samples lack.
+    """
+    if isinstance(cell_size, str):
+        if cell_size != "auto":
+            raise ValueError("cell_size must be a number or 'auto'")
+        cell_size = _AUTO_TOLERANCE_FACTOR * median_edge_length(mesh2d)
+    if not cell_size > 0.0:
+        raise ValueError("cell_size must be positive")
+    if reducer not in ("mean", "median", "min", "max", "closest"):
+        raise ValueError("reducer must be 'mean', 'median', 'min', 'max' or 'closest'")
+
+    x, y, values = samples.x_coordinates, samples.y_coordinates, samples.values
+    has_values = values.size > 0
+    if not has_values and reducer in ("median", "min", "max"):
+        raise ValueError("The reducer {!r} needs sample values".format(reducer))
+
+    valid = (x != samples.geometry_separator) & (x != samples.inner_outer_separator)
+    if has_values:
+        valid &= ~np.isnan(values)
+    x, y = x[valid], y[valid]
+    values = values[valid] if has_values else values
+
+    result = GeometryList(
+        geometry_separator=samples.geometry_separator,
+        inner_outer_separator=samples.inner_outer_separator,
+    )
+    if x.size == 0:
+        return SampleThinning(result, int(samples.x_coordinates.size), cell_size)
+
+    column = np.floor((x - np.min(x)) / cell_size).astype(np.int64)
+    row = np.floor((y - np.min(y)) / cell_size).astype(np.int64)
+    keys = row * (int(np.max(column)) + 1) + column
+    _, cell, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    cell = cell.reshape(-1)
+
+    if reducer == "mean":
+        result.x_coordinates = np.bincount(cell, weights=x) / counts
+        result.y_coordinates = np.bincount(cell, weights=y) / counts
+        if has_values:
+            result.values = np.bincount(cell, weights=values) / counts
+    else:
+        # Sort the samples by cell, then by the key of the reducer, and pick one sample per cell
+        if reducer == "closest":
+            center_x = np.min(x) + (column + 0.5) * cell_size
+            center_y = np.min(y) + (row + 0.5) * cell_size
+            sort_key = np.hypot(x - center_x, y - center_y)
+        else:
+            sort_key = values
+        order = np.lexsort((sort_key, cell))
+        first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        if reducer == "median":
+            picked = first + (counts - 1) // 2
+        elif reducer == "max":
+            picked = first + counts - 1
+        else:
+            picked = first
+        picked = order[picked]
+        result.x_coordinates = x[picked]
+        result.y_coordinates = y[picked]
+        if has_values:
+            result.values = values[picked]
+
+    thinning = SampleThinning(result, int(samples.x_coordinates.size), cell_size)
+    logger.debug("Thinned samples: %s", thinning)
+    return thinning
+
+
+def thin_to_resolution(
+    samples: GeometryList, edge_length: float, reducer: str = "mean"
+) -> GeometryList:
+    """Thins the samples only if their density greatly exceeds the resolution of a mesh.
+
+    The cell size is a quarter of the edge length. The samples are thinned when they hold,
+    on average over their bounding box, more than `_AUTO_THIN_DENSITY` samples per cell.
+
+    Args:
+        samples (GeometryList): The samples.
+        edge_length (float): The typical edge length of the mesh.
+        reducer (str, optional): The reduction of the samples of a cell. Default is "mean".
+
+    Returns:
+        GeometryList: The thinned samples, or the samples themselves.
+    """
+    x, y = samples.x_coordinates, samples.y_coordinates
+    cell_size = _AUTO_TOLERANCE_FACTOR * edge_length
+    if x.size < 2 or not cell_size > 0.0:
+        return samples
+
+    valid = (x != samples.geometry_separator) & (x != samples.inner_outer_separator)
+    width = np.ptp(x[valid]) + cell_size
+    height = np.ptp(y[valid]) + cell_size
+    density = np.count_nonzero(valid) * cell_size**2 / (width * height)
+    if density <= _AUTO_THIN_DENSITY:
+        return samples
+
+    thinning = thin_samples(samples, cell_size, reducer)
+    logger.info("Thinned dense samples to the mesh resolution: %s", thinning)
+    return thinning.samples
+
+
+def median_edge_length(mesh2d: Optional[Mesh2d]) -> float:
+    """Gets the median edge length of a mesh2d, the typical resolution used by the "auto" sizes.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d.
+
+    Returns:
+        float: The median edge length.
+
+    Raises:
+        ValueError: If the mesh2d is None or has no edges.
+    """
+    if mesh2d is None or mesh2d.edge_nodes.size == 0:
+        raise ValueError("The median edge length requires a mesh2d with edges")
+
+    edge_nodes = mesh2d.edge_nodes.reshape(-1, 2)
+    lengths = np.hypot(
+        mesh2d.node_x[edge_nodes[:, 1]] - mesh2d.node_x[edge_nodes[:, 0]],
+        mesh2d.node_y[edge_nodes[:, 1]] - mesh2d.node_y[edge_nodes[:, 0]],
+    )
+    return float(np.median(lengths))
+
+
+def mesh1d_from_polylines(
+    polylines: GeometryList, spacing: float, snap_tolerance: float = 0.0
+) -> Mesh1d:
+    """Discretizes polylines into a mesh1d network, joining the polylines at their shared endpoints.
+
+    Each polyline is split into the fewest edges of equal arc length not longer than `spacing`,
+    its nodes interpolated along the cumulative arc length of its vertices. The first and last nodes
+    are its first and last vertices. The endpoints closer than `snap_tolerance`, found by hashing them
+    on a grid of that cell size, are merged into one node at their mean position. All the polylines
+    are processed at once, without a loop over them.
+
+    Args:
+        polylines (GeometryList): The polylines. Both separators start a new polyline.
+        spacing (float): The maximum edge length.
+        snap_tolerance (float, optional): The distance below which endpoints are merged. Default is `0.0`,
+                                          only merging identical endpoints.
+
+    Returns:
+        Mesh1d: The network, with the nodes of each polyline in order.
+
+    Raises:
+        ValueError: If `spacing` is not positive or `snap_tolerance` is negative.
+    """
+    if not spacing > 0.0:
+        raise ValueError("spacing must be positive")
+    if snap_tolerance < 0.0:
+        raise ValueError("snap_tolerance must not be negative")
+
+    starts, ends, _, _ = get_ring_ranges(
+        polylines.x_coordinates,
+        polylines.geometry_separator,
+        polylines.inner_outer_separator,
+    )
+    owner, index = _expand_ranges(starts, ends)
+    vertex_x = polylines.x_coordinates[index]
+    vertex_y = polylines.y_coordinates[index]
+
+    # The cumulative arc length of the vertices of all the polylines, not increasing between polylines
+    same_polyline = owner[1:] == owner[:-1]
+    lengths = np.hypot(np.diff(vertex_x), np.diff(vertex_y)) * same_polyline
+    arc_length = np.concatenate(([0.0], np.cumsum(lengths)))
+    first = (np.cumsum(ends - starts) - (ends - starts)).astype(np.int64)
+    last = first + (ends - starts) - 1
+    polyline_length = arc_length[last] - arc_length[first]
+
+    kept = polyline_length > 0.0
+    first, last, polyline_length = first[kept], last[kept], polyline_length[kept]
+    num_edges = np.maximum(1, np.ceil(polyline_length / spacing)).astype(np.int64)
+    if num_edges.size == 0:
+        return Mesh1d(
+            node_x=np.empty(0, dtype=np.double),
+            node_y=np.empty(0, dtype=np.double),
+            edge_nodes=np.empty(0, dtype=np.int32),
+        )
+
+    # The arc length of each node, on the global arc length of its polyline
+    node_polyline, node_rank = _expand_ranges(
+        np.zeros(num_edges.size, dtype=np.int64), num_edges + 1
+    )
+    node_arc = (
+        arc_length[first[node_polyline]]
+        + node_rank * (polyline_length / num_edges)[node_polyline]
+    )
+    segment = np.searchsorted(arc_length, node_arc, side="right") - 1
+    segment = np.clip(segment, first[node_polyline], last[node_polyline] - 1)
+    segment_length = arc_length[segment + 1] - arc_length[segment]
+    fraction = np.divide(
+        node_arc - arc_length[segment],
+        segment_length,
+        out=np.zeros(node_arc.size),
+        where=segment_length > 0.0,
+    )
+    fraction = np.clip(fraction, 0.0, 1.0)
+    node_x = vertex_x[segment] + fraction * (vertex_x[segment + 1] - vertex_x[segment])
+    node_y = vertex_y[segment] + fraction * (vertex_y[segment + 1] - vertex_y[segment])
+
+    first_node = np.concatenate(([0], np.cumsum(num_edges + 1)[:-1]))
+    last_node = first_node + num_edges
+    node_x[first_node], node_y[first_node] = vertex_x[first], vertex_y[first]
+    node_x[last_node], node_y[last_node] = vertex_x[last], vertex_y[last]
+
+    # Merge the endpoints, each node pointing to the first node of its group
+    endpoints = np.concatenate((first_node, last_node))
+    group = _snap_points(node_x[endpoints], node_y[endpoints], snap_tolerance)
+    representative = np.arange(node_x.size)
+    representative[endpoints] = endpoints[group]
+    counts = np.bincount(group, minlength=endpoints.size)
+    merged = counts > 0
+    node_x[endpoints[merged]] = (
+        np.bincount(group, weights=node_x[endpoints])[merged] / counts[merged]
+    )
+    node_y[endpoints[merged]] = (
+        np.bincount(group, weights=node_y[endpoints])[merged] / counts[merged]
+    )
+
+    kept_nodes, node_index = np.unique(representative, return_inverse=True)
+    node_index = node_index.reshape(-1)
+    edge_start = np.flatnonzero(node_polyline[1:] == node_polyline[:-1])
+    edge_nodes = np.stack((node_index[edge_start], node_index[edge_start + 1]), axis=1)
+    edge_nodes = edge_nodes[edge_nodes[:, 0] != edge_nodes[:, 1]]
+
+    logger.debug(
+        "Discretized %d polylines into %d nodes and %d edges",
+        first.size,
+        kept_nodes.size,
+        edge_nodes.shape[0],
+    )
+    return Mesh1d(
+        node_x=node_x[kept_nodes],
+        node_y=node_y[kept_nodes],
+        edge_nodes=edge_nodes.reshape(-1).astype(np.int32),
+    )
+
+
+def _snap_points(x: ndarray, y: ndarray, tolerance: float) -> ndarray:
+    """Groups the points closer than a tolerance, transitively.
+
+    The points are hashed on a grid with the tolerance as cell size, so the neighbours of a point
+    are in its cell or in the 8 cells around it. The groups are the connected components of the
+    pairs of neighbours, found by propagating the smallest point index.
+
+    Args:
+        x (ndarray): The x-coordinates of the points.
+        y (ndarray): The y-coordinates of the points.
+        tolerance (float): The distance below which points are grouped. With 0, only identical points are grouped.
+
+    Returns:
+        ndarray: The group of each point, the smallest index of the points of the group.
+    """
+    if x.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if tolerance == 0.0:
+        _, first, inverse = np.unique(
+            np.stack((x, y), axis=1), axis=0, return_index=True, return_inverse=True
+        )
+        return first[inverse.reshape(-1)]
+
+    column = np.floor((x - np.min(x)) / tolerance).astype(np.int64)
+    row = np.floor((y - np.min(y)) / tolerance).astype(np.int64)
+    num_columns = int(np.max(column)) + 3
+    keys = (row + 1) * num_columns + column + 1
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    first_points, second_points = [], []
+    for row_offset in (-1, 0, 1):
+        for column_offset in (-1, 0, 1):
+            neighbour_keys = keys + row_offset * num_columns + column_offset
+            range_start = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+            range_end = np.searchsorted(sorted_keys, neighbour_keys, side="right")
+            point, position = _expand_ranges(range_start, range_end)
+            first_points.append(point)
+            second_points.append(order[position])
+    first_point = np.concatenate(first_points)
+    second_point = np.concatenate(second_points)
+    close = (first_point < second_point) & (
+        np.hypot(x[first_point] - x[second_point], y[first_point] - y[second_point])
+        <= tolerance
+    )
+    first_point, second_point = first_point[close], second_point[close]
+
+    group = np.arange(x.size)
+    while True:
+        previous = group.copy()
+        np.minimum.at(group, first_point, group[second_point])
+        np.minimum.at(group, second_point, group[first_point])
+        group = group[group]
+        if np.array_equal(group, previous):
+            return group
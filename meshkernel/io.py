@@ -0,0 +1,846 @@
+from __future__ import annotations
+
+import json
+from enum import IntEnum, unique
+from typing import IO, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+from numpy import ndarray
+
+from meshkernel.errors import InputError
+from meshkernel.py_structures import GeometryList, Mesh2d
+from meshkernel.utils import get_ring_ranges
+
+
+@unique
+class GeometryType(IntEnum):
+    """The geometry types, numbered as in the WKB specification."""
+
+    POINT = 1
+    LINESTRING = 2
+    POLYGON = 3
+    MULTIPOINT = 4
+    MULTILINESTRING = 5
+    MULTIPOLYGON = 6
+
+
+_GEOJSON_NAMES = {
+    GeometryType.POINT: "Point",
+    GeometryType.LINESTRING: "LineString",
+    GeometryType.POLYGON: "Polygon",
+    GeometryType.MULTIPOINT: "MultiPoint",
+    GeometryType.MULTILINESTRING: "MultiLineString",
+    GeometryType.MULTIPOLYGON: "MultiPolygon",
+}
+
+# The maximum number of bytes scattered or gathered at once, bounding the size of the index arrays
+_CHUNK_BYTES = 1 << 24
+
+_LITTLE_ENDIAN = 1
+
+
+def mesh2d_faces_to_wkb(mesh2d: Mesh2d) -> Tuple[ndarray, ndarray]:
+    """Encodes the faces of a mesh2d as WKB polygons, one polygon per face.
+    Faces without nodes are skipped.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d, with `face_nodes` and `nodes_per_face` set.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The uint8 buffer holding all encoded polygons and the int64 offsets
+                                 of each polygon in the buffer. The polygon `i` spans
+                                 `buffer[offsets[i]:offsets[i + 1]]`.
+    """
+    ring_nodes, ring_sizes, _ = _closed_face_rings(mesh2d)
+    return _encode_wkb(
+        GeometryType.POLYGON,
+        np.ones(ring_sizes.size, dtype=np.int64),
+        ring_sizes,
+        mesh2d.node_x[ring_nodes],
+        mesh2d.node_y[ring_nodes],
+    )
+
+
+def geometrylist_to_wkb(
+    geometry_list: GeometryList, geometry_type: GeometryType
+) -> Tuple[ndarray, ndarray]:
+    """Encodes a separator-encoded geometry list as WKB geometries.
+
+    Points are encoded one feature per coordinate, line strings one feature per ring and polygons
+    one feature per geometry, with the rings following an `inner_outer_separator` as holes.
+
+    Args:
+        geometry_list (GeometryList): The geometry list.
+        geometry_type (GeometryType): The type of the encoded geometries, `POINT`, `LINESTRING` or `POLYGON`.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The uint8 buffer holding all encoded geometries and the int64 offsets
+                                 of each geometry in the buffer.
+    """
+    return _encode_wkb(
+        geometry_type, *_split_geometry_list(geometry_list, geometry_type)
+    )
+
+
+def split_wkb(buffer: ndarray, offsets: ndarray) -> Iterator[bytes]:
+    """Splits an encoded WKB buffer into the byte strings of the single geometries.
+
+    Args:
+        buffer (ndarray): The uint8 buffer holding the encoded geometries.
+        offsets (ndarray): The offsets of each geometry in the buffer.
+
+    Returns:
+        Iterator[bytes]: The WKB byte string of each geometry.
+    """
+    data = buffer.tobytes()
+    for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        yield data[start:end]
+
+
+def wkb_to_geometrylist(
+    wkb: Union[Tuple[ndarray, ndarray], Iterable[bytes]],
+    geometry_separator: float = -999.0,
+    inner_outer_separator: float = -998.0,
+) -> GeometryList:
+    """Decodes WKB geometries into a separator-encoded geometry list.
+
+    Points, line strings, polygons and their multi-part counterparts are supported.
+    If all geometries are points, the coordinates are not separated.
+    Every part of a multi-part geometry is stored as a separate geometry.
+
+    Args:
+        wkb (Union[Tuple[ndarray, ndarray], Iterable[bytes]]): Either a buffer and offsets pair as returned
+                                                                by the encoders, or the WKB byte strings.
+        geometry_separator (float, optional): The value used as a separator in the coordinates.
+                                              Default is `-999.0`.
+        inner_outer_separator (float, optional): The value used to separate the inner part of a polygon
+                                                 from its outer part. Default is `-998.0`.
+
+    Returns:
+        GeometryList: The decoded geometries.
+    """
+    if isinstance(wkb, tuple):
+        buffer, offsets = wkb
+        buffer = np.ascontiguousarray(buffer, dtype=np.uint8)
+        offsets = np.asarray(offsets, dtype=np.int64)
+    else:
+        chunks = list(wkb)
+        offsets = np.concatenate(([0], np.cumsum([len(c) for c in chunks]))).astype(
+            np.int64
+        )
+        buffer = np.frombuffer(b"".join(chunks), dtype=np.uint8)
+
+    (
+        ring_geometry,
+        ring_position,
+        coordinate_start,
+        ring_sizes,
+        big_endian,
+        is_point,
+    ) = _decode_wkb_rings(buffer, offsets)
+
+    # Sort the rings by geometry and by position inside the geometry
+    order = np.lexsort((ring_position, ring_geometry))
+    ring_geometry = ring_geometry[order]
+    ring_position = ring_position[order]
+    coordinate_start = coordinate_start[order]
+    ring_sizes = ring_sizes[order]
+    big_endian = big_endian[order]
+
+    point_coordinates = _gather_coordinates(
+        buffer, coordinate_start, ring_sizes, big_endian
+    )
+
+    if ring_sizes.size == 0 or np.all(is_point):
+        return GeometryList(
+            x_coordinates=point_coordinates[:, 0],
+            y_coordinates=point_coordinates[:, 1],
+            geometry_separator=geometry_separator,
+            inner_outer_separator=inner_outer_separator,
+        )
+
+    # Every ring but the first one is preceded by a separator
+    separators = np.where(ring_position == 0, geometry_separator, inner_outer_separator)
+    has_separator = np.ones(ring_sizes.size, dtype=np.int64)
+    has_separator[0] = 0
+    ring_output_start = np.cumsum(ring_sizes + has_separator) - ring_sizes
+    total = int(ring_sizes.sum() + has_separator.sum())
+
+    x_coordinates = np.empty(total, dtype=np.double)
+    y_coordinates = np.empty(total, dtype=np.double)
+    x_coordinates[ring_output_start[1:] - 1] = separators[1:]
+    y_coordinates[ring_output_start[1:] - 1] = separators[1:]
+
+    output_index = _ragged_arange(ring_output_start, ring_sizes)
+    x_coordinates[output_index] = point_coordinates[:, 0]
+    y_coordinates[output_index] = point_coordinates[:, 1]
+
+    return GeometryList(
+        x_coordinates=x_coordinates,
+        y_coordinates=y_coordinates,
+        geometry_separator=geometry_separator,
+        inner_outer_separator=inner_outer_separator,
+    )
+
+
+def mesh2d_faces_to_geojson(
+    mesh2d: Mesh2d, values: Optional[ndarray] = None
+) -> Iterator[str]:
+    """Encodes the faces of a mesh2d as a stream of GeoJSON polygon features.
+    Faces without nodes are skipped, the `index` property of the features is the face index.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d, with `face_nodes` and `nodes_per_face` set.
+        values (ndarray, optional): A 1D double array with a value for each face,
+                                    stored as the `value` property of the features.
+
+    Returns:
+        Iterator[str]: The serialized GeoJSON features.
+
+    Raises:
+        InputError: If the length of values is not the number of faces.
+    """
+    ring_nodes, ring_sizes, faces = _closed_face_rings(mesh2d)
+    if values is not None:
+        if len(values) != mesh2d.nodes_per_face.size:
+            raise InputError("The length of values is not equal to the number of faces")
+        values = np.asarray(values)[faces]
+
+    return _encode_geojson(
+        GeometryType.POLYGON,
+        np.ones(ring_sizes.size, dtype=np.int64),
+        ring_sizes,
+        mesh2d.node_x[ring_nodes],
+        mesh2d.node_y[ring_nodes],
+        values,
+        faces,
+    )
+
+
+def geometrylist_to_geojson(
+    geometry_list: GeometryList, geometry_type: GeometryType
+) -> Iterator[str]:
+    """Encodes a separator-encoded geometry list as a stream of GeoJSON features.
+    The features are split as in `geometrylist_to_wkb`. For points, the geometry list values
+    are stored as the `value` property of the features.
+
+    Args:
+        geometry_list (GeometryList): The geometry list.
+        geometry_type (GeometryType): The type of the encoded geometries, `POINT`, `LINESTRING` or `POLYGON`.
+
+    Returns:
+        Iterator[str]: The serialized GeoJSON features.
+    """
+    values = None
+    if geometry_type == GeometryType.POINT and geometry_list.values.size > 0:
+        is_separator = (
+            geometry_list.x_coordinates == geometry_list.geometry_separator
+        ) | (geometry_list.x_coordinates == geometry_list.inner_outer_separator)
+        values = geometry_list.values[~is_separator]
+
+    return _encode_geojson(
+        geometry_type,
+        *_split_geometry_list(geometry_list, geometry_type),
+        values,
+    )
+
+
+def write_geojson(features: Iterable[str], file: IO[str]) -> int:
+    """Writes serialized GeoJSON features to a text file as a feature collection.
+
+    Args:
+        features (Iterable[str]): The serialized features, as returned by the GeoJSON encoders.
+        file (IO[str]): The text file to write to.
+
+    Returns:
+        int: The number of written features.
+    """
+    file.write('{"type":"FeatureCollection","features":[')
+    count = 0
+    for feature in features:
+        if count > 0:
+            file.write(",")
+        file.write(feature)
+        count += 1
+    file.write("]}")
+    return count
+
+
+def geojson_to_geometrylist(
+    features: Union[dict, Iterable[Union[str, dict]]],
+    geometry_separator: float = -999.0,
+    inner_outer_separator: float = -998.0,
+) -> GeometryList:
+    """Decodes GeoJSON features into a separator-encoded geometry list.
+    The geometries are stored as in `wkb_to_geometrylist`.
+
+    Args:
+        features (Union[dict, Iterable[Union[str, dict]]]): A feature collection, or the features
+                                                            either serialized or as dictionaries.
+        geometry_separator (float, optional): The value used as a separator in the coordinates.
+                                              Default is `-999.0`.
+        inner_outer_separator (float, optional): The value used to separate the inner part of a polygon
+                                                 from its outer part. Default is `-998.0`.
+
+    Returns:
+        GeometryList: The decoded geometries.
+    """
+    if isinstance(features, dict):
+        features = features["features"]
+
+    rings = []
+    ring_positions = []
+    only_points = True
+    for feature in features:
+        if isinstance(feature, str):
+            feature = json.loads(feature)
+        geometry = feature["geometry"] if "geometry" in feature else feature
+        geometry_type = geometry["type"]
+        coordinates = geometry["coordinates"]
+
+        if geometry_type == "Point":
+            parts = [[[coordinates]]]
+        elif geometry_type == "MultiPoint":
+            parts = [[[point]] for point in coordinates]
+        elif geometry_type == "LineString":
+            parts = [[coordinates]]
+        elif geometry_type == "MultiLineString":
+            parts = [[line] for line in coordinates]
+        elif geometry_type == "Polygon":
+            parts = [coordinates]
+        elif geometry_type == "MultiPolygon":
+            parts = coordinates
+        else:
+            raise InputError(
+                "Unsupported GeoJSON geometry type: {}".format(geometry_type)
+            )
+        only_points = only_points and geometry_type in ("Point", "MultiPoint")
+
+        for part in parts:
+            for position, ring in enumerate(part):
+                ring = np.asarray(ring, dtype=np.double).reshape(-1, 2)
+                if ring.shape[0] > 0:
+                    rings.append(ring)
+                    ring_positions.append(position)
+
+    if len(rings) == 0:
+        return GeometryList(
+            geometry_separator=geometry_separator,
+            inner_outer_separator=inner_outer_separator,
+        )
+
+    if only_points:
+        coordinates = np.concatenate(rings)
+    else:
+        separators = [
+            np.full(
+                (1, 2),
+                inner_outer_separator if position > 0 else geometry_separator,
+                dtype=np.double,
+            )
+            for position in ring_positions[1:]
+        ]
+        pieces = [rings[0]]
+        for separator, ring in zip(separators, rings[1:]):
+            pieces.append(separator)
+            pieces.append(ring)
+        coordinates = np.concatenate(pieces)
+
+    return GeometryList(
+        x_coordinates=coordinates[:, 0],
+        y_coordinates=coordinates[:, 1],
+        geometry_separator=geometry_separator,
+        inner_outer_separator=inner_outer_separator,
+    )
+
+
+def _closed_face_rings(mesh2d: Mesh2d) -> Tuple[ndarray, ndarray]:
+    """Gets the node indices of the closed face rings of a mesh2d, skipping the faces without nodes.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d.
+
+    Returns:
+        Tuple[ndarray, ndarray, ndarray]: The node indices of all rings, each ring closed by repeating its first node,
+                                          the number of nodes of each ring and the index of the face of each ring.
+    """
+    nodes_per_face = mesh2d.nodes_per_face.astype(np.int64)
+    if nodes_per_face.sum() != mesh2d.face_nodes.size:
+        raise InputError(
+            "The sum of nodes_per_face is not equal to the size of face_nodes"
+        )
+    faces = np.flatnonzero(nodes_per_face > 0)
+    nodes_per_face = nodes_per_face[faces]
+    face_starts = np.cumsum(nodes_per_face) - nodes_per_face
+    face_ends = face_starts + nodes_per_face
+    ring_nodes = np.insert(mesh2d.face_nodes, face_ends, mesh2d.face_nodes[face_starts])
+    return ring_nodes, nodes_per_face + 1, faces
+
+
+def _split_geometry_list(
+    geometry_list: GeometryList, geometry_type: GeometryType
+) -> Tuple[ndarray, ndarray, ndarray, ndarray]:
+    """Splits a geometry list into features.
+
+    Args:
+        geometry_list (GeometryList): The geometry list.
+        geometry_type (GeometryType): The type of the features, `POINT`, `LINESTRING` or `POLYGON`.
+
+    Returns:
+        Tuple[ndarray, ndarray, ndarray, ndarray]: The number of rings of each feature, the number of
+                                                   points of each ring and the ring coordinates.
+    """
+    x = geometry_list.x_coordinates
+    y = geometry_list.y_coordinates
+    starts, ends, geometry_index, _ = get_ring_ranges(
+        x, geometry_list.geometry_separator, geometry_list.inner_outer_separator
+    )
+    ring_sizes = ends - starts
+
+    if geometry_type == GeometryType.POINT:
+        point_index = _ragged_arange(starts, ring_sizes)
+        return (
+            np.ones(point_index.size, dtype=np.int64),
+            np.ones(point_index.size, dtype=np.int64),
+            x[point_index],
+            y[point_index],
+        )
+
+    if geometry_type == GeometryType.LINESTRING:
+        point_index = _ragged_arange(starts, ring_sizes)
+        return (
+            np.ones(ring_sizes.size, dtype=np.int64),
+            ring_sizes,
+            x[point_index],
+            y[point_index],
+        )
+
+    if geometry_type == GeometryType.POLYGON:
+        # Close the rings whose last point differs from the first one
+        last = ends - 1
+        is_open = (x[starts] != x[last]) | (y[starts] != y[last])
+        closed_sizes = ring_sizes + is_open
+        point_index = _ragged_arange(starts, ring_sizes)
+        point_index = np.insert(
+            point_index, np.cumsum(ring_sizes)[is_open], starts[is_open]
+        )
+        ring_count = np.bincount(geometry_index).astype(np.int64)
+        return ring_count, closed_sizes, x[point_index], y[point_index]
+
+    raise InputError("Unsupported geometry type: {}".format(geometry_type))
+
+
+def _ragged_arange(starts: ndarray, sizes: ndarray) -> ndarray:
+    """Concatenates the ranges `[start, start + size)`.
+
+    Args:
+        starts (ndarray): The start of each range.
+        sizes (ndarray): The size of each range.
+
+    Returns:
+        ndarray: The concatenated ranges.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    total = int(sizes.sum())
+    range_offsets = np.cumsum(sizes) - sizes
+    return np.repeat(
+        np.asarray(starts, dtype=np.int64) - range_offsets, sizes
+    ) + np.arange(total, dtype=np.int64)
+
+
+def _scatter(buffer: ndarray, positions: ndarray, data: ndarray) -> None:
+    """Writes fixed-width byte records at arbitrary positions of a buffer.
+
+    Args:
+        buffer (ndarray): The uint8 destination buffer.
+        positions (ndarray): The destination position of each record.
+        data (ndarray): The records, viewed as a 2D uint8 array of shape (num_records, width).
+    """
+    width = data.shape[1]
+    step = max(1, _CHUNK_BYTES // max(width, 1))
+    byte_range = np.arange(width, dtype=np.int64)
+    for first in range(0, positions.size, step):
+        chunk = slice(first, first + step)
+        buffer[positions[chunk, None] + byte_range] = data[chunk]
+
+
+def _gather(buffer: ndarray, positions: ndarray, width: int) -> ndarray:
+    """Reads fixed-width byte records at arbitrary positions of a buffer.
+
+    Args:
+        buffer (ndarray): The uint8 source buffer.
+        positions (ndarray): The source position of each record.
+        width (int): The width of each record in bytes.
+
+    Returns:
+        ndarray: The records as a 2D uint8 array of shape (num_records, width).
+    """
+    result = np.empty((positions.size, width), dtype=np.uint8)
+    step = max(1, _CHUNK_BYTES // max(width, 1))
+    byte_range = np.arange(width, dtype=np.int64)
+    for first in range(0, positions.size, step):
+        chunk = slice(first, first + step)
+        result[chunk] = buffer[positions[chunk, None] + byte_range]
+    return result
+
+
+def _as_bytes(values: ndarray, dtype: str) -> ndarray:
+    """Views values as rows of little-endian bytes."""
+    values = np.ascontiguousarray(values, dtype=dtype)
+    return values.view(np.uint8).reshape(values.size, -1)
+
+
+def _read_uint32(buffer: ndarray, positions: ndarray, big_endian: ndarray) -> ndarray:
+    """Reads unsigned 32-bit integers with a per-value byte order."""
+    data = _gather(buffer, positions, 4)
+    data[big_endian] = data[big_endian, ::-1]
+    return data.view("<u4").reshape(-1).astype(np.int64)
+
+
+def _encode_wkb(
+    geometry_type: GeometryType,
+    feature_ring_counts: ndarray,
+    ring_sizes: ndarray,
+    x: ndarray,
+    y: ndarray,
+) -> Tuple[ndarray, ndarray]:
+    """Encodes ragged rings as WKB geometries.
+
+    Args:
+        geometry_type (GeometryType): The type of the geometries, `POINT`, `LINESTRING` or `POLYGON`.
+        feature_ring_counts (ndarray): The number of rings of each geometry.
+        ring_sizes (ndarray): The number of points of each ring.
+        x (ndarray): The x-coordinates of the points.
+        y (ndarray): The y-coordinates of the points.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The uint8 buffer holding all encoded geometries and their offsets.
+    """
+    feature_ring_counts = np.asarray(feature_ring_counts, dtype=np.int64)
+    ring_sizes = np.asarray(ring_sizes, dtype=np.int64)
+    num_features = feature_ring_counts.size
+    ring_feature = np.repeat(np.arange(num_features), feature_ring_counts)
+
+    if geometry_type == GeometryType.POINT:
+        header_size = 5
+        ring_header_size = 0
+    elif geometry_type == GeometryType.LINESTRING:
+        header_size = 9
+        ring_header_size = 0
+    elif geometry_type == GeometryType.POLYGON:
+        header_size = 9
+        ring_header_size = 4
+    else:
+        raise InputError("Unsupported geometry type: {}".format(geometry_type))
+
+    ring_bytes = ring_header_size + 16 * ring_sizes
+    feature_sizes = header_size + np.bincount(
+        ring_feature, weights=ring_bytes, minlength=num_features
+    ).astype(np.int64)
+    offsets = np.concatenate(([0], np.cumsum(feature_sizes))).astype(np.int64)
+    feature_starts = offsets[:-1]
+
+    buffer = np.empty(int(offsets[-1]), dtype=np.uint8)
+    buffer[feature_starts] = _LITTLE_ENDIAN
+    _scatter(
+        buffer,
+        feature_starts + 1,
+        _as_bytes(np.full(num_features, int(geometry_type)), "<u4"),
+    )
+
+    if geometry_type == GeometryType.LINESTRING:
+        _scatter(buffer, feature_starts + 5, _as_bytes(ring_sizes, "<u4"))
+    elif geometry_type == GeometryType.POLYGON:
+        _scatter(buffer, feature_starts + 5, _as_bytes(feature_ring_counts, "<u4"))
+
+    # Position of each ring inside the buffer
+    first_ring_of_feature = np.cumsum(feature_ring_counts) - feature_ring_counts
+    ring_offset_in_feature = np.cumsum(ring_bytes) - ring_bytes
+    ring_offset_in_feature -= np.repeat(
+        ring_offset_in_feature[first_ring_of_feature[feature_ring_counts > 0]],
+        feature_ring_counts[feature_ring_counts > 0],
+    )
+    ring_starts = feature_starts[ring_feature] + header_size + ring_offset_in_feature
+    if ring_header_size > 0:
+        _scatter(buffer, ring_starts, _as_bytes(ring_sizes, "<u4"))
+
+    point_positions = (ring_starts + ring_header_size).repeat(
+        ring_sizes
+    ) + 16 * _ragged_arange(np.zeros_like(ring_sizes), ring_sizes)
+    coordinates = np.empty((x.size, 2), dtype="<f8")
+    coordinates[:, 0] = x
+    coordinates[:, 1] = y
+    _scatter(buffer, point_positions, coordinates.view(np.uint8).reshape(x.size, 16))
+
+    return buffer, offsets
+
+
+def _decode_wkb_rings(buffer: ndarray, offsets: ndarray):
+    """Locates the rings of WKB geometries.
+
+    Args:
+        buffer (ndarray): The uint8 buffer holding the encoded geometries.
+        offsets (ndarray): The offsets of each geometry in the buffer.
+
+    Returns:
+        tuple: For each ring, the index of its geometry, its position within the geometry,
+               the buffer position of its first coordinate, its number of points, its byte order,
+               and whether it is a point.
+    """
+    num_features = offsets.size - 1
+    feature_starts = offsets[:-1]
+    big_endian = buffer[feature_starts] == 0
+    geometry_type = _read_uint32(buffer, feature_starts + 1, big_endian)
+
+    unsupported = ~np.isin(geometry_type, list(GeometryType))
+    if np.any(unsupported):
+        raise InputError(
+            "Unsupported WKB geometry type: {}".format(geometry_type[unsupported][0])
+        )
+
+    is_multi = geometry_type >= GeometryType.MULTIPOINT
+    num_parts = np.ones(num_features, dtype=np.int64)
+    num_parts[is_multi] = _read_uint32(
+        buffer, feature_starts[is_multi] + 5, big_endian[is_multi]
+    )
+    cursor = feature_starts.copy()
+    cursor[is_multi] += 9
+
+    # Every part is stored as a separate geometry, numbered in feature order
+    first_part = np.cumsum(num_parts) - num_parts
+
+    rings = []
+    for part in range(int(num_parts.max()) if num_features > 0 else 0):
+        active = np.flatnonzero(num_parts > part)
+        part_start = cursor[active]
+        part_big_endian = buffer[part_start] == 0
+        part_type = _read_uint32(buffer, part_start + 1, part_big_endian)
+        part_geometry = first_part[active] + part
+
+        unsupported = ~np.isin(
+            part_type,
+            [GeometryType.POINT, GeometryType.LINESTRING, GeometryType.POLYGON],
+        )
+        if np.any(unsupported):
+            raise InputError(
+                "Unsupported WKB geometry type: {}".format(part_type[unsupported][0])
+            )
+
+        is_point = part_type == GeometryType.POINT
+        rings.append(
+            (
+                part_geometry[is_point],
+                np.zeros(is_point.sum(), dtype=np.int64),
+                part_start[is_point] + 5,
+                np.ones(is_point.sum(), dtype=np.int64),
+                part_big_endian[is_point],
+                np.ones(is_point.sum(), dtype=bool),
+            )
+        )
+        part_end = part_start + 21
+
+        is_line = part_type == GeometryType.LINESTRING
+        line_sizes = _read_uint32(
+            buffer, part_start[is_line] + 5, part_big_endian[is_line]
+        )
+        rings.append(
+            (
+                part_geometry[is_line],
+                np.zeros(is_line.sum(), dtype=np.int64),
+                part_start[is_line] + 9,
+                line_sizes,
+                part_big_endian[is_line],
+                np.zeros(is_line.sum(), dtype=bool),
+            )
+        )
+        part_end[is_line] = part_start[is_line] + 9 + 16 * line_sizes
+
+        is_polygon = np.flatnonzero(part_type == GeometryType.POLYGON)
+        polygon_big_endian = part_big_endian[is_polygon]
+        num_rings = _read_uint32(buffer, part_start[is_polygon] + 5, polygon_big_endian)
+        ring_cursor = part_start[is_polygon] + 9
+        for ring in range(int(num_rings.max()) if is_polygon.size > 0 else 0):
+            has_ring = num_rings > ring
+            ring_start = ring_cursor[has_ring]
+            ring_sizes = _read_uint32(buffer, ring_start, polygon_big_endian[has_ring])
+            rings.append(
+                (
+                    part_geometry[is_polygon[has_ring]],
+                    np.full(has_ring.sum(), ring, dtype=np.int64),
+                    ring_start + 4,
+                    ring_sizes,
+                    polygon_big_endian[has_ring],
+                    np.zeros(has_ring.sum(), dtype=bool),
+                )
+            )
+            ring_cursor[has_ring] = ring_start + 4 + 16 * ring_sizes
+        part_end[is_polygon] = ring_cursor
+
+        cursor[active] = part_end
+
+    if len(rings) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty, np.empty(0, dtype=bool), np.empty(0, bool)
+
+    return tuple(np.concatenate(column) for column in zip(*rings))
+
+
+def _gather_coordinates(
+    buffer: ndarray, coordinate_start: ndarray, ring_sizes: ndarray, big_endian: ndarray
+) -> ndarray:
+    """Reads the coordinates of WKB rings.
+
+    Args:
+        buffer (ndarray): The uint8 buffer holding the encoded geometries.
+        coordinate_start (ndarray): The buffer position of the first coordinate of each ring.
+        ring_sizes (ndarray): The number of points of each ring.
+        big_endian (ndarray): Whether each ring is stored in big-endian byte order.
+
+    Returns:
+        ndarray: The coordinates as a double array of shape (num_points, 2).
+    """
+    point_positions = coordinate_start.repeat(ring_sizes) + 16 * _ragged_arange(
+        np.zeros_like(ring_sizes), ring_sizes
+    )
+    data = _gather(buffer, point_positions, 16).reshape(-1, 2, 8)
+    point_big_endian = big_endian.repeat(ring_sizes)
+    data[point_big_endian] = data[point_big_endian, :, ::-1]
+    return data.view("<f8").reshape(-1, 2).astype(np.double)
+
+
+def _encode_geojson(
+    geometry_type: GeometryType,
+    feature_ring_counts: ndarray,
+    ring_sizes: ndarray,
+    x: ndarray,
+    y: ndarray,
+    values: Optional[ndarray] = None,
+    indices: Optional[ndarray] = None,
+) -> Iterator[str]:
+    """Encodes ragged rings as serialized GeoJSON features.
+    The input is validated before the first feature is produced.
+
+    Args:
+        geometry_type (GeometryType): The type of the geometries, `POINT`, `LINESTRING` or `POLYGON`.
+        feature_ring_counts (ndarray): The number of rings of each geometry.
+        ring_sizes (ndarray): The number of points of each ring.
+        x (ndarray): The x-coordinates of the points.
+        y (ndarray): The y-coordinates of the points.
+        values (ndarray, optional): A value for each feature, stored as the `value` property.
+        indices (ndarray, optional): The `index` property of each feature. Default is the position of the feature.
+
+    Returns:
+        Iterator[str]: The serialized GeoJSON features.
+
+    Raises:
+        InputError: If the length of values is not the number of features,
+                    or if a coordinate or a value is not finite, which JSON cannot represent.
+    """
+    if values is not None and len(values) != len(feature_ring_counts):
+        raise InputError("The length of values is not equal to the number of features")
+    x = np.asarray(x, dtype=np.double)
+    y = np.asarray(y, dtype=np.double)
+    if not (np.isfinite(x).all() and np.isfinite(y).all()):
+        raise InputError("GeoJSON cannot represent non-finite coordinates")
+
+    indices = (
+        np.arange(len(feature_ring_counts))
+        if indices is None
+        else np.asarray(indices, dtype=np.int64)
+    )
+    if values is not None:
+        values = np.asarray(values, dtype=np.double)
+        non_finite = np.flatnonzero(~np.isfinite(values))
+        if non_finite.size > 0:
+            raise InputError(
+                "GeoJSON cannot represent the non-finite value of feature {}".format(
+                    indices[non_finite[0]]
+                )
+            )
+
+    return _iterate_geojson_features(
+        geometry_type, feature_ring_counts, ring_sizes, x, y, values, indices
+    )
+
+
+# The number of features whose coordinates are formatted together by the GeoJSON encoder
+_GEOJSON_CHUNK_SIZE = 4096
+
+
+def _iterate_geojson_features(
+    geometry_type: GeometryType,
+    feature_ring_counts: ndarray,
+    ring_sizes: ndarray,
+    x: ndarray,
+    y: ndarray,
+    values: Optional[ndarray],
+    indices: ndarray,
+) -> Iterator[str]:
+    """Produces the serialized GeoJSON features of validated ragged rings, see `_encode_geojson`.
+    The coordinates are formatted in chunks of features, so memory does not grow with the input size.
+    """
+    prefix = '{"type":"Feature","geometry":{"type":"%s","coordinates":' % (
+        _GEOJSON_NAMES[GeometryType(geometry_type)]
+    )
+
+    ring_ends = np.cumsum(ring_sizes, dtype=np.int64)
+    feature_ring_ends = np.cumsum(feature_ring_counts, dtype=np.int64)
+
+    for chunk_start in range(0, feature_ring_ends.size, _GEOJSON_CHUNK_SIZE):
+        chunk_end = min(chunk_start + _GEOJSON_CHUNK_SIZE, feature_ring_ends.size)
+        first_ring = int(feature_ring_ends[chunk_start - 1]) if chunk_start > 0 else 0
+        last_ring = int(feature_ring_ends[chunk_end - 1])
+        first_point = int(ring_ends[first_ring - 1]) if first_ring > 0 else 0
+        last_point = int(ring_ends[last_ring - 1]) if last_ring > 0 else 0
+
+        # Format the coordinates of the chunk at once, the per-feature work only joins strings.
+        # The float representation is the shortest one that round-trips
+        points = list(
+            map(
+                ",".join,
+                zip(
+                    map(float.__repr__, x[first_point:last_point].tolist()),
+                    map(float.__repr__, y[first_point:last_point].tolist()),
+                ),
+            )
+        )
+        chunk_ring_ends = (ring_ends[first_ring:last_ring] - first_point).tolist()
+        chunk_ring_starts = [0] + chunk_ring_ends[:-1]
+
+        chunk_feature_ring_ends = (
+            feature_ring_ends[chunk_start:chunk_end] - first_ring
+        ).tolist()
+        chunk_indices = indices[chunk_start:chunk_end].tolist()
+        chunk_values = (
+            None if values is None else values[chunk_start:chunk_end].tolist()
+        )
+
+        ring = 0
+        for feature, feature_ring_end in enumerate(chunk_feature_ring_ends):
+            rings = []
+            while ring < feature_ring_end:
+                rings.append(
+                    "["
+                    + "],[".join(
+                        points[chunk_ring_starts[ring] : chunk_ring_ends[ring]]
+                    )
+                    + "]"
+                )
+                ring += 1
+
+            if geometry_type == GeometryType.POINT:
+                coordinates = rings[0]
+            elif geometry_type == GeometryType.LINESTRING:
+                coordinates = "[" + rings[0] + "]"
+            else:
+                coordinates = "[[" + "],[".join(rings) + "]]"
+
+            if chunk_values is None:
+                properties = '{"index":%d}' % chunk_indices[feature]
+            else:
+                properties = '{"index":%d,"value":%s}' % (
+                    chunk_indices[feature],
+                    json.dumps(chunk_values[feature]),
+                )
+
+            yield prefix + coordinates + '},"properties":' + properties + "}"
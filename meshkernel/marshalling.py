@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+import numpy as np
+from numpy import ndarray
+
+import meshkernel.errors as mk_errors
+
+# The copy accountings active on each thread, innermost last
+_active = threading.local()
+
+
+class ArrayConversion:
+    """A conversion of an input to an array with the dtype and layout expected by the MeshKernel library.
+
+    Attributes:
+        label (str): The array converted, such as "Mesh2d.node_x".
+        nbytes (int): The size of the converted array, in bytes.
+        reason (str): Why the conversion copied the input, None if it did not.
+    """
+
+    def __init__(self, label: str, nbytes: int, reason: Optional[str]):
+        self.label = label
+        self.nbytes = nbytes
+        self.reason = reason
+
+    @property
+    def copied(self) -> bool:
+        """Whether the conversion copied the input."""
+        return self.reason is not None
+
+    def __repr__(self):
+        return "ArrayConversion({}, nbytes={}, {})".format(
+            self.label, self.nbytes, self.reason or "no copy"
+        )
+
+
+class CopyAccounting:
+    """The array conversions recorded while a `copy_accounting` block runs on the current thread.
+
+    Attributes:
+        conversions (List[ArrayConversion]): The conversions, in order.
+        strict (bool): Whether a conversion that would copy raises a `ZeroCopyError` instead.
+    """
+
+    def __init__(self, strict: bool = False):
+        self.conversions: List[ArrayConversion] = []
+        self.strict = strict
+
+    @property
+    def copies(self) -> List[ArrayConversion]:
+        """The conversions that copied their input."""
+        return [conversion for conversion in self.conversions if conversion.copied]
+
+    @property
+    def copied_bytes(self) -> int:
+        """The total size of the copies, in bytes."""
+        return sum(conversion.nbytes for conversion in self.copies)
+
+    def __repr__(self):
+        return "CopyAccounting(conversions={}, copies={}, copied_bytes={})".format(
+            len(self.conversions), len(self.copies), self.copied_bytes
+        )
+
+
+@contextmanager
+def copy_accounting(strict: bool = False) -> Iterator[CopyAccounting]:
+    """Records the array conversions made on the current thread, by the constructors of the mesh and
+    geometry classes and by the marshalling to the C structures, while the block runs.
+
+    Blocks can be nested, each one records the conversions made while it is active.
+    If any active block is strict, a conversion that would copy raises a `ZeroCopyError`.
+
+    Args:
+        strict (bool, optional): Whether a conversion that would copy raises. Default is `False`.
+
+    Yields:
+        CopyAccounting: The recorded conversions.
+    """
+    accounting = CopyAccounting(strict)
+    stack = getattr(_active, "stack", None)
+    if stack is None:
+        stack = _active.stack = []
+    stack.append(accounting)
+    try:
+        yield accounting
+    finally:
+        stack.remove(accounting)
+
+
+def as_array(values, dtype, label: str, subok: bool = False) -> ndarray:
+    """Converts an input to an array of a dtype, copying it only if it is not such an array already.
+
+    Args:
+        values: The input, an array or a sequence.
+        dtype: The dtype of the array.
+        label (str): The name of the array, recorded with the conversion.
+        subok (bool, optional): Whether subclasses of ndarray, such as memory maps, are kept. Default is `False`.
+
+    Returns:
+        ndarray: The array.
+
+    Raises:
+        ZeroCopyError: If the conversion would copy while a strict `copy_accounting` block is active.
+    """
+    dtype = np.dtype(dtype)
+    if not isinstance(values, np.ndarray):
+        reason = "not an array"
+    elif values.dtype != dtype:
+        reason = "dtype {} instead of {}".format(values.dtype, dtype)
+    else:
+        reason = None
+
+    _record(label, np.size(values) * dtype.itemsize, reason)
+    if subok:
+        return np.asanyarray(values, dtype=dtype)
+    return np.asarray(values, dtype=dtype)
+
+
+def as_contiguous_array(values, dtype, label: str) -> ndarray:
+    """Converts an input to a C-contiguous array of a dtype, as passed to the MeshKernel library,
+    copying it only if its dtype or layout differs.
+
+    Args:
+        values: The input, an array or a sequence.
+        dtype: The dtype of the array.
+        label (str): The name of the array, recorded with the conversion.
+
+    Returns:
+        ndarray: The C-contiguous array.
+
+    Raises:
+        ZeroCopyError: If the conversion would copy while a strict `copy_accounting` block is active.
+    """
+    dtype = np.dtype(dtype)
+    if not isinstance(values, np.ndarray):
+        reason = "not an array"
+    elif values.dtype != dtype:
+        reason = "dtype {} instead of {}".format(values.dtype, dtype)
+    elif not values.flags.c_contiguous:
+        reason = "not contiguous"
+    else:
+        reason = None
+
+    _record(label, np.size(values) * dtype.itemsize, reason)
+    return values if reason is None else np.ascontiguousarray(values, dtype=dtype)
+
+
+def _record(label: str, nbytes: int, reason: Optional[str]):
+    """Records a conversion in the active accountings, or raises if it copies in strict mode."""
+    stack = getattr(_active, "stack", None)
+    if not stack:
+        return
+
+    if reason is not None and any(accounting.strict for accounting in stack):
+        raise mk_errors.ZeroCopyError("{} would be copied: {}".format(label, reason))
+
+    conversion = ArrayConversion(label, int(nbytes), reason)
+    for accounting in stack:
+        accounting.conversions.append(conversion)
@@ -1,6 +1,9 @@
+import functools
 import logging
 import os
 import platform
+import threading
+import time
 from ctypes import (
     CDLL,
     byref,
@@ -12,7 +15,7 @@ from ctypes import (
 )
 from enum import IntEnum
 from pathlib import Path
-from typing import Tuple
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 from numpy import ndarray
@@ -32,6 +35,18 @@ from meshkernel.c_structures import (
     CSplinesToCurvilinearParameters,
 )
 from meshkernel.errors import InputError, MeshGeometryError, MeshKernelError
+from meshkernel.geometry import (
+    clip_to_extent,
+    median_edge_length,
+    thin_to_resolution,
+)
+from meshkernel.marshalling import as_contiguous_array, copy_accounting
+from meshkernel.polygons import (
+    concatenate_polygons,
+    group_disjoint_polygons,
+    polygon_index_of_points,
+    select_polygons,
+)
 from meshkernel.py_structures import (
     AveragingMethod,
     Contacts,
@@ -47,32 +62,99 @@ from meshkernel.py_structures import (
     Mesh2dLocation,
     MeshRefinementParameters,
     OrthogonalizationParameters,
+    PolygonBatchRefinement,
     ProjectionType,
     ProjectToLandBoundaryOption,
+    RegionRefinement,
     SplinesToCurvilinearParameters,
 )
 from meshkernel.utils import (
     get_maximum_bounding_box_coordinates,
-    to_contiguous_numpy_array,
 )
 from meshkernel.version import __version__
 
 logger = logging.getLogger(__name__)
 
+# The error details of the MeshKernel library are stored globally, not per state.
+# The lock makes each native call and the retrieval of its error details atomic
+_native_call_lock = threading.Lock()
+
+
+def _synchronized(method):
+    """Runs a method while holding the lock of the MeshKernel instance."""
+
+    @functools.wraps(method)
+    def synchronized_method(self, *args, **kwargs):
+        with self._lock:
+            if self.strict_zero_copy:
+                with copy_accounting(strict=True):
+                    return method(self, *args, **kwargs)
+            return method(self, *args, **kwargs)
+
+    return synchronized_method
+
 
+def _synchronize_public_methods(cls):
+    """Makes every public method of a class hold the lock of the instance while running."""
+    for name, member in list(vars(cls).items()):
+        if not name.startswith("_") and callable(member):
+            setattr(cls, name, _synchronized(member))
+    return cls
+
+
+@_synchronize_public_methods
 class MeshKernel:
-    """This class is the entry point for interacting with the MeshKernel library"""
+    """This class is the entry point for interacting with the MeshKernel library
+
+    A MeshKernel instance is thread-safe: every public method holds a per-instance reentrant lock,
+    so the calls on one instance are serialized, and multi-step calls, such as getting the dimensions and then
+    the data of a mesh, are atomic. The native library stores the error details globally, not per state,
+    so each native call and the retrieval of its error details hold a process-wide lock: the native calls
+    of different instances do not overlap, while the Python code around them runs concurrently.
+
+    With `clip_geometries`, the polygons and land boundaries passed to `mesh2d_delete`, `mesh2d_flip_edges` and
+    `mesh2d_compute_orthogonalization` are first clipped to the extent of the mesh2d, enlarged by a margin,
+    so the kernel only processes the rings near the mesh. The extent is computed from the mesh2d nodes and kept
+    until a native call other than a getter is made, and the clipped geometries are cached with the GeometryList.
+
+    With `thin_samples`, the samples passed to `mesh2d_refine_based_on_samples` and
+    `mesh2d_triangulation_interpolation` are first thinned to a quarter of the median edge length
+    of the mesh2d, when their density greatly exceeds it. Each cell keeps the mean of its samples.
+
+    The input arrays are passed to the library without copies when they have the expected dtype
+    and are contiguous, otherwise they are copied once. With `strict_zero_copy`, the methods raise
+    a `ZeroCopyError` instead of copying. Use `meshkernel.marshalling.copy_accounting` to list the copies.
+    """
 
-    def __init__(self, projection: ProjectionType = ProjectionType.CARTESIAN):
+    def __init__(
+        self,
+        projection: ProjectionType = ProjectionType.CARTESIAN,
+        clip_geometries: bool = False,
+        thin_samples: bool = False,
+        strict_zero_copy: bool = False,
+    ):
         """Constructor of MeshKernel
 
         Args:
             projection (ProjectionType, optional): The projection type. Default is `ProjectionType.CARTESIAN`.
+            clip_geometries (bool, optional): Whether the input geometries are clipped to the mesh2d extent.
+                                              Default is `False`.
+            thin_samples (bool, optional): Whether dense samples are thinned to the mesh2d resolution.
+                                           Default is `False`.
+            strict_zero_copy (bool, optional): Whether the methods raise a `ZeroCopyError` instead of copying
+                                               an input array to convert it. Default is `False`.
 
         Raises:
             OSError: This gets raised in case MeshKernel is used within an unsupported OS.
         """
 
+        self._lock = threading.RLock()
+        self.strict_zero_copy = strict_zero_copy
+        self.clip_geometries = clip_geometries
+        self.thin_samples = thin_samples
+        self._mesh2d_extent = None
+        self._mesh2d_edge_length = None
+
         # Determine OS
         system = platform.system()
 
@@ -103,7 +185,8 @@ class MeshKernel:
         self._set_undo_size(0)
 
     def __del__(self):
-        self._deallocate_state()
+        if hasattr(self, "_meshkernelid"):
+            self._deallocate_state()
 
     def __get_exit_codes(self):
         """Stores the backend exit codes
@@ -219,17 +302,24 @@ class MeshKernel:
             self.lib.mkernel_mesh2d_add, self._meshkernelid, byref(c_mesh2d)
         )
 
-    def mesh2d_get(self) -> Mesh2d:
+    def mesh2d_get(self, memmap_directory: Optional[str] = None) -> Mesh2d:
         """Gets the two-dimensional mesh state from the MeshKernel.
 
         Please note that this involves a copy of the data.
+        For very large meshes, the copy can be written to memory-mapped `.npy` files
+        in `memmap_directory` instead of the heap. The files form a snapshot of the mesh,
+        which can be reopened with `Mesh2d.from_directory`.
+
+        Args:
+            memmap_directory (str, optional): The directory where the memory-mapped arrays are created.
+                                              If None, the arrays are allocated in memory.
 
         Returns:
             Mesh2d: A copy of the two-dimensional mesh state.
         """
 
         c_mesh2d = self._mesh2d_get_dimensions()
-        mesh2d = c_mesh2d.allocate_memory()
+        mesh2d = c_mesh2d.allocate_memory(memmap_directory=memmap_directory)
         self._execute_function(
             self.lib.mkernel_mesh2d_get_data, self._meshkernelid, byref(c_mesh2d)
         )
@@ -268,6 +358,7 @@ class MeshKernel:
             invert_deletion (bool): Whether or not to invert the deletion.
         """
 
+        geometry_list = self._clip_to_mesh2d(geometry_list, polygons=True)
         c_geometry_list = CGeometryList.from_geometrylist(geometry_list)
 
         self._execute_function(
@@ -771,6 +862,7 @@ class MeshKernel:
             mesh_refinement_params (MeshRefinementParameters): The mesh refinement parameters.
         """
 
+        samples = self._thin_to_mesh2d(samples)
         c_samples = CGeometryList.from_geometrylist(samples)
         c_refinement_params = CMeshRefinementParameters.from_meshrefinementparameters(
             mesh_refinement_params
@@ -837,6 +929,27 @@ class MeshKernel:
         c_refinement_params = CMeshRefinementParameters.from_meshrefinementparameters(
             mesh_refinement_params
         )
+
+        self._mesh2d_refine_based_on_c_gridded_samples(
+            c_gridded_samples, c_refinement_params, use_nodal_refinement
+        )
+
+    def _mesh2d_refine_based_on_c_gridded_samples(
+        self,
+        c_gridded_samples: CGriddedSamples,
+        c_refinement_params: CMeshRefinementParameters,
+        use_nodal_refinement: bool = True,
+    ) -> None:
+        """For internal use only.
+
+        Computes mesh refinement based of already marshalled gridded samples and refinement parameters.
+        The arrays referenced by `c_gridded_samples` must be kept alive by the caller.
+
+        Args:
+            c_gridded_samples (CGriddedSamples): The gridded samples.
+            c_refinement_params (CMeshRefinementParameters): The mesh refinement parameters.
+            use_nodal_refinement (bool): If the depth value at nodes is used for refinement. Default True.
+        """
         use_nodal_refinement_int = 1 if use_nodal_refinement else 0
 
         self._execute_function(
@@ -872,6 +985,72 @@ class MeshKernel:
             byref(c_refinement_params),
         )
 
+    def mesh2d_refine_regions(
+        self,
+        regions: List[Tuple[GeometryList, MeshRefinementParameters]],
+        order: bool = False,
+        connect_hanging_nodes: bool = True,
+    ) -> List[RegionRefinement]:
+        """Refines a mesh2d within several polygons, each with its own refinement parameters.
+
+        The regions are refined one after the other with `mesh2d_refine_based_on_polygon`, in the given order
+        unless `order` is set. Refining overlapping regions in another order can give another mesh.
+        The hanging nodes are only connected after the last region, so the refinement of a region is not
+        constrained by the connections made for the previous ones. Each polygon and each parameter set
+        is marshalled once, even when shared by several regions.
+
+        Args:
+            regions (List[Tuple[GeometryList, MeshRefinementParameters]]): The polygons and their refinement
+                                                                            parameters.
+            order (bool, optional): Whether to refine the regions from the largest to the smallest `min_edge_size`
+                                    instead of in the given order, so the mesh does not depend on the order
+                                    of the list. Regions with the same `min_edge_size` keep their order.
+                                    Default is `False`.
+            connect_hanging_nodes (bool, optional): Whether to connect the hanging nodes after the last region.
+                                                    Default is `True`.
+
+        Returns:
+            List[RegionRefinement]: The face growth and the duration of each region, in refinement order.
+        """
+        indices = list(range(len(regions)))
+        if order:
+            indices.sort(key=lambda index: -regions[index][1].min_edge_size)
+
+        c_polygons = {}
+        c_parameters = {}
+        refinements = []
+        num_faces = self._mesh2d_get_dimensions().num_faces
+        for position, index in enumerate(indices):
+            polygon, parameters = regions[index]
+            if id(polygon) not in c_polygons:
+                c_polygons[id(polygon)] = CGeometryList.from_geometrylist(polygon)
+            if id(parameters) not in c_parameters:
+                c_parameters[id(parameters)] = (
+                    CMeshRefinementParameters.from_meshrefinementparameters(parameters)
+                )
+            c_refinement_params = c_parameters[id(parameters)]
+            c_refinement_params.connect_hanging_nodes = (
+                connect_hanging_nodes and position == len(indices) - 1
+            )
+
+            start = time.perf_counter()
+            self._execute_function(
+                self.lib.mkernel_mesh2d_refine_based_on_polygon,
+                self._meshkernelid,
+                byref(c_polygons[id(polygon)]),
+                byref(c_refinement_params),
+            )
+            elapsed = time.perf_counter() - start
+
+            # The face count after a region is the count before the next one
+            num_faces_before = num_faces
+            num_faces = self._mesh2d_get_dimensions().num_faces
+            refinement = RegionRefinement(index, num_faces_before, num_faces, elapsed)
+            logger.debug("Refined region: %s", refinement)
+            refinements.append(refinement)
+
+        return refinements
+
     def mesh2d_remove_disconnected_regions(
         self,
     ) -> None:
@@ -971,6 +1150,8 @@ class MeshKernel:
 
         """
 
+        selecting_polygon = self._clip_to_mesh2d(selecting_polygon, polygons=True)
+        land_boundaries = self._clip_to_mesh2d(land_boundaries, polygons=False)
         c_selecting_polygon = CGeometryList.from_geometrylist(selecting_polygon)
         c_land_boundaries = CGeometryList.from_geometrylist(land_boundaries)
 
@@ -1427,8 +1608,7 @@ class MeshKernel:
             not inside the 2d mesh.
         """
 
-        node_mask_int = to_contiguous_numpy_array(node_mask.astype(np.int32))
-        c_node_mask = as_ctypes(node_mask_int)
+        c_node_mask = as_ctypes(as_contiguous_array(node_mask, np.int32, "node_mask"))
         c_polygons = CGeometryList.from_geometrylist(polygons)
 
         self._execute_function(
@@ -1448,8 +1628,7 @@ class MeshKernel:
                                  should not be connected
         """
 
-        node_mask_int = to_contiguous_numpy_array(node_mask.astype(np.int32))
-        c_node_mask = as_ctypes(node_mask_int)
+        c_node_mask = as_ctypes(as_contiguous_array(node_mask, np.int32, "node_mask"))
 
         self._execute_function(
             self.lib.mkernel_contacts_compute_multiple,
@@ -1469,8 +1648,7 @@ class MeshKernel:
 
         """
 
-        node_mask_int = to_contiguous_numpy_array(node_mask.astype(np.int32))
-        c_node_mask = as_ctypes(node_mask_int)
+        c_node_mask = as_ctypes(as_contiguous_array(node_mask, np.int32, "node_mask"))
         c_polygons = CGeometryList.from_geometrylist(polygons)
 
         self._execute_function(
@@ -1492,8 +1670,7 @@ class MeshKernel:
             polygons (GeometryList, optional):  The polygon selecting the Mesh2d faces to connect.
 
         """
-        node_mask_int = to_contiguous_numpy_array(node_mask.astype(np.int32))
-        c_node_mask = as_ctypes(node_mask_int)
+        c_node_mask = as_ctypes(as_contiguous_array(node_mask, np.int32, "node_mask"))
         c_polygons = CGeometryList.from_geometrylist(polygons)
 
         self._execute_function(
@@ -1521,8 +1698,7 @@ class MeshKernel:
 
         """
 
-        node_mask_int = to_contiguous_numpy_array(node_mask.astype(np.int32))
-        c_node_mask = as_ctypes(node_mask_int)
+        c_node_mask = as_ctypes(as_contiguous_array(node_mask, np.int32, "node_mask"))
         c_polygons = CGeometryList.from_geometrylist(polygons)
 
         self._execute_function(
@@ -1559,6 +1735,25 @@ class MeshKernel:
             byref(c_polygon),
         )
 
+    def mesh2d_casulli_derefinement_on_polygons(
+        self,
+        polygons: Union[GeometryList, List[GeometryList]],
+    ) -> PolygonBatchRefinement:
+        """
+        De-refine many mesh regions using the Casulli algorithm, with one native call per group of polygons.
+        See `mesh2d_casulli_refinement_on_polygons` for the grouping.
+
+        Args:
+            polygons (Union[GeometryList, List[GeometryList]]): The polygons, as a multi-polygon GeometryList
+                                                                 or as a list of GeometryLists.
+
+        Returns:
+            PolygonBatchRefinement: The face-count change of each polygon and the duration of each call.
+        """
+        return self._casulli_on_polygons(
+            self.lib.mkernel_mesh2d_casulli_derefinement_on_polygon, polygons
+        )
+
     def mesh2d_casulli_refinement(self) -> None:
         """
         Refine the whole mesh using the Casulli algorithm
@@ -1585,6 +1780,29 @@ class MeshKernel:
             byref(c_polygon),
         )
 
+    def mesh2d_casulli_refinement_on_polygons(
+        self,
+        polygons: Union[GeometryList, List[GeometryList]],
+    ) -> PolygonBatchRefinement:
+        """
+        Refine many mesh regions using the Casulli algorithm, with one native call per group of polygons.
+
+        The polygons are grouped so the bounding boxes of the polygons of a group do not intersect,
+        then each group is marshalled once and refined in a single call, as one multi-polygon.
+        Overlapping polygons are in different groups, so their overlap is refined once per polygon,
+        as with one call per polygon, but the groups are not processed in the order of the polygons.
+
+        Args:
+            polygons (Union[GeometryList, List[GeometryList]]): The polygons, as a multi-polygon GeometryList
+                                                                 or as a list of GeometryLists.
+
+        Returns:
+            PolygonBatchRefinement: The face-count change of each polygon and the duration of each call.
+        """
+        return self._casulli_on_polygons(
+            self.lib.mkernel_mesh2d_casulli_refinement_on_polygon, polygons
+        )
+
     def mesh2d_compute_orthogonalization(
         self,
         project_to_land_boundary_option: ProjectToLandBoundaryOption,
@@ -1610,6 +1828,8 @@ class MeshKernel:
                 orthogonalization_parameters
             )
         )
+        selecting_polygon = self._clip_to_mesh2d(selecting_polygon, polygons=True)
+        land_boundaries = self._clip_to_mesh2d(land_boundaries, polygons=False)
         c_selecting_polygon = CGeometryList.from_geometrylist(selecting_polygon)
         c_land_boundaries = CGeometryList.from_geometrylist(land_boundaries)
 
@@ -1761,6 +1981,7 @@ class MeshKernel:
         Returns:
             GeometryList: The interpolated samples.
         """
+        samples = self._thin_to_mesh2d(samples)
         c_samples = CGeometryList.from_geometrylist(samples)
 
         number_of_coordinates = self._get_num_coordinates(location_type)
@@ -1905,31 +2126,150 @@ class MeshKernel:
             function (Callable): The function which we want to call.
             args: Arguments which will be passed to `function`.
 
+        The call and the retrieval of its error details hold the process-wide native call lock,
+        since the library stores the error details globally.
+
         Raises:
             MeshKernelError: This exception gets raised,
                              if the MeshKernel library reports an error.
         """
-        exit_code = function(*args)
-        if exit_code != self._exit_code.SUCCESS:
-            error_message = self._get_error()
-            if exit_code == self._exit_code.MESHKERNEL_ERROR:
-                raise MeshKernelError("MeshKernelError", error_message)
-            elif exit_code == self._exit_code.NOT_IMPLEMENTED_ERROR:
-                raise MeshKernelError("NotImplementedError", error_message)
-            elif exit_code == self._exit_code.ALGORITHM_ERROR:
-                raise MeshKernelError("AlgorithmError", error_message)
-            elif exit_code == self._exit_code.CONSTRAINT_ERROR:
-                raise MeshKernelError("ConstraintError", error_message)
-            elif exit_code == self._exit_code.MESH_GEOMETRY_ERROR:
-                raise MeshGeometryError(error_message, self._get_geometry_error())
-            elif exit_code == self._exit_code.LINEAR_ALGEBRA_ERROR:
-                raise MeshKernelError("LinearAlgebraError", error_message)
-            elif exit_code == self._exit_code.RANGE_ERROR:
-                raise MeshKernelError("RangeError", error_message)
-            elif exit_code == self._exit_code.STDLIB_EXCEPTION:
-                raise MeshKernelError("STDLibException", error_message)
-            elif exit_code == self._exit_code.UNKNOWN_EXCEPTION:
-                raise MeshKernelError("UnknownException", error_message)
+        with self._lock:
+            with _native_call_lock:
+                exit_code = function(*args)
+                if exit_code != self._exit_code.SUCCESS:
+                    error_message = self._get_error()
+                    if exit_code == self._exit_code.MESH_GEOMETRY_ERROR:
+                        geometry_error = self._get_geometry_error()
+            # Only the getters are known to leave the mesh2d unchanged
+            if "_get_" not in getattr(function, "__name__", ""):
+                self._mesh2d_extent = None
+                self._mesh2d_edge_length = None
+            if exit_code == self._exit_code.SUCCESS:
+                return
+
+        if exit_code == self._exit_code.MESHKERNEL_ERROR:
+            raise MeshKernelError("MeshKernelError", error_message)
+        elif exit_code == self._exit_code.NOT_IMPLEMENTED_ERROR:
+            raise MeshKernelError("NotImplementedError", error_message)
+        elif exit_code == self._exit_code.ALGORITHM_ERROR:
+            raise MeshKernelError("AlgorithmError", error_message)
+        elif exit_code == self._exit_code.CONSTRAINT_ERROR:
+            raise MeshKernelError("ConstraintError", error_message)
+        elif exit_code == self._exit_code.MESH_GEOMETRY_ERROR:
+            raise MeshGeometryError(error_message, geometry_error)
+        elif exit_code == self._exit_code.LINEAR_ALGEBRA_ERROR:
+            raise MeshKernelError("LinearAlgebraError", error_message)
+        elif exit_code == self._exit_code.RANGE_ERROR:
+            raise MeshKernelError("RangeError", error_message)
+        elif exit_code == self._exit_code.STDLIB_EXCEPTION:
+            raise MeshKernelError("STDLibException", error_message)
+        elif exit_code == self._exit_code.UNKNOWN_EXCEPTION:
+            raise MeshKernelError("UnknownException", error_message)
+
+    def _clip_to_mesh2d(
+        self, geometry_list: GeometryList, polygons: bool
+    ) -> GeometryList:
+        """For internal use only.
+
+        Clips a GeometryList to the extent of the mesh2d if `clip_geometries` is set.
+
+        Args:
+            geometry_list (GeometryList): The polygons or polylines.
+            polygons (bool): Whether the rings are polygons, or polylines.
+
+        Returns:
+            GeometryList: The clipped geometries, or the GeometryList itself.
+        """
+        if not self.clip_geometries or geometry_list.x_coordinates.size == 0:
+            return geometry_list
+
+        if self._mesh2d_extent is None:
+            mesh2d = self.mesh2d_get()
+            if mesh2d.node_x.size == 0:
+                return geometry_list
+            self._mesh2d_extent = (
+                float(np.min(mesh2d.node_x)),
+                float(np.min(mesh2d.node_y)),
+                float(np.max(mesh2d.node_x)),
+                float(np.max(mesh2d.node_y)),
+            )
+
+        spherical = self.get_projection() == ProjectionType.SPHERICAL
+        return clip_to_extent(geometry_list, self._mesh2d_extent, polygons, spherical)
+
+    def _casulli_on_polygons(
+        self, function, polygons: Union[GeometryList, List[GeometryList]]
+    ) -> PolygonBatchRefinement:
+        """For internal use only.
+
+        Applies a Casulli function taking a polygon to groups of polygons with disjoint bounding boxes,
+        and counts the faces inside each polygon before the first call and after the last one.
+        The mesh2d is fetched only twice, whatever the number of groups.
+
+        Args:
+            function (Callable): The native Casulli function.
+            polygons (Union[GeometryList, List[GeometryList]]): The polygons.
+
+        Returns:
+            PolygonBatchRefinement: The face-count change of each polygon and the duration of each call.
+        """
+        if not isinstance(polygons, GeometryList):
+            polygons = concatenate_polygons(polygons)
+
+        group_index = group_disjoint_polygons(polygons)
+        groups = [
+            np.flatnonzero(group_index == group)
+            for group in range(int(np.max(group_index, initial=-1)) + 1)
+        ]
+        group_polygons = [select_polygons(polygons, members) for members in groups]
+
+        def count_faces(mesh2d: Mesh2d) -> ndarray:
+            # The polygons of a group do not overlap, so each face center is in at most one of them
+            num_faces = np.zeros(group_index.size, dtype=np.int64)
+            for members, members_polygons in zip(groups, group_polygons):
+                inside = polygon_index_of_points(
+                    members_polygons, mesh2d.face_x, mesh2d.face_y
+                )
+                num_faces[members] = np.bincount(
+                    inside + 1, minlength=members.size + 1
+                )[1:]
+            return num_faces
+
+        elapsed = []
+        with self._lock:
+            num_faces_before = count_faces(self.mesh2d_get())
+            for members_polygons in group_polygons:
+                c_polygons = CGeometryList.from_geometrylist(members_polygons)
+                start = time.perf_counter()
+                self._execute_function(function, self._meshkernelid, byref(c_polygons))
+                elapsed.append(time.perf_counter() - start)
+            face_deltas = count_faces(self.mesh2d_get()) - num_faces_before
+
+        batch = PolygonBatchRefinement(face_deltas, group_index, elapsed)
+        logger.debug("Casulli on polygons: %s", batch)
+        return batch
+
+    def _thin_to_mesh2d(self, samples: GeometryList) -> GeometryList:
+        """For internal use only.
+
+        Thins the samples to the mesh2d resolution if `thin_samples` is set and they are much denser.
+
+        Args:
+            samples (GeometryList): The samples.
+
+        Returns:
+            GeometryList: The thinned samples, or the GeometryList itself.
+        """
+        if not self.thin_samples or samples.x_coordinates.size == 0:
+            return samples
+
+        if self._mesh2d_edge_length is None:
+            mesh2d = self.mesh2d_get()
+            if mesh2d.edge_nodes.size == 0:
+                return samples
+            self._mesh2d_edge_length = median_edge_length(mesh2d)
+
+        return thin_to_resolution(samples, self._mesh2d_edge_length)
 
     def _curvilineargrid_get_dimensions(self) -> CCurvilinearGrid:
         """For internal use only.
@@ -1949,10 +2289,34 @@ class MeshKernel:
         )
         return c_curvilineargrid
 
-    def curvilineargrid_get(self) -> CurvilinearGrid:
+    def curvilinear_set(self, curvilinear_grid: CurvilinearGrid) -> None:
+        """Sets the curvilinear grid state of the MeshKernel.
+
+        Please note that this involves a copy of the data.
+
+        Args:
+            curvilinear_grid (CurvilinearGrid): The input data used for setting the state.
+        """
+        c_curvilinear_grid = CCurvilinearGrid.from_curvilinearGrid(curvilinear_grid)
+
+        self._execute_function(
+            self.lib.mkernel_curvilinear_set,
+            self._meshkernelid,
+            byref(c_curvilinear_grid),
+        )
+
+    def curvilineargrid_get(
+        self, memmap_directory: Optional[str] = None
+    ) -> CurvilinearGrid:
         """Gets the curvilinear grid state from the MeshKernel.
 
         Please note that this involves a copy of the data.
+        The copy can be written to memory-mapped `.npy` files in `memmap_directory` instead of the heap.
+        The files form a snapshot of the grid, which can be reopened with `CurvilinearGrid.from_directory`.
+
+        Args:
+            memmap_directory (str, optional): The directory where the memory-mapped arrays are created.
+                                              If None, the arrays are allocated in memory.
 
         Returns:
             CurvilinearGrid: A copy of the curvilinear grid state.
@@ -1960,7 +2324,9 @@ class MeshKernel:
 
         c_curvilineargrid = self._curvilineargrid_get_dimensions()
 
-        curvilineargrid = c_curvilineargrid.allocate_memory()
+        curvilineargrid = c_curvilineargrid.allocate_memory(
+            memmap_directory=memmap_directory
+        )
         self._execute_function(
             self.lib.mkernel_curvilinear_get_data,
             self._meshkernelid,
@@ -2657,24 +3023,21 @@ class MeshKernel:
         if location_type == location_type.NODES:
             geometry_list.x_coordinates = mesh.node_x
             geometry_list.y_coordinates = mesh.node_y
-            geometry_list.values = np.array(
-                [geometry_list.values[i] for i in mesh.valid_nodes_map.keys()],
-                dtype=np.double,
-            )
+            geometry_list.values = np.asarray(geometry_list.values, dtype=np.double)[
+                mesh.valid_node_indices
+            ]
         elif location_type == location_type.FACES:
             geometry_list.x_coordinates = mesh.face_x
             geometry_list.y_coordinates = mesh.face_y
-            geometry_list.values = np.array(
-                [geometry_list.values[i] for i in mesh.valid_faces_map.keys()],
-                dtype=np.double,
-            )
+            geometry_list.values = np.asarray(geometry_list.values, dtype=np.double)[
+                mesh.valid_face_indices
+            ]
         elif location_type == location_type.EDGES:
             geometry_list.x_coordinates = mesh.edge_x
             geometry_list.y_coordinates = mesh.edge_y
-            geometry_list.values = np.array(
-                [geometry_list.values[i] for i in mesh.valid_edges_map.keys()],
-                dtype=np.double,
-            )
+            geometry_list.values = np.asarray(geometry_list.values, dtype=np.double)[
+                mesh.valid_edge_indices
+            ]
         else:
             raise ValueError("wrong location_type")
 
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import copy
+import logging
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from meshkernel.meshkernel import MeshKernel
+from meshkernel.py_structures import (
+    CurvilinearGrid,
+    GeometryList,
+    OrthogonalizationParameters,
+    ProjectToLandBoundaryOption,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class OrthogonalizationStep:
+    """The orthogonality measured after an outer iteration.
+
+    The orthogonality is the cosine of the angle between an edge and the segment connecting
+    the circumcenters of its faces for a mesh2d, and between the grid lines at a node
+    for a curvilinear grid. Zero is perfectly orthogonal.
+
+    Attributes:
+        iteration (int): The number of outer iterations done, 0 for the orthogonality before the first one.
+        maximum (float): The maximum orthogonality.
+        percentile (float): The orthogonality at the requested percentile.
+        elapsed (float): The time spent since the start of the orthogonalization, in seconds.
+    """
+
+    def __init__(
+        self, iteration: int, maximum: float, percentile: float, elapsed: float
+    ):
+        self.iteration = iteration
+        self.maximum = maximum
+        self.percentile = percentile
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return "OrthogonalizationStep(iteration={}, maximum={:.6g}, percentile={:.6g}, elapsed={:.3f}s)".format(
+            self.iteration, self.maximum, self.percentile, self.elapsed
+        )
+
+
+class OrthogonalizationResult:
+    """The outcome of a stepwise orthogonalization.
+
+    Attributes:
+        steps (List[OrthogonalizationStep]): The orthogonality before the first iteration and after each iteration.
+        stop_reason (str): Why the iterations stopped: "converged", "time_budget", "max_iterations" or "callback".
+    """
+
+    def __init__(self):
+        self.steps: List[OrthogonalizationStep] = []
+        self.stop_reason: str = "max_iterations"
+
+    @property
+    def iterations(self) -> int:
+        """The number of outer iterations done."""
+        return self.steps[-1].iteration if self.steps else 0
+
+    @property
+    def converged(self) -> bool:
+        """Whether the iterations stopped because the orthogonality no longer improved."""
+        return self.stop_reason == "converged"
+
+    def __repr__(self):
+        return (
+            "OrthogonalizationResult(iterations={}, stop_reason={!r}, last={})".format(
+                self.iterations,
+                self.stop_reason,
+                self.steps[-1] if self.steps else None,
+            )
+        )
+
+
+def orthogonalize_mesh2d(
+    meshkernel: MeshKernel,
+    orthogonalization_parameters: OrthogonalizationParameters,
+    land_boundaries: GeometryList = GeometryList(),
+    project_to_land_boundary_option: ProjectToLandBoundaryOption = ProjectToLandBoundaryOption.DO_NOT_PROJECT_TO_LANDBOUNDARY,
+    selecting_polygon: GeometryList = GeometryList(),
+    max_iterations: int = 20,
+    tolerance: float = 1e-4,
+    percentile: float = 95.0,
+    time_budget: Optional[float] = None,
+    callback: Optional[Callable[[OrthogonalizationStep], Optional[bool]]] = None,
+) -> OrthogonalizationResult:
+    """Orthogonalizes the mesh2d of a state one outer iteration at a time, until the orthogonality stops improving.
+
+    Each iteration calls `mesh2d_compute_orthogonalization` with a single outer iteration and the other
+    orthogonalization parameters, then measures the orthogonality of the edges with `mesh2d_get_orthogonality`.
+    The iterations stop when neither the maximum nor the percentile of the orthogonality improved by more than
+    `tolerance`, when `max_iterations` is reached, when the time budget is spent, or when the callback returns False.
+
+    Args:
+        meshkernel (MeshKernel): The state holding the mesh2d.
+        orthogonalization_parameters (OrthogonalizationParameters): The orthogonalization parameters.
+                                                                    `outer_iterations` is ignored.
+        land_boundaries (GeometryList, optional): The land boundaries to account for.
+        project_to_land_boundary_option (ProjectToLandBoundaryOption, optional): The option to determine
+                                                                                 how to snap to land boundaries.
+        selecting_polygon (GeometryList, optional): The polygon where to perform the orthogonalization.
+        max_iterations (int, optional): The maximum number of outer iterations. Default is `20`.
+        tolerance (float, optional): The minimum improvement of the orthogonality per iteration. Default is `1e-4`.
+        percentile (float, optional): The percentile of the orthogonality measured with the maximum. Default is `95`.
+        time_budget (float, optional): The time after which no new iteration is started, in seconds.
+                                       Default is None, no time budget.
+        callback (Callable, optional): Called with each step, including the initial one. Returning False stops.
+
+    Returns:
+        OrthogonalizationResult: The per-iteration orthogonality and the stop reason.
+    """
+    parameters = copy.copy(orthogonalization_parameters)
+    parameters.outer_iterations = 1
+
+    def iterate():
+        meshkernel.mesh2d_compute_orthogonalization(
+            project_to_land_boundary_option,
+            parameters,
+            land_boundaries,
+            selecting_polygon,
+        )
+
+    def measure():
+        return meshkernel.mesh2d_get_orthogonality().values
+
+    return _iterate(
+        iterate, measure, max_iterations, tolerance, percentile, time_budget, callback
+    )
+
+
+def orthogonalize_curvilinear(
+    meshkernel: MeshKernel,
+    orthogonalization_parameters: OrthogonalizationParameters,
+    configure: Optional[Callable[[MeshKernel], None]] = None,
+    max_iterations: int = 20,
+    tolerance: float = 1e-4,
+    percentile: float = 95.0,
+    time_budget: Optional[float] = None,
+    callback: Optional[Callable[[OrthogonalizationStep], Optional[bool]]] = None,
+) -> OrthogonalizationResult:
+    """Orthogonalizes the curvilinear grid of a state one outer iteration at a time,
+    until the orthogonality stops improving.
+
+    Each iteration calls `curvilinear_initialize_orthogonalize` with a single outer iteration,
+    then `configure`, if given, for example to set a block or frozen lines, and `curvilinear_orthogonalize`.
+    Without `configure`, the block is set to the whole grid with `curvilinear_set_block_orthogonalize`,
+    from the extent of the valid nodes before the first iteration.
+    The orthogonality is measured at the interior nodes of the grid, from the grid lines through them.
+    The stop criteria are those of `orthogonalize_mesh2d`.
+
+    Args:
+        meshkernel (MeshKernel): The state holding the curvilinear grid.
+        orthogonalization_parameters (OrthogonalizationParameters): The orthogonalization parameters.
+                                                                    `outer_iterations` is ignored.
+        configure (Callable, optional): Called with the state after each initialization.
+                                        Default is None, the whole grid is orthogonalized.
+        max_iterations (int, optional): The maximum number of outer iterations. Default is `20`.
+        tolerance (float, optional): The minimum improvement of the orthogonality per iteration. Default is `1e-4`.
+        percentile (float, optional): The percentile of the orthogonality measured with the maximum. Default is `95`.
+        time_budget (float, optional): The time after which no new iteration is started, in seconds.
+                                       Default is None, no time budget.
+        callback (Callable, optional): Called with each step, including the initial one. Returning False stops.
+
+    Returns:
+        OrthogonalizationResult: The per-iteration orthogonality and the stop reason.
+    """
+    parameters = copy.copy(orthogonalization_parameters)
+    parameters.outer_iterations = 1
+
+    if configure is None:
+        # The kernel orthogonalizes only a block, which must be set after each initialization
+        curvilinear_grid = meshkernel.curvilineargrid_get()
+        valid = (curvilinear_grid.node_x != meshkernel._float_invalid_value) & (
+            curvilinear_grid.node_y != meshkernel._float_invalid_value
+        )
+        extent = (
+            float(np.min(curvilinear_grid.node_x[valid])),
+            float(np.min(curvilinear_grid.node_y[valid])),
+            float(np.max(curvilinear_grid.node_x[valid])),
+            float(np.max(curvilinear_grid.node_y[valid])),
+        )
+        del curvilinear_grid
+
+        def configure(meshkernel: MeshKernel):
+            meshkernel.curvilinear_set_block_orthogonalize(*extent)
+
+    def iterate():
+        meshkernel.curvilinear_initialize_orthogonalize(parameters)
+        configure(meshkernel)
+        meshkernel.curvilinear_orthogonalize()
+
+    def measure():
+        return curvilinear_orthogonality(
+            meshkernel.curvilineargrid_get(), meshkernel._float_invalid_value
+        )
+
+    return _iterate(
+        iterate, measure, max_iterations, tolerance, percentile, time_budget, callback
+    )
+
+
+def curvilinear_orthogonality(
+    curvilinear_grid: CurvilinearGrid, float_invalid_value: Optional[float] = None
+) -> np.ndarray:
+    """Computes the orthogonality at the interior nodes of a curvilinear grid, as the absolute cosine
+    of the angle between the m and the n grid lines through each node.
+
+    Args:
+        curvilinear_grid (CurvilinearGrid): The curvilinear grid.
+        float_invalid_value (float, optional): The coordinate of the invalid nodes, usually the invalid value
+                                               of the MeshKernel library. Default is None, only the nodes
+                                               with non-finite coordinates are invalid.
+
+    Returns:
+        np.ndarray: The orthogonality of the interior nodes whose neighbours are all valid.
+    """
+    shape = (curvilinear_grid.num_n, curvilinear_grid.num_m)
+    x = np.reshape(curvilinear_grid.node_x, shape)
+    y = np.reshape(curvilinear_grid.node_y, shape)
+    if shape[0] < 3 or shape[1] < 3:
+        return np.empty(0, dtype=np.double)
+
+    # Central differences along m and n
+    dx_m = x[1:-1, 2:] - x[1:-1, :-2]
+    dy_m = y[1:-1, 2:] - y[1:-1, :-2]
+    dx_n = x[2:, 1:-1] - x[:-2, 1:-1]
+    dy_n = y[2:, 1:-1] - y[:-2, 1:-1]
+
+    valid = np.isfinite(x)
+    if float_invalid_value is not None:
+        valid &= x != float_invalid_value
+    valid = (
+        valid[1:-1, 1:-1]
+        & valid[1:-1, 2:]
+        & valid[1:-1, :-2]
+        & valid[2:, 1:-1]
+        & valid[:-2, 1:-1]
+    )
+    lengths = np.hypot(dx_m, dy_m) * np.hypot(dx_n, dy_n)
+    valid &= lengths > 0.0
+
+    return np.abs(dx_m * dx_n + dy_m * dy_n)[valid] / lengths[valid]
+
+
+def _iterate(
+    iterate: Callable[[], None],
+    measure: Callable[[], np.ndarray],
+    max_iterations: int,
+    tolerance: float,
+    percentile: float,
+    time_budget: Optional[float],
+    callback: Optional[Callable[[OrthogonalizationStep], Optional[bool]]],
+) -> OrthogonalizationResult:
+    """Runs the iterations until one of the stop criteria is met.
+
+    Args:
+        iterate (Callable): Runs one outer iteration.
+        measure (Callable): Gets the orthogonality values.
+        max_iterations (int): The maximum number of outer iterations.
+        tolerance (float): The minimum improvement of the orthogonality per iteration.
+        percentile (float): The percentile of the orthogonality measured with the maximum.
+        time_budget (float, optional): The time after which no new iteration is started.
+        callback (Callable, optional): Called with each step. Returning False stops.
+
+    Returns:
+        OrthogonalizationResult: The per-iteration orthogonality and the stop reason.
+    """
+    result = OrthogonalizationResult()
+    start = time.perf_counter()
+
+    def add_step(iteration: int) -> bool:
+        values = measure()
+        # Boundary edges have no orthogonality and hold the invalid value
+        values = values[np.isfinite(values) & (values >= 0.0)]
+        maximum, value_at_percentile = 0.0, 0.0
+        if values.size > 0:
+            maximum = float(np.max(values))
+            value_at_percentile = float(np.percentile(values, percentile))
+
+        step = OrthogonalizationStep(
+            iteration, maximum, value_at_percentile, time.perf_counter() - start
+        )
+        result.steps.append(step)
+        logger.debug("Orthogonalization: %s", step)
+        return callback is None or callback(step) is not False
+
+    if not add_step(0):
+        result.stop_reason = "callback"
+        return result
+
+    for iteration in range(1, max_iterations + 1):
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            result.stop_reason = "time_budget"
+            break
+
+        iterate()
+        if not add_step(iteration):
+            result.stop_reason = "callback"
+            break
+
+        previous, current = result.steps[-2], result.steps[-1]
+        if (
+            previous.maximum - current.maximum < tolerance
+            and previous.percentile - current.percentile < tolerance
+        ):
+            result.stop_reason = "converged"
+            break
+
+    return result
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import queue
+import secrets
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from meshkernel.meshkernel import MeshKernel
+from meshkernel.py_structures import MESH2D_ARRAY_NAMES, Mesh2d, ProjectionType
+from meshkernel.shared_memory import SharedMemoryHandle
+
+logger = logging.getLogger(__name__)
+
+
+class MeshKernelPool:
+    """Runs independent jobs concurrently, each one on its own MeshKernel state.
+
+    The states are allocated once when the pool is created and reused by the jobs.
+    A job is a callable receiving a MeshKernel instance as its first argument.
+    The native calls of the jobs are serialized, see `MeshKernel`, but ctypes releases the GIL during them,
+    so the Python code of the other jobs, such as preparing the inputs or processing the results with numpy,
+    runs meanwhile. Use `run_batch` to run the native calls on several cores.
+
+    A state is handed to one job at a time, but it is not reset between jobs:
+    a job must set the meshes it works on, for example with `mesh2d_set`.
+
+    Args:
+        num_states (int, optional): The number of states, which is also the number of worker threads.
+                                    Default is the number of CPUs.
+        projection (ProjectionType, optional): The projection of the states. Default is `ProjectionType.CARTESIAN`.
+    """
+
+    def __init__(
+        self,
+        num_states: Optional[int] = None,
+        projection: ProjectionType = ProjectionType.CARTESIAN,
+    ):
+        if num_states is None:
+            num_states = os.cpu_count() or 1
+        if num_states < 1:
+            raise ValueError("num_states must be at least 1")
+
+        self.num_states = num_states
+        self._states = queue.SimpleQueue()
+        for _ in range(num_states):
+            self._states.put(MeshKernel(projection=projection))
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=num_states, thread_name_prefix="meshkernel-pool"
+        )
+
+    def submit(self, function: Callable, *args, **kwargs) -> Future:
+        """Schedules `function(meshkernel, *args, **kwargs)` on a free state.
+
+        Args:
+            function (Callable): The job, taking a MeshKernel instance as its first argument.
+            args: The positional arguments passed to the job.
+            kwargs: The keyword arguments passed to the job.
+
+        Returns:
+            Future: The future of the job result.
+        """
+        return self._executor.submit(self._run, function, *args, **kwargs)
+
+    def map(self, function: Callable, *iterables: Iterable) -> Iterator:
+        """Runs `function(meshkernel, *items)` for the items of the iterables, like the builtin `map`.
+
+        Args:
+            function (Callable): The job, taking a MeshKernel instance as its first argument.
+            iterables (Iterable): The iterables providing the other arguments of the jobs.
+
+        Returns:
+            Iterator: The job results, in the order of the inputs.
+        """
+        futures = [self.submit(function, *items) for items in zip(*iterables)]
+
+        def results():
+            for future in futures:
+                yield future.result()
+
+        return results()
+
+    def shutdown(self, wait: bool = True):
+        """Stops accepting jobs and releases the worker threads.
+
+        Args:
+            wait (bool, optional): Whether to wait for the pending jobs to finish. Default is True.
+        """
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> MeshKernelPool:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(wait=True)
+
+    def _run(self, function: Callable, *args, **kwargs):
+        """Runs a job on a state taken from the free states, and returns the state afterwards."""
+        meshkernel = self._states.get()
+        try:
+            return function(meshkernel, *args, **kwargs)
+        finally:
+            self._states.put(meshkernel)
+
+
+class BatchResult:
+    """The outcome of `run_batch`.
+
+    Attributes:
+        results (List[Any]): The result of each job, in the order of the inputs. None for failed jobs.
+        errors (Dict[int, BaseException]): The exception of each failed job, by input index.
+        run_times (List[float]): For each job, the time spent running the job function in the worker, in seconds.
+        latencies (List[float]): For each job, the time from its first submission to its result, in seconds.
+        retries (int): The number of submissions of started jobs repeated because a worker process crashed.
+        wall_time (float): The wall-clock time of the whole batch, in seconds.
+    """
+
+    def __init__(self, num_jobs: int):
+        self.results: List[Any] = [None] * num_jobs
+        self.errors: Dict[int, BaseException] = {}
+        self.run_times: List[float] = [0.0] * num_jobs
+        self.latencies: List[float] = [0.0] * num_jobs
+        self.retries: int = 0
+        self.wall_time: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """The number of successful jobs per second."""
+        if self.wall_time == 0.0:
+            return 0.0
+        return (len(self.results) - len(self.errors)) / self.wall_time
+
+    def __repr__(self):
+        return "BatchResult(num_jobs={}, failed={}, retries={}, throughput={:.2f} jobs/s, wall_time={:.3f}s)".format(
+            len(self.results),
+            len(self.errors),
+            self.retries,
+            self.throughput,
+            self.wall_time,
+        )
+
+
+def run_batch(
+    func: Callable,
+    inputs: Iterable,
+    workers: Optional[int] = None,
+    projection: ProjectionType = ProjectionType.CARTESIAN,
+    max_retries: int = 2,
+    mp_context=None,
+) -> BatchResult:
+    """Runs many independent jobs on warm worker processes.
+
+    Each worker process loads the MeshKernel library once and allocates one MeshKernel state,
+    which is passed to every job it runs as `func(meshkernel, input)`. `func` must be picklable,
+    i.e. defined at module level. As in `MeshKernelPool`, the state is not reset between jobs.
+
+    `Mesh2d` inputs and results, also inside tuples, lists and dictionaries, travel through shared memory
+    instead of being pickled. Result meshes are copied once out of the shared memory in this process.
+
+    If a worker process crashes, the pool is restarted and the unfinished jobs are submitted again.
+    Each worker marks a job as started in a shared segment before running it, so only the jobs that had
+    started when the pool broke count a retry, up to `max_retries` times. Since the crashing job cannot be
+    told apart from the other running jobs, all of them count a retry. Jobs still queued are submitted again
+    without counting one. Exceptions raised by a job are not retried, they are reported in `errors`.
+
+    Args:
+        func (Callable): The job function, taking a MeshKernel instance and an input.
+        inputs (Iterable): The input of each job.
+        workers (int, optional): The number of worker processes. Default is the number of CPUs.
+        projection (ProjectionType, optional): The projection of the worker states.
+                                               Default is `ProjectionType.CARTESIAN`.
+        max_retries (int, optional): The number of times a started job is submitted again after a crash.
+                                     Default is `2`.
+        mp_context (optional): The multiprocessing context used to start the workers. Default is the
+                               default context of `multiprocessing`.
+
+    Returns:
+        BatchResult: The results, errors and timings of the jobs.
+    """
+    inputs = list(inputs)
+    result = BatchResult(len(inputs))
+    start = time.perf_counter()
+
+    # The segments of the input meshes, shared by all jobs using the same mesh
+    segments: Dict[int, SharedMemoryHandle] = {}
+    payloads = [_to_transport(item, segments) for item in inputs]
+
+    # The result segments of a job attempt are named after it, so they can be discarded
+    # when a worker crashed before the calling process received their handles
+    batch_token = secrets.token_hex(4)
+    submissions = [0] * len(inputs)
+    crashes = [0] * len(inputs)
+    submitted_at = [0.0] * len(inputs)
+    pending = list(range(len(inputs)))
+
+    # One byte per job, set by the worker when the job starts
+    markers = SharedMemoryHandle.create(
+        {"started": np.zeros(len(inputs), dtype=np.uint8)}
+    )
+    started = markers.attach()["started"]
+
+    try:
+        while pending:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=_initialize_worker,
+                initargs=(projection, markers),
+            ) as executor:
+                futures = {}
+                for index in pending:
+                    if submissions[index] == 0:
+                        submitted_at[index] = time.perf_counter()
+                    submissions[index] += 1
+                    result_prefix = "mkb{}_{}_{}".format(
+                        batch_token, index, submissions[index]
+                    )
+                    future = executor.submit(
+                        _run_job, func, payloads[index], index, result_prefix
+                    )
+                    futures[future] = (index, result_prefix)
+                pending = []
+                crashed = []
+
+                not_done = set(futures)
+                while not_done:
+                    done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index, result_prefix = futures[future]
+                        try:
+                            payload, run_time = future.result()
+                        except BrokenProcessPool as exception:
+                            _discard_segments(result_prefix)
+                            crashed.append((index, exception))
+                            continue
+                        except BaseException as exception:
+                            result.errors[index] = exception
+                            continue
+
+                        result.results[index] = _from_transport(payload, copy=True)
+                        result.run_times[index] = run_time
+                        result.latencies[index] = (
+                            time.perf_counter() - submitted_at[index]
+                        )
+
+            # If no job started, the workers failed on their own and every job is charged,
+            # otherwise a crash in the initializer would restart the pool forever
+            any_started = any(started[index] for index, _ in crashed)
+            for index, exception in crashed:
+                if started[index] or not any_started:
+                    started[index] = 0
+                    crashes[index] += 1
+                    if crashes[index] > max_retries:
+                        result.errors[index] = exception
+                        continue
+                    result.retries += 1
+                pending.append(index)
+
+            if pending:
+                logger.warning(
+                    "A batch worker process crashed, restarting %d jobs", len(pending)
+                )
+            pending.sort()
+    finally:
+        del started
+        # The workers keep their reference to the markers until they exit
+        markers.unlink()
+        # Crashed workers may not have released their reference to the input segments
+        for handle in segments.values():
+            handle.unlink()
+
+    result.wall_time = time.perf_counter() - start
+    logger.debug("Batch run: %s", result)
+    return result
+
+
+# The MeshKernel state of a batch worker process
+_worker_meshkernel = None
+
+# The job start markers of a batch worker process
+_worker_started = None
+
+
+def _initialize_worker(projection: ProjectionType, markers: SharedMemoryHandle):
+    """Loads the MeshKernel library and allocates the state of a batch worker process."""
+    global _worker_meshkernel, _worker_started
+    _worker_meshkernel = MeshKernel(projection=projection)
+    _worker_started = markers.attach()["started"]
+
+
+def _run_job(func: Callable, payload, index: int, result_prefix: str):
+    """Runs a job in a batch worker process.
+
+    Args:
+        func (Callable): The job function.
+        payload: The transported job input.
+        index (int): The index of the job, whose start marker is set.
+        result_prefix (str): The prefix of the names of the result segments.
+
+    Returns:
+        tuple: The transported job result and the time spent in `func`.
+    """
+    _worker_started[index] = 1
+    handles = []
+    job_input = _from_transport(payload, handles=handles)
+    try:
+        start = time.perf_counter()
+        job_result = func(_worker_meshkernel, job_input)
+        run_time = time.perf_counter() - start
+
+        # The segments of the results are handed over to the calling process
+        names = ("{}_{}".format(result_prefix, k) for k in itertools.count())
+        transported = _to_transport(job_result, {}, names=names)
+    finally:
+        del job_input
+        for handle in handles:
+            handle.close()
+    return transported, run_time
+
+
+def _to_transport(
+    value,
+    segments: Dict[int, SharedMemoryHandle],
+    names: Optional[Iterator[str]] = None,
+):
+    """Replaces the meshes in a value by handles of shared memory segments.
+
+    Args:
+        value: The value, possibly a Mesh2d or a tuple, list or dict containing meshes.
+        segments (Dict[int, SharedMemoryHandle]): The segments already created, by mesh id.
+        names (Iterator[str], optional): If given, the names of the new segments, and each returned handle
+                                         takes over the reference of its segment. Default is None.
+
+    Returns:
+        The value with the meshes replaced.
+    """
+    if isinstance(value, Mesh2d):
+        if names is not None:
+            # Each returned handle owns the reference of its own segment
+            return value.to_shared_memory(name=next(names)).transfer()
+        key = id(value)
+        if key not in segments:
+            segments[key] = value.to_shared_memory()
+        return segments[key]
+    if isinstance(value, tuple):
+        return tuple(_to_transport(item, segments, names) for item in value)
+    if isinstance(value, list):
+        return [_to_transport(item, segments, names) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: _to_transport(item, segments, names) for key, item in value.items()
+        }
+    return value
+
+
+def _discard_segments(result_prefix: str):
+    """Unlinks the result segments left by a job attempt whose worker process crashed."""
+    for k in itertools.count():
+        try:
+            SharedMemoryHandle(
+                "{}_{}".format(result_prefix, k), owns_reference=True
+            ).unlink()
+        except FileNotFoundError:
+            return
+
+
+def _from_transport(value, handles: Optional[list] = None, copy: bool = False):
+    """Replaces the handles of shared memory segments in a value by meshes.
+
+    Args:
+        value: The value, possibly a handle or a tuple, list or dict containing handles.
+        handles (list, optional): Receives the attached handles, which must be closed after use.
+        copy (bool, optional): Whether the meshes are copied out of the segments, which are then closed.
+
+    Returns:
+        The value with the handles replaced.
+    """
+    if isinstance(value, SharedMemoryHandle):
+        mesh2d = Mesh2d.from_shared_memory(value)
+        if copy:
+            mesh2d = Mesh2d(
+                **{name: np.array(getattr(mesh2d, name)) for name in MESH2D_ARRAY_NAMES}
+            )
+            value.close()
+        elif handles is not None:
+            handles.append(value)
+        return mesh2d
+    if isinstance(value, tuple):
+        return tuple(_from_transport(item, handles, copy) for item in value)
+    if isinstance(value, list):
+        return [_from_transport(item, handles, copy) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: _from_transport(item, handles, copy) for key, item in value.items()
+        }
+    return value
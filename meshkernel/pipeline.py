@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Iterable, List
+
+import numpy as np
+
+from meshkernel.c_structures import CGriddedSamples, CMeshRefinementParameters
+from meshkernel.meshkernel import MeshKernel
+from meshkernel.py_structures import GriddedSamples, MeshRefinementParameters
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the tile stream in the prefetch queue
+_END_OF_TILES = object()
+
+
+class PipelineTimings:
+    """The per-stage timings of a tile pipeline run, in seconds.
+
+    Attributes:
+        load (List[float]): For each tile, the time spent producing and marshalling it on the background thread.
+        wait (List[float]): For each tile, the time the kernel stage waited for it to be available.
+        refine (List[float]): For each tile, the time spent in the refinement.
+        total (float): The wall-clock time of the whole run.
+    """
+
+    def __init__(self):
+        self.load: List[float] = []
+        self.wait: List[float] = []
+        self.refine: List[float] = []
+        self.total: float = 0.0
+
+    @property
+    def num_tiles(self) -> int:
+        """The number of refined tiles."""
+        return len(self.refine)
+
+    @property
+    def overlap(self) -> float:
+        """The fraction of the loading time hidden behind the refinement, between 0 and 1."""
+        load = sum(self.load)
+        if load == 0.0:
+            return 1.0
+        return max(0.0, min(1.0, 1.0 - sum(self.wait) / load))
+
+    def __repr__(self):
+        return "PipelineTimings(num_tiles={}, load={:.3f}s, wait={:.3f}s, refine={:.3f}s, total={:.3f}s)".format(
+            self.num_tiles,
+            sum(self.load),
+            sum(self.wait),
+            sum(self.refine),
+            self.total,
+        )
+
+
+class GriddedSamplesRefinementPipeline:
+    """Refines a mesh2d tile by tile with gridded samples, overlapping the loading of the next tile
+    with the refinement of the current one.
+
+    The tiles are produced on a background thread, which also marshals them into their C structure,
+    while the kernel refines with the current tile. Since ctypes releases the GIL during the native call,
+    reading and decoding raster windows proceeds in parallel with the refinement.
+    The refinement parameters are marshalled once and reused for every tile.
+
+    Args:
+        meshkernel (MeshKernel): The MeshKernel instance holding the mesh2d to refine.
+        mesh_refinement_params (MeshRefinementParameters): The mesh refinement parameters.
+        use_nodal_refinement (bool, optional): If the depth value at nodes is used for refinement. Default True.
+        queue_depth (int, optional): The maximum number of tiles loaded ahead of the refinement. Default is `2`.
+    """
+
+    def __init__(
+        self,
+        meshkernel: MeshKernel,
+        mesh_refinement_params: MeshRefinementParameters,
+        use_nodal_refinement: bool = True,
+        queue_depth: int = 2,
+    ):
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be at least 1")
+
+        self.meshkernel = meshkernel
+        self.mesh_refinement_params = mesh_refinement_params
+        self.use_nodal_refinement = use_nodal_refinement
+        self.queue_depth = queue_depth
+
+    def run(self, tiles: Iterable[GriddedSamples]) -> PipelineTimings:
+        """Refines the mesh2d with each tile in turn.
+
+        The `tiles` iterable is consumed on the background thread, so a generator reading
+        the raster windows from disk is evaluated ahead of the refinement.
+        An exception raised while producing a tile is re-raised by this method.
+
+        Args:
+            tiles (Iterable[GriddedSamples]): The gridded samples of each tile.
+
+        Returns:
+            PipelineTimings: The per-stage timings.
+        """
+        timings = PipelineTimings()
+        c_refinement_params = CMeshRefinementParameters.from_meshrefinementparameters(
+            self.mesh_refinement_params
+        )
+        prefetched = queue.Queue(maxsize=self.queue_depth)
+        stop = threading.Event()
+
+        producer = threading.Thread(
+            target=self._produce,
+            args=(tiles, prefetched, stop),
+            name="meshkernel-tile-prefetch",
+            daemon=True,
+        )
+
+        start = time.perf_counter()
+        producer.start()
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                item = prefetched.get()
+                wait = time.perf_counter() - wait_start
+
+                if item is _END_OF_TILES:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                # The gridded samples are kept alive until the refinement is done
+                gridded_samples, c_gridded_samples, load = item
+
+                refine_start = time.perf_counter()
+                self.meshkernel._mesh2d_refine_based_on_c_gridded_samples(
+                    c_gridded_samples, c_refinement_params, self.use_nodal_refinement
+                )
+                timings.refine.append(time.perf_counter() - refine_start)
+                timings.load.append(load)
+                timings.wait.append(wait)
+                del gridded_samples, c_gridded_samples
+        finally:
+            stop.set()
+            # Unblock the producer if it is waiting on a full queue
+            while producer.is_alive():
+                try:
+                    prefetched.get(timeout=0.01)
+                except queue.Empty:
+                    pass
+            producer.join()
+            timings.total = time.perf_counter() - start
+
+        logger.debug("Gridded samples refinement pipeline: %s", timings)
+        return timings
+
+    def _produce(
+        self,
+        tiles: Iterable[GriddedSamples],
+        prefetched: queue.Queue,
+        stop: threading.Event,
+    ):
+        """Loads and marshals the tiles on the background thread.
+
+        Args:
+            tiles (Iterable[GriddedSamples]): The gridded samples of each tile.
+            prefetched (queue.Queue): The bounded queue receiving the marshalled tiles.
+            stop (threading.Event): Set when the consumer stops early.
+        """
+        try:
+            iterator = iter(tiles)
+            while not stop.is_set():
+                load_start = time.perf_counter()
+                try:
+                    gridded_samples = next(iterator)
+                except StopIteration:
+                    break
+
+                # Make the arrays contiguous here, so the marshalled pointers stay valid.
+                # They are held by a local copy, the caller's object is left unchanged
+                gridded_samples = GriddedSamples(
+                    num_x=gridded_samples.num_x,
+                    num_y=gridded_samples.num_y,
+                    x_origin=gridded_samples.x_origin,
+                    y_origin=gridded_samples.y_origin,
+                    cell_size=gridded_samples.cell_size,
+                    x_coordinates=np.ascontiguousarray(gridded_samples.x_coordinates),
+                    y_coordinates=np.ascontiguousarray(gridded_samples.y_coordinates),
+                    values=np.ascontiguousarray(gridded_samples.values),
+                )
+                c_gridded_samples = CGriddedSamples.from_griddedSamples(gridded_samples)
+                load = time.perf_counter() - load_start
+
+                self._put(prefetched, (gridded_samples, c_gridded_samples, load), stop)
+        except BaseException as exception:
+            self._put(prefetched, exception, stop)
+            return
+
+        self._put(prefetched, _END_OF_TILES, stop)
+
+    @staticmethod
+    def _put(prefetched: queue.Queue, item, stop: threading.Event):
+        """Puts an item in the queue, giving up when the consumer stopped."""
+        while not stop.is_set():
+            try:
+                prefetched.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
@@ -0,0 +1,404 @@
+from __future__ import annotations
+
+from functools import cached_property
+from typing import List, Union
+
+import numpy as np
+from numpy import ndarray
+
+from meshkernel.py_structures import GeometryList, Mesh2d, Mesh2dLocation
+from meshkernel.rtree import PackedRTree
+from meshkernel.utils import get_ring_ranges
+
+# The maximum number of point-edge pairs evaluated at once by the crossing number kernel
+_MAX_PAIRS = 1 << 22
+
+
+class PolygonRings:
+    """The rings of the polygons of a GeometryList, with their bounding boxes, prepared once for many queries.
+
+    A polygon is a geometry delimited by `geometry_separator`. Its first ring is the outer ring,
+    the following ones, delimited by `inner_outer_separator`, are its holes.
+    Use `PolygonRings.of` to reuse the rings, and their R-tree, cached with the GeometryList.
+
+    Args:
+        polygons (GeometryList): The polygons.
+
+    Attributes:
+        starts (ndarray): The start index of each ring in the coordinates.
+        ends (ndarray): The end index (exclusive) of each ring in the coordinates.
+        polygon_index (ndarray): The polygon of each ring.
+        num_polygons (int): The number of polygons.
+        x_min (ndarray): The minimum x-coordinate of each ring.
+        x_max (ndarray): The maximum x-coordinate of each ring.
+        y_min (ndarray): The minimum y-coordinate of each ring.
+        y_max (ndarray): The maximum y-coordinate of each ring.
+    """
+
+    def __init__(self, polygons: GeometryList):
+        self.x_coordinates = polygons.x_coordinates
+        self.y_coordinates = polygons.y_coordinates
+        self.starts, self.ends, self.polygon_index, _ = get_ring_ranges(
+            polygons.x_coordinates,
+            polygons.geometry_separator,
+            polygons.inner_outer_separator,
+        )
+        self.num_polygons = (
+            int(self.polygon_index[-1]) + 1 if self.polygon_index.size else 0
+        )
+
+        # The separators are ignored by `fmin` and `fmax` once replaced by NaN,
+        # so each reduction segment, a ring and the separators following it, gives the ring bounds
+        is_separator = (polygons.x_coordinates == polygons.geometry_separator) | (
+            polygons.x_coordinates == polygons.inner_outer_separator
+        )
+        x = np.where(is_separator, np.nan, polygons.x_coordinates)
+        y = np.where(is_separator, np.nan, polygons.y_coordinates)
+        if self.starts.size:
+            self.x_min = np.fmin.reduceat(x, self.starts)
+            self.x_max = np.fmax.reduceat(x, self.starts)
+            self.y_min = np.fmin.reduceat(y, self.starts)
+            self.y_max = np.fmax.reduceat(y, self.starts)
+        else:
+            self.x_min = self.x_max = self.y_min = self.y_max = np.empty(0)
+
+    @staticmethod
+    def of(polygons: GeometryList) -> PolygonRings:
+        """Gets the rings of a GeometryList, cached with it until one of its attributes is reassigned.
+
+        Args:
+            polygons (GeometryList): The polygons.
+
+        Returns:
+            PolygonRings: The rings.
+        """
+        return polygons._derived("polygon_rings", PolygonRings)
+
+    @cached_property
+    def rtree(self) -> PackedRTree:
+        """The R-tree of the ring bounding boxes, built on first use."""
+        return PackedRTree(self.x_min, self.y_min, self.x_max, self.y_max)
+
+    def rings_containing_points(self, x: ndarray, y: ndarray):
+        """Finds the rings whose bounding box contains each point, the candidates for containing the point.
+
+        Args:
+            x (ndarray): The x-coordinates of the points.
+            y (ndarray): The y-coordinates of the points.
+
+        Returns:
+            tuple: The point indices and the ring indices of the candidate pairs, sorted by point.
+        """
+        return self.rtree.query_points(x, y)
+
+    def rings_intersecting_boxes(
+        self, x_min: ndarray, y_min: ndarray, x_max: ndarray, y_max: ndarray
+    ):
+        """Finds the rings whose bounding box intersects each box, the candidates for intersecting the box.
+
+        Args:
+            x_min (ndarray): The minimum x-coordinate of each box.
+            y_min (ndarray): The minimum y-coordinate of each box.
+            x_max (ndarray): The maximum x-coordinate of each box.
+            y_max (ndarray): The maximum y-coordinate of each box.
+
+        Returns:
+            tuple: The box indices and the ring indices of the candidate pairs, sorted by box.
+        """
+        return self.rtree.query_boxes(x_min, y_min, x_max, y_max)
+
+
+def polygon_index_of_points(
+    polygons: Union[GeometryList, PolygonRings],
+    x: ndarray,
+    y: ndarray,
+    chunk_size: int = 1 << 16,
+) -> ndarray:
+    """Finds the polygon containing each point, with the even-odd rule, so the holes are excluded.
+
+    The points are processed in chunks. The R-tree of the rings gives the rings whose bounding box
+    contains each point, then the crossing number of the candidate points of each ring is computed
+    against all the edges of the ring at once. Points on a ring boundary may be counted as inside or outside.
+
+    Args:
+        polygons (Union[GeometryList, PolygonRings]): The polygons, or their prepared rings.
+        x (ndarray): The x-coordinates of the points.
+        y (ndarray): The y-coordinates of the points.
+        chunk_size (int, optional): The number of points processed at once. Default is `65536`.
+
+    Returns:
+        ndarray: The index of the first polygon containing each point, -1 for the points outside all polygons.
+    """
+    rings = (
+        polygons if isinstance(polygons, PolygonRings) else PolygonRings.of(polygons)
+    )
+    x = np.asarray(x, dtype=np.double).reshape(-1)
+    y = np.asarray(y, dtype=np.double).reshape(-1)
+    if x.size != y.size:
+        raise ValueError("x and y must have the same size")
+
+    result = np.full(x.size, -1, dtype=np.int64)
+    for start in range(0, x.size, chunk_size):
+        chunk_x = x[start : start + chunk_size]
+        chunk_y = y[start : start + chunk_size]
+        point_index, ring_index = rings.rings_containing_points(chunk_x, chunk_y)
+        if point_index.size == 0:
+            continue
+
+        # Group the candidate pairs by ring
+        by_ring = np.argsort(ring_index, kind="stable")
+        point_index, ring_index = point_index[by_ring], ring_index[by_ring]
+        group_starts = np.flatnonzero(np.diff(ring_index, prepend=-1))
+        group_ends = np.append(group_starts[1:], ring_index.size)
+
+        odd = np.empty(point_index.size, dtype=bool)
+        for group_start, group_end in zip(group_starts, group_ends):
+            ring = ring_index[group_start]
+            points = point_index[group_start:group_end]
+            odd[group_start:group_end] = _odd_crossings(
+                rings.x_coordinates[rings.starts[ring] : rings.ends[ring]],
+                rings.y_coordinates[rings.starts[ring] : rings.ends[ring]],
+                chunk_x[points],
+                chunk_y[points],
+            )
+
+        # A point is inside a polygon when it is inside an odd number of its rings
+        keys = (
+            point_index[odd] * rings.num_polygons + rings.polygon_index[ring_index[odd]]
+        )
+        keys, counts = np.unique(keys, return_counts=True)
+        keys = keys[counts % 2 == 1]
+
+        # The keys are sorted, so the first key of a point holds its first polygon
+        inside_points, first = np.unique(keys // rings.num_polygons, return_index=True)
+        result[start + inside_points] = keys[first] % rings.num_polygons
+
+    return result
+
+
+def points_in_polygons(
+    polygons: Union[GeometryList, PolygonRings],
+    x: ndarray,
+    y: ndarray,
+    chunk_size: int = 1 << 16,
+) -> ndarray:
+    """Gets which points are inside the polygons, excluding their holes.
+
+    Args:
+        polygons (Union[GeometryList, PolygonRings]): The polygons, or their prepared rings.
+        x (ndarray): The x-coordinates of the points.
+        y (ndarray): The y-coordinates of the points.
+        chunk_size (int, optional): The number of points processed at once. Default is `65536`.
+
+    Returns:
+        ndarray: The boolean mask of the points inside a polygon.
+    """
+    return polygon_index_of_points(polygons, x, y, chunk_size) >= 0
+
+
+def mesh2d_locations_in_polygons(
+    mesh2d: Mesh2d,
+    location: Mesh2dLocation,
+    polygons: Union[GeometryList, PolygonRings],
+) -> ndarray:
+    """Gets which nodes, edge centers or face centers of a mesh2d are inside the polygons, excluding their holes.
+    Unlike `MeshKernel.mesh2d_get_nodes_in_polygons`, the mesh2d does not need to be set on a state.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d.
+        location (Mesh2dLocation): The locations to test.
+        polygons (Union[GeometryList, PolygonRings]): The polygons, or their prepared rings.
+
+    Returns:
+        ndarray: The boolean mask of the locations inside a polygon.
+    """
+    if location == Mesh2dLocation.NODES:
+        return points_in_polygons(polygons, mesh2d.node_x, mesh2d.node_y)
+    if location == Mesh2dLocation.EDGES:
+        return points_in_polygons(polygons, mesh2d.edge_x, mesh2d.edge_y)
+    if location == Mesh2dLocation.FACES:
+        return points_in_polygons(polygons, mesh2d.face_x, mesh2d.face_y)
+    raise ValueError("wrong location")
+
+
+def _odd_crossings(ring_x: ndarray, ring_y: ndarray, x: ndarray, y: ndarray) -> ndarray:
+    """Computes whether a horizontal ray from each point crosses the edges of a ring an odd number of times.
+
+    Args:
+        ring_x (ndarray): The x-coordinates of the ring, closed or not.
+        ring_y (ndarray): The y-coordinates of the ring, closed or not.
+        x (ndarray): The x-coordinates of the points.
+        y (ndarray): The y-coordinates of the points.
+
+    Returns:
+        ndarray: The boolean parity of the crossings of each point.
+    """
+    start_x, start_y = ring_x, ring_y
+    end_x, end_y = np.roll(ring_x, -1), np.roll(ring_y, -1)
+
+    # Only the edges straddling the ray of a point can cross it
+    delta_y = np.where(end_y != start_y, end_y - start_y, 1.0)
+    slope = (end_x - start_x) / delta_y
+
+    odd = np.zeros(x.size, dtype=bool)
+    block = max(1, _MAX_PAIRS // max(1, ring_x.size))
+    for first in range(0, x.size, block):
+        point_x = x[first : first + block, np.newaxis]
+        point_y = y[first : first + block, np.newaxis]
+        straddles = (start_y > point_y) != (end_y > point_y)
+        crossing_x = start_x + (point_y - start_y) * slope
+        crossings = np.count_nonzero(straddles & (point_x < crossing_x), axis=1)
+        odd[first : first + block] = crossings % 2 == 1
+    return odd
+
+
+def polygon_ranges(polygons: Union[GeometryList, PolygonRings]):
+    """Gets the coordinate range of each polygon, from the start of its outer ring to the end of its last hole.
+
+    Args:
+        polygons (Union[GeometryList, PolygonRings]): The polygons, or their prepared rings.
+
+    Returns:
+        tuple: The start index and the end index (exclusive) of each polygon in the coordinates.
+    """
+    rings = (
+        polygons if isinstance(polygons, PolygonRings) else PolygonRings.of(polygons)
+    )
+    first_ring = np.flatnonzero(np.diff(rings.polygon_index, prepend=-1))
+    last_ring = np.append(first_ring[1:], rings.polygon_index.size) - 1
+    return rings.starts[first_ring], rings.ends[last_ring]
+
+
+def select_polygons(polygons: GeometryList, indices: ndarray) -> GeometryList:
+    """Gets some polygons of a GeometryList, with their holes.
+
+    Args:
+        polygons (GeometryList): The polygons.
+        indices (ndarray): The indices of the selected polygons.
+
+    Returns:
+        GeometryList: The selected polygons, in the order of `indices`.
+    """
+    starts, ends = polygon_ranges(polygons)
+    indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+    return _join_ranges(polygons, starts[indices], ends[indices])
+
+
+def concatenate_polygons(polygon_list: List[GeometryList]) -> GeometryList:
+    """Joins GeometryLists into a single multi-polygon GeometryList.
+
+    The separators of the first GeometryList are used, the separators of the others
+    are replaced by them.
+
+    Args:
+        polygon_list (List[GeometryList]): The polygons.
+
+    Returns:
+        GeometryList: The polygons of all the GeometryLists, in order.
+    """
+    if not polygon_list:
+        return GeometryList()
+
+    first = polygon_list[0]
+    parts = []
+    for polygons in polygon_list:
+        if polygons.x_coordinates.size == 0:
+            continue
+        x = polygons.x_coordinates.copy()
+        y = polygons.y_coordinates.copy()
+        for separator, replacement in (
+            (polygons.geometry_separator, first.geometry_separator),
+            (polygons.inner_outer_separator, first.inner_outer_separator),
+        ):
+            is_separator = polygons.x_coordinates == separator
+            x[is_separator] = replacement
+            y[is_separator] = replacement
+        parts.append((x, y, polygons.values))
+
+    def join(arrays):
+        separator = np.array([first.geometry_separator])
+        return np.concatenate(
+            [array for part in arrays for array in (separator, part)][1:]
+        )
+
+    has_values = bool(parts) and all(part[2].size for part in parts)
+    return GeometryList(
+        join([part[0] for part in parts]) if parts else np.empty(0),
+        join([part[1] for part in parts]) if parts else np.empty(0),
+        join([part[2] for part in parts]) if has_values else np.empty(0),
+        first.geometry_separator,
+        first.inner_outer_separator,
+    )
+
+
+def group_disjoint_polygons(polygons: Union[GeometryList, PolygonRings]) -> ndarray:
+    """Groups polygons so the bounding boxes of the polygons of a group do not intersect.
+
+    The R-tree of the rings gives the pairs of polygons whose bounding boxes intersect,
+    then each polygon, in order, gets the first group holding none of the preceding polygons it intersects.
+
+    Args:
+        polygons (Union[GeometryList, PolygonRings]): The polygons, or their prepared rings.
+
+    Returns:
+        ndarray: The group of each polygon, numbered from 0.
+    """
+    rings = (
+        polygons if isinstance(polygons, PolygonRings) else PolygonRings.of(polygons)
+    )
+    groups = np.zeros(rings.num_polygons, dtype=np.int64)
+    if rings.num_polygons == 0:
+        return groups
+
+    # The bounding box of a polygon is the bounding box of its outer ring
+    outer = np.flatnonzero(np.diff(rings.polygon_index, prepend=-1))
+    ring_index, other_ring = rings.rings_intersecting_boxes(
+        rings.x_min[outer], rings.y_min[outer], rings.x_max[outer], rings.y_max[outer]
+    )
+    polygon, other = ring_index, rings.polygon_index[other_ring]
+    earlier = other < polygon
+    polygon, other = polygon[earlier], other[earlier]
+    neighbour_starts = np.searchsorted(polygon, np.arange(rings.num_polygons + 1))
+
+    for index in range(rings.num_polygons):
+        used = groups[other[neighbour_starts[index] : neighbour_starts[index + 1]]]
+        free = np.flatnonzero(np.bincount(used, minlength=used.size + 1) == 0)
+        groups[index] = free[0]
+    return groups
+
+
+def _join_ranges(
+    polygons: GeometryList, starts: ndarray, ends: ndarray
+) -> GeometryList:
+    """Joins coordinate ranges of a GeometryList with geometry separators."""
+    if starts.size == 0:
+        return GeometryList(
+            geometry_separator=polygons.geometry_separator,
+            inner_outer_separator=polygons.inner_outer_separator,
+        )
+
+    # Each range is followed by a separator, except the last one
+    lengths = ends - starts
+    offsets = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+    total = int(np.sum(lengths + 1)) - 1
+    source = np.full(total, -1, dtype=np.int64)
+    owner = np.repeat(np.arange(starts.size), lengths)
+    position = np.arange(owner.size) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    source[offsets[owner] + position] = starts[owner] + position
+
+    is_separator = source < 0
+    source = np.where(is_separator, 0, source)
+    x = np.where(
+        is_separator, polygons.geometry_separator, polygons.x_coordinates[source]
+    )
+    y = np.where(
+        is_separator, polygons.geometry_separator, polygons.y_coordinates[source]
+    )
+    values = (
+        np.where(is_separator, polygons.geometry_separator, polygons.values[source])
+        if polygons.values.size
+        else polygons.values
+    )
+    return GeometryList(
+        x, y, values, polygons.geometry_separator, polygons.inner_outer_separator
+    )
@@ -1,13 +1,186 @@
 from __future__ import annotations
 
+import os
+import pickle
 from enum import IntEnum, unique
+from typing import Callable, List, Optional, Tuple, Union
 
 import numpy as np
 from matplotlib.collections import PolyCollection
 from numpy import ndarray
 
 import meshkernel.errors as mk_errors
-from meshkernel.utils import plot_edges
+from meshkernel.marshalling import as_array
+from meshkernel.shared_memory import SharedMemoryHandle
+from meshkernel.utils import compact_array, hash_values, plot_edges
+
+# The arrays of a mesh2d and the prefix of their files in a memory-mapped snapshot
+MESH2D_ARRAY_NAMES = (
+    "node_x",
+    "node_y",
+    "edge_nodes",
+    "face_nodes",
+    "nodes_per_face",
+    "edge_x",
+    "edge_y",
+    "face_x",
+    "face_y",
+    "edge_faces",
+    "face_edges",
+)
+MESH2D_FILE_PREFIX = "mesh2d_"
+CURVILINEAR_GRID_FILE_PREFIX = "curvilinear_grid_"
+
+
+def _valid_indices(x: ndarray, y: ndarray, float_invalid_value: float) -> ndarray:
+    """Gets the indices of the points with valid coordinates, reading the arrays chunk by chunk.
+
+    Args:
+        x (ndarray): The x-coordinates.
+        y (ndarray): The y-coordinates.
+        float_invalid_value (float): The float invalid value.
+
+    Returns:
+        ndarray: The int64 indices of the valid points.
+    """
+    chunk_size = 1 << 22
+    return np.concatenate(
+        [np.empty(0, dtype=np.int64)]
+        + [
+            np.flatnonzero(
+                (x[start : start + chunk_size] != float_invalid_value)
+                & (y[start : start + chunk_size] != float_invalid_value)
+            )
+            + start
+            for start in range(0, min(x.size, y.size), chunk_size)
+        ]
+    )
+
+
+def _indices_to_map(indices: ndarray) -> dict:
+    """Builds the map from old indices to their position in `indices`."""
+    return {
+        old_index: new_index for new_index, old_index in enumerate(indices.tolist())
+    }
+
+
+def _rebuild_from_buffers(cls, arrays: dict, attributes: dict):
+    """Rebuilds an object pickled by `_OutOfBandPickle.__reduce_ex__`.
+
+    Args:
+        cls (type): The class of the object.
+        arrays (dict): For each array attribute, the buffer holding its data, its dtype and its shape.
+        attributes (dict): The other attributes.
+
+    Returns:
+        The rebuilt object.
+    """
+    obj = cls.__new__(cls)
+    for name, (buffer, dtype, shape) in arrays.items():
+        array = np.frombuffer(buffer, dtype=dtype).reshape(shape)
+        # Read-only buffers are copied, because the arrays are handed to the MeshKernel C API
+        attributes[name] = array if array.flags.writeable else array.copy()
+    obj.__setstate__(attributes)
+    return obj
+
+
+class _ContentHashed:
+    """Content hashing for classes holding NumPy arrays and scalar parameters.
+
+    `content_hash` and the values registered with `_derived`, such as spatial indices,
+    are cached until a public attribute is reassigned.
+    Modifying an array in place does not invalidate the cached values.
+    """
+
+    _transient_attributes = ()
+
+    def content_hash(self) -> str:
+        """Computes a stable hash of the content, over the raw buffers of the arrays.
+
+        Returns:
+            str: The hexadecimal hash.
+        """
+        content_hash = self.__dict__.get("_content_hash")
+        if content_hash is None:
+            content_hash = hash_values(
+                type(self).__qualname__,
+                {
+                    name: value
+                    for name, value in vars(self).items()
+                    if not name.startswith("_")
+                    and name not in self._transient_attributes
+                },
+            )
+            self.__dict__["_content_hash"] = content_hash
+        return content_hash
+
+    def _derived(self, key: str, factory: Callable):
+        """Gets a value derived from the content, computed once by `factory`.
+
+        The derived values are not pickled.
+
+        Args:
+            key (str): The name of the derived value.
+            factory (Callable): Computes the value from the object.
+
+        Returns:
+            The derived value.
+        """
+        derived = self.__dict__.setdefault("_derived_values", {})
+        if key not in derived:
+            derived[key] = factory(self)
+        return derived[key]
+
+    def __setattr__(self, name, value):
+        if not name.startswith("_") and name not in self._transient_attributes:
+            self.__dict__.pop("_content_hash", None)
+            self.__dict__.pop("_derived_values", None)
+        super().__setattr__(name, value)
+
+
+class _OutOfBandPickle(_ContentHashed):
+    """Pickling support for classes holding NumPy arrays.
+
+    With pickle protocol 5, the array attributes are exported as `pickle.PickleBuffer` objects,
+    so they are transferred out-of-band without copies when the pickler has a `buffer_callback`.
+    The attributes listed in `_transient_attributes` are caches, they are excluded from the payload
+    and reset by `_reset_transient_attributes` when unpickling.
+    """
+
+    _transient_attributes = ()
+
+    def _reset_transient_attributes(self):
+        """Resets the transient attributes to their initial value."""
+
+    def __getstate__(self):
+        return {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in self._transient_attributes and name != "_derived_values"
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_transient_attributes()
+
+    def __reduce_ex__(self, protocol):
+        if protocol < 5:
+            return super().__reduce_ex__(protocol)
+
+        arrays = {}
+        attributes = {}
+        for name, value in self.__getstate__().items():
+            if isinstance(value, ndarray) and not value.dtype.hasobject:
+                value = np.ascontiguousarray(value)
+                arrays[name] = (
+                    pickle.PickleBuffer(value),
+                    value.dtype.str,
+                    value.shape,
+                )
+            else:
+                attributes[name] = value
+
+        return _rebuild_from_buffers, (type(self), arrays, attributes)
 
 
 @unique
@@ -100,7 +273,7 @@ class InterpolationValues(IntEnum):
     DOUBLE = 3
 
 
-class Mesh2d:
+class Mesh2d(_OutOfBandPickle):
     """This class is used for getting and setting two-dimensional mesh data.
 
     Attributes:
@@ -139,108 +312,229 @@ class Mesh2d:
         edge_faces=np.empty(0, dtype=np.int32),
         face_edges=np.empty(0, dtype=np.int32),
     ):
-        self.node_x: ndarray = np.asarray(node_x, dtype=np.double)
-        self.node_y: ndarray = np.asarray(node_y, dtype=np.double)
-        self.edge_nodes: ndarray = np.asarray(edge_nodes, dtype=np.int32)
-        self.face_nodes: ndarray = np.asarray(face_nodes, dtype=np.int32)
-        self.nodes_per_face: ndarray = np.asarray(nodes_per_face, dtype=np.int32)
-        self.edge_x: ndarray = np.asarray(edge_x, dtype=np.double)
-        self.edge_y: ndarray = np.asarray(edge_y, dtype=np.double)
-        self.face_x: ndarray = np.asarray(face_x, dtype=np.double)
-        self.face_y: ndarray = np.asarray(face_y, dtype=np.double)
-        self.edge_faces: ndarray = np.asarray(edge_faces, dtype=np.int32)
-        self.face_edges: ndarray = np.asarray(face_edges, dtype=np.int32)
-
-        self.valid_nodes_map = {}
-        self.valid_faces_map = {}
-        self.valid_edges_map = {}
+        self.node_x: ndarray = as_array(node_x, np.double, "Mesh2d.node_x", subok=True)
+        self.node_y: ndarray = as_array(node_y, np.double, "Mesh2d.node_y", subok=True)
+        self.edge_nodes: ndarray = as_array(
+            edge_nodes, np.int32, "Mesh2d.edge_nodes", subok=True
+        )
+        self.face_nodes: ndarray = as_array(
+            face_nodes, np.int32, "Mesh2d.face_nodes", subok=True
+        )
+        self.nodes_per_face: ndarray = as_array(
+            nodes_per_face, np.int32, "Mesh2d.nodes_per_face", subok=True
+        )
+        self.edge_x: ndarray = as_array(edge_x, np.double, "Mesh2d.edge_x", subok=True)
+        self.edge_y: ndarray = as_array(edge_y, np.double, "Mesh2d.edge_y", subok=True)
+        self.face_x: ndarray = as_array(face_x, np.double, "Mesh2d.face_x", subok=True)
+        self.face_y: ndarray = as_array(face_y, np.double, "Mesh2d.face_y", subok=True)
+        self.edge_faces: ndarray = as_array(
+            edge_faces, np.int32, "Mesh2d.edge_faces", subok=True
+        )
+        self.face_edges: ndarray = as_array(
+            face_edges, np.int32, "Mesh2d.face_edges", subok=True
+        )
+
+        self._reset_transient_attributes()
+
+    _transient_attributes = (
+        "valid_node_indices",
+        "valid_face_indices",
+        "valid_edge_indices",
+        "_valid_nodes_map",
+        "_valid_faces_map",
+        "_valid_edges_map",
+    )
+
+    def _reset_transient_attributes(self):
+        self.valid_node_indices: ndarray = np.empty(0, dtype=np.int64)
+        self.valid_face_indices: ndarray = np.empty(0, dtype=np.int64)
+        self.valid_edge_indices: ndarray = np.empty(0, dtype=np.int64)
+        self._reset_valid_maps()
+
+    def _reset_valid_maps(self):
+        self._valid_nodes_map: Optional[dict] = None
+        self._valid_faces_map: Optional[dict] = None
+        self._valid_edges_map: Optional[dict] = None
+
+    @property
+    def valid_nodes_map(self) -> dict:
+        """The map from the node indices before `remove_invalid_values` to the node indices after it.
+        It is built on first access and kept until the next `remove_invalid_values`."""
+        if self._valid_nodes_map is None:
+            self._valid_nodes_map = _indices_to_map(self.valid_node_indices)
+        return self._valid_nodes_map
+
+    @valid_nodes_map.setter
+    def valid_nodes_map(self, valid_nodes_map: dict):
+        self._valid_nodes_map = valid_nodes_map
+
+    @property
+    def valid_faces_map(self) -> dict:
+        """The map from the face indices before `remove_invalid_values` to the face indices after it.
+        It is built on first access and kept until the next `remove_invalid_values`."""
+        if self._valid_faces_map is None:
+            self._valid_faces_map = _indices_to_map(self.valid_face_indices)
+        return self._valid_faces_map
+
+    @valid_faces_map.setter
+    def valid_faces_map(self, valid_faces_map: dict):
+        self._valid_faces_map = valid_faces_map
+
+    @property
+    def valid_edges_map(self) -> dict:
+        """The map from the edge indices before `remove_invalid_values` to the edge indices after it.
+        It is built on first access and kept until the next `remove_invalid_values`."""
+        if self._valid_edges_map is None:
+            self._valid_edges_map = _indices_to_map(self.valid_edge_indices)
+        return self._valid_edges_map
+
+    @valid_edges_map.setter
+    def valid_edges_map(self, valid_edges_map: dict):
+        self._valid_edges_map = valid_edges_map
 
     def remove_invalid_values(self, float_invalid_value: float):
         """Removes invalid values that might be present in the arrays.
-        Remove the corresponding entries in the others
+        Remove the corresponding entries in the others.
+        Arrays memory-mapped to writable `.npy` files are compacted out-of-core, in place.
 
         Args:
              float_invalid_value: (float): The float invalid value.
         """
 
-        valid_node_indices = [
-            i
-            for i, (x, y) in enumerate(zip(self.node_x, self.node_y))
-            if x != float_invalid_value and y != float_invalid_value
-        ]
-        self.valid_nodes_map = {
-            old_index: new_index
-            for new_index, old_index in enumerate(valid_node_indices)
-        }
+        self.valid_node_indices = _valid_indices(
+            self.node_x, self.node_y, float_invalid_value
+        )
+        self.valid_face_indices = _valid_indices(
+            self.face_x, self.face_y, float_invalid_value
+        )
+        self.valid_edge_indices = _valid_indices(
+            self.edge_x, self.edge_y, float_invalid_value
+        )
+        self._reset_valid_maps()
 
-        self.node_x = np.array(
-            [self.node_x[i] for i in valid_node_indices], dtype=np.double
+        # Maps the old node indices to the new ones, -1 for the removed nodes
+        new_node_index = np.full(self.node_x.size, -1, dtype=np.int32)
+        new_node_index[self.valid_node_indices] = np.arange(
+            self.valid_node_indices.size, dtype=np.int32
         )
-        self.node_y = np.array(
-            [self.node_y[i] for i in valid_node_indices], dtype=np.double
+
+        def map_nodes(chunk, _):
+            is_node = (chunk >= 0) & (chunk < new_node_index.size)
+            mapped = new_node_index[chunk[is_node]]
+            return mapped[mapped >= 0]
+
+        def keep_positions(indices):
+            def select(chunk, start):
+                first, last = np.searchsorted(indices, [start, start + chunk.size])
+                return chunk[indices[first:last] - start]
+
+            return select
+
+        self.node_x = compact_array(
+            self.node_x, keep_positions(self.valid_node_indices)
         )
-        self.edge_nodes = np.array(
-            [
-                self.valid_nodes_map[edge_node]
-                for edge_node in self.edge_nodes
-                if edge_node in self.valid_nodes_map
-            ],
-            dtype=np.int32,
+        self.node_y = compact_array(
+            self.node_y, keep_positions(self.valid_node_indices)
         )
-        self.face_nodes = np.array(
-            [
-                self.valid_nodes_map[face_node]
-                for face_node in self.face_nodes
-                if face_node in self.valid_nodes_map
-            ],
-            dtype=np.int32,
+        self.edge_nodes = compact_array(self.edge_nodes, map_nodes)
+        self.face_nodes = compact_array(self.face_nodes, map_nodes)
+
+        self.face_x = compact_array(
+            self.face_x, keep_positions(self.valid_face_indices)
+        )
+        self.face_y = compact_array(
+            self.face_y, keep_positions(self.valid_face_indices)
         )
 
-        valid_face_indices = [
-            i
-            for i, (x, y) in enumerate(zip(self.face_x, self.face_y))
-            if x != float_invalid_value and y != float_invalid_value
-        ]
-        self.valid_faces_map = {
-            old_index: new_index
-            for new_index, old_index in enumerate(valid_face_indices)
-        }
-        self.face_x = np.array(
-            [self.face_x[i] for i in self.valid_faces_map], dtype=np.double
+        self.edge_x = compact_array(
+            self.edge_x, keep_positions(self.valid_edge_indices)
         )
-        self.face_y = np.array(
-            [self.face_y[i] for i in self.valid_faces_map], dtype=np.double
+        self.edge_y = compact_array(
+            self.edge_y, keep_positions(self.valid_edge_indices)
         )
 
-        valid_edge_indices = [
-            i
-            for i, (x, y) in enumerate(zip(self.edge_x, self.edge_y))
-            if x != float_invalid_value and y != float_invalid_value
-        ]
-        self.valid_edges_map = {
-            old_index: new_index
-            for new_index, old_index in enumerate(valid_edge_indices)
-        }
-        self.edge_x = np.array(
-            [self.edge_x[i] for i in self.valid_edges_map], dtype=np.double
+        self.edge_faces = compact_array(
+            self.edge_faces, keep_positions(self.valid_edge_indices)
         )
-        self.edge_y = np.array(
-            [self.edge_y[i] for i in self.valid_edges_map], dtype=np.double
+        self.face_edges = compact_array(
+            self.face_edges, keep_positions(self.valid_face_indices)
         )
 
-        self.edge_faces = np.array(
-            [self.edge_faces[i] for i in valid_edge_indices], dtype=np.int32
+    def to_shared_memory(self, name: Optional[str] = None) -> SharedMemoryHandle:
+        """Copies the mesh2d arrays into a single named shared memory segment.
+
+        The returned handle can be pickled and sent to other processes, which get
+        the mesh2d with `Mesh2d.from_shared_memory`. Each attached handle holds a reference
+        to the segment, which is unlinked when the last one is closed, including this one.
+
+        Args:
+            name (str, optional): The name of the segment. Default is a random unique name.
+
+        Returns:
+            SharedMemoryHandle: The handle of the segment, attached to it.
+        """
+        return SharedMemoryHandle.create(
+            {
+                array_name: getattr(self, array_name)
+                for array_name in MESH2D_ARRAY_NAMES
+            },
+            name=name,
         )
-        self.face_edges = np.array(
-            [self.face_edges[i] for i in valid_face_indices], dtype=np.int32
+
+    @staticmethod
+    def from_shared_memory(handle: SharedMemoryHandle) -> Mesh2d:
+        """Gets a mesh2d whose arrays are views of a shared memory segment created by `to_shared_memory`.
+        The arrays are not copied and can be passed directly to the MeshKernel C API.
+        The handle is attached if needed and must be closed when the mesh2d is no longer used.
+
+        Args:
+            handle (SharedMemoryHandle): The handle of the segment.
+
+        Returns:
+            Mesh2d: The mesh2d sharing the memory of the segment.
+        """
+        arrays = handle.attach()
+        return Mesh2d(**{name: arrays[name] for name in MESH2D_ARRAY_NAMES})
+
+    @staticmethod
+    def from_directory(directory: str, mmap_mode: str = "r") -> Mesh2d:
+        """Opens a mesh2d snapshot written by `MeshKernel.mesh2d_get` with a `memmap_directory`.
+        The arrays are memory-mapped, so they are only read from disk when accessed.
+
+        Args:
+            directory (str): The directory holding the `.npy` files of the snapshot.
+            mmap_mode (str, optional): The mode used to memory-map the files, see `numpy.load`. Default is `"r"`.
+
+        Returns:
+            Mesh2d: The mesh2d backed by the snapshot files.
+        """
+        return Mesh2d(
+            **{
+                name: np.load(
+                    os.path.join(directory, MESH2D_FILE_PREFIX + name + ".npy"),
+                    mmap_mode=mmap_mode,
+                )
+                for name in MESH2D_ARRAY_NAMES
+            }
         )
 
     def __eq__(self, other: Mesh2d):
         """Checks if the mesh is exactly equal to another.
 
+        The cached content hashes are not used, since modifying an array in place does not invalidate them.
+        Only the checks that cannot be wrong are done first: the same object, and arrays of different sizes.
+
         Args:
              other: (Mesh2d): The mesh to compare to.
         """
+        if self is other:
+            return True
+        if any(
+            getattr(self, name).size != getattr(other, name).size
+            for name in MESH2D_ARRAY_NAMES
+        ):
+            return False
+
         return (
             np.array_equal(self.node_x, other.node_x)
             and np.array_equal(self.node_y, other.node_y)
@@ -325,7 +619,7 @@ class Mesh2d:
         ax.set_ylim(y_min, y_max)
 
 
-class GeometryList:
+class GeometryList(_OutOfBandPickle):
     """A class to describe a list of geometries.
 
     Attributes:
@@ -345,9 +639,13 @@ class GeometryList:
         geometry_separator=-999.0,
         inner_outer_separator=-998.0,
     ):
-        self.x_coordinates: ndarray = np.asarray(x_coordinates, dtype=np.double)
-        self.y_coordinates: ndarray = np.asarray(y_coordinates, dtype=np.double)
-        self.values: ndarray = np.asarray(values, dtype=np.double)
+        self.x_coordinates: ndarray = as_array(
+            x_coordinates, np.double, "GeometryList.x_coordinates"
+        )
+        self.y_coordinates: ndarray = as_array(
+            y_coordinates, np.double, "GeometryList.y_coordinates"
+        )
+        self.values: ndarray = as_array(values, np.double, "GeometryList.values")
         self.geometry_separator: float = float(geometry_separator)
         self.inner_outer_separator: float = float(inner_outer_separator)
 
@@ -361,8 +659,54 @@ class GeometryList:
                 "The length of values is not equal to the length of x_coordinates"
             )
 
+    def simplify(
+        self,
+        tolerance: Union[float, str],
+        preserve_topology: bool = True,
+        mesh2d: Optional[Mesh2d] = None,
+    ) -> GeometryList:
+        """Simplifies the rings with the Douglas-Peucker algorithm, keeping the separators,
+        so land boundaries and selecting polygons have no more vertices than the mesh resolution needs.
+
+        Args:
+            tolerance (Union[float, str]): The maximum distance between a removed vertex and the simplified ring,
+                                           or "auto" for a quarter of the median edge length of `mesh2d`.
+            preserve_topology (bool, optional): Whether the closed rings keep at least three distinct vertices,
+                                                instead of being removed when they collapse. Default is `True`.
+            mesh2d (Mesh2d, optional): The mesh2d the geometries are used with, required for the "auto" tolerance.
+
+        Returns:
+            GeometryList: The simplified geometries.
+        """
+        from meshkernel.geometry import simplify_geometry_list
+
+        return simplify_geometry_list(self, tolerance, preserve_topology, mesh2d)
+
+    def thin(
+        self,
+        cell_size: Union[float, str],
+        reducer: str = "mean",
+        mesh2d: Optional[Mesh2d] = None,
+    ) -> GeometryList:
+        """Thins dense samples by binning them on a grid and keeping one representative sample per occupied cell.
+        Use `meshkernel.geometry.thin_samples` to get the reduction ratio as well.
+
+        Args:
+            cell_size (Union[float, str]): The size of the cells, or "auto" for a quarter of
+                                           the median edge length of `mesh2d`.
+            reducer (str, optional): The reduction of the samples of a cell: "mean", "median", "min", "max"
+                                     or "closest" to the cell center. Default is "mean".
+            mesh2d (Mesh2d, optional): The mesh2d the samples are used with, required for the "auto" cell size.
+
+        Returns:
+            GeometryList: The thinned samples.
+        """
+        from meshkernel.geometry import thin_samples
+
+        return thin_samples(self, cell_size, reducer, mesh2d).samples
+
 
-class OrthogonalizationParameters:
+class OrthogonalizationParameters(_ContentHashed):
     """A class holding the parameters for orthogonalization.
 
     Attributes:
@@ -403,7 +747,7 @@ class OrthogonalizationParameters:
         )
 
 
-class CurvilinearGrid:
+class CurvilinearGrid(_OutOfBandPickle):
     """This class is used for getting and setting curvilinear grid data.
 
     Attributes:
@@ -414,11 +758,37 @@ class CurvilinearGrid:
     """
 
     def __init__(self, node_x, node_y, num_m, num_n):
-        self.node_x: ndarray = np.asarray(node_x, dtype=np.double)
-        self.node_y: ndarray = np.asarray(node_y, dtype=np.double)
+        self.node_x: ndarray = as_array(
+            node_x, np.double, "CurvilinearGrid.node_x", subok=True
+        )
+        self.node_y: ndarray = as_array(
+            node_y, np.double, "CurvilinearGrid.node_y", subok=True
+        )
         self.num_m: int = int(num_m)
         self.num_n: int = int(num_n)
 
+    @staticmethod
+    def from_directory(directory: str, mmap_mode: str = "r") -> CurvilinearGrid:
+        """Opens a curvilinear grid snapshot written by `MeshKernel.curvilineargrid_get` with a `memmap_directory`.
+        The node coordinates are stored with shape (num_n, num_m) and are memory-mapped.
+
+        Args:
+            directory (str): The directory holding the `.npy` files of the snapshot.
+            mmap_mode (str, optional): The mode used to memory-map the files, see `numpy.load`. Default is `"r"`.
+
+        Returns:
+            CurvilinearGrid: The curvilinear grid backed by the snapshot files.
+        """
+        node_x, node_y = (
+            np.load(
+                os.path.join(directory, CURVILINEAR_GRID_FILE_PREFIX + name + ".npy"),
+                mmap_mode=mmap_mode,
+            )
+            for name in ("node_x", "node_y")
+        )
+        num_n, num_m = node_x.shape
+        return CurvilinearGrid(node_x.reshape(-1), node_y.reshape(-1), num_m, num_n)
+
     def plot_edges(self, ax, *args, **kwargs):
         """Plots the edges at a given axes.
         `args` and `kwargs` will be used as parameters of the `plot` method of matplotlib.
@@ -466,7 +836,7 @@ class CurvilinearGrid:
         plot_edges(self.node_x, self.node_y, edge_nodes, ax, *args, **kwargs)
 
 
-class CurvilinearParameters:
+class CurvilinearParameters(_ContentHashed):
     """A class holding the parameters for generating a curvilinear grid from splines.
 
     Attributes:
@@ -492,7 +862,7 @@ class CurvilinearParameters:
         self.attraction_parameter: float = float(attraction_parameter)
 
 
-class SplinesToCurvilinearParameters:
+class SplinesToCurvilinearParameters(_ContentHashed):
     """A class holding the additional parameters required for generating a curvilinear grid from splines
     using the advancing front method.
 
@@ -539,7 +909,7 @@ class SplinesToCurvilinearParameters:
         self.remove_skinny_triangles: bool = bool(remove_skinny_triangles)
 
 
-class MeshRefinementParameters:
+class MeshRefinementParameters(_ContentHashed):
     """A class holding the parameters for Mesh2d refinement.
 
     Attributes:
@@ -584,7 +954,76 @@ class MeshRefinementParameters:
         self.directional_refinement: bool = bool(directional_refinement)
 
 
-class MakeGridParameters:
+class RegionRefinement:
+    """The outcome of the refinement of one region by `MeshKernel.mesh2d_refine_regions`.
+
+    Attributes:
+        region_index (int): The index of the region in the list passed to `mesh2d_refine_regions`.
+        num_faces_before (int): The number of mesh2d faces before refining the region.
+        num_faces_after (int): The number of mesh2d faces after refining the region.
+        elapsed (float): The duration of the refinement, in seconds.
+    """
+
+    def __init__(
+        self,
+        region_index: int,
+        num_faces_before: int,
+        num_faces_after: int,
+        elapsed: float,
+    ):
+        self.region_index = region_index
+        self.num_faces_before = num_faces_before
+        self.num_faces_after = num_faces_after
+        self.elapsed = elapsed
+
+    @property
+    def faces_added(self) -> int:
+        """The number of faces added by the refinement of the region."""
+        return self.num_faces_after - self.num_faces_before
+
+    def __repr__(self):
+        return (
+            "RegionRefinement(region_index={}, faces={} -> {}, elapsed={:.3f}s)".format(
+                self.region_index,
+                self.num_faces_before,
+                self.num_faces_after,
+                self.elapsed,
+            )
+        )
+
+
+class PolygonBatchRefinement:
+    """The outcome of a batched Casulli refinement or derefinement over many polygons.
+
+    Attributes:
+        face_deltas (ndarray): For each polygon, the change of the number of faces whose center is inside it,
+                               over the whole batch.
+        group_index (ndarray): For each polygon, the group it was processed with.
+        elapsed (List[float]): For each group, the duration of the native call, in seconds.
+    """
+
+    def __init__(
+        self, face_deltas: ndarray, group_index: ndarray, elapsed: List[float]
+    ):
+        self.face_deltas = face_deltas
+        self.group_index = group_index
+        self.elapsed = elapsed
+
+    @property
+    def num_groups(self) -> int:
+        """The number of native calls made, one per group."""
+        return len(self.elapsed)
+
+    def __repr__(self):
+        return "PolygonBatchRefinement(polygons={}, groups={}, face_delta={}, elapsed={:.3f}s)".format(
+            self.face_deltas.size,
+            self.num_groups,
+            int(np.sum(self.face_deltas)),
+            sum(self.elapsed),
+        )
+
+
+class MakeGridParameters(_ContentHashed):
     """A class holding the necessary parameters to create a new curvilinear grid in a C-compatible manner.
 
     Attributes:
@@ -628,7 +1067,7 @@ class MakeGridParameters:
         self.upper_right_y: float = float(upper_right_y)
 
 
-class Mesh1d:
+class Mesh1d(_OutOfBandPickle):
     """This class is used for getting and setting one-dimensional mesh data.
 
     Attributes:
@@ -638,9 +1077,28 @@ class Mesh1d:
     """
 
     def __init__(self, node_x, node_y, edge_nodes):
-        self.node_x: ndarray = np.asarray(node_x, dtype=np.double)
-        self.node_y: ndarray = np.asarray(node_y, dtype=np.double)
-        self.edge_nodes: ndarray = np.asarray(edge_nodes, dtype=np.int32)
+        self.node_x: ndarray = as_array(node_x, np.double, "Mesh1d.node_x")
+        self.node_y: ndarray = as_array(node_y, np.double, "Mesh1d.node_y")
+        self.edge_nodes: ndarray = as_array(edge_nodes, np.int32, "Mesh1d.edge_nodes")
+
+    @staticmethod
+    def from_polylines(
+        geometry_list: GeometryList, spacing: float, snap_tolerance: float = 0.0
+    ) -> Mesh1d:
+        """Builds a network by discretizing polylines at a target spacing and joining them at their shared endpoints.
+
+        Args:
+            geometry_list (GeometryList): The polylines, such as the center lines of channels.
+            spacing (float): The maximum edge length.
+            snap_tolerance (float, optional): The distance below which endpoints are merged. Default is `0.0`,
+                                              only merging identical endpoints.
+
+        Returns:
+            Mesh1d: The network.
+        """
+        from meshkernel.geometry import mesh1d_from_polylines
+
+        return mesh1d_from_polylines(geometry_list, spacing, snap_tolerance)
 
     def remove_invalid_values(self, float_invalid_value: float):
         """Removes invalid values that might be present in the arrays.
@@ -686,8 +1144,12 @@ class Contacts:
     """
 
     def __init__(self, mesh1d_indices, mesh2d_indices):
-        self.mesh1d_indices: ndarray = np.asarray(mesh1d_indices, dtype=np.int32)
-        self.mesh2d_indices: ndarray = np.asarray(mesh2d_indices, dtype=np.int32)
+        self.mesh1d_indices: ndarray = as_array(
+            mesh1d_indices, np.int32, "Contacts.mesh1d_indices"
+        )
+        self.mesh2d_indices: ndarray = as_array(
+            mesh2d_indices, np.int32, "Contacts.mesh2d_indices"
+        )
 
     def remove_invalid_values(self, int_invalid_value: int):
         """Removes invalid values that might be present in the arrays.
@@ -721,7 +1183,7 @@ class Contacts:
             ax.plot(node_x, node_y, *args, **kwargs)
 
 
-class GriddedSamples:
+class GriddedSamples(_OutOfBandPickle):
     """A class holding gridded samples, both for uniform gridding and non-uniform gridding.
 
     Attributes:
@@ -753,27 +1215,153 @@ class GriddedSamples:
         self.x_origin: float = float(x_origin)
         self.y_origin: float = float(y_origin)
         self.cell_size: float = float(cell_size)
-        self.x_coordinates: ndarray = np.asarray(x_coordinates, dtype=np.double)
-        self.y_coordinates: ndarray = np.asarray(y_coordinates, dtype=np.double)
+        self.x_coordinates: ndarray = as_array(
+            x_coordinates, np.double, "GriddedSamples.x_coordinates"
+        )
+        self.y_coordinates: ndarray = as_array(
+            y_coordinates, np.double, "GriddedSamples.y_coordinates"
+        )
 
         if not isinstance(values, np.ndarray):
             raise RuntimeError("the gridded sample values must be a numpy array")
 
         if values.dtype == np.int16:
             self.value_type: int = InterpolationValues.SHORT
-            self.values: ndarray = np.asarray(values, dtype=np.int16)
+            self.values: ndarray = as_array(values, np.int16, "GriddedSamples.values")
         elif values.dtype == np.float32:
             self.value_type: int = InterpolationValues.FLOAT
-            self.values: ndarray = np.asarray(values, dtype=np.float32)
+            self.values: ndarray = as_array(values, np.float32, "GriddedSamples.values")
         elif values.dtype == np.int32:
             self.value_type: int = InterpolationValues.INT
-            self.values: ndarray = np.asarray(values, dtype=np.int32)
+            self.values: ndarray = as_array(values, np.int32, "GriddedSamples.values")
         elif values.dtype == np.float64:
             self.value_type: int = InterpolationValues.DOUBLE
-            self.values: ndarray = np.asarray(values, dtype=np.float64)
+            self.values: ndarray = as_array(values, np.float64, "GriddedSamples.values")
         else:
             self.value_type: int = InterpolationValues.FLOAT
-            self.values: ndarray = np.asarray(values, dtype=np.float32)
+            self.values: ndarray = as_array(values, np.float32, "GriddedSamples.values")
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """The number of samples along y and along x. The values are ordered row by row, from the lowest y."""
+        num_y = self.y_coordinates.size if self.y_coordinates.size else self.num_y
+        num_x = self.x_coordinates.size if self.x_coordinates.size else self.num_x
+        return num_y, num_x
+
+    @property
+    def spacing(self) -> float:
+        """The largest distance between two neighbouring samples along x or y.
+        The cell size when there is a single sample."""
+        if self.x_coordinates.size <= 1 and self.y_coordinates.size <= 1:
+            return self.cell_size
+        return float(
+            max(
+                np.max(np.diff(self.x_coordinates), initial=0.0),
+                np.max(np.diff(self.y_coordinates), initial=0.0),
+            )
+        )
+
+    def build_pyramid(
+        self,
+        levels: int,
+        reducer: str = "mean",
+        invalid_value: Optional[float] = -999.0,
+    ) -> List[GriddedSamples]:
+        """Builds a multiresolution pyramid of the gridded samples.
+
+        Each level reduces the blocks of 2x2 samples of the previous level to a single sample,
+        located at the center of the block, so the spacing doubles. An odd last row or column
+        is reduced on its own and located at the center of its own samples, which makes the level
+        non-uniform. The values keep their type, the means of integer values are rounded.
+        The invalid values are left out of the reductions, a block without valid values is invalid.
+
+        Args:
+            levels (int): The number of levels, including the gridded samples themselves as the first level.
+                          The pyramid stops earlier when a level has a single sample.
+            reducer (str, optional): How the values of a block are reduced: "mean", "min" or "max".
+                                     Default is "mean".
+            invalid_value (float, optional): The value of the samples without data, usually the invalid value
+                                             of the MeshKernel library. Default is `-999.0`. Non-finite values
+                                             are invalid as well.
+
+        Returns:
+            List[GriddedSamples]: The levels, from the finest to the coarsest.
+        """
+        if levels < 1:
+            raise mk_errors.InputError("levels must be at least 1")
+        if reducer not in ("mean", "min", "max"):
+            raise mk_errors.InputError("reducer must be 'mean', 'min' or 'max'")
+
+        pyramid = [self]
+        while len(pyramid) < levels and max(pyramid[-1].shape) > 1:
+            pyramid.append(pyramid[-1]._reduce_blocks(reducer, invalid_value))
+        return pyramid
+
+    def _reduce_blocks(
+        self, reducer: str, invalid_value: Optional[float]
+    ) -> GriddedSamples:
+        """Reduces the blocks of 2x2 samples to single samples, leaving out the invalid values."""
+        num_y, num_x = self.shape
+        values = self.values.reshape(num_y, num_x)
+        row_starts = np.arange(0, num_y, 2)
+        column_starts = np.arange(0, num_x, 2)
+
+        valid = np.isfinite(values)
+        if invalid_value is not None:
+            valid &= values != invalid_value
+        counts = np.add.reduceat(valid, row_starts, axis=0, dtype=np.int64)
+        counts = np.add.reduceat(counts, column_starts, axis=1)
+
+        if reducer == "mean":
+            sums = np.add.reduceat(
+                np.where(valid, values, 0), row_starts, axis=0, dtype=np.float64
+            )
+            sums = np.add.reduceat(sums, column_starts, axis=1)
+            reduced = sums / np.maximum(counts, 1)
+            if np.issubdtype(values.dtype, np.integer):
+                reduced = np.rint(reduced)
+        else:
+            ufunc = np.minimum if reducer == "min" else np.maximum
+            filled = np.where(
+                valid,
+                values.astype(np.float64),
+                np.inf if reducer == "min" else -np.inf,
+            )
+            reduced = ufunc.reduceat(filled, row_starts, axis=0)
+            reduced = ufunc.reduceat(reduced, column_starts, axis=1)
+        reduced[counts == 0] = np.nan if invalid_value is None else invalid_value
+
+        reduced = reduced.astype(values.dtype).reshape(-1)
+        if self.x_coordinates.size == 0 and self.y_coordinates.size == 0:
+            if num_x % 2 == 0 and num_y % 2 == 0:
+                return GriddedSamples(
+                    num_x=column_starts.size,
+                    num_y=row_starts.size,
+                    x_origin=self.x_origin + 0.5 * self.cell_size,
+                    y_origin=self.y_origin + 0.5 * self.cell_size,
+                    cell_size=2.0 * self.cell_size,
+                    values=reduced,
+                )
+            x_coordinates = self.x_origin + self.cell_size * np.arange(num_x)
+            y_coordinates = self.y_origin + self.cell_size * np.arange(num_y)
+        else:
+            x_coordinates = self.x_coordinates
+            y_coordinates = self.y_coordinates
+
+        return GriddedSamples(
+            num_x=column_starts.size,
+            num_y=row_starts.size,
+            cell_size=2.0 * self.spacing,
+            x_coordinates=_block_means(x_coordinates, column_starts),
+            y_coordinates=_block_means(y_coordinates, row_starts),
+            values=reduced,
+        )
+
+
+def _block_means(coordinates: ndarray, starts: ndarray) -> ndarray:
+    """Computes the means of consecutive blocks of coordinates."""
+    counts = np.diff(starts, append=coordinates.size)
+    return np.add.reduceat(coordinates, starts) / counts
 
 
 @unique
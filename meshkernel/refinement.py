@@ -0,0 +1,828 @@
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from meshkernel.meshkernel import MeshKernel
+from meshkernel.parallel import MeshKernelPool
+from meshkernel.py_structures import (
+    GeometryList,
+    GriddedSamples,
+    Mesh2d,
+    MeshRefinementParameters,
+    ProjectionType,
+    RefinementType,
+)
+
+logger = logging.getLogger(__name__)
+
+# The gravitational acceleration used by the wave Courant criterion, in m/s2
+_GRAVITY = 9.81
+
+# The length of a degree of latitude, in meters
+_METERS_PER_DEGREE = 6378137.0 * np.pi / 180.0
+
+
+class PyramidRefinementStep:
+    """A refinement iteration of `refine_with_pyramid`.
+
+    Attributes:
+        iteration (int): The index of the iteration.
+        level (int): The pyramid level used for the iteration, 0 for the full resolution.
+        sample_spacing (float): The spacing of the samples of the level.
+        face_size (float): The size of the finest face before the iteration.
+        num_faces_before (int): The number of faces before the iteration.
+        num_faces_after (int): The number of faces after the iteration.
+        elapsed (float): The duration of the refinement, in seconds.
+    """
+
+    def __init__(
+        self,
+        iteration: int,
+        level: int,
+        sample_spacing: float,
+        face_size: float,
+        num_faces_before: int,
+        num_faces_after: int,
+        elapsed: float,
+    ):
+        self.iteration = iteration
+        self.level = level
+        self.sample_spacing = sample_spacing
+        self.face_size = face_size
+        self.num_faces_before = num_faces_before
+        self.num_faces_after = num_faces_after
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (
+            "PyramidRefinementStep(iteration={}, level={}, sample_spacing={:.6g}, "
+            "face_size={:.6g}, faces={} -> {}, elapsed={:.3f}s)"
+        ).format(
+            self.iteration,
+            self.level,
+            self.sample_spacing,
+            self.face_size,
+            self.num_faces_before,
+            self.num_faces_after,
+            self.elapsed,
+        )
+
+
+class RefinementEstimate:
+    """The predicted outcome of a refinement based on gridded samples.
+
+    Attributes:
+        num_faces_before (int): The number of faces before the refinement.
+        splits (np.ndarray): The predicted number of times each face is split in four.
+    """
+
+    def __init__(self, num_faces_before: int, splits: np.ndarray):
+        self.num_faces_before = num_faces_before
+        self.splits = splits
+
+    @property
+    def num_faces(self) -> int:
+        """The predicted number of faces after the refinement, without the faces connecting the hanging nodes."""
+        return int(np.sum(np.left_shift(np.int64(1), 2 * self.splits.astype(np.int64))))
+
+    def __repr__(self):
+        return "RefinementEstimate(faces={} -> {}, max_splits={})".format(
+            self.num_faces_before,
+            self.num_faces,
+            int(np.max(self.splits, initial=0)),
+        )
+
+
+class RefinementTrial:
+    """A candidate evaluated by the target-driven refinement search.
+
+    Attributes:
+        round_index (int): The index of the search round, or the number of passes of a Casulli refinement.
+        value (float): The value of the searched parameter.
+        num_faces (int): The number of faces after the refinement.
+        edge_length (float): The edge length quantile after the refinement.
+        error (float): The relative error of the measured quantity to the target.
+        elapsed (float): The duration of the refinement, in seconds.
+    """
+
+    def __init__(
+        self,
+        round_index: int,
+        value: float,
+        num_faces: int,
+        edge_length: float,
+        error: float,
+        elapsed: float,
+    ):
+        self.round_index = round_index
+        self.value = value
+        self.num_faces = num_faces
+        self.edge_length = edge_length
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return "RefinementTrial(round={}, value={:.6g}, faces={}, edge_length={:.6g}, error={:+.3%}, elapsed={:.3f}s)".format(
+            self.round_index,
+            self.value,
+            self.num_faces,
+            self.edge_length,
+            self.error,
+            self.elapsed,
+        )
+
+
+class TargetRefinementResult:
+    """The outcome of a target-driven refinement.
+
+    Attributes:
+        parameter (str): The searched parameter.
+        value (float): The value of the parameter giving the best result, which is set on the state.
+        num_faces (int): The number of faces of the best result.
+        error (float): The relative error of the best result to the target.
+        trials (List[RefinementTrial]): The search trace, in the order of evaluation.
+    """
+
+    def __init__(
+        self,
+        parameter: str,
+        value: float,
+        num_faces: int,
+        error: float,
+        trials: List[RefinementTrial],
+    ):
+        self.parameter = parameter
+        self.value = value
+        self.num_faces = num_faces
+        self.error = error
+        self.trials = trials
+
+    def __repr__(self):
+        return "TargetRefinementResult({}={:.6g}, faces={}, error={:+.3%}, trials={})".format(
+            self.parameter, self.value, self.num_faces, self.error, len(self.trials)
+        )
+
+
+def face_sizes(mesh2d: Mesh2d) -> np.ndarray:
+    """Computes the size of each face of a mesh2d, as the square root of its area.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d.
+
+    Returns:
+        np.ndarray: The size of each face, in the units of the coordinates.
+    """
+    nodes_per_face = mesh2d.nodes_per_face.astype(np.int64)
+    if nodes_per_face.size == 0:
+        return np.empty(0, dtype=np.double)
+
+    # The next node of each face node, within its face
+    starts = np.concatenate(([0], np.cumsum(nodes_per_face)[:-1]))
+    next_position = np.arange(1, mesh2d.face_nodes.size + 1)
+    next_position[starts + nodes_per_face - 1] = starts
+
+    x = mesh2d.node_x[mesh2d.face_nodes]
+    y = mesh2d.node_y[mesh2d.face_nodes]
+    cross = x * y[next_position] - x[next_position] * y
+    return np.sqrt(0.5 * np.abs(np.add.reduceat(cross, starts)))
+
+
+def refine_with_pyramid(
+    meshkernel: MeshKernel,
+    pyramid: List[GriddedSamples],
+    mesh_refinement_params: MeshRefinementParameters,
+    use_nodal_refinement: bool = True,
+    samples_per_face: float = 2.0,
+) -> List[PyramidRefinementStep]:
+    """Refines the mesh2d of a state based on gridded samples, using at each iteration the coarsest
+    pyramid level that still resolves the finest face.
+
+    `mesh_refinement_params.max_refinement_iterations` calls of `mesh2d_refine_based_on_gridded_samples`
+    are made, each with a single iteration. Before each call, the level is chosen so that its spacing is
+    at most the size of the finest face divided by `samples_per_face`, the full resolution being used
+    when no level is fine enough. The hanging nodes are connected after the last iteration, if requested
+    by the parameters. The iterations stop early when one of them adds no face.
+
+    Args:
+        meshkernel (MeshKernel): The state holding the mesh2d.
+        pyramid (List[GriddedSamples]): The levels built by `GriddedSamples.build_pyramid`, finest first.
+        mesh_refinement_params (MeshRefinementParameters): The mesh refinement parameters.
+        use_nodal_refinement (bool, optional): If the depth value at nodes is used for refinement. Default True.
+        samples_per_face (float, optional): The minimum number of samples across the finest face. Default is `2`.
+
+    Returns:
+        List[PyramidRefinementStep]: The level and the face growth of each iteration.
+    """
+    if not pyramid:
+        raise ValueError("The pyramid has no level")
+
+    spacings = np.array([level.spacing for level in pyramid])
+    parameters = copy.copy(mesh_refinement_params)
+    parameters.max_refinement_iterations = 1
+    parameters.connect_hanging_nodes = False
+
+    steps = []
+    for iteration in range(mesh_refinement_params.max_refinement_iterations):
+        mesh2d = meshkernel.mesh2d_get()
+        sizes = face_sizes(mesh2d)
+        if sizes.size == 0:
+            break
+        face_size = float(np.min(sizes))
+
+        resolving = np.flatnonzero(spacings <= face_size / samples_per_face)
+        level = int(resolving[-1]) if resolving.size else 0
+
+        last = iteration == mesh_refinement_params.max_refinement_iterations - 1
+        parameters.connect_hanging_nodes = (
+            mesh_refinement_params.connect_hanging_nodes and last
+        )
+        start = time.perf_counter()
+        meshkernel.mesh2d_refine_based_on_gridded_samples(
+            pyramid[level], parameters, use_nodal_refinement
+        )
+        num_faces_after = meshkernel._mesh2d_get_dimensions().num_faces
+
+        step = PyramidRefinementStep(
+            iteration,
+            level,
+            float(spacings[level]),
+            face_size,
+            sizes.size,
+            num_faces_after,
+            time.perf_counter() - start,
+        )
+        logger.debug("Pyramid refinement: %s", step)
+        steps.append(step)
+
+        if num_faces_after == sizes.size and not last:
+            # A last call, refining nothing more, connects the hanging nodes left by the previous iterations
+            if mesh_refinement_params.connect_hanging_nodes:
+                parameters.connect_hanging_nodes = True
+                meshkernel.mesh2d_refine_based_on_gridded_samples(
+                    pyramid[level], parameters, use_nodal_refinement
+                )
+            break
+
+    return steps
+
+
+def estimate_refinement(
+    mesh2d: Mesh2d,
+    gridded_samples: GriddedSamples,
+    mesh_refinement_params: MeshRefinementParameters,
+    projection: ProjectionType = ProjectionType.CARTESIAN,
+) -> RefinementEstimate:
+    """Predicts the faces created by `mesh2d_refine_based_on_gridded_samples`, without running it.
+
+    Each face is assumed to be split in four until it meets the refinement criterion, as long as
+    the split faces are not smaller than `min_edge_size`, and at most `max_refinement_iterations` times.
+    The sample value is interpolated bilinearly at the face centers. With `RefinementType.WAVE_COURANT`,
+    a face meets the criterion when its size is at most the distance travelled by a shallow water wave
+    in `max_courant_time` seconds. With `RefinementType.REFINEMENT_LEVELS`, the sample value is the number
+    of splits. The faces outside the samples are not split. The face size is the square root of its area,
+    converted to meters for spherical coordinates.
+
+    This is an estimate: the kernel compares the edge lengths, not the face sizes,
+    and the faces created by connecting the hanging nodes are not counted.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d, as returned by `mesh2d_get`.
+        gridded_samples (GriddedSamples): The gridded samples.
+        mesh_refinement_params (MeshRefinementParameters): The mesh refinement parameters.
+        projection (ProjectionType, optional): The projection of the mesh2d. Default is `ProjectionType.CARTESIAN`.
+
+    Returns:
+        RefinementEstimate: The predicted number of splits of each face.
+    """
+    sizes = face_sizes(mesh2d)
+    if projection == ProjectionType.SPHERICAL:
+        sizes = (
+            sizes
+            * _METERS_PER_DEGREE
+            * np.sqrt(np.abs(np.cos(np.radians(mesh2d.face_y))))
+        )
+
+    values = _interpolate_bilinear(gridded_samples, mesh2d.face_x, mesh2d.face_y)
+    inside = np.isfinite(values)
+    max_splits = max(0, mesh_refinement_params.max_refinement_iterations)
+
+    # The number of halvings before the faces reach the minimum edge size
+    min_edge_size = max(mesh_refinement_params.min_edge_size, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        allowed = np.floor(np.log2(sizes / min_edge_size))
+    allowed = np.clip(np.nan_to_num(allowed, nan=0.0, posinf=max_splits), 0, max_splits)
+
+    if mesh_refinement_params.refinement_type == RefinementType.WAVE_COURANT:
+        celerity = np.sqrt(_GRAVITY * np.abs(np.where(inside, values, 0.0)))
+        target = celerity * mesh_refinement_params.max_courant_time
+        with np.errstate(divide="ignore", invalid="ignore"):
+            needed = np.ceil(np.log2(sizes / target))
+        needed = np.nan_to_num(needed, nan=0.0, posinf=max_splits)
+    elif mesh_refinement_params.refinement_type == RefinementType.REFINEMENT_LEVELS:
+        needed = np.floor(np.where(inside, values, 0.0))
+    else:
+        raise ValueError(
+            "The refinement type {!r} cannot be estimated".format(
+                mesh_refinement_params.refinement_type
+            )
+        )
+
+    splits = np.where(inside, np.clip(np.minimum(needed, allowed), 0, None), 0)
+    return RefinementEstimate(sizes.size, splits.astype(np.int64))
+
+
+def refine_within_budget(
+    meshkernel: MeshKernel,
+    gridded_samples: GriddedSamples,
+    mesh_refinement_params: MeshRefinementParameters,
+    max_faces: int,
+    use_nodal_refinement: bool = True,
+    adjust: str = "max_refinement_iterations",
+) -> MeshRefinementParameters:
+    """Refines the mesh2d of a state based on gridded samples, after adjusting the refinement parameters
+    so the predicted number of faces does not exceed a budget.
+
+    While `estimate_refinement` predicts more than `max_faces` faces, either `max_refinement_iterations`
+    is decreased by one, or `min_edge_size` is doubled. The mesh2d is then refined with the adjusted parameters.
+
+    Args:
+        meshkernel (MeshKernel): The state holding the mesh2d.
+        gridded_samples (GriddedSamples): The gridded samples.
+        mesh_refinement_params (MeshRefinementParameters): The mesh refinement parameters. They are not modified.
+        max_faces (int): The maximum number of faces after the refinement.
+        use_nodal_refinement (bool, optional): If the depth value at nodes is used for refinement. Default True.
+        adjust (str, optional): The parameter adjusted to meet the budget: "max_refinement_iterations"
+                                or "min_edge_size". Default is "max_refinement_iterations".
+
+    Returns:
+        MeshRefinementParameters: The parameters used for the refinement.
+
+    Raises:
+        ValueError: If the mesh2d already has more than `max_faces` faces.
+    """
+    if adjust not in ("max_refinement_iterations", "min_edge_size"):
+        raise ValueError(
+            "adjust must be 'max_refinement_iterations' or 'min_edge_size'"
+        )
+
+    mesh2d = meshkernel.mesh2d_get()
+    projection = meshkernel.get_projection()
+    parameters = copy.copy(mesh_refinement_params)
+
+    estimate = estimate_refinement(mesh2d, gridded_samples, parameters, projection)
+    if estimate.num_faces_before > max_faces:
+        raise ValueError(
+            "The mesh2d already has {} faces, more than {}".format(
+                estimate.num_faces_before, max_faces
+            )
+        )
+
+    while estimate.num_faces > max_faces:
+        logger.info(
+            "Refinement predicted to create %d faces, more than %d: adjusting %s",
+            estimate.num_faces,
+            max_faces,
+            adjust,
+        )
+        if adjust == "max_refinement_iterations":
+            parameters.max_refinement_iterations = int(np.max(estimate.splits)) - 1
+        else:
+            parameters.min_edge_size = (
+                2.0 * parameters.min_edge_size
+                if parameters.min_edge_size > 0.0
+                else float(np.min(face_sizes(mesh2d))) / 2.0
+            )
+        estimate = estimate_refinement(mesh2d, gridded_samples, parameters, projection)
+
+    logger.debug("Refinement within budget: %s", estimate)
+    meshkernel.mesh2d_refine_based_on_gridded_samples(
+        gridded_samples, parameters, use_nodal_refinement
+    )
+    return parameters
+
+
+def edge_lengths(mesh2d: Mesh2d) -> np.ndarray:
+    """Computes the length of the edges of a mesh2d, in the units of the coordinates.
+
+    Args:
+        mesh2d (Mesh2d): The mesh2d.
+
+    Returns:
+        np.ndarray: The length of each edge.
+    """
+    edge_nodes = mesh2d.edge_nodes.reshape(-1, 2)
+    return np.hypot(
+        mesh2d.node_x[edge_nodes[:, 1]] - mesh2d.node_x[edge_nodes[:, 0]],
+        mesh2d.node_y[edge_nodes[:, 1]] - mesh2d.node_y[edge_nodes[:, 0]],
+    )
+
+
+def refine_samples_to_target(
+    meshkernel: MeshKernel,
+    samples: GeometryList,
+    relative_search_radius: float,
+    minimum_num_samples: int,
+    mesh_refinement_params: MeshRefinementParameters,
+    target_faces: Optional[int] = None,
+    target_edge_length: Optional[float] = None,
+    **search_options,
+) -> TargetRefinementResult:
+    """Refines the mesh2d of a state based on samples, searching the refinement parameter
+    reaching a target number of faces or a target edge length.
+
+    See `refine_to_target` for the search and its options.
+
+    Args:
+        meshkernel (MeshKernel): The state holding the mesh2d.
+        samples (GeometryList): The samples.
+        relative_search_radius (float): The relative search radius of the samples.
+        minimum_num_samples (int): The minimum number of samples used for the interpolation.
+        mesh_refinement_params (MeshRefinementParameters): The mesh refinement parameters. They are not modified.
+        target_faces (int, optional): The target number of faces.
+        target_edge_length (float, optional): The target edge length quantile.
+        search_options: The options of `refine_to_target`.
+
+    Returns:
+        TargetRefinementResult: The best result and the search trace.
+    """
+
+    def refine(state: MeshKernel, parameters: MeshRefinementParameters):
+        state.mesh2d_refine_based_on_samples(
+            samples, relative_search_radius, minimum_num_samples, parameters
+        )
+
+    return refine_to_target(
+        meshkernel,
+        refine,
+        mesh_refinement_params,
+        target_faces,
+        target_edge_length,
+        **search_options,
+    )
+
+
+def refine_gridded_samples_to_target(
+    meshkernel: MeshKernel,
+    gridded_samples: GriddedSamples,
+    mesh_refinement_params: MeshRefinementParameters,
+    target_faces: Optional[int] = None,
+    target_edge_length: Optional[float] = None,
+    use_nodal_refinement: bool = True,
+    **search_options,
+) -> TargetRefinementResult:
+    """Refines the mesh2d of a state based on gridded samples, searching the refinement parameter
+    reaching a target number of faces or a target edge length.
+
+    See `refine_to_target` for the search and its options.
+
+    Args:
+        meshkernel (MeshKernel): The state holding the mesh2d.
+        gridded_samples (GriddedSamples): The gridded samples.
+        mesh_refinement_params (MeshRefinementParameters): The mesh refinement parameters. They are not modified.
+        target_faces (int, optional): The target number of faces.
+        target_edge_length (float, optional): The target edge length quantile.
+        use_nodal_refinement (bool, optional): If the depth value at nodes is used for refinement. Default True.
+        search_options: The options of `refine_to_target`.
+
+    Returns:
+        TargetRefinementResult: The best result and the search trace.
+    """
+
+    def refine(state: MeshKernel, parameters: MeshRefinementParameters):
+        state.mesh2d_refine_based_on_gridded_samples(
+            gridded_samples, parameters, use_nodal_refinement
+        )
+
+    return refine_to_target(
+        meshkernel,
+        refine,
+        mesh_refinement_params,
+        target_faces,
+        target_edge_length,
+        **search_options,
+    )
+
+
+def refine_to_target(
+    meshkernel: MeshKernel,
+    refine: Callable[[MeshKernel, MeshRefinementParameters], None],
+    mesh_refinement_params: MeshRefinementParameters,
+    target_faces: Optional[int] = None,
+    target_edge_length: Optional[float] = None,
+    parameter: str = "min_edge_size",
+    bounds: Optional[Tuple[float, float]] = None,
+    edge_length_quantile: float = 0.5,
+    num_candidates: Optional[int] = None,
+    max_rounds: int = 8,
+    tolerance: float = 0.02,
+) -> TargetRefinementResult:
+    """Refines the mesh2d of a state, searching the value of a refinement parameter
+    reaching a target number of faces or a target edge length.
+
+    The number of faces decreases, and the edge lengths increase, with both `min_edge_size` and
+    `max_courant_time`. Each round of the search refines copies of the mesh2d with `num_candidates` values
+    evenly spaced on a logarithmic scale inside the current bounds, in parallel on the states of a
+    `MeshKernelPool`, then narrows the bounds to the candidates around the target: with one candidate,
+    this is a bisection. The first round also refines with the bounds themselves. The search stops
+    when a candidate is within `tolerance` of the target, after `max_rounds` rounds, or when both ends
+    of the bounds give the same result, since the response is flat in between. The best candidate
+    is set on the state.
+
+    Each candidate is logged, and returned in the search trace.
+
+    Args:
+        meshkernel (MeshKernel): The state holding the mesh2d.
+        refine (Callable[[MeshKernel, MeshRefinementParameters], None]): The refinement, called with a state
+                                                                         holding a copy of the mesh2d and the
+                                                                         parameters of a candidate.
+        mesh_refinement_params (MeshRefinementParameters): The mesh refinement parameters. They are not modified.
+        target_faces (int, optional): The target number of faces.
+        target_edge_length (float, optional): The target edge length quantile, in the units of the coordinates.
+        parameter (str, optional): The searched parameter, "min_edge_size" or "max_courant_time".
+                                   Default is "min_edge_size".
+        bounds (Tuple[float, float], optional): The positive bounds of the searched parameter.
+                                                Default is the smallest face size divided by
+                                                `2 ** max_refinement_iterations` to the largest face size
+                                                for `min_edge_size`, and the parameter value divided and
+                                                multiplied by 1000 for `max_courant_time`.
+        edge_length_quantile (float, optional): The quantile of the edge lengths compared to
+                                                `target_edge_length`. Default is the median.
+        num_candidates (int, optional): The number of candidates of each round. Default is the number of CPUs.
+        max_rounds (int, optional): The maximum number of rounds. Default is `8`.
+        tolerance (float, optional): The relative error to the target accepted as converged. Default is `0.02`.
+
+    Returns:
+        TargetRefinementResult: The best result and the search trace.
+
+    Raises:
+        ValueError: If not exactly one target is given, if the parameter or the bounds are invalid,
+                    or if the refinement gives the same result at both bounds, for example because
+                    the refinement type ignores the parameter.
+    """
+    if (target_faces is None) == (target_edge_length is None):
+        raise ValueError("Exactly one of target_faces and target_edge_length is needed")
+    if parameter not in ("min_edge_size", "max_courant_time"):
+        raise ValueError("parameter must be 'min_edge_size' or 'max_courant_time'")
+    if num_candidates is None:
+        num_candidates = os.cpu_count() or 1
+    if num_candidates < 1 or max_rounds < 1:
+        raise ValueError("num_candidates and max_rounds must be at least 1")
+
+    mesh2d = meshkernel.mesh2d_get()
+    if bounds is None:
+        bounds = _default_bounds(mesh2d, mesh_refinement_params, parameter)
+    lower, upper = float(bounds[0]), float(bounds[1])
+    if not 0.0 < lower < upper:
+        raise ValueError("The bounds must be positive and increasing")
+
+    target = float(target_faces if target_faces is not None else target_edge_length)
+
+    def measure(refined: Mesh2d, value: float, round_index: int, elapsed: float):
+        lengths = edge_lengths(refined)
+        edge_length = (
+            float(np.quantile(lengths, edge_length_quantile)) if lengths.size else 0.0
+        )
+        num_faces = int(refined.nodes_per_face.size)
+        measured = num_faces if target_faces is not None else edge_length
+        return RefinementTrial(
+            round_index, value, num_faces, edge_length, measured / target - 1.0, elapsed
+        )
+
+    # The trials by parameter value, to find those measured at the current bounds
+    trials_by_value: Dict[float, RefinementTrial] = {}
+
+    trials: List[RefinementTrial] = []
+    best: Optional[RefinementTrial] = None
+    best_mesh2d = None
+    with MeshKernelPool(num_candidates, meshkernel.get_projection()) as pool:
+        for round_index in range(max_rounds):
+            values = np.geomspace(lower, upper, num_candidates + 2)
+            if round_index > 0:
+                # The bounds were measured by the previous rounds
+                values = values[1:-1]
+            candidates = []
+            for value in values:
+                parameters = copy.copy(mesh_refinement_params)
+                setattr(parameters, parameter, float(value))
+                candidates.append(parameters)
+
+            round_trials = []
+            for value, (refined, elapsed) in zip(
+                values,
+                pool.map(
+                    _refine_copy,
+                    [mesh2d] * len(values),
+                    [refine] * len(values),
+                    candidates,
+                ),
+            ):
+                trial = measure(refined, float(value), round_index, elapsed)
+                logger.info("Target refinement: %s", trial)
+                round_trials.append(trial)
+                if best is None or abs(trial.error) < abs(best.error):
+                    best, best_mesh2d = trial, refined
+            trials.extend(round_trials)
+
+            if abs(best.error) <= tolerance:
+                break
+
+            # The face count decreases with the parameter, the edge lengths increase with it
+            for trial in round_trials:
+                trials_by_value[trial.value] = trial
+                increasing = trial.error if target_faces is None else -trial.error
+                if increasing < 0.0:
+                    lower = max(lower, trial.value)
+                elif increasing > 0.0:
+                    upper = min(upper, trial.value)
+
+            if round_index == 0 and round_trials[0].error == round_trials[-1].error:
+                raise ValueError(
+                    "The refinement gives the same result for {} = {} and {} = {}, "
+                    "it does not depend on the parameter".format(
+                        parameter,
+                        round_trials[0].value,
+                        parameter,
+                        round_trials[-1].value,
+                    )
+                )
+
+            # Narrowing a flat bracket cannot get closer to the target, this also stops the search
+            # when the target is beyond the results of the bounds and the bracket collapsed on one of them
+            lower_trial = trials_by_value.get(lower)
+            upper_trial = trials_by_value.get(upper)
+            if (
+                lower_trial is not None
+                and upper_trial is not None
+                and lower_trial.error == upper_trial.error
+            ):
+                logger.warning(
+                    "Target refinement: the result is the same for %s between %s and %s, "
+                    "the search stops with an error of %s",
+                    parameter,
+                    lower,
+                    upper,
+                    best.error,
+                )
+                break
+
+    meshkernel.mesh2d_set(best_mesh2d)
+    result = TargetRefinementResult(
+        parameter, best.value, best.num_faces, best.error, trials
+    )
+    logger.debug("Target refinement: %s", result)
+    return result
+
+
+def casulli_refine_to_target(
+    meshkernel: MeshKernel,
+    polygon: GeometryList,
+    target_faces: int,
+    max_passes: int = 4,
+) -> TargetRefinementResult:
+    """Refines the mesh2d of a state inside a polygon with Casulli passes, until the number of faces
+    is as close as possible to a target.
+
+    The Casulli refinement has no continuous parameter, the searched parameter is the number of passes.
+    Since each pass refines the result of the previous one, the passes run one after the other
+    on a copy of the mesh2d, until the number of faces reaches the target or stops increasing.
+    The best result is set on the state.
+
+    Args:
+        meshkernel (MeshKernel): The state holding the mesh2d.
+        polygon (GeometryList): The polygon of the refined region.
+        target_faces (int): The target number of faces.
+        max_passes (int, optional): The maximum number of passes. Default is `4`.
+
+    Returns:
+        TargetRefinementResult: The best result and the search trace, with one trial per number of passes.
+
+    Raises:
+        ValueError: If `target_faces` is less than 1.
+    """
+    if target_faces < 1:
+        raise ValueError("target_faces must be at least 1")
+
+    mesh2d = meshkernel.mesh2d_get()
+    state = MeshKernel(meshkernel.get_projection())
+    state.mesh2d_set(mesh2d)
+
+    num_faces = int(mesh2d.nodes_per_face.size)
+    best = RefinementTrial(0, 0.0, num_faces, 0.0, num_faces / target_faces - 1.0, 0.0)
+    best_mesh2d = mesh2d
+    trials = [best]
+    for passes in range(1, max_passes + 1):
+        start = time.perf_counter()
+        state.mesh2d_casulli_refinement_on_polygon(polygon)
+        refined = state.mesh2d_get()
+        num_faces_after = int(refined.nodes_per_face.size)
+        trial = RefinementTrial(
+            passes,
+            float(passes),
+            num_faces_after,
+            0.0,
+            num_faces_after / target_faces - 1.0,
+            time.perf_counter() - start,
+        )
+        logger.info("Casulli target refinement: %s", trial)
+        trials.append(trial)
+        if abs(trial.error) < abs(best.error):
+            best, best_mesh2d = trial, refined
+        if num_faces_after >= target_faces or num_faces_after == num_faces:
+            break
+        num_faces = num_faces_after
+
+    meshkernel.mesh2d_set(best_mesh2d)
+    return TargetRefinementResult(
+        "passes", best.value, best.num_faces, best.error, trials
+    )
+
+
+def _refine_copy(
+    state: MeshKernel,
+    mesh2d: Mesh2d,
+    refine: Callable[[MeshKernel, MeshRefinementParameters], None],
+    parameters: MeshRefinementParameters,
+) -> Tuple[Mesh2d, float]:
+    """Refines a copy of a mesh2d on a pool state, and returns the refined mesh2d and the refinement duration."""
+    state.mesh2d_set(mesh2d)
+    start = time.perf_counter()
+    refine(state, parameters)
+    elapsed = time.perf_counter() - start
+    return state.mesh2d_get(), elapsed
+
+
+def _default_bounds(
+    mesh2d: Mesh2d, mesh_refinement_params: MeshRefinementParameters, parameter: str
+) -> Tuple[float, float]:
+    """Gets the default search bounds of a refinement parameter."""
+    if parameter == "max_courant_time":
+        value = mesh_refinement_params.max_courant_time
+        return value / 1000.0, value * 1000.0
+
+    sizes = face_sizes(mesh2d)
+    if sizes.size == 0:
+        raise ValueError("The mesh2d has no face")
+    iterations = max(1, mesh_refinement_params.max_refinement_iterations)
+    return float(np.min(sizes)) / 2.0**iterations, float(np.max(sizes))
+
+
+def _interpolate_bilinear(
+    gridded_samples: GriddedSamples, x: np.ndarray, y: np.ndarray
+) -> np.ndarray:
+    """Interpolates gridded samples bilinearly at points.
+
+    Args:
+        gridded_samples (GriddedSamples): The gridded samples.
+        x (np.ndarray): The x-coordinates of the points.
+        y (np.ndarray): The y-coordinates of the points.
+
+    Returns:
+        np.ndarray: The interpolated values, NaN outside the samples.
+    """
+    num_y, num_x = gridded_samples.shape
+    values = gridded_samples.values.reshape(num_y, num_x)
+
+    def cell_positions(coordinates, samples, origin, num):
+        if samples.size:
+            position = np.searchsorted(samples, coordinates, side="right") - 1
+            position = np.clip(position, 0, max(num - 2, 0))
+            width = samples[np.minimum(position + 1, num - 1)] - samples[position]
+            fraction = np.divide(
+                coordinates - samples[position],
+                width,
+                out=np.zeros(coordinates.size),
+                where=width > 0.0,
+            )
+            inside = (coordinates >= samples[0]) & (coordinates <= samples[-1])
+        else:
+            continuous = (coordinates - origin) / gridded_samples.cell_size
+            position = np.clip(
+                np.floor(continuous).astype(np.int64), 0, max(num - 2, 0)
+            )
+            fraction = continuous - position
+            inside = (continuous >= 0.0) & (continuous <= num - 1)
+        return position, np.clip(fraction, 0.0, 1.0), inside
+
+    column, fraction_x, inside_x = cell_positions(
+        x, gridded_samples.x_coordinates, gridded_samples.x_origin, num_x
+    )
+    row, fraction_y, inside_y = cell_positions(
+        y, gridded_samples.y_coordinates, gridded_samples.y_origin, num_y
+    )
+    next_column = np.minimum(column + 1, num_x - 1)
+    next_row = np.minimum(row + 1, num_y - 1)
+
+    bottom = (1.0 - fraction_x) * values[row, column] + fraction_x * values[
+        row, next_column
+    ]
+    top = (1.0 - fraction_x) * values[next_row, column] + fraction_x * values[
+        next_row, next_column
+    ]
+    interpolated = (1.0 - fraction_y) * bottom + fraction_y * top
+    return np.where(inside_x & inside_y, interpolated, np.nan)
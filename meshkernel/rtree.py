@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+# The maximum number of query-node pairs tested at once while descending the tree
+_MAX_PAIRS = 1 << 22
+
+
+class PackedRTree:
+    """A static R-tree over bounding boxes, bulk-loaded with the Sort-Tile-Recursive algorithm.
+
+    The tree is stored level by level in flat arrays: the children of the node `i` of a level
+    are the entries `i * node_capacity` to `(i + 1) * node_capacity - 1` of the level below,
+    the lowest level holding the items, sorted in tile order. The queries take batches of points
+    or boxes and descend the tree for all of them at once.
+
+    Args:
+        x_min (ndarray): The minimum x-coordinate of each item.
+        y_min (ndarray): The minimum y-coordinate of each item.
+        x_max (ndarray): The maximum x-coordinate of each item.
+        y_max (ndarray): The maximum y-coordinate of each item.
+        node_capacity (int, optional): The maximum number of children of a node. Default is `16`.
+    """
+
+    def __init__(
+        self,
+        x_min: ndarray,
+        y_min: ndarray,
+        x_max: ndarray,
+        y_max: ndarray,
+        node_capacity: int = 16,
+    ):
+        if node_capacity < 2:
+            raise ValueError("node_capacity must be at least 2")
+
+        self.node_capacity = node_capacity
+        boxes = np.stack(
+            [
+                np.asarray(array, dtype=np.double)
+                for array in (x_min, y_min, x_max, y_max)
+            ]
+        )
+        self.num_items = boxes.shape[1]
+        self.order = _sort_tile_recursive(boxes, node_capacity)
+
+        # levels[0] holds the items in tile order, levels[-1] the root
+        self.levels: List[ndarray] = [boxes[:, self.order]]
+        while self.levels[-1].shape[1] > 1:
+            self.levels.append(_parent_boxes(self.levels[-1], node_capacity))
+
+    def query_points(self, x: ndarray, y: ndarray) -> Tuple[ndarray, ndarray]:
+        """Finds the items whose bounding box contains each point.
+
+        Args:
+            x (ndarray): The x-coordinates of the points.
+            y (ndarray): The y-coordinates of the points.
+
+        Returns:
+            tuple: The point indices and the item indices of the matching pairs, sorted by point.
+        """
+        x = np.asarray(x, dtype=np.double).reshape(-1)
+        y = np.asarray(y, dtype=np.double).reshape(-1)
+        return self.query_boxes(x, y, x, y)
+
+    def query_boxes(
+        self, x_min: ndarray, y_min: ndarray, x_max: ndarray, y_max: ndarray
+    ) -> Tuple[ndarray, ndarray]:
+        """Finds the items whose bounding box intersects each box.
+
+        Args:
+            x_min (ndarray): The minimum x-coordinate of each box.
+            y_min (ndarray): The minimum y-coordinate of each box.
+            x_max (ndarray): The maximum x-coordinate of each box.
+            y_max (ndarray): The maximum y-coordinate of each box.
+
+        Returns:
+            tuple: The box indices and the item indices of the matching pairs, sorted by box.
+        """
+        queries = np.stack(
+            [
+                np.asarray(array, dtype=np.double).reshape(-1)
+                for array in (x_min, y_min, x_max, y_max)
+            ]
+        )
+        num_queries = queries.shape[1]
+        if self.num_items == 0 or num_queries == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        # Bound the number of pairs tested at each level by processing the queries in chunks
+        chunk_size = max(1, _MAX_PAIRS // (self.node_capacity * len(self.levels)))
+        query_indices, item_indices = [], []
+        for start in range(0, num_queries, chunk_size):
+            chunk = queries[:, start : start + chunk_size]
+            query_index, item_index = self._descend(chunk)
+            query_indices.append(query_index + start)
+            item_indices.append(item_index)
+
+        query_index = np.concatenate(query_indices)
+        item_index = np.concatenate(item_indices)
+        sort = np.lexsort((item_index, query_index))
+        return query_index[sort], self.order[item_index[sort]]
+
+    def _descend(self, queries: ndarray) -> Tuple[ndarray, ndarray]:
+        """Descends the tree for a chunk of query boxes.
+
+        Returns:
+            tuple: The query indices and the positions of the matching items in tile order.
+        """
+        query_index = np.arange(queries.shape[1])
+        node_index = np.zeros(queries.shape[1], dtype=np.int64)
+        query_index, node_index = self._filter(
+            queries, query_index, node_index, self.levels[-1]
+        )
+
+        children = np.arange(self.node_capacity)
+        for level in reversed(self.levels[:-1]):
+            # Expand each pair into the children of its node
+            child_index = (
+                node_index[:, np.newaxis] * self.node_capacity + children
+            ).reshape(-1)
+            query_index = np.repeat(query_index, self.node_capacity)
+            exists = child_index < level.shape[1]
+            query_index, node_index = self._filter(
+                queries, query_index[exists], child_index[exists], level
+            )
+
+        return query_index, node_index
+
+    @staticmethod
+    def _filter(
+        queries: ndarray, query_index: ndarray, node_index: ndarray, level: ndarray
+    ) -> Tuple[ndarray, ndarray]:
+        """Keeps the query-node pairs whose boxes intersect."""
+        intersects = (
+            (level[0, node_index] <= queries[2, query_index])
+            & (level[2, node_index] >= queries[0, query_index])
+            & (level[1, node_index] <= queries[3, query_index])
+            & (level[3, node_index] >= queries[1, query_index])
+        )
+        return query_index[intersects], node_index[intersects]
+
+
+def _sort_tile_recursive(boxes: ndarray, node_capacity: int) -> ndarray:
+    """Orders the boxes with the Sort-Tile-Recursive algorithm: sorted by x-center into vertical slices,
+    each slice sorted by y-center, so consecutive groups of `node_capacity` boxes are spatially close.
+
+    Args:
+        boxes (ndarray): The boxes, as an array of shape (4, n) of x_min, y_min, x_max and y_max.
+        node_capacity (int): The number of boxes per node.
+
+    Returns:
+        ndarray: The order of the boxes.
+    """
+    num_boxes = boxes.shape[1]
+    if num_boxes == 0:
+        return np.empty(0, dtype=np.int64)
+
+    center_x = boxes[0] + boxes[2]
+    center_y = boxes[1] + boxes[3]
+    num_leaves = -(-num_boxes // node_capacity)
+    num_slices = int(np.ceil(np.sqrt(num_leaves)))
+    slice_size = num_slices * node_capacity
+
+    by_x = np.argsort(center_x, kind="stable")
+    slice_index = np.empty(num_boxes, dtype=np.int64)
+    slice_index[by_x] = np.arange(num_boxes) // slice_size
+    return np.lexsort((center_y, slice_index))
+
+
+def _parent_boxes(boxes: ndarray, node_capacity: int) -> ndarray:
+    """Computes the bounding boxes of consecutive groups of `node_capacity` boxes."""
+    starts = np.arange(0, boxes.shape[1], node_capacity)
+    return np.stack(
+        [
+            np.minimum.reduceat(boxes[0], starts),
+            np.minimum.reduceat(boxes[1], starts),
+            np.maximum.reduceat(boxes[2], starts),
+            np.maximum.reduceat(boxes[3], starts),
+        ]
+    )
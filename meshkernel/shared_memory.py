@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import tempfile
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional
+
+import numpy as np
+from numpy import ndarray
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, Windows
+    fcntl = None
+
+_MAGIC = b"MKARRAYS"
+
+# The header of a packed buffer, followed by one entry per array and by the array data
+_HEADER_DTYPE = np.dtype(
+    [("magic", "S8"), ("refcount", "<i8"), ("num_arrays", "<i8")], align=False
+)
+_ENTRY_DTYPE = np.dtype(
+    [("name", "S24"), ("dtype", "S8"), ("offset", "<i8"), ("size", "<i8")],
+    align=False,
+)
+
+# The alignment of the array data in a packed buffer, in bytes
+_ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def packed_nbytes(arrays: Dict[str, ndarray]) -> int:
+    """Computes the size of the buffer needed by `pack_arrays`.
+
+    Args:
+        arrays (Dict[str, ndarray]): The 1D arrays by name.
+
+    Returns:
+        int: The size in bytes.
+    """
+    offset = _align(_HEADER_DTYPE.itemsize + len(arrays) * _ENTRY_DTYPE.itemsize)
+    for array in arrays.values():
+        offset = _align(offset + array.nbytes)
+    return offset
+
+
+def pack_arrays(buffer, arrays: Dict[str, ndarray]) -> None:
+    """Writes 1D arrays into a buffer, after a header holding the offset, dtype and size of each array.
+    The data of each array is aligned to 64 bytes.
+
+    Args:
+        buffer: A writable buffer of at least `packed_nbytes(arrays)` bytes.
+        arrays (Dict[str, ndarray]): The 1D arrays by name. Names are limited to 24 bytes.
+    """
+    header = np.ndarray(1, dtype=_HEADER_DTYPE, buffer=buffer)
+    entries = np.ndarray(
+        len(arrays), dtype=_ENTRY_DTYPE, buffer=buffer, offset=_HEADER_DTYPE.itemsize
+    )
+    header["magic"] = _MAGIC
+    header["refcount"] = 0
+    header["num_arrays"] = len(arrays)
+
+    offset = _align(_HEADER_DTYPE.itemsize + len(arrays) * _ENTRY_DTYPE.itemsize)
+    for entry, (name, array) in zip(entries, arrays.items()):
+        array = np.asarray(array).reshape(-1)
+        entry["name"] = name.encode("ascii")
+        entry["dtype"] = array.dtype.str.encode("ascii")
+        entry["offset"] = offset
+        entry["size"] = array.size
+        np.ndarray(array.shape, dtype=array.dtype, buffer=buffer, offset=offset)[
+            ...
+        ] = array
+        offset = _align(offset + array.nbytes)
+
+
+def unpack_arrays(buffer) -> Dict[str, ndarray]:
+    """Gets views of the arrays written by `pack_arrays`, without copying them.
+
+    Args:
+        buffer: The buffer holding the packed arrays.
+
+    Returns:
+        Dict[str, ndarray]: The 1D arrays by name, sharing the memory of the buffer.
+
+    Raises:
+        ValueError: If the buffer does not hold packed arrays.
+    """
+    header = np.ndarray(1, dtype=_HEADER_DTYPE, buffer=buffer)[0]
+    if header["magic"] != _MAGIC:
+        raise ValueError("The buffer does not hold packed arrays")
+
+    entries = np.ndarray(
+        int(header["num_arrays"]),
+        dtype=_ENTRY_DTYPE,
+        buffer=buffer,
+        offset=_HEADER_DTYPE.itemsize,
+    )
+    return {
+        entry["name"].decode("ascii"): np.ndarray(
+            int(entry["size"]),
+            dtype=np.dtype(entry["dtype"].decode("ascii")),
+            buffer=buffer,
+            offset=int(entry["offset"]),
+        )
+        for entry in entries
+    }
+
+
+class SharedMemoryHandle:
+    """A reference-counted named shared memory segment holding packed arrays.
+
+    The handle is picklable, only its name is transferred, so it can be sent to worker processes.
+    Every handle attached to the segment holds one reference, counted in the segment header.
+    Closing the last reference unlinks the segment.
+
+    On Windows, the operating system frees the segment when its last mapping is closed
+    and the reference count is only informative.
+
+    Args:
+        name (str): The name of the shared memory segment.
+        owns_reference (bool, optional): Whether the handle owns a reference already counted in the segment,
+                                         handed over by `transfer`. Default is False.
+    """
+
+    def __init__(self, name: str, owns_reference: bool = False):
+        self.name = name
+        self._owns_reference = owns_reference
+        self._shared_memory = None
+
+    def __reduce__(self):
+        return SharedMemoryHandle, (self.name, self._owns_reference)
+
+    def __repr__(self):
+        return "SharedMemoryHandle({!r})".format(self.name)
+
+    @staticmethod
+    def create(
+        arrays: Dict[str, ndarray], name: Optional[str] = None
+    ) -> SharedMemoryHandle:
+        """Creates a segment holding a copy of the arrays. The returned handle holds the first reference.
+
+        Args:
+            arrays (Dict[str, ndarray]): The 1D arrays by name.
+            name (str, optional): The name of the segment. Default is a random unique name.
+
+        Returns:
+            SharedMemoryHandle: The attached handle of the new segment.
+        """
+        shared_memory = SharedMemory(
+            name=name, create=True, size=max(packed_nbytes(arrays), 1)
+        )
+        _untrack(shared_memory)
+        pack_arrays(shared_memory.buf, arrays)
+
+        handle = SharedMemoryHandle(shared_memory.name)
+        handle._shared_memory = shared_memory
+        with handle._locked():
+            handle._header()["refcount"] = 1
+        return handle
+
+    @property
+    def attached(self) -> bool:
+        """Whether this handle holds a reference to the segment."""
+        return self._shared_memory is not None
+
+    def attach(self) -> Dict[str, ndarray]:
+        """Attaches the handle to the segment, if not attached yet, and gets the arrays.
+
+        Returns:
+            Dict[str, ndarray]: The writable arrays, sharing the memory of the segment.
+        """
+        if self._shared_memory is None:
+            shared_memory = _open(self.name)
+            self._shared_memory = shared_memory
+            if self._owns_reference:
+                self._owns_reference = False
+            else:
+                with self._locked():
+                    self._header()["refcount"] += 1
+        return unpack_arrays(self._shared_memory.buf)
+
+    def transfer(self) -> SharedMemoryHandle:
+        """Hands the reference held by this attached handle over to a new handle, for example to return
+        a segment from a worker process without unlinking it. This handle is detached from the segment.
+        The new handle takes the reference when attached, wherever it is unpickled.
+
+        Returns:
+            SharedMemoryHandle: The handle owning the reference.
+        """
+        if self._shared_memory is None:
+            raise ValueError("Only an attached handle can transfer its reference")
+
+        _unclosed.append(self._shared_memory)
+        self._shared_memory = None
+        _close_unused()
+        return SharedMemoryHandle(self.name, owns_reference=True)
+
+    @property
+    def refcount(self) -> int:
+        """The number of attached handles, in all processes."""
+        return int(self._header()["refcount"][0])
+
+    def unlink(self):
+        """Releases the reference held by this handle and unlinks the segment, whatever its reference count.
+        This is meant for the owner of a segment, when the other users are known to be gone
+        but may not have released their reference, for example after a worker process crashed.
+        """
+        self.close(unlink=True)
+
+    def close(self, unlink: bool = False):
+        """Releases the reference held by this handle, unlinking the segment if it was the last one.
+
+        Arrays obtained from the segment stay valid as long as they are referenced.
+        The mapping is closed by a later call once they are gone.
+
+        Args:
+            unlink (bool, optional): Whether to unlink the segment, even if other references remain.
+                                     Default is False.
+        """
+        if self._shared_memory is None:
+            if not self._owns_reference:
+                return
+            self.attach()
+
+        with self._locked():
+            header = self._header()
+            header["refcount"] -= 1
+            last = header["refcount"][0] <= 0
+            del header
+            if last or unlink:
+                _unlink(self._shared_memory)
+                if fcntl is not None:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(self._lock_path())
+
+        _unclosed.append(self._shared_memory)
+        self._shared_memory = None
+        _close_unused()
+
+    def __enter__(self) -> SharedMemoryHandle:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _header(self) -> ndarray:
+        return np.ndarray(1, dtype=_HEADER_DTYPE, buffer=self._shared_memory.buf)
+
+    def _lock_path(self) -> str:
+        return os.path.join(
+            tempfile.gettempdir(), "{}.lock".format(self.name.lstrip("/"))
+        )
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Serializes the reference count updates across processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path(), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# The segments whose mapping could not be closed yet, because arrays still reference it
+_unclosed = []
+
+
+def _close_unused():
+    """Closes the mappings of released segments no longer referenced by any array."""
+    for shared_memory in list(_unclosed):
+        try:
+            shared_memory.close()
+        except BufferError:
+            continue
+        _unclosed.remove(shared_memory)
+
+
+def _open(name: str) -> SharedMemory:
+    """Opens an existing segment without registering it with the resource tracker."""
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attached segments are always tracked
+        shared_memory = SharedMemory(name=name)
+        _untrack(shared_memory)
+        return shared_memory
+
+
+def _untrack(shared_memory: SharedMemory):
+    """Prevents the resource tracker from unlinking a segment when this process exits.
+    The lifetime of the segment is managed by the reference count of `SharedMemoryHandle`.
+    """
+    if os.name == "posix":
+        with contextlib.suppress(Exception):
+            resource_tracker.unregister(shared_memory._name, "shared_memory")
+
+
+def _unlink(shared_memory: SharedMemory):
+    """Unlinks a segment that was removed from the resource tracker by `_untrack`."""
+    if os.name == "posix" and getattr(shared_memory, "_track", True):
+        # `SharedMemory.unlink` unregisters tracked segments
+        resource_tracker.register(shared_memory._name, "shared_memory")
+    shared_memory.unlink()
@@ -1,8 +1,18 @@
+import hashlib
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 from matplotlib.collections import LineCollection
 
+# The size of the chunks of the arrays hashed on several threads
+_HASH_CHUNK_BYTES = 1 << 22
+
+_hash_executor = None
+_hash_executor_lock = threading.Lock()
+
 
 def to_contiguous_numpy_array(vec) -> np.ndarray:
     """Ensures the input vector is contiguous before passing it to a MeshKernel C API function,
@@ -49,6 +59,167 @@ def plot_edges(node_x, node_y, edge_nodes, ax, *args, **kwargs):
     ax.autoscale(enable=True)
 
 
+def get_ring_ranges(
+    x_coordinates, geometry_separator: float, inner_outer_separator: float
+):
+    """Splits separator-encoded coordinates into rings.
+    Rings are delimited by `geometry_separator` (new geometry) or `inner_outer_separator`
+    (new ring within the same polygon). Empty rings are discarded.
+
+    Args:
+        x_coordinates (ndarray): A 1D double array describing the x-coordinates of the nodes.
+        geometry_separator (float): The value used as a separator in the coordinates.
+        inner_outer_separator (float): The value used to separate the inner part of a polygon from its outer part.
+
+    Returns:
+        tuple: Four 1D integer arrays, the start (inclusive) and end (exclusive) index of each ring,
+               the geometry index of each ring, and the position of each ring within its geometry
+               (0 for the outer ring, > 0 for the inner rings).
+    """
+    x_coordinates = np.asarray(x_coordinates)
+    is_geometry_separator = x_coordinates == geometry_separator
+    is_separator = is_geometry_separator | (x_coordinates == inner_outer_separator)
+
+    separators = np.flatnonzero(is_separator)
+    starts = np.concatenate(([0], separators + 1))
+    ends = np.concatenate((separators, [x_coordinates.size]))
+
+    # A ring belongs to the geometry counted by the number of geometry separators before it
+    geometry_index = np.concatenate(([0], np.cumsum(is_geometry_separator[separators])))
+    non_empty = ends > starts
+    starts = starts[non_empty]
+    ends = ends[non_empty]
+    geometry_index = geometry_index[non_empty]
+    if starts.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty
+
+    # Renumber geometries so that geometries without rings are removed
+    _, geometry_index = np.unique(geometry_index, return_inverse=True)
+    geometry_index = geometry_index.reshape(-1)
+    first_ring = np.concatenate(([True], geometry_index[1:] != geometry_index[:-1]))
+    ring_start_of_geometry = np.maximum.accumulate(
+        np.where(first_ring, np.arange(geometry_index.size), 0)
+    )
+    ring_position = np.arange(geometry_index.size) - ring_start_of_geometry
+
+    return starts, ends, geometry_index, ring_position
+
+
+def allocate_array(size: int, dtype, memmap_path=None, shape=None) -> np.ndarray:
+    """Allocates an uninitialized 1D array, either on the heap or as a memory-mapped `.npy` file.
+    Memory-mapped arrays are backed by the page cache, so arrays larger than the available memory can be filled
+    and the file is directly usable as a snapshot with `numpy.load`.
+
+    Args:
+        size (int): The number of elements.
+        dtype: The data type of the elements.
+        memmap_path (str, optional): The path of the `.npy` file backing the array. If None, the array is
+                                     allocated on the heap.
+        shape (tuple, optional): The shape stored in the `.npy` file. It must describe `size` elements.
+                                 Default is `(size,)`.
+
+    Returns:
+        np.ndarray: The contiguous 1D array.
+    """
+    if memmap_path is None:
+        return np.empty(size, dtype=dtype)
+
+    shape = (size,) if shape is None else tuple(shape)
+    array = np.lib.format.open_memmap(memmap_path, mode="w+", dtype=dtype, shape=shape)
+    return array.reshape(size)
+
+
+def compact_array(array: np.ndarray, select, chunk_size: int = 1 << 22) -> np.ndarray:
+    """Compacts an array by keeping or transforming a subset of its elements, preserving their order.
+    If the array is a writable memory-mapped 1D `.npy` file, the compaction is done out-of-core and in place:
+    the file is processed chunk by chunk, the kept elements are moved to its start and its header is rewritten
+    with the new shape. The file is never replaced or resized, which is not possible on Windows while it is
+    mapped, so views of the input array stay readable, and the file keeps its size.
+    Otherwise the whole array is processed at once in memory.
+
+    Args:
+        array (np.ndarray): The array to compact.
+        select (Callable[[np.ndarray, int], np.ndarray]): Given a chunk of the array and the index of its
+                                                          first element, returns the elements to keep.
+        chunk_size (int, optional): The number of elements processed at once for memory-mapped arrays.
+
+    Returns:
+        np.ndarray: The compacted array. For memory-mapped arrays, a new memory map of the file.
+    """
+    filename = getattr(array, "filename", None)
+    if (
+        filename is None
+        or getattr(array, "mode", None) not in ("r+", "w+")
+        or array.ndim != 1
+        or _npy_shape(filename) != array.shape
+    ):
+        return np.asarray(select(array, 0), dtype=array.dtype)
+
+    size = 0
+    for start in range(0, array.size, chunk_size):
+        # The chunk is copied before it is overwritten, and the kept elements never move forward
+        selected = select(np.array(array[start : start + chunk_size]), start)
+        array[size : size + selected.size] = selected
+        size += selected.size
+    array.flush()
+
+    _write_npy_shape(filename, size)
+    return np.load(filename, mmap_mode="r+")
+
+
+def _npy_shape(filename: str) -> tuple:
+    """Reads the shape of the array of a `.npy` file.
+
+    Args:
+        filename (str): The path of the `.npy` file.
+
+    Returns:
+        tuple: The shape, or None if the file is not a `.npy` file.
+    """
+    try:
+        with open(filename, "rb") as file:
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, _, _ = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, _, _ = np.lib.format.read_array_header_2_0(file)
+    except ValueError:
+        return None
+    return shape
+
+
+def _write_npy_shape(filename: str, size: int):
+    """Rewrites the header of a 1D `.npy` file with a new number of elements, through a memory map,
+    so the file can be updated while it is mapped elsewhere. The data offset is unchanged.
+
+    Args:
+        filename (str): The path of the `.npy` file.
+        size (int): The new number of elements.
+    """
+    with open(filename, "rb") as file:
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            _, _, dtype = np.lib.format.read_array_header_1_0(file)
+            length_size = 2
+        else:
+            _, _, dtype = np.lib.format.read_array_header_2_0(file)
+            length_size = 4
+        data_offset = file.tell()
+
+    header_start = np.lib.format.MAGIC_LEN + length_size
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(
+        np.lib.format.dtype_to_descr(dtype), size
+    )
+    # The header keeps its length, so that the data offset is unchanged
+    header = header.ljust(data_offset - header_start - 1) + "\n"
+
+    header_map = np.memmap(filename, dtype=np.uint8, mode="r+", shape=(data_offset,))
+    header_map[header_start:] = np.frombuffer(header.encode("latin1"), dtype=np.uint8)
+    header_map.flush()
+    del header_map
+
+
 def get_maximum_bounding_box_coordinates():
     """Get the maximum coordinate values for a bounding box defined by floating point coordinates"""
 
@@ -59,3 +230,52 @@ def get_maximum_bounding_box_coordinates():
     y_upper_right = sys.float_info.max
 
     return x_lower_left, y_lower_left, x_upper_right, y_upper_right
+
+
+def hash_values(name: str, values: dict) -> str:
+    """Computes a stable hash of named arrays and scalars.
+
+    The arrays are hashed with their dtype and shape over their raw buffers. Arrays larger than 4 MiB
+    are hashed in chunks on a thread pool, `hashlib` releases the GIL while hashing.
+    The hash only depends on the content, not on the number of threads.
+
+    Args:
+        name (str): A name distinguishing the kind of content, for example the class name.
+        values (dict): The arrays and scalars by name.
+
+    Returns:
+        str: The hexadecimal hash.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update("{};".format(name).encode())
+    for key in sorted(values):
+        value = values[key]
+        if isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            digest.update(
+                "{}:ndarray:{}:{};".format(key, array.dtype.str, array.shape).encode()
+            )
+            digest.update(_hash_buffer(memoryview(array.reshape(-1)).cast("B")))
+        else:
+            digest.update("{}:{!r};".format(key, value).encode())
+    return digest.hexdigest()
+
+
+def _hash_buffer(buffer: memoryview) -> bytes:
+    """Hashes a buffer, chunk by chunk on the hash thread pool if it is large."""
+    if buffer.nbytes <= _HASH_CHUNK_BYTES:
+        return hashlib.blake2b(buffer).digest()
+
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1, thread_name_prefix="meshkernel-hash"
+            )
+
+    chunks = (
+        buffer[start : start + _HASH_CHUNK_BYTES]
+        for start in range(0, buffer.nbytes, _HASH_CHUNK_BYTES)
+    )
+    digests = _hash_executor.map(lambda chunk: hashlib.blake2b(chunk).digest(), chunks)
+    return hashlib.blake2b(b"".join(digests)).digest()
@@ -0,0 +1,57 @@
+"""
+Script used to compare the batched Casulli refinement over many polygons with one call per polygon
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from meshkernel import GeometryList, MakeGridParameters, MeshKernel
+
+
+def make_polygons(size: int, spacing: float) -> list:
+    polygons = []
+    for x_min in np.arange(2.5, size - 5.0, spacing):
+        for y_min in np.arange(2.5, size - 5.0, spacing):
+            x = np.array([x_min, x_min + 3.0, x_min + 3.0, x_min, x_min])
+            y = np.array([y_min, y_min, y_min + 3.0, y_min + 3.0, y_min])
+            polygons.append(GeometryList(x, y))
+    return polygons
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--spacing", type=float, default=6.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    parameters = MakeGridParameters(
+        num_columns=args.size, num_rows=args.size, block_size_x=1, block_size_y=1
+    )
+    polygons = make_polygons(args.size, args.spacing)
+
+    looped_times = []
+    batched_times = []
+    for _ in range(args.repeat):
+        looped = MeshKernel()
+        looped.mesh2d_make_rectangular_mesh(parameters)
+        start = time.perf_counter()
+        for polygon in polygons:
+            looped.mesh2d_casulli_refinement_on_polygon(polygon)
+        looped_times.append(time.perf_counter() - start)
+
+        batched = MeshKernel()
+        batched.mesh2d_make_rectangular_mesh(parameters)
+        start = time.perf_counter()
+        batch = batched.mesh2d_casulli_refinement_on_polygons(polygons)
+        batched_times.append(time.perf_counter() - start)
+
+    print("polygons: {}, groups: {}".format(len(polygons), batch.num_groups))
+    print("looped:  {:.4f} s (best of {})".format(min(looped_times), args.repeat))
+    print("batched: {:.4f} s (best of {})".format(min(batched_times), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+from mesh2d_factory import Mesh2dFactory
+
+from meshkernel import AsyncMeshKernel, MakeGridParameters, MeshKernel
+
+
+def delete_node_slowly(mk: MeshKernel, node_index: int):
+    """Deletes a node, then keeps the state busy."""
+    mk.mesh2d_delete_node(node_index)
+    time.sleep(0.5)
+
+
+def sleep(mk: MeshKernel, duration: float):
+    """Keeps the state busy."""
+    time.sleep(duration)
+
+
+def test_async_meshkernel_methods():
+    """Tests the MeshKernel methods are available as coroutines."""
+    mesh2d = Mesh2dFactory.create(rows=2, columns=3)
+
+    async def main():
+        async with AsyncMeshKernel() as async_mk:
+            await async_mk.mesh2d_set(mesh2d)
+            return await async_mk.mesh2d_get()
+
+    result = asyncio.run(main())
+
+    assert result.node_x.size == mesh2d.node_x.size
+
+
+def test_async_meshkernel_concurrent_calls_are_serialized():
+    """Tests concurrent coroutines on the same facade do not interleave."""
+    mesh2d = Mesh2dFactory.create(rows=5, columns=5)
+
+    async def set_and_count(async_mk: AsyncMeshKernel):
+        return await async_mk.run(
+            lambda mk: (mk.mesh2d_set(mesh2d), mk.mesh2d_get().node_x.size)[1]
+        )
+
+    async def main():
+        async with AsyncMeshKernel() as async_mk:
+            return await asyncio.gather(*(set_and_count(async_mk) for _ in range(8)))
+
+    assert asyncio.run(main()) == [mesh2d.node_x.size] * 8
+
+
+def test_async_meshkernel_timeout_restores_state():
+    """Tests a timed out call raises and the state and its options are restored from before the call."""
+    mesh2d = Mesh2dFactory.create(rows=2, columns=2)
+
+    async def main():
+        async with AsyncMeshKernel(clip_geometries=True) as async_mk:
+            await async_mk.mesh2d_set(mesh2d)
+            state = async_mk.meshkernel
+            state.thin_samples = True
+
+            with pytest.raises(asyncio.TimeoutError):
+                await async_mk.run(delete_node_slowly, 0, timeout=0.05)
+
+            assert async_mk.meshkernel is not state
+            assert async_mk.meshkernel.clip_geometries
+            assert async_mk.meshkernel.thin_samples
+            assert not async_mk.meshkernel.strict_zero_copy
+            return await async_mk.mesh2d_get()
+
+    result = asyncio.run(main())
+
+    assert result.node_x.size == mesh2d.node_x.size
+
+
+def test_async_meshkernel_timeout_restores_curvilinear_grid():
+    """Tests the curvilinear grid is restored after a timeout."""
+    make_grid_parameters = MakeGridParameters(num_columns=3, num_rows=2)
+
+    async def main():
+        async with AsyncMeshKernel() as async_mk:
+            await async_mk.curvilinear_compute_rectangular_grid(make_grid_parameters)
+            expected = await async_mk.curvilineargrid_get()
+
+            with pytest.raises(asyncio.TimeoutError):
+                await async_mk.run(sleep, 0.5, timeout=0.05)
+
+            return expected, await async_mk.curvilineargrid_get()
+
+    expected, result = asyncio.run(main())
+
+    assert (result.num_m, result.num_n) == (expected.num_m, expected.num_n)
+    assert result.node_x.tolist() == expected.node_x.tolist()
+    assert result.node_y.tolist() == expected.node_y.tolist()
+
+
+def test_async_meshkernel_limits_abandoned_calls():
+    """Tests a call waits for a timed out call to finish when the limit of abandoned calls is reached."""
+
+    async def main():
+        async with AsyncMeshKernel(max_abandoned_calls=1) as async_mk:
+            with pytest.raises(asyncio.TimeoutError):
+                await async_mk.run(sleep, 0.5, timeout=0.05)
+
+            start = time.perf_counter()
+            await async_mk.run(sleep, 0.0, timeout=5.0)
+            return time.perf_counter() - start
+
+    assert asyncio.run(main()) > 0.3
+
+    with pytest.raises(ValueError):
+        AsyncMeshKernel(max_abandoned_calls=0)
+
+
+def test_async_meshkernel_unknown_attribute():
+    """Tests only the public MeshKernel methods are exposed."""
+    async_mk = AsyncMeshKernel()
+
+    with pytest.raises(AttributeError):
+        async_mk.not_a_method
+    with pytest.raises(AttributeError):
+        async_mk._execute_function
@@ -13,6 +13,7 @@ from meshkernel import (
 )
 from meshkernel.c_structures import (
     CContacts,
+    CCurvilinearGrid,
     CGeometryList,
     CMesh1d,
     CMesh2d,
@@ -101,6 +102,41 @@ def test_cmesh2d_allocate_memory():
     assert mesh2d.face_y.size == 1
 
 
+def test_cmesh2d_allocate_memory_memmap(tmp_path):
+    """Tests `allocate_memory` of the `CMesh2D` class with memory-mapped arrays."""
+
+    c_mesh2d = CMesh2d()
+    c_mesh2d.num_nodes = 4
+    c_mesh2d.num_edges = 4
+    c_mesh2d.num_faces = 1
+    c_mesh2d.num_face_nodes = 4
+
+    mesh2d = c_mesh2d.allocate_memory(memmap_directory=tmp_path)
+
+    assert isinstance(mesh2d.node_x, np.memmap)
+    assert isinstance(mesh2d.face_edges, np.memmap)
+    assert mesh2d.edge_nodes.size == 8
+
+    # The kernel writes through the pointers straight into the files
+    as_array(c_mesh2d.node_x, (4,))[:] = [0.0, 1.0, 2.0, 3.0]
+    mesh2d.node_x.flush()
+    assert_array_equal(np.load(tmp_path / "mesh2d_node_x.npy"), [0.0, 1.0, 2.0, 3.0])
+
+
+def test_ccurvilineargrid_allocate_memory_memmap(tmp_path):
+    """Tests `allocate_memory` of the `CCurvilinearGrid` class with memory-mapped arrays."""
+
+    c_curvilinear_grid = CCurvilinearGrid()
+    c_curvilinear_grid.num_m = 3
+    c_curvilinear_grid.num_n = 2
+
+    curvilinear_grid = c_curvilinear_grid.allocate_memory(memmap_directory=tmp_path)
+
+    assert isinstance(curvilinear_grid.node_x, np.memmap)
+    assert curvilinear_grid.node_x.shape == (6,)
+    assert np.load(tmp_path / "curvilinear_grid_node_y.npy").shape == (2, 3)
+
+
 def test_cgeometrylist_from_geometrylist():
     """Tests `from_geometrylist` of the `CGeometryList` class."""
 
@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+from mesh2d_factory import Mesh2dFactory
+
+from meshkernel import CurvilinearGrid, GeometryList, MakeGridParameters, MeshKernel
+from meshkernel.cache import MeshCache
+
+
+def test_mesh_cache_put_get(tmp_path):
+    """Tests a stored mesh2d is read back with the same arrays."""
+    cache = MeshCache(str(tmp_path))
+    mesh2d = Mesh2dFactory.create(rows=3, columns=4)
+
+    assert cache.get("missing") is None
+    cache.put("key", mesh2d)
+    cached = cache.get("key")
+
+    np.testing.assert_array_equal(cached.node_x, mesh2d.node_x)
+    np.testing.assert_array_equal(cached.node_y, mesh2d.node_y)
+    np.testing.assert_array_equal(cached.edge_nodes, mesh2d.edge_nodes)
+    assert cache.total_bytes > 0
+
+
+def test_mesh_cache_evicts_least_recently_used(tmp_path):
+    """Tests the least recently used files are removed when the cache is too large."""
+    cache = MeshCache(str(tmp_path))
+    mesh2d = Mesh2dFactory.create(rows=3, columns=4)
+    cache.put("first", mesh2d)
+    size = cache.total_bytes
+    cache.put("second", mesh2d)
+
+    # Make "first" the most recently used
+    os.utime(os.path.join(str(tmp_path), "second.mkmesh"), (0, 0))
+    cache.get("first")
+
+    cache.max_bytes = size
+    cache.evict()
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.total_bytes == size
+
+
+def test_mesh_cache_call(tmp_path):
+    """Tests a repeated call is restored from the cache and a different call is not."""
+    cache = MeshCache(str(tmp_path))
+    make_grid_parameters = MakeGridParameters(num_columns=3, num_rows=2)
+
+    mk = MeshKernel()
+    assert not cache.call(mk, "mesh2d_make_rectangular_mesh", make_grid_parameters)
+    expected = mk.mesh2d_get()
+
+    mk = MeshKernel()
+    assert cache.call(mk, "mesh2d_make_rectangular_mesh", make_grid_parameters)
+    np.testing.assert_array_equal(mk.mesh2d_get().node_x, expected.node_x)
+
+    make_grid_parameters.num_rows = 3
+    assert not cache.call(mk, "mesh2d_make_rectangular_mesh", make_grid_parameters)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_mesh_cache_key_depends_on_arrays(tmp_path):
+    """Tests the key changes with the values of the input arrays."""
+    cache = MeshCache(str(tmp_path))
+    mk = MeshKernel()
+    polygon = GeometryList(
+        np.array([0.0, 1.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0, 0.0])
+    )
+    key = cache.key(mk, "mesh2d_make_triangular_mesh_from_polygon", polygon)
+
+    polygon.x_coordinates[1] = 2.0
+
+    assert key != cache.key(mk, "mesh2d_make_triangular_mesh_from_polygon", polygon)
+
+
+def test_mesh_cache_key_detects_in_place_edits_after_content_hash(tmp_path):
+    """Tests the key changes when an array is edited in place after its content hash was cached."""
+    cache = MeshCache(str(tmp_path))
+    mk = MeshKernel()
+    polygon = GeometryList(
+        np.array([0.0, 1.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0, 0.0])
+    )
+    polygon.content_hash()
+    key = cache.key(mk, "mesh2d_make_triangular_mesh_from_polygon", polygon)
+
+    polygon.x_coordinates[1] = 2.0
+
+    assert key != cache.key(mk, "mesh2d_make_triangular_mesh_from_polygon", polygon)
+
+
+def test_mesh_cache_put_get_curvilinear_grid(tmp_path):
+    """Tests a stored curvilinear grid is read back with the same nodes and dimensions."""
+    cache = MeshCache(str(tmp_path))
+    curvilinear_grid = CurvilinearGrid(
+        np.tile(np.arange(4.0), 3), np.repeat(np.arange(3.0), 4), num_m=4, num_n=3
+    )
+
+    cache.put("key", curvilinear_grid)
+    cached = cache.get("key")
+
+    assert isinstance(cached, CurvilinearGrid)
+    assert (cached.num_m, cached.num_n) == (4, 3)
+    np.testing.assert_array_equal(cached.node_x, curvilinear_grid.node_x)
+    np.testing.assert_array_equal(cached.node_y, curvilinear_grid.node_y)
+
+
+def test_mesh_cache_call_curvilinear(tmp_path):
+    """Tests a repeated curvilinear grid generation is restored from the cache with `curvilinear_set`."""
+    cache = MeshCache(str(tmp_path))
+    make_grid_parameters = MakeGridParameters(
+        origin_x=0.0,
+        origin_y=0.0,
+        upper_right_x=10.0,
+        upper_right_y=5.0,
+        block_size_x=1.0,
+        block_size_y=1.0,
+    )
+
+    mk = MeshKernel()
+    assert not cache.call(
+        mk, "curvilinear_compute_rectangular_grid_on_extension", make_grid_parameters
+    )
+    expected = mk.curvilineargrid_get()
+
+    mk = MeshKernel()
+    assert cache.call(
+        mk, "curvilinear_compute_rectangular_grid_on_extension", make_grid_parameters
+    )
+    curvilinear_grid = mk.curvilineargrid_get()
+
+    assert (curvilinear_grid.num_m, curvilinear_grid.num_n) == (
+        expected.num_m,
+        expected.num_n,
+    )
+    np.testing.assert_array_equal(curvilinear_grid.node_x, expected.node_x)
+    np.testing.assert_array_equal(curvilinear_grid.node_y, expected.node_y)
+    assert mk.mesh2d_get().node_x.size == 0
@@ -2,6 +2,7 @@ import numpy as np
 from pytest import approx
 
 from meshkernel import (
+    CurvilinearGrid,
     CurvilinearParameters,
     GeometryList,
     MakeGridParameters,
@@ -92,6 +93,21 @@ def create_meshkernel_instance_with_skewed_curvilinear_grid(num_columns=3, num_r
     return mk
 
 
+def test_curvilinear_set():
+    r"""Tests `curvilinear_set` sets the curvilinear grid of the state."""
+    mk = MeshKernel()
+    node_x, node_y = np.meshgrid(np.arange(4.0), 2.0 * np.arange(3.0))
+    curvilinear_grid = CurvilinearGrid(node_x.ravel(), node_y.ravel(), num_m=4, num_n=3)
+
+    mk.curvilinear_set(curvilinear_grid)
+
+    output_curvilinear = mk.curvilineargrid_get()
+    assert output_curvilinear.num_m == 4
+    assert output_curvilinear.num_n == 3
+    assert np.array_equal(output_curvilinear.node_x, curvilinear_grid.node_x)
+    assert np.array_equal(output_curvilinear.node_y, curvilinear_grid.node_y)
+
+
 def test_curvilinear_compute_transfinite_from_splines():
     r"""Tests `curvilinear_compute_transfinite_from_splines` generates a curvilinear grid."""
     mk = create_meshkernel_instance_with_curvilinear_grid()
@@ -0,0 +1,189 @@
+import numpy as np
+import pytest
+from mesh2d_factory import Mesh2dFactory
+
+from meshkernel import (
+    AveragingMethod,
+    GeometryList,
+    Mesh2dLocation,
+    MeshKernel,
+    OrthogonalizationParameters,
+    ProjectToLandBoundaryOption,
+)
+from meshkernel.decomposition import (
+    Tile,
+    interpolate_tiled,
+    make_tiles,
+    run_decomposed,
+)
+
+
+def orthogonalize_tile(mk: MeshKernel, tile: Tile):
+    """Orthogonalizes the faces of a tile."""
+    mk.mesh2d_compute_orthogonalization(
+        ProjectToLandBoundaryOption.DO_NOT_PROJECT_TO_LANDBOUNDARY,
+        OrthogonalizationParameters(outer_iterations=1),
+        GeometryList(),
+    )
+
+
+def keep_tile(mk: MeshKernel, tile: Tile):
+    """Leaves a tile unchanged."""
+
+
+def refine_tile(mk: MeshKernel, tile: Tile):
+    """Refines all faces of a tile."""
+    mk.mesh2d_casulli_refinement()
+
+
+def test_make_tiles():
+    """Tests the tiles cover the mesh and their halos overlap the neighbouring tiles."""
+    mesh2d = Mesh2dFactory.create(rows=4, columns=6)
+
+    tiles = make_tiles(mesh2d, num_x=3, num_y=2, halo_width=0.5)
+
+    assert [tile.index for tile in tiles] == list(range(6))
+    assert tiles[0].bounds[0] < 0.0 and tiles[0].bounds[1] < 0.0
+    assert tiles[-1].bounds[2] > 6.0 and tiles[-1].bounds[3] > 4.0
+    assert tiles[0].bounds[2] == pytest.approx(2.0)
+    assert tiles[1].halo_bounds[0] == pytest.approx(tiles[1].bounds[0] - 0.5)
+    assert tiles[0].halo_bounds[2] > tiles[1].bounds[0]
+
+    polygon = tiles[0].polygon
+    assert polygon.x_coordinates.size == 5
+    assert polygon.x_coordinates[0] == polygon.x_coordinates[-1]
+
+
+def test_make_tiles_invalid():
+    """Tests the number of tiles must be positive."""
+    mesh2d = Mesh2dFactory.create(rows=2, columns=2)
+
+    with pytest.raises(ValueError):
+        make_tiles(mesh2d, num_x=0, num_y=1)
+
+
+def test_run_decomposed_reassembles_mesh():
+    """Tests tiles processed without changes are stitched back into the original mesh."""
+    mesh2d = Mesh2dFactory.create(rows=6, columns=8)
+
+    result = run_decomposed(mesh2d, keep_tile, make_tiles(mesh2d, 2, 2), workers=2)
+
+    assert result.mesh2d.node_x.size == mesh2d.node_x.size
+    assert result.mesh2d.edge_nodes.size == mesh2d.edge_nodes.size
+    assert result.mesh2d.face_x.size == 48
+    assert len(result.batch.run_times) == 4
+
+
+def test_run_decomposed_orthogonalization():
+    """Tests a decomposed orthogonalization keeps the faces and the seams consistent."""
+    mesh2d = Mesh2dFactory.create(rows=10, columns=10)
+    mesh2d.node_x = mesh2d.node_x + 0.1 * np.sin(mesh2d.node_y)
+
+    result = run_decomposed(
+        mesh2d, orthogonalize_tile, make_tiles(mesh2d, 2, 1), workers=2
+    )
+
+    assert result.mesh2d.face_x.size == 100
+    assert result.mesh2d.node_x.size == mesh2d.node_x.size
+
+
+def test_run_decomposed_refinement():
+    """Tests tiles whose processing replaces the nodes are stitched back into the mesh refined at once."""
+    mesh2d = Mesh2dFactory.create(rows=6, columns=6)
+    mk = MeshKernel()
+    mk.mesh2d_set(mesh2d)
+    refine_tile(mk, None)
+    expected = mk.mesh2d_get()
+
+    result = run_decomposed(mesh2d, refine_tile, make_tiles(mesh2d, 2, 2), workers=2)
+
+    assert result.mesh2d.face_x.size == expected.face_x.size
+    assert result.mesh2d.node_x.size == expected.node_x.size
+    assert sorted(zip(result.mesh2d.node_x, result.mesh2d.node_y)) == sorted(
+        zip(expected.node_x, expected.node_y)
+    )
+
+
+@pytest.mark.parametrize("averaging_method", [None, AveragingMethod.SIMPLE_AVERAGING])
+def test_interpolate_tiled_matches_direct_interpolation(averaging_method):
+    """Tests the tiled interpolation gives the values of a single interpolation of all samples."""
+    mesh2d = Mesh2dFactory.create(rows=8, columns=8)
+    sample_x, sample_y = np.meshgrid(np.linspace(-1, 9, 41), np.linspace(-1, 9, 41))
+    samples = GeometryList(
+        x_coordinates=sample_x.ravel(),
+        y_coordinates=sample_y.ravel(),
+        values=(sample_x + 2.0 * sample_y).ravel(),
+    )
+
+    mk = MeshKernel()
+    mk.mesh2d_set(mesh2d)
+    if averaging_method is None:
+        expected = mk.mesh2d_triangulation_interpolation(samples, Mesh2dLocation.NODES)
+    else:
+        expected = mk.mesh2d_averaging_interpolation(
+            samples, Mesh2dLocation.NODES, averaging_method, 1.01, 1
+        )
+
+    result = interpolate_tiled(
+        mesh2d,
+        samples,
+        Mesh2dLocation.NODES,
+        num_x=2,
+        num_y=2,
+        averaging_method=averaging_method,
+        num_states=2,
+    )
+
+    assert np.allclose(result.interpolated.values, expected.values)
+    assert np.array_equal(result.interpolated.x_coordinates, expected.x_coordinates)
+    assert len(result.run_times) == 4
+    assert sum(result.num_samples) >= samples.x_coordinates.size
+    assert all(memory > 0 for memory in result.memory_estimate)
+    assert all(
+        num_locations < mesh2d.node_x.size for num_locations in result.num_locations
+    )
+
+
+@pytest.mark.parametrize("location_type", [Mesh2dLocation.EDGES, Mesh2dLocation.FACES])
+def test_interpolate_tiled_locations(location_type):
+    """Tests the tiled interpolation on edges and faces gives the values of a single interpolation."""
+    mesh2d = Mesh2dFactory.create(rows=8, columns=8)
+    sample_x, sample_y = np.meshgrid(np.linspace(-1, 9, 41), np.linspace(-1, 9, 41))
+    samples = GeometryList(
+        x_coordinates=sample_x.ravel(),
+        y_coordinates=sample_y.ravel(),
+        values=(sample_x + 2.0 * sample_y).ravel(),
+    )
+
+    mk = MeshKernel()
+    mk.mesh2d_set(mesh2d)
+    expected = mk.mesh2d_triangulation_interpolation(samples, location_type)
+
+    result = interpolate_tiled(
+        mesh2d, samples, location_type, num_x=2, num_y=2, num_states=2
+    )
+
+    assert np.allclose(result.interpolated.values, expected.values)
+
+
+def test_interpolate_tiled_invalid_value():
+    """Tests the locations without samples around them take the given invalid value."""
+    mesh2d = Mesh2dFactory.create(rows=4, columns=4)
+    samples = GeometryList(
+        x_coordinates=np.array([100.0, 101.0, 100.0]),
+        y_coordinates=np.array([100.0, 100.0, 101.0]),
+        values=np.array([1.0, 2.0, 3.0]),
+    )
+
+    result = interpolate_tiled(
+        mesh2d,
+        samples,
+        Mesh2dLocation.NODES,
+        num_x=2,
+        num_y=1,
+        num_states=1,
+        float_invalid_value=-1234.0,
+    )
+
+    assert result.interpolated.values.size == 25
+    assert np.all(result.interpolated.values == -1234.0)
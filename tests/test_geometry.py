@@ -0,0 +1,337 @@
+import numpy as np
+import pytest
+
+from meshkernel import GeometryList, Mesh1d, Mesh2d
+from meshkernel.geometry import (
+    clip_geometry_list,
+    clip_to_extent,
+    mesh1d_from_polylines,
+    simplify_geometry_list,
+    thin_samples,
+    thin_to_resolution,
+)
+
+
+def noisy_circle(radius, num_points, noise, center=(0.0, 0.0), seed=0):
+    """Gets the coordinates of a closed circle with radial noise."""
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0.0, 2.0 * np.pi, num_points, endpoint=False)
+    radii = radius + noise * rng.uniform(-1.0, 1.0, num_points)
+    x = center[0] + radii * np.cos(angles)
+    y = center[1] + radii * np.sin(angles)
+    return np.append(x, x[0]), np.append(y, y[0])
+
+
+def test_simplify_polyline():
+    """Tests the collinear and nearly collinear vertices of a polyline are removed."""
+    geometry_list = GeometryList(
+        x_coordinates=np.array([0.0, 1.0, 2.0, 3.0, 4.0, 4.0]),
+        y_coordinates=np.array([0.0, 0.01, -0.01, 0.0, 0.0, 3.0]),
+        values=np.arange(6.0),
+    )
+
+    simplified = geometry_list.simplify(0.1)
+
+    assert simplified.x_coordinates.tolist() == [0.0, 4.0, 4.0]
+    assert simplified.y_coordinates.tolist() == [0.0, 0.0, 3.0]
+    assert simplified.values.tolist() == [0.0, 4.0, 5.0]
+
+
+def test_simplify_keeps_separators():
+    """Tests the rings are simplified separately and the separators are kept."""
+    outer_x, outer_y = noisy_circle(10.0, 500, 0.01)
+    hole_x, hole_y = noisy_circle(2.0, 200, 0.01)
+    other_x, other_y = noisy_circle(1.0, 100, 0.01, center=(30.0, 0.0))
+    geometry_list = GeometryList(
+        x_coordinates=np.concatenate((outer_x, [-998.0], hole_x, [-999.0], other_x)),
+        y_coordinates=np.concatenate((outer_y, [-998.0], hole_y, [-999.0], other_y)),
+    )
+
+    simplified = geometry_list.simplify(0.1)
+
+    x = simplified.x_coordinates
+    assert np.count_nonzero(x == -998.0) == 1
+    assert np.count_nonzero(x == -999.0) == 1
+    assert x.size < geometry_list.x_coordinates.size // 5
+
+    # The rings stay closed and within the tolerance of the original circles
+    rings = np.split(np.arange(x.size), np.flatnonzero(x < -900.0))
+    for ring, radius, center in zip(rings, [10.0, 2.0, 1.0], [0.0, 0.0, 30.0]):
+        ring = ring[x[ring] > -900.0]
+        assert x[ring[0]] == x[ring[-1]]
+        distances = np.hypot(x[ring] - center, simplified.y_coordinates[ring])
+        assert np.all(np.abs(distances - radius) <= 0.011)
+
+
+def test_simplify_preserve_topology():
+    """Tests small closed rings are kept as triangles, or removed with their holes without preserving the topology."""
+    small_x, small_y = noisy_circle(0.01, 20, 0.0)
+    hole_x, hole_y = noisy_circle(0.005, 20, 0.0)
+    large_x, large_y = noisy_circle(10.0, 50, 0.0, center=(30.0, 0.0))
+    geometry_list = GeometryList(
+        x_coordinates=np.concatenate((small_x, [-998.0], hole_x, [-999.0], large_x)),
+        y_coordinates=np.concatenate((small_y, [-998.0], hole_y, [-999.0], large_y)),
+    )
+
+    preserved = geometry_list.simplify(1.0)
+    x = preserved.x_coordinates
+    assert x.tolist().count(-998.0) == 1 and x.tolist().count(-999.0) == 1
+    assert np.flatnonzero(x == -998.0)[0] == 4
+
+    removed = geometry_list.simplify(1.0, preserve_topology=False)
+    assert np.all(removed.x_coordinates > 0.0)
+    assert removed.x_coordinates.size >= 4
+
+
+def test_simplify_auto_tolerance():
+    """Tests the automatic tolerance is derived from the mesh2d edge lengths."""
+    mesh2d = Mesh2d(
+        node_x=np.array([0.0, 2.0, 2.0, 0.0]),
+        node_y=np.array([0.0, 0.0, 2.0, 2.0]),
+        edge_nodes=np.array([0, 1, 1, 2, 2, 3, 3, 0]),
+    )
+    geometry_list = GeometryList(
+        x_coordinates=np.array([0.0, 1.0, 2.0]),
+        y_coordinates=np.array([0.0, 0.6, 0.0]),
+    )
+
+    assert geometry_list.simplify("auto", mesh2d=mesh2d).x_coordinates.tolist() == [
+        0.0,
+        1.0,
+        2.0,
+    ]
+    assert simplify_geometry_list(geometry_list, 0.7).x_coordinates.tolist() == [
+        0.0,
+        2.0,
+    ]
+
+    with pytest.raises(ValueError):
+        geometry_list.simplify("auto")
+    with pytest.raises(ValueError):
+        geometry_list.simplify(-1.0)
+
+
+def test_simplify_empty():
+    """Tests an empty geometry list stays empty."""
+    assert GeometryList().simplify(1.0).x_coordinates.size == 0
+
+
+def test_clip_polygons():
+    """Tests the polygons are clipped to the rectangle, with their holes, and the polygons outside are removed."""
+    geometry_list = GeometryList(
+        x_coordinates=np.array(
+            [0, 10, 10, 0, 0, -998, 4, 6, 6, 4, 4, -999, 30, 31, 31, 30],
+            dtype=np.double,
+        ),
+        y_coordinates=np.array(
+            [0, 0, 10, 10, 0, -998, 4, 4, 6, 6, 4, -999, 0, 0, 1, 1], dtype=np.double
+        ),
+    )
+
+    clipped = clip_geometry_list(geometry_list, (5.0, -1.0, 20.0, 20.0))
+
+    x, y = clipped.x_coordinates, clipped.y_coordinates
+    assert np.count_nonzero(x == -998.0) == 1
+    assert np.count_nonzero(x == -999.0) == 0
+    outer = np.flatnonzero(x == -998.0)[0]
+    assert sorted(set(zip(x[:outer].tolist(), y[:outer].tolist()))) == [
+        (5.0, 0.0),
+        (5.0, 10.0),
+        (10.0, 0.0),
+        (10.0, 10.0),
+    ]
+    # The clipped rings stay closed
+    assert (x[0], y[0]) == (x[outer - 1], y[outer - 1])
+    assert x[outer + 1 :].min() == 5.0 and x[outer + 1 :].max() == 6.0
+
+
+def test_clip_polylines():
+    """Tests the polylines are cut into the parts inside the rectangle."""
+    geometry_list = GeometryList(
+        x_coordinates=np.array(
+            [-5, 0, 5, 10, 15, -999, 3, 3, -999, 0, 9], dtype=np.double
+        ),
+        y_coordinates=np.array(
+            [0, 0, 0, 0, 0, -999, -5, 5, -999, 5, 5], dtype=np.double
+        ),
+    )
+
+    clipped = clip_geometry_list(geometry_list, (1.0, -1.0, 8.0, 1.0), polygons=False)
+
+    assert clipped.x_coordinates.tolist() == [1.0, 5.0, 8.0, -999.0, 3.0, 3.0]
+    assert clipped.y_coordinates.tolist() == [0.0, 0.0, 0.0, -999.0, -1.0, 1.0]
+
+
+def test_clip_polygons_spherical():
+    """Tests the polygons intersecting the rectangle shifted by 360 degrees are kept in spherical coordinates."""
+    geometry_list = GeometryList(
+        x_coordinates=np.array([-178.0, -176.0, -176.0, -178.0]),
+        y_coordinates=np.array([0.0, 0.0, 2.0, 2.0]),
+    )
+    bounds = (170.0, -10.0, 185.0, 10.0)
+
+    assert clip_geometry_list(geometry_list, bounds).x_coordinates.size == 0
+    kept = clip_geometry_list(geometry_list, bounds, spherical=True)
+    assert kept.x_coordinates.tolist() == geometry_list.x_coordinates.tolist()
+
+
+def test_clip_to_extent_cached():
+    """Tests the clipped geometries are cached while the extent stays within the margin,
+    and the geometries are kept when nothing is left after clipping."""
+    x_coordinates, y_coordinates = noisy_circle(100.0, 1000, 0.0)
+    geometry_list = GeometryList(
+        x_coordinates=x_coordinates, y_coordinates=y_coordinates
+    )
+
+    clipped = clip_to_extent(geometry_list, (90.0, -10.0, 110.0, 10.0))
+    assert clipped.x_coordinates.size < 100
+    assert clipped.x_coordinates.min() >= 88.0
+    assert clip_to_extent(geometry_list, (90.5, -10.0, 110.0, 10.0)) is clipped
+    assert clip_to_extent(geometry_list, (90.0, -10.0, 150.0, 10.0)) is not clipped
+
+    far = clip_to_extent(geometry_list, (1000.0, 1000.0, 1010.0, 1010.0))
+    assert far is geometry_list
+
+
+def test_thin_samples_reducers():
+    """Tests each reducer keeps one representative sample per occupied cell."""
+    samples = GeometryList(
+        x_coordinates=np.array([0.1, 0.2, 0.9, 1.5, 1.6]),
+        y_coordinates=np.array([0.1, 0.8, 0.5, 0.5, 0.6]),
+        values=np.array([1.0, 2.0, 6.0, 10.0, np.nan]),
+    )
+
+    mean = thin_samples(samples, 1.0, "mean")
+    assert mean.num_samples_before == 5
+    assert mean.num_samples_after == 2
+    assert mean.reduction_ratio == 2.5
+    assert np.allclose(mean.samples.values, [3.0, 10.0])
+    assert np.allclose(mean.samples.x_coordinates, [0.4, 1.5])
+
+    assert thin_samples(samples, 1.0, "median").samples.values.tolist() == [2.0, 10.0]
+    assert thin_samples(samples, 1.0, "min").samples.values.tolist() == [1.0, 10.0]
+    assert thin_samples(samples, 1.0, "max").samples.values.tolist() == [6.0, 10.0]
+
+    # The cell centers are (0.6, 0.6) and (1.6, 0.6)
+    closest = thin_samples(samples, 1.0, "closest").samples
+    assert closest.x_coordinates.tolist() == [0.9, 1.5]
+    assert closest.values.tolist() == [6.0, 10.0]
+
+    with pytest.raises(ValueError):
+        thin_samples(samples, 1.0, "mode")
+    with pytest.raises(ValueError):
+        thin_samples(
+            GeometryList(samples.x_coordinates, samples.y_coordinates), 1.0, "max"
+        )
+
+
+def test_thin_samples_auto_and_method():
+    """Tests the automatic cell size and `GeometryList.thin`."""
+    rng = np.random.default_rng(0)
+    samples = GeometryList(
+        x_coordinates=rng.uniform(0.0, 10.0, 10000),
+        y_coordinates=rng.uniform(0.0, 10.0, 10000),
+        values=rng.uniform(-5.0, 0.0, 10000),
+    )
+    mesh2d = Mesh2d(
+        node_x=np.array([0.0, 4.0, 4.0]),
+        node_y=np.array([0.0, 0.0, 4.0]),
+        edge_nodes=np.array([0, 1, 1, 2, 2, 0]),
+    )
+
+    thinning = thin_samples(samples, "auto", mesh2d=mesh2d)
+    assert thinning.cell_size == 1.0
+    assert thinning.num_samples_after == 100
+
+    thinned = samples.thin(1.0, "closest")
+    assert thinned.x_coordinates.size == 100
+    assert np.all(np.isin(thinned.values, samples.values))
+
+
+def test_thin_to_resolution():
+    """Tests the samples are only thinned when they are much denser than the mesh resolution."""
+    rng = np.random.default_rng(0)
+    samples = GeometryList(
+        x_coordinates=rng.uniform(0.0, 10.0, 1000),
+        y_coordinates=rng.uniform(0.0, 10.0, 1000),
+        values=rng.uniform(-5.0, 0.0, 1000),
+    )
+
+    assert thin_to_resolution(samples, 1.0) is samples
+    assert thin_to_resolution(samples, 4.0).x_coordinates.size <= 121
+
+
+def test_mesh1d_from_polylines():
+    """Tests the polylines are discretized at the spacing and joined at their identical endpoints."""
+    polylines = GeometryList(
+        x_coordinates=np.array([0.0, 10.0, -999.0, 10.0, 10.0, 20.0, -999.0, 3.0, 3.0]),
+        y_coordinates=np.array([0.0, 0.0, -999.0, 0.0, 10.0, 10.0, -999.0, 3.0, 3.0]),
+    )
+
+    mesh1d = Mesh1d.from_polylines(polylines, 3.0)
+
+    # 4 edges of 2.5 along the first polyline, 7 edges of 20 / 7 along the second,
+    # sharing the node at (10, 0); the zero-length polyline is dropped
+    assert mesh1d.node_x.size == 12
+    assert mesh1d.edge_nodes.size == 2 * 11
+    assert np.allclose(mesh1d.node_x[:5], [0.0, 2.5, 5.0, 7.5, 10.0])
+    assert mesh1d.edge_nodes.reshape(-1, 2)[4].tolist() == [4, 5]
+    edges = mesh1d.edge_nodes.reshape(-1, 2)
+    lengths = np.hypot(
+        mesh1d.node_x[edges[:, 1]] - mesh1d.node_x[edges[:, 0]],
+        mesh1d.node_y[edges[:, 1]] - mesh1d.node_y[edges[:, 0]],
+    )
+    assert np.all(lengths <= 3.0 + 1e-12)
+    assert np.allclose(mesh1d.node_y[-1], 10.0)
+
+
+@pytest.mark.parametrize(
+    "x, y",
+    [
+        ([], []),
+        ([5.0], [5.0]),
+        ([1.0, 1.0, -999.0, 2.0], [1.0, 1.0, -999.0, 2.0]),
+    ],
+)
+def test_mesh1d_from_polylines_empty(x, y):
+    """Tests polylines without any length give an empty network."""
+    polylines = GeometryList(
+        x_coordinates=np.array(x, dtype=np.double),
+        y_coordinates=np.array(y, dtype=np.double),
+    )
+
+    mesh1d = Mesh1d.from_polylines(polylines, 1.0)
+
+    assert mesh1d.node_x.size == 0
+    assert mesh1d.node_y.size == 0
+    assert mesh1d.edge_nodes.size == 0
+
+
+def test_mesh1d_from_polylines_snapping():
+    """Tests the endpoints closer than the snap tolerance are merged, transitively, at their mean position."""
+    polylines = GeometryList(
+        x_coordinates=np.array(
+            [0.0, 10.0, -999.0, 10.05, 10.05, -999.0, 10.1, 20.0, -999.0, 30.0, 40.0]
+        ),
+        y_coordinates=np.array(
+            [0.0, 0.0, -999.0, 0.0, -10.0, -999.0, 0.0, 0.0, -999.0, 0.0, 0.0]
+        ),
+    )
+
+    unsnapped = mesh1d_from_polylines(polylines, 100.0)
+    assert unsnapped.node_x.size == 8
+
+    snapped = mesh1d_from_polylines(polylines, 100.0, snap_tolerance=0.06)
+    assert snapped.node_x.size == 6
+    assert snapped.edge_nodes.reshape(-1, 2).tolist() == [
+        [0, 1],
+        [1, 2],
+        [1, 3],
+        [4, 5],
+    ]
+    assert np.isclose(snapped.node_x[1], 10.05)
+
+    with pytest.raises(ValueError):
+        mesh1d_from_polylines(polylines, 0.0)
+    with pytest.raises(ValueError):
+        mesh1d_from_polylines(polylines, 1.0, snap_tolerance=-1.0)
@@ -0,0 +1,232 @@
+import json
+import struct
+from io import StringIO
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+import meshkernel.io
+from meshkernel import GeometryList, Mesh2d
+from meshkernel.errors import InputError
+from meshkernel.io import (
+    GeometryType,
+    geojson_to_geometrylist,
+    geometrylist_to_geojson,
+    geometrylist_to_wkb,
+    mesh2d_faces_to_geojson,
+    mesh2d_faces_to_wkb,
+    split_wkb,
+    wkb_to_geometrylist,
+    write_geojson,
+)
+
+
+def create_mesh2d() -> Mesh2d:
+    """Creates a mesh2d with a quadrilateral and a triangle."""
+    return Mesh2d(
+        node_x=np.array([0.0, 1.0, 1.0, 0.0, 2.0], dtype=np.double),
+        node_y=np.array([0.0, 0.0, 1.0, 1.0, 0.0], dtype=np.double),
+        edge_nodes=np.array([0, 1, 1, 2, 2, 3, 3, 0, 1, 4, 4, 2], dtype=np.int32),
+        face_nodes=np.array([0, 1, 2, 3, 1, 4, 2], dtype=np.int32),
+        nodes_per_face=np.array([4, 3], dtype=np.int32),
+    )
+
+
+def create_polygons() -> GeometryList:
+    """Creates two polygons, the first one with a hole."""
+    x = np.array([0.0, 4.0, 4.0, 0.0, -998.0, 1.0, 2.0, 2.0, -999.0, 5.0, 6.0, 6.0])
+    y = np.array([0.0, 0.0, 4.0, 4.0, -998.0, 1.0, 1.0, 2.0, -999.0, 5.0, 5.0, 6.0])
+    return GeometryList(x_coordinates=x, y_coordinates=y)
+
+
+def test_mesh2d_faces_to_wkb():
+    """Tests `mesh2d_faces_to_wkb` encodes each face as a closed polygon."""
+    buffer, offsets = mesh2d_faces_to_wkb(create_mesh2d())
+
+    assert_array_equal(offsets, [0, 9 + 4 + 5 * 16, 2 * 9 + 2 * 4 + 9 * 16])
+
+    triangle = bytes(buffer[offsets[1] : offsets[2]])
+    assert struct.unpack_from("<BIII", triangle) == (1, 3, 1, 4)
+    coordinates = struct.unpack_from("<8d", triangle, 13)
+    assert coordinates == (1.0, 0.0, 2.0, 0.0, 1.0, 1.0, 1.0, 0.0)
+
+
+def test_mesh2d_faces_to_wkb_roundtrip():
+    """Tests the faces encoded by `mesh2d_faces_to_wkb` are decoded as separated closed rings."""
+    geometry_list = wkb_to_geometrylist(mesh2d_faces_to_wkb(create_mesh2d()))
+
+    assert_array_equal(
+        geometry_list.x_coordinates,
+        [0.0, 1.0, 1.0, 0.0, 0.0, -999.0, 1.0, 2.0, 1.0, 1.0],
+    )
+    assert_array_equal(
+        geometry_list.y_coordinates,
+        [0.0, 0.0, 1.0, 1.0, 0.0, -999.0, 0.0, 0.0, 1.0, 0.0],
+    )
+
+
+def test_geometrylist_to_wkb_polygons_roundtrip():
+    """Tests polygons with holes are closed and preserve their separators."""
+    buffer, offsets = geometrylist_to_wkb(create_polygons(), GeometryType.POLYGON)
+
+    assert offsets.size == 3
+    geometry_list = wkb_to_geometrylist(list(split_wkb(buffer, offsets)))
+
+    assert_array_equal(
+        geometry_list.x_coordinates,
+        [
+            0.0,
+            4.0,
+            4.0,
+            0.0,
+            0.0,
+            -998.0,
+            1.0,
+            2.0,
+            2.0,
+            1.0,
+            -999.0,
+            5.0,
+            6.0,
+            6.0,
+            5.0,
+        ],
+    )
+
+
+def test_geometrylist_to_wkb_points_roundtrip():
+    """Tests points are encoded one feature per coordinate and decoded without separators."""
+    buffer, offsets = geometrylist_to_wkb(create_polygons(), GeometryType.POINT)
+
+    assert_array_equal(np.diff(offsets), np.full(10, 21))
+    geometry_list = wkb_to_geometrylist((buffer, offsets))
+    assert_array_equal(
+        geometry_list.x_coordinates, [0.0, 4.0, 4.0, 0.0, 1.0, 2.0, 2.0, 5.0, 6.0, 6.0]
+    )
+
+
+def test_wkb_to_geometrylist_big_endian_multipolygon():
+    """Tests `wkb_to_geometrylist` decodes big-endian multi-part geometries."""
+
+    def polygon(points):
+        ring = struct.pack(">I", len(points))
+        ring += b"".join(struct.pack(">dd", *point) for point in points)
+        return b"\x00" + struct.pack(">II", 3, 1) + ring
+
+    multipolygon = b"\x00" + struct.pack(">II", 6, 2)
+    multipolygon += polygon([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (0.0, 0.0)])
+    multipolygon += polygon([(5.0, 5.0), (6.0, 5.0), (5.0, 6.0), (5.0, 5.0)])
+    point = b"\x01" + struct.pack("<Idd", 1, 9.0, 9.0)
+
+    geometry_list = wkb_to_geometrylist([multipolygon, point])
+
+    assert_array_equal(
+        geometry_list.x_coordinates,
+        [0.0, 1.0, 0.0, 0.0, -999.0, 5.0, 6.0, 5.0, 5.0, -999.0, 9.0],
+    )
+
+
+def test_wkb_to_geometrylist_unsupported_type():
+    """Tests `wkb_to_geometrylist` raises for geometry types it cannot decode."""
+    collection = b"\x01" + struct.pack("<II", 7, 0)
+
+    with pytest.raises(InputError):
+        wkb_to_geometrylist([collection])
+
+
+def test_mesh2d_faces_to_geojson():
+    """Tests `mesh2d_faces_to_geojson` yields valid features with the face values."""
+    features = [
+        json.loads(feature)
+        for feature in mesh2d_faces_to_geojson(create_mesh2d(), np.array([1.5, 2.5]))
+    ]
+
+    assert len(features) == 2
+    assert features[1]["geometry"] == {
+        "type": "Polygon",
+        "coordinates": [[[1.0, 0.0], [2.0, 0.0], [1.0, 1.0], [1.0, 0.0]]],
+    }
+    assert features[1]["properties"] == {"index": 1, "value": 2.5}
+
+
+def test_mesh2d_faces_skip_empty_faces():
+    """Tests faces without nodes are skipped by the WKB and GeoJSON encoders."""
+    mesh2d = create_mesh2d()
+    mesh2d.nodes_per_face = np.array([4, 0, 3], dtype=np.int32)
+
+    buffer, offsets = mesh2d_faces_to_wkb(mesh2d)
+    geometry_list = wkb_to_geometrylist(list(split_wkb(buffer, offsets)))
+    assert np.count_nonzero(geometry_list.x_coordinates == -999.0) == 1
+
+    features = [
+        json.loads(feature)
+        for feature in mesh2d_faces_to_geojson(mesh2d, np.array([1.5, 2.0, 2.5]))
+    ]
+    assert len(features) == 2
+    assert features[1]["properties"] == {"index": 2, "value": 2.5}
+
+
+def test_mesh2d_faces_to_geojson_non_finite():
+    """Tests `mesh2d_faces_to_geojson` raises for values JSON cannot represent,
+    before any feature is produced."""
+    mesh2d = create_mesh2d()
+    with pytest.raises(InputError):
+        mesh2d_faces_to_geojson(mesh2d, np.array([1.5, np.nan]))
+
+    mesh2d.node_x[4] = np.inf
+    with pytest.raises(InputError):
+        mesh2d_faces_to_geojson(mesh2d)
+
+
+def test_geometrylist_to_geojson_chunks(monkeypatch):
+    """Tests the features are the same whatever the number of features formatted together."""
+    points = GeometryList(
+        x_coordinates=np.arange(7, dtype=np.double),
+        y_coordinates=np.arange(7, dtype=np.double) * 2.0,
+        values=np.arange(7, dtype=np.double) + 0.5,
+    )
+    expected = list(geometrylist_to_geojson(points, GeometryType.POINT))
+    expected_polygons = list(
+        geometrylist_to_geojson(create_polygons(), GeometryType.POLYGON)
+    )
+
+    monkeypatch.setattr(meshkernel.io, "_GEOJSON_CHUNK_SIZE", 3)
+    assert list(geometrylist_to_geojson(points, GeometryType.POINT)) == expected
+    monkeypatch.setattr(meshkernel.io, "_GEOJSON_CHUNK_SIZE", 1)
+    assert (
+        list(geometrylist_to_geojson(create_polygons(), GeometryType.POLYGON))
+        == expected_polygons
+    )
+    assert json.loads(expected[6])["properties"] == {"index": 6, "value": 6.5}
+
+
+def test_geometrylist_to_geojson_roundtrip():
+    """Tests polygons written as a GeoJSON feature collection are read back."""
+    stream = StringIO()
+    count = write_geojson(
+        geometrylist_to_geojson(create_polygons(), GeometryType.POLYGON), stream
+    )
+
+    assert count == 2
+    geometry_list = geojson_to_geometrylist(json.loads(stream.getvalue()))
+    assert_array_equal(
+        geometry_list.x_coordinates,
+        [
+            0.0,
+            4.0,
+            4.0,
+            0.0,
+            0.0,
+            -998.0,
+            1.0,
+            2.0,
+            2.0,
+            1.0,
+            -999.0,
+            5.0,
+            6.0,
+            6.0,
+            5.0,
+        ],
+    )
@@ -0,0 +1,89 @@
+import ctypes
+import gc
+
+import numpy as np
+import pytest
+from mesh2d_factory import Mesh2dFactory
+
+from meshkernel import GeometryList, GriddedSamples, Mesh2d, MeshKernel, ZeroCopyError
+from meshkernel.c_structures import CGeometryList, CGriddedSamples, CMesh2d
+from meshkernel.marshalling import as_contiguous_array, copy_accounting
+
+
+def test_copy_accounting_records_constructor_copies():
+    """Tests the constructors record a copy only for the inputs not already arrays of the right dtype."""
+    with copy_accounting() as accounting:
+        GeometryList(
+            x_coordinates=np.array([0.0, 1.0]),
+            y_coordinates=[0.0, 1.0],
+            values=np.array([1, 2], dtype=np.int64),
+        )
+
+    assert len(accounting.conversions) == 3
+    assert [copy.label for copy in accounting.copies] == [
+        "GeometryList.y_coordinates",
+        "GeometryList.values",
+    ]
+    assert accounting.copied_bytes == 32
+
+
+def test_marshalling_copies_at_most_once():
+    """Tests a non-contiguous array is copied once when marshalled, and correct arrays are not copied."""
+    node_x = np.arange(8.0)[::2]
+    mesh2d = Mesh2d(node_x=node_x, node_y=np.zeros(4))
+
+    with copy_accounting() as accounting:
+        c_mesh2d = CMesh2d.from_mesh2d(mesh2d)
+
+    assert [copy.label for copy in accounting.copies] == ["Mesh2d.node_x"]
+    assert accounting.copies[0].reason == "not contiguous"
+    assert [c_mesh2d.node_x[index] for index in range(4)] == [0.0, 2.0, 4.0, 6.0]
+
+    contiguous = Mesh2d(node_x=np.arange(4.0), node_y=np.zeros(4))
+    with copy_accounting(strict=True) as accounting:
+        CMesh2d.from_mesh2d(contiguous)
+        CGeometryList.from_geometrylist(GeometryList(np.zeros(3), np.ones(3)))
+    assert accounting.copies == []
+
+
+def test_strict_zero_copy_raises():
+    """Tests a strict accounting raises instead of copying, also when nested in a non-strict one."""
+    with copy_accounting() as outer:
+        with pytest.raises(ZeroCopyError):
+            with copy_accounting(strict=True):
+                as_contiguous_array(np.zeros(4)[::2], np.double, "strided")
+        as_contiguous_array(np.zeros(4)[::2], np.double, "strided")
+
+    assert len(outer.copies) == 1
+    with pytest.raises(ZeroCopyError):
+        with copy_accounting(strict=True):
+            Mesh2d(node_x=[0.0], node_y=[0.0])
+
+
+def test_gridded_samples_copied_values_stay_alive():
+    """Tests the copy of non-contiguous gridded sample values lives as long as the C structure."""
+    gridded_samples = GriddedSamples(
+        num_x=2,
+        num_y=2,
+        cell_size=1.0,
+        values=np.arange(8, dtype=np.float32),
+    )
+    gridded_samples.values = gridded_samples.values[::2]
+
+    c_gridded_samples = CGriddedSamples.from_griddedSamples(gridded_samples)
+    del gridded_samples
+    gc.collect()
+
+    values = ctypes.cast(c_gridded_samples.values, ctypes.POINTER(ctypes.c_float))
+    assert [values[index] for index in range(4)] == [0.0, 2.0, 4.0, 6.0]
+
+
+def test_meshkernel_strict_zero_copy():
+    """Tests a MeshKernel with `strict_zero_copy` rejects inputs needing a copy, and accepts the others."""
+    mk = MeshKernel(strict_zero_copy=True)
+    mesh2d = Mesh2dFactory.create(2, 2)
+    mk.mesh2d_set(mesh2d)
+
+    mesh2d.node_x = np.repeat(mesh2d.node_x, 2)[::2]
+    with pytest.raises(ZeroCopyError):
+        mk.mesh2d_set(mesh2d)
@@ -531,6 +531,41 @@ def test_mesh2d_delete_small_polygon(
     assert mesh2d.face_x.size == exp_faces
 
 
+@pytest.mark.parametrize(
+    "invert_deletion, delete_option, exp_nodes, exp_edges, exp_faces",
+    cases_mesh2d_delete_small_polygon,
+)
+def test_mesh2d_delete_small_polygon_clipped(
+    meshkernel_with_mesh2d: MeshKernel,
+    invert_deletion: bool,
+    delete_option: DeleteMeshOption,
+    exp_nodes: int,
+    exp_edges: int,
+    exp_faces: int,
+):
+    """Test `mesh2d_delete` with `clip_geometries` gives the same result as without,
+    with a polygon crossing the mesh extent and a polygon far away from the mesh."""
+    mk = meshkernel_with_mesh2d(5, 5)
+    mk.clip_geometries = True
+
+    x_coordinates = np.array(
+        [1.5, 3.5, 3.5, 1.5, 1.5, -999.0, 1000.0, 1001.0, 1001.0, 1000.0, 1000.0],
+        dtype=np.double,
+    )
+    y_coordinates = np.array(
+        [1.5, 1.5, 3.5, 3.5, 1.5, -999.0, 1000.0, 1000.0, 1001.0, 1001.0, 1000.0],
+        dtype=np.double,
+    )
+    geometry_list = GeometryList(x_coordinates, y_coordinates)
+
+    mk.mesh2d_delete(geometry_list, delete_option, invert_deletion)
+    mesh2d = mk.mesh2d_get()
+
+    assert mesh2d.node_x.size == exp_nodes
+    assert mesh2d.edge_x.size == exp_edges
+    assert mesh2d.face_x.size == exp_faces
+
+
 cases_mesh2d_delete_empty_polygon = [(False, 0, 0, 0), (True, 25, 40, 16)]
 
 
@@ -1050,6 +1085,62 @@ def test_mesh2d_refine_based_on_polygon(
     assert mesdh2d.face_x.size == exp_faces
 
 
+def test_mesh2d_refine_regions(meshkernel_with_mesh2d: MeshKernel):
+    """Tests `mesh2d_refine_regions` with `order` refines each region, the coarsest first,
+    and reports the face growth.
+
+    6---7---8
+    |   |   |
+    3---4---5
+    |   |   |
+    0---1---2
+    """
+
+    mk = meshkernel_with_mesh2d(2, 2)
+
+    whole = GeometryList(
+        np.array([0.0, 0.0, 2.0, 2.0, 0.0], dtype=np.double),
+        np.array([0.0, 2.0, 2.0, 0.0, 0.0], dtype=np.double),
+    )
+    corner = GeometryList(
+        np.array([-0.1, -0.1, 0.6, 0.6, -0.1], dtype=np.double),
+        np.array([-0.1, 0.6, 0.6, -0.1, -0.1], dtype=np.double),
+    )
+    coarse = MeshRefinementParameters(True, False, 0.5, 1, True, False, 1)
+    fine = MeshRefinementParameters(True, False, 0.1, 1, True, False, 1)
+
+    refinements = mk.mesh2d_refine_regions(
+        [(corner, fine), (whole, coarse)], order=True
+    )
+
+    assert [refinement.region_index for refinement in refinements] == [1, 0]
+    assert refinements[0].num_faces_before == 4
+    assert refinements[0].num_faces_after == 16
+    assert refinements[1].num_faces_before == 16
+    assert refinements[1].faces_added > 0
+    assert mk.mesh2d_get().face_x.size == refinements[1].num_faces_after
+    # The parameters of the caller are not modified
+    assert coarse.connect_hanging_nodes and fine.connect_hanging_nodes
+
+
+def test_mesh2d_refine_regions_keeps_given_order(meshkernel_with_mesh2d: MeshKernel):
+    """Tests `mesh2d_refine_regions` refines the regions in the given order by default."""
+    mk = meshkernel_with_mesh2d(2, 2)
+
+    corner = GeometryList(
+        np.array([-0.1, -0.1, 0.6, 0.6, -0.1], dtype=np.double),
+        np.array([-0.1, 0.6, 0.6, -0.1, -0.1], dtype=np.double),
+    )
+    coarse = MeshRefinementParameters(True, False, 0.5, 1, True, False, 1)
+    fine = MeshRefinementParameters(True, False, 0.1, 1, True, False, 1)
+
+    refinements = mk.mesh2d_refine_regions([(corner, fine), (corner, coarse)])
+
+    assert [refinement.region_index for refinement in refinements] == [0, 1]
+    assert refinements[0].num_faces_before == 4
+    assert refinements[1].num_faces_before == refinements[0].num_faces_after
+
+
 def test_remove_disconnected_regions():
     """Tests `mkernel_mesh2d_remove_disconnected_regions` removes the smallest disconnected mesh"""
 
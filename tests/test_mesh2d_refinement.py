@@ -76,3 +76,86 @@ def test_mesh2d_casulli_derefinement_on_polygon():
     mk.mesh2d_casulli_derefinement_on_polygon(polygon)
     derefined_mesh2d = mk.mesh2d_get()
     assert mesh2d.node_x.size > derefined_mesh2d.node_x.size
+
+
+def harbour_polygons():
+    """Creates small square polygons spread over a 20x20 mesh, two of them overlapping."""
+    polygons = []
+    for x_min, y_min in [
+        (2.5, 2.5),
+        (3.5, 3.5),
+        (10.5, 2.5),
+        (2.5, 12.5),
+        (12.5, 12.5),
+    ]:
+        x = np.array([x_min, x_min + 3.0, x_min + 3.0, x_min, x_min])
+        y = np.array([y_min, y_min, y_min + 3.0, y_min + 3.0, y_min])
+        polygons.append(GeometryList(x, y))
+    return polygons
+
+
+def test_mesh2d_casulli_refinement_on_polygons():
+    """Test `mesh2d_casulli_refinement_on_polygons` matches one call per polygon, with fewer native calls."""
+    parameters = MakeGridParameters(
+        num_columns=20, num_rows=20, block_size_x=1, block_size_y=1
+    )
+    polygons = harbour_polygons()
+
+    looped = MeshKernel()
+    looped.mesh2d_make_rectangular_mesh(parameters)
+    for polygon in polygons:
+        looped.mesh2d_casulli_refinement_on_polygon(polygon)
+
+    batched = MeshKernel()
+    batched.mesh2d_make_rectangular_mesh(parameters)
+    batch = batched.mesh2d_casulli_refinement_on_polygons(polygons)
+
+    assert batch.num_groups == 2
+    assert batch.group_index.tolist() == [0, 1, 0, 0, 0]
+    assert np.all(batch.face_deltas > 0)
+    assert (
+        batched.mesh2d_get().nodes_per_face.size
+        == looped.mesh2d_get().nodes_per_face.size
+    )
+
+
+def test_mesh2d_casulli_derefinement_on_polygons():
+    """Test `mesh2d_casulli_derefinement_on_polygons` removes faces inside each polygon."""
+    mk = MeshKernel()
+    mk.mesh2d_make_rectangular_mesh(
+        MakeGridParameters(num_columns=20, num_rows=20, block_size_x=1, block_size_y=1)
+    )
+    polygons = harbour_polygons()
+
+    batch = mk.mesh2d_casulli_derefinement_on_polygons(polygons[2:])
+
+    assert batch.num_groups == 1
+    assert np.all(batch.face_deltas < 0)
+
+
+def test_mesh2d_casulli_refinement_on_polygons_matches_a_loop():
+    """Test refining many disjoint polygons in one batch gives the same mesh size as one call per polygon."""
+    parameters = MakeGridParameters(
+        num_columns=100, num_rows=100, block_size_x=1, block_size_y=1
+    )
+    polygons = []
+    for x_min in np.arange(2.5, 95.0, 6.0):
+        for y_min in np.arange(2.5, 95.0, 6.0):
+            x = np.array([x_min, x_min + 3.0, x_min + 3.0, x_min, x_min])
+            y = np.array([y_min, y_min, y_min + 3.0, y_min + 3.0, y_min])
+            polygons.append(GeometryList(x, y))
+
+    looped = MeshKernel()
+    looped.mesh2d_make_rectangular_mesh(parameters)
+    for polygon in polygons:
+        looped.mesh2d_casulli_refinement_on_polygon(polygon)
+
+    batched = MeshKernel()
+    batched.mesh2d_make_rectangular_mesh(parameters)
+    batch = batched.mesh2d_casulli_refinement_on_polygons(polygons)
+
+    assert batch.num_groups == 1
+    assert (
+        batched.mesh2d_get().nodes_per_face.size
+        == looped.mesh2d_get().nodes_per_face.size
+    )
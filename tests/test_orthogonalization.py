@@ -1,15 +1,23 @@
 import numpy as np
+import pytest
 from mesh2d_factory import Mesh2dFactory
 from numpy.testing import assert_array_equal
 from pytest import approx
 
 from meshkernel import (
+    CurvilinearGrid,
     GeometryList,
+    MakeGridParameters,
     Mesh2d,
     MeshKernel,
     OrthogonalizationParameters,
     ProjectToLandBoundaryOption,
 )
+from meshkernel.orthogonalization import (
+    curvilinear_orthogonality,
+    orthogonalize_curvilinear,
+    orthogonalize_mesh2d,
+)
 
 
 def test_mesh2d_compute_orthogonalization():
@@ -174,3 +182,109 @@ def test_mesh2d_get_smoothness_smooth_mesh2d():
     assert smoothness.values[2] == -999.0
     assert smoothness.values[3] == -999.0
     assert smoothness.values[4] == approx(1.0, abs=0.01)
+
+
+def sheared_mesh2d(rows: int, columns: int):
+    """Creates a rectilinear mesh whose interior nodes are moved, so it is not orthogonal."""
+    mesh2d = Mesh2dFactory.create(rows=rows, columns=columns)
+    interior = (
+        (mesh2d.node_x > 0)
+        & (mesh2d.node_x < columns)
+        & (mesh2d.node_y > 0)
+        & (mesh2d.node_y < rows)
+    )
+    mesh2d.node_x[interior] += 0.2 * np.sin(mesh2d.node_y[interior])
+    return mesh2d
+
+
+def test_curvilinear_orthogonality():
+    """Tests the orthogonality of a rectangular grid is zero and that of a sheared grid is positive."""
+    node_x, node_y = np.meshgrid(np.arange(4.0), np.arange(3.0))
+    grid = CurvilinearGrid(node_x.ravel(), node_y.ravel(), 4, 3)
+
+    assert np.allclose(curvilinear_orthogonality(grid), 0.0)
+    assert curvilinear_orthogonality(grid).size == 2
+
+    sheared = CurvilinearGrid((node_x + 0.5 * node_y).ravel(), node_y.ravel(), 4, 3)
+    assert np.allclose(curvilinear_orthogonality(sheared), 0.5 / np.sqrt(1.25))
+
+
+def test_curvilinear_orthogonality_skips_invalid_nodes():
+    """Tests the nodes next to invalid nodes are not measured."""
+    node_x, node_y = np.meshgrid(np.arange(4.0), np.arange(3.0))
+    node_x[0, 1] = -999.0
+    grid = CurvilinearGrid(node_x.ravel(), node_y.ravel(), 4, 3)
+
+    assert curvilinear_orthogonality(grid, float_invalid_value=-999.0).size == 1
+
+    node_x[0, 1] = np.nan
+    grid = CurvilinearGrid(node_x.ravel(), node_y.ravel(), 4, 3)
+    assert curvilinear_orthogonality(grid).size == 1
+
+
+def test_orthogonalize_mesh2d_converges():
+    """Tests the stepwise orthogonalization improves the orthogonality and reports every iteration."""
+    mk = MeshKernel()
+    mk.mesh2d_set(sheared_mesh2d(rows=6, columns=6))
+    steps = []
+
+    result = orthogonalize_mesh2d(
+        mk, OrthogonalizationParameters(), max_iterations=50, callback=steps.append
+    )
+
+    assert result.converged
+    assert steps == result.steps
+    assert [step.iteration for step in result.steps] == list(
+        range(result.iterations + 1)
+    )
+    assert result.steps[-1].maximum < result.steps[0].maximum
+
+
+def test_orthogonalize_mesh2d_stops_on_callback_and_time_budget():
+    """Tests the iterations stop when the callback returns False or the time budget is spent."""
+    mk = MeshKernel()
+    mk.mesh2d_set(sheared_mesh2d(rows=4, columns=4))
+
+    result = orthogonalize_mesh2d(
+        mk,
+        OrthogonalizationParameters(),
+        callback=lambda step: step.iteration < 2,
+    )
+    assert result.stop_reason == "callback"
+    assert result.iterations == 2
+
+    result = orthogonalize_mesh2d(mk, OrthogonalizationParameters(), time_budget=0.0)
+    assert result.stop_reason == "time_budget"
+    assert result.iterations == 0
+
+
+def test_orthogonalize_curvilinear():
+    """Tests the stepwise orthogonalization of a curvilinear grid."""
+    mk = MeshKernel()
+    make_grid_parameters = MakeGridParameters(
+        num_columns=5, num_rows=5, block_size_x=1.0, block_size_y=1.0
+    )
+    mk.curvilinear_compute_rectangular_grid(make_grid_parameters)
+    mk.curvilinear_move_node(2.0, 2.0, 2.3, 2.1)
+
+    result = orthogonalize_curvilinear(
+        mk, OrthogonalizationParameters(), max_iterations=10
+    )
+
+    assert result.iterations >= 1
+    assert result.steps[-1].maximum < result.steps[0].maximum
+    assert result.stop_reason in ("converged", "max_iterations")
+
+
+@pytest.mark.parametrize("percentile", [50.0, 100.0])
+def test_orthogonalize_mesh2d_percentile(percentile):
+    """Tests the percentile is at most the maximum."""
+    mk = MeshKernel()
+    mk.mesh2d_set(sheared_mesh2d(rows=4, columns=4))
+
+    result = orthogonalize_mesh2d(
+        mk, OrthogonalizationParameters(), max_iterations=2, percentile=percentile
+    )
+
+    for step in result.steps:
+        assert step.percentile <= step.maximum
@@ -0,0 +1,189 @@
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from mesh2d_factory import Mesh2dFactory
+
+from meshkernel import (
+    CurvilinearGrid,
+    Mesh2d,
+    MeshKernel,
+    MeshKernelError,
+    MeshKernelPool,
+)
+from meshkernel.parallel import BatchResult, run_batch
+
+
+def count_nodes(mk: MeshKernel, rows: int, columns: int) -> int:
+    """Sets a rectilinear mesh on the state and returns the number of nodes in the state."""
+    mk.mesh2d_set(Mesh2dFactory.create(rows=rows, columns=columns))
+    return mk.mesh2d_get().node_x.size
+
+
+def delete_corner_edge(mk: MeshKernel, mesh2d: Mesh2d) -> Mesh2d:
+    """Sets a mesh on the state, deletes the edge closest to its first node and returns the resulting mesh."""
+    mk.mesh2d_set(mesh2d)
+    mk.mesh2d_delete_edge(mesh2d.node_x[0], mesh2d.node_y[0])
+    return mk.mesh2d_get()
+
+
+def raise_on_negative(mk: MeshKernel, value: int) -> int:
+    """Returns the value, or raises if it is negative."""
+    if value < 0:
+        raise ValueError("negative value")
+    return value
+
+
+def exit_on_negative(mk: MeshKernel, value: int) -> int:
+    """Returns the value, or kills the worker process if it is negative."""
+    if value < 0:
+        os._exit(1)
+    return value
+
+
+def test_meshkernel_pool_map():
+    """Tests `MeshKernelPool.map` runs independent jobs and keeps the input order."""
+    sizes = [(2, 2), (3, 4), (5, 5), (10, 3), (4, 4), (6, 2)]
+    expected = [
+        Mesh2dFactory.create(rows=rows, columns=columns).node_x.size
+        for rows, columns in sizes
+    ]
+
+    with MeshKernelPool(num_states=3) as pool:
+        results = list(
+            pool.map(
+                count_nodes,
+                [rows for rows, _ in sizes],
+                [columns for _, columns in sizes],
+            )
+        )
+
+    assert results == expected
+
+
+def test_meshkernel_pool_submit_raises():
+    """Tests an error raised by a job is reported by its future and the state is reused."""
+
+    def make_global_mesh(mk: MeshKernel):
+        # Global meshes cannot be made with cartesian coordinates
+        mk.mesh2d_make_global(19, 25)
+
+    with MeshKernelPool(num_states=1) as pool:
+        with pytest.raises(MeshKernelError):
+            pool.submit(make_global_mesh).result()
+
+        assert pool.submit(count_nodes, 2, 2).result() > 0
+
+
+def test_meshkernel_concurrent_calls_on_one_state():
+    """Tests concurrent calls on the same instance are serialized."""
+    mk = MeshKernel()
+    mesh2d = Mesh2dFactory.create(rows=10, columns=10)
+    errors = []
+
+    def set_and_get():
+        try:
+            for _ in range(20):
+                mk.mesh2d_set(mesh2d)
+                assert mk.mesh2d_get().node_x.size == mesh2d.node_x.size
+        except Exception as exception:
+            errors.append(exception)
+
+    threads = [threading.Thread(target=set_and_get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def test_meshkernel_concurrent_failures_report_their_own_errors():
+    """Tests calls failing concurrently on different instances each report the message of their failure."""
+    empty_curvilinear_grid = CurvilinearGrid(np.empty(0), np.empty(0), 0, 0)
+    messages = {}
+
+    def fail(name: str, call):
+        mk = MeshKernel()
+        messages[name] = set()
+        for _ in range(5000):
+            with pytest.raises(MeshKernelError) as error:
+                call(mk)
+            messages[name].add(str(error.value))
+
+    threads = [
+        threading.Thread(
+            target=fail, args=("global", lambda mk: mk.mesh2d_make_global(19, 25))
+        ),
+        threading.Thread(
+            target=fail,
+            args=("curvilinear", lambda mk: mk.curvilinear_set(empty_curvilinear_grid)),
+        ),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(messages["global"]) == 1
+    assert len(messages["curvilinear"]) == 1
+    assert messages["global"] != messages["curvilinear"]
+
+
+def test_meshkernel_pool_invalid_num_states():
+    """Tests the pool needs at least one state."""
+    with pytest.raises(ValueError):
+        MeshKernelPool(num_states=0)
+
+
+def test_run_batch_meshes():
+    """Tests `run_batch` transports input and result meshes and keeps the input order."""
+    meshes = [Mesh2dFactory.create(rows=rows, columns=3) for rows in range(2, 8)]
+
+    result = run_batch(delete_corner_edge, meshes, workers=2)
+
+    assert result.errors == {}
+    assert len(result.results) == len(meshes)
+    for mesh2d, edited in zip(meshes, result.results):
+        assert isinstance(edited, Mesh2d)
+        assert edited.edge_nodes.size == mesh2d.edge_nodes.size - 2
+    assert result.throughput > 0.0
+    assert all(
+        latency >= run_time
+        for latency, run_time in zip(result.latencies, result.run_times)
+    )
+
+
+def test_run_batch_errors():
+    """Tests an exception raised by a job is reported without stopping the batch."""
+    result = run_batch(raise_on_negative, [1, -1, 2], workers=1)
+
+    assert result.results == [1, None, 2]
+    assert list(result.errors) == [1]
+    assert isinstance(result.errors[1], ValueError)
+    assert result.retries == 0
+
+
+def test_run_batch_retries_only_started_jobs():
+    """Tests a job killing its worker on every attempt fails alone,
+    while the queued jobs are submitted again without being charged a retry."""
+    values = [-1] + list(range(10))
+
+    result = run_batch(exit_on_negative, values, workers=1, max_retries=2)
+
+    assert list(result.errors) == [0]
+    assert isinstance(result.errors[0], BrokenProcessPool)
+    assert result.results[1:] == values[1:]
+    assert result.retries == 2
+
+
+def test_batch_result_throughput():
+    """Tests the throughput counts only the successful jobs."""
+    result = BatchResult(4)
+    assert result.throughput == 0.0
+
+    result.errors[0] = ValueError()
+    result.wall_time = 2.0
+    assert result.throughput == 1.5
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from meshkernel import (
+    GriddedSamples,
+    MeshKernel,
+    MeshRefinementParameters,
+    RefinementType,
+)
+from meshkernel.pipeline import GriddedSamplesRefinementPipeline, PipelineTimings
+
+
+def create_refinement_parameters() -> MeshRefinementParameters:
+    """Creates the refinement parameters used by the pipeline tests."""
+    return MeshRefinementParameters(
+        refine_intersected=False,
+        use_mass_center_when_refining=False,
+        min_edge_size=2.0,
+        refinement_type=RefinementType.WAVE_COURANT,
+        connect_hanging_nodes=True,
+        account_for_samples_outside_face=False,
+        max_refinement_iterations=5,
+        smoothing_iterations=0,
+        max_courant_time=120.0,
+        directional_refinement=0,
+    )
+
+
+def create_tile() -> GriddedSamples:
+    """Creates a gridded samples tile covering the 5x4 mesh."""
+    return GriddedSamples(
+        num_x=7,
+        num_y=6,
+        x_origin=-50.0,
+        y_origin=-50.0,
+        cell_size=100.0,
+        values=np.array([-0.05] * 42, dtype=np.float32),
+    )
+
+
+def test_pipeline_timings():
+    """Tests the aggregated values of `PipelineTimings`."""
+    timings = PipelineTimings()
+    timings.load = [1.0, 1.0]
+    timings.wait = [1.0, 0.0]
+    timings.refine = [2.0, 2.0]
+
+    assert timings.num_tiles == 2
+    assert timings.overlap == pytest.approx(0.5)
+
+
+def test_gridded_samples_refinement_pipeline(meshkernel_with_mesh2d: MeshKernel):
+    """Tests a single tile refined by the pipeline gives the same mesh as
+    `mesh2d_refine_based_on_gridded_samples`."""
+    mk = meshkernel_with_mesh2d(rows=5, columns=4, spacing_x=100.0, spacing_y=100.0)
+
+    pipeline = GriddedSamplesRefinementPipeline(
+        mk, create_refinement_parameters(), use_nodal_refinement=True
+    )
+    timings = pipeline.run(create_tile() for _ in range(1))
+
+    mesh2d = mk.mesh2d_get()
+    assert mesh2d.node_x.size == 86
+    assert mesh2d.edge_x.size == 161
+    assert mesh2d.face_x.size == 76
+
+    assert timings.num_tiles == 1
+    assert len(timings.load) == len(timings.wait) == 1
+    assert timings.total >= timings.refine[0]
+
+
+def test_gridded_samples_refinement_pipeline_keeps_tiles(
+    meshkernel_with_mesh2d: MeshKernel,
+):
+    """Tests the pipeline does not replace the arrays of the tiles it is given."""
+    mk = meshkernel_with_mesh2d(rows=5, columns=4, spacing_x=100.0, spacing_y=100.0)
+    tile = create_tile()
+    tile.values = np.array([-0.05] * 84, dtype=np.float32)[::2]
+    values = tile.values
+
+    pipeline = GriddedSamplesRefinementPipeline(mk, create_refinement_parameters())
+    pipeline.run([tile])
+
+    assert tile.values is values
+    assert not tile.values.flags.c_contiguous
+
+
+def test_gridded_samples_refinement_pipeline_loader_error(
+    meshkernel_with_mesh2d: MeshKernel,
+):
+    """Tests an exception raised while loading a tile is re-raised by `run`."""
+    mk = meshkernel_with_mesh2d(rows=5, columns=4, spacing_x=100.0, spacing_y=100.0)
+
+    def tiles():
+        yield create_tile()
+        raise IOError("unreadable raster window")
+
+    pipeline = GriddedSamplesRefinementPipeline(
+        mk, create_refinement_parameters(), queue_depth=1
+    )
+
+    with pytest.raises(IOError):
+        pipeline.run(tiles())
+
+
+def test_gridded_samples_refinement_pipeline_invalid_queue_depth():
+    """Tests the queue depth must be at least one."""
+    with pytest.raises(ValueError):
+        GriddedSamplesRefinementPipeline(
+            None, create_refinement_parameters(), queue_depth=0
+        )
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from meshkernel import GeometryList, Mesh2d, Mesh2dLocation
+from meshkernel.polygons import (
+    PolygonRings,
+    concatenate_polygons,
+    group_disjoint_polygons,
+    mesh2d_locations_in_polygons,
+    points_in_polygons,
+    polygon_index_of_points,
+    select_polygons,
+)
+
+
+def square(x_min, y_min, size, closed=True):
+    """Gets the coordinates of a square ring."""
+    x = [x_min, x_min + size, x_min + size, x_min]
+    y = [y_min, y_min, y_min + size, y_min + size]
+    if closed:
+        x.append(x_min)
+        y.append(y_min)
+    return x, y
+
+
+def multi_polygon() -> GeometryList:
+    """Creates two polygons: a 10x10 square with a 2x2 hole at (4, 4), and a 2x2 square at (20, 0)."""
+    outer_x, outer_y = square(0.0, 0.0, 10.0)
+    hole_x, hole_y = square(4.0, 4.0, 2.0)
+    other_x, other_y = square(20.0, 0.0, 2.0, closed=False)
+    return GeometryList(
+        x_coordinates=np.array(outer_x + [-998.0] + hole_x + [-999.0] + other_x),
+        y_coordinates=np.array(outer_y + [-998.0] + hole_y + [-999.0] + other_y),
+    )
+
+
+def test_polygon_rings_bounding_boxes():
+    """Tests the rings and their bounding boxes ignore the separators."""
+    rings = PolygonRings(multi_polygon())
+
+    assert rings.num_polygons == 2
+    assert rings.polygon_index.tolist() == [0, 0, 1]
+    assert rings.x_min.tolist() == [0.0, 4.0, 20.0]
+    assert rings.x_max.tolist() == [10.0, 6.0, 22.0]
+    assert rings.y_min.tolist() == [0.0, 4.0, 0.0]
+
+
+def test_polygon_index_of_points_with_holes():
+    """Tests the points in a hole are outside and the polygon of each point is found."""
+    x = np.array([1.0, 5.0, 9.0, 21.0, 15.0, -1.0])
+    y = np.array([1.0, 5.0, 3.0, 1.0, 1.0, 5.0])
+
+    index = polygon_index_of_points(multi_polygon(), x, y)
+
+    assert index.tolist() == [0, -1, 0, 1, -1, -1]
+
+
+def test_points_in_polygons_matches_chunking():
+    """Tests the result does not depend on the chunk size."""
+    rng = np.random.default_rng(1)
+    x = rng.uniform(-2.0, 24.0, 5000)
+    y = rng.uniform(-2.0, 12.0, 5000)
+    polygons = multi_polygon()
+
+    expected = points_in_polygons(polygons, x, y)
+
+    np.testing.assert_array_equal(
+        points_in_polygons(PolygonRings(polygons), x, y, chunk_size=7), expected
+    )
+    inside_outer = (x > 0) & (x < 10) & (y > 0) & (y < 10)
+    inside_hole = (x > 4) & (x < 6) & (y > 4) & (y < 6)
+    inside_other = (x > 20) & (x < 22) & (y > 0) & (y < 2)
+    np.testing.assert_array_equal(
+        expected, (inside_outer & ~inside_hole) | inside_other
+    )
+
+
+def test_points_in_polygons_empty():
+    """Tests empty polygons contain no points."""
+    mask = points_in_polygons(GeometryList(), np.array([0.0]), np.array([0.0]))
+
+    assert mask.tolist() == [False]
+
+
+def test_mesh2d_locations_in_polygons():
+    """Tests the locations of a mesh2d are tested without a MeshKernel state."""
+    mesh2d = Mesh2d(
+        node_x=np.array([1.0, 5.0, 30.0]),
+        node_y=np.array([1.0, 5.0, 30.0]),
+        face_x=np.array([2.0]),
+        face_y=np.array([2.0]),
+    )
+
+    nodes = mesh2d_locations_in_polygons(mesh2d, Mesh2dLocation.NODES, multi_polygon())
+    faces = mesh2d_locations_in_polygons(mesh2d, Mesh2dLocation.FACES, multi_polygon())
+
+    assert nodes.tolist() == [True, False, False]
+    assert faces.tolist() == [True]
+
+
+def test_polygon_index_of_points_invalid_sizes():
+    """Tests the coordinates must have the same size."""
+    with pytest.raises(ValueError):
+        polygon_index_of_points(multi_polygon(), np.zeros(2), np.zeros(3))
+
+
+def square_polygon(x_min, y_min, size=1.0) -> GeometryList:
+    """Creates a closed square polygon."""
+    return GeometryList(*square(x_min, y_min, size))
+
+
+def test_concatenate_and_select_polygons():
+    """Tests joining polygons into a multi-polygon and selecting some of them back."""
+    polygons = concatenate_polygons(
+        [
+            square_polygon(0.0, 0.0),
+            GeometryList(),
+            square_polygon(3.0, 3.0),
+            square_polygon(6.0, 0.0),
+        ]
+    )
+
+    assert np.count_nonzero(polygons.x_coordinates == -999.0) == 2
+
+    selected = select_polygons(polygons, np.array([2, 0]))
+    assert selected.x_coordinates.tolist() == [
+        6.0, 7.0, 7.0, 6.0, 6.0, -999.0, 0.0, 1.0, 1.0, 0.0, 0.0,
+    ]  # fmt: skip
+    assert selected.y_coordinates[5] == -999.0
+
+
+def test_group_disjoint_polygons():
+    """Tests the polygons with intersecting bounding boxes are in different groups."""
+    polygons = concatenate_polygons(
+        [
+            square_polygon(0.0, 0.0),
+            square_polygon(0.5, 0.5),
+            square_polygon(3.0, 3.0),
+            square_polygon(0.2, 0.2, 0.2),
+            square_polygon(0.6, 0.6, 0.1),
+        ]
+    )
+
+    assert group_disjoint_polygons(polygons).tolist() == [0, 1, 0, 1, 2]
+    assert group_disjoint_polygons(GeometryList()).size == 0
@@ -1,16 +1,21 @@
+import pickle
+
 import numpy as np
 import pytest
+from numpy.testing import assert_array_equal
 
 from meshkernel import (
     AveragingMethod,
     DeleteMeshOption,
     GeometryList,
+    GriddedSamples,
     Mesh2d,
     Mesh2dLocation,
     MeshRefinementParameters,
     OrthogonalizationParameters,
     ProjectToLandBoundaryOption,
     RefinementType,
+    RegionRefinement,
 )
 
 cases_deletemeshoption_values = [
@@ -18,6 +23,7 @@ cases_deletemeshoption_values = [
     (DeleteMeshOption.INSIDE_AND_INTERSECTED, 1),
 ]
 
+from meshkernel.c_structures import CMesh2d
 from meshkernel.errors import InputError
 
 
@@ -122,6 +128,23 @@ def test_mesh2d_equal():
     assert mesh2d_1 == mesh2d_2
 
 
+def test_mesh2d_equal_ignores_stale_content_hash():
+    """Tests meshes made equal by an in-place edit compare equal despite their cached content hashes."""
+    node_x = np.array([0.0, 1.0, 1.0, 0.0], dtype=np.double)
+    node_y = np.array([0.0, 0.0, 1.0, 1.0], dtype=np.double)
+    edge_nodes = np.array([0, 1, 1, 2, 2, 3, 3, 0], dtype=np.int32)
+
+    mesh2d_1 = Mesh2d(node_x.copy(), node_y, edge_nodes)
+    mesh2d_2 = Mesh2d(node_x + 1.0, node_y, edge_nodes)
+    assert mesh2d_1.content_hash() != mesh2d_2.content_hash()
+    assert mesh2d_1 != mesh2d_2
+
+    mesh2d_1.node_x += 1.0
+
+    assert mesh2d_1 == mesh2d_2
+    assert mesh2d_1 != Mesh2d(node_x, node_y, edge_nodes[:6])
+
+
 def test_mesh2d_almost_equal():
     node_x_1 = np.array([0.0, 1.0, 1.0, 0.0], dtype=np.double)
     node_y = np.array([0.0, 0.0, 1.0, 1.0], dtype=np.double)
@@ -138,6 +161,170 @@ def test_mesh2d_almost_equal():
     assert not mesh2d_1.almost_equal(mesh2d_2, rtol=0.0, atol=1.0e-7)
 
 
+def test_mesh2d_remove_invalid_values():
+    """Tests `remove_invalid_values` removes the invalid nodes and remaps the edge nodes."""
+
+    mesh2d = Mesh2d(
+        node_x=np.array([0.0, -999.0, 1.0, 1.0], dtype=np.double),
+        node_y=np.array([0.0, -999.0, 0.0, 1.0], dtype=np.double),
+        edge_nodes=np.array([0, 2, 2, 3, 3, 0, -999, -999], dtype=np.int32),
+        edge_x=np.array([0.5, 1.0, 0.5, -999.0], dtype=np.double),
+        edge_y=np.array([0.0, 0.5, 0.5, -999.0], dtype=np.double),
+    )
+
+    mesh2d.remove_invalid_values(float_invalid_value=-999.0)
+
+    assert_array_equal(mesh2d.node_x, [0.0, 1.0, 1.0])
+    assert_array_equal(mesh2d.edge_nodes, [0, 1, 1, 2, 2, 0])
+    assert_array_equal(mesh2d.edge_x, [0.5, 1.0, 0.5])
+    assert mesh2d.valid_nodes_map == {0: 0, 2: 1, 3: 2}
+    assert_array_equal(mesh2d.valid_edge_indices, [0, 1, 2])
+
+
+def test_mesh2d_valid_maps_are_cached_and_assignable():
+    """Tests the valid index maps are built once, can be assigned, and are rebuilt by `remove_invalid_values`."""
+
+    mesh2d = Mesh2d(
+        node_x=np.array([0.0, -999.0, 1.0], dtype=np.double),
+        node_y=np.array([0.0, -999.0, 0.0], dtype=np.double),
+    )
+    mesh2d.remove_invalid_values(float_invalid_value=-999.0)
+
+    assert mesh2d.valid_nodes_map is mesh2d.valid_nodes_map
+    assert mesh2d.valid_nodes_map == {0: 0, 2: 1}
+
+    mesh2d.valid_nodes_map = {5: 0}
+    mesh2d.valid_faces_map = {1: 0}
+    mesh2d.valid_edges_map = {2: 0}
+    assert mesh2d.valid_nodes_map == {5: 0}
+    assert mesh2d.valid_faces_map == {1: 0}
+    assert mesh2d.valid_edges_map == {2: 0}
+
+    mesh2d.remove_invalid_values(float_invalid_value=-999.0)
+
+    assert mesh2d.valid_nodes_map == {0: 0, 1: 1}
+    assert mesh2d.valid_faces_map == {}
+    assert mesh2d.valid_edges_map == {}
+
+
+def test_mesh2d_remove_invalid_values_memmap(tmp_path):
+    """Tests `remove_invalid_values` compacts memory-mapped arrays in place,
+    and the compacted files are reopened by `from_directory`."""
+
+    c_mesh2d = CMesh2d()
+    c_mesh2d.num_nodes = 4
+    c_mesh2d.num_edges = 0
+    c_mesh2d.num_faces = 0
+    c_mesh2d.num_face_nodes = 0
+    mesh2d = c_mesh2d.allocate_memory(memmap_directory=tmp_path)
+    mesh2d.node_x[:] = [0.0, -999.0, 1.0, 1.0]
+    mesh2d.node_y[:] = [0.0, -999.0, 0.0, 1.0]
+
+    mesh2d.remove_invalid_values(float_invalid_value=-999.0)
+
+    assert isinstance(mesh2d.node_x, np.memmap)
+    assert_array_equal(mesh2d.node_x, [0.0, 1.0, 1.0])
+
+    snapshot = Mesh2d.from_directory(tmp_path)
+    assert_array_equal(snapshot.node_x, [0.0, 1.0, 1.0])
+    assert_array_equal(snapshot.node_y, [0.0, 0.0, 1.0])
+    assert snapshot == mesh2d
+
+
+def test_mesh2d_remove_invalid_values_memmap_keeps_views(tmp_path):
+    """Tests views of memory-mapped arrays taken before `remove_invalid_values`
+    stay readable past the end of the compacted files."""
+
+    c_mesh2d = CMesh2d()
+    c_mesh2d.num_nodes = 4
+    c_mesh2d.num_edges = 0
+    c_mesh2d.num_faces = 0
+    c_mesh2d.num_face_nodes = 0
+    mesh2d = c_mesh2d.allocate_memory(memmap_directory=tmp_path)
+    mesh2d.node_x[:] = [0.0, 1.0, 1.0, -999.0]
+    mesh2d.node_y[:] = [0.0, 0.0, 1.0, -999.0]
+    view = mesh2d.node_x[2:]
+    files = sorted(path.name for path in tmp_path.iterdir())
+
+    mesh2d.remove_invalid_values(float_invalid_value=-999.0)
+
+    assert_array_equal(view, [1.0, -999.0])
+    assert_array_equal(mesh2d.node_x, [0.0, 1.0, 1.0])
+    assert sorted(path.name for path in tmp_path.iterdir()) == files
+    assert_array_equal(Mesh2d.from_directory(tmp_path).node_x, [0.0, 1.0, 1.0])
+
+
+def test_mesh2d_remove_invalid_values_memmap_keeps_files(tmp_path):
+    """Tests `remove_invalid_values` compacts the mapped files without replacing them,
+    and a read-only snapshot is compacted in memory without changing its files."""
+
+    c_mesh2d = CMesh2d()
+    c_mesh2d.num_nodes = 4
+    c_mesh2d.num_edges = 0
+    c_mesh2d.num_faces = 0
+    c_mesh2d.num_face_nodes = 0
+    mesh2d = c_mesh2d.allocate_memory(memmap_directory=tmp_path)
+    mesh2d.node_x[:] = [-999.0, 0.0, 1.0, 1.0]
+    mesh2d.node_y[:] = [-999.0, 0.0, 0.0, 1.0]
+    mesh2d.node_x.flush()
+    mesh2d.node_y.flush()
+    inodes = {path.name: path.stat().st_ino for path in tmp_path.iterdir()}
+
+    snapshot = Mesh2d.from_directory(tmp_path)
+    snapshot.remove_invalid_values(float_invalid_value=-999.0)
+
+    assert not isinstance(snapshot.node_x, np.memmap)
+    assert_array_equal(snapshot.node_x, [0.0, 1.0, 1.0])
+    assert Mesh2d.from_directory(tmp_path).node_x.size == 4
+
+    mesh2d.remove_invalid_values(float_invalid_value=-999.0)
+
+    assert {path.name: path.stat().st_ino for path in tmp_path.iterdir()} == inodes
+    assert_array_equal(Mesh2d.from_directory(tmp_path).node_x, [0.0, 1.0, 1.0])
+
+
+def test_mesh2d_pickle_out_of_band():
+    """Tests a `Mesh2d` pickled with protocol 5 transfers its arrays out-of-band
+    and drops the valid index caches."""
+
+    mesh2d = Mesh2d(
+        node_x=np.array([0.0, 1.0, 1.0, 0.0], dtype=np.double),
+        node_y=np.array([0.0, 0.0, 1.0, 1.0], dtype=np.double),
+        edge_nodes=np.array([0, 1, 1, 2, 2, 3, 3, 0], dtype=np.int32),
+    )
+    mesh2d.remove_invalid_values(float_invalid_value=-999.0)
+
+    buffers = []
+    data = pickle.dumps(mesh2d, protocol=5, buffer_callback=buffers.append)
+    unpickled = pickle.loads(data, buffers=buffers)
+
+    assert len(buffers) == 11
+    assert unpickled == mesh2d
+    assert np.shares_memory(unpickled.node_x, mesh2d.node_x)
+    assert unpickled.node_x.flags.writeable
+    assert unpickled.valid_node_indices.size == 0
+    assert unpickled.valid_nodes_map == {}
+
+
+@pytest.mark.parametrize("protocol", [4, 5])
+def test_geometrylist_pickle(protocol: int):
+    """Tests a `GeometryList` survives a pickle round trip with in-band data."""
+
+    geometry_list = GeometryList(
+        x_coordinates=np.array([0.0, 1.0, 2.0], dtype=np.double),
+        y_coordinates=np.array([3.0, 4.0, 5.0], dtype=np.double),
+        values=np.array([6.0, 7.0, 8.0], dtype=np.double),
+        geometry_separator=-1.0,
+    )
+
+    unpickled = pickle.loads(pickle.dumps(geometry_list, protocol=protocol))
+
+    assert_array_equal(unpickled.x_coordinates, geometry_list.x_coordinates)
+    assert_array_equal(unpickled.values, geometry_list.values)
+    assert unpickled.geometry_separator == -1.0
+    assert unpickled.x_coordinates.flags.writeable
+
+
 def test_geometrylist_constructor():
     """Tests the default values after constructing a `GeometryList`."""
 
@@ -192,3 +379,162 @@ def test_meshrefinementparameter_constructor_defaults():
     assert parameters.connect_hanging_nodes is False
     assert parameters.account_for_samples_outside_face is True
     assert parameters.max_refinement_iterations == 10
+
+
+def test_content_hash_is_stable_and_cached():
+    """Tests equal contents have equal hashes and reassigning an array invalidates the cached hash."""
+    mesh2d = Mesh2d(node_x=np.arange(4.0), node_y=np.zeros(4))
+    other = Mesh2d(node_x=np.arange(4.0), node_y=np.zeros(4))
+
+    content_hash = mesh2d.content_hash()
+    assert content_hash == other.content_hash()
+    assert mesh2d.content_hash() is content_hash
+
+    mesh2d.node_y = np.ones(4)
+    assert mesh2d.content_hash() != content_hash
+    assert mesh2d != other
+
+
+def test_content_hash_depends_on_class_and_dtype():
+    """Tests the hash distinguishes the classes and the dtypes of the arrays."""
+    coordinates = np.arange(3.0)
+    geometry_list = GeometryList(coordinates, coordinates)
+    mesh2d = Mesh2d(node_x=coordinates, node_y=coordinates)
+
+    assert geometry_list.content_hash() != mesh2d.content_hash()
+    assert (
+        GriddedSamples(values=np.zeros(4, dtype=np.float32)).content_hash()
+        != GriddedSamples(values=np.zeros(4, dtype=np.float64)).content_hash()
+    )
+
+
+def test_content_hash_of_large_arrays():
+    """Tests arrays hashed in chunks on several threads give a stable hash."""
+    values = np.random.default_rng(0).random(3_000_000)
+
+    content_hash = GeometryList(values, values).content_hash()
+
+    assert content_hash == GeometryList(values.copy(), values.copy()).content_hash()
+    values[-1] += 1.0
+    assert content_hash != GeometryList(values, values).content_hash()
+
+
+def test_content_hash_of_parameters():
+    """Tests the parameter classes are hashed by their values."""
+    parameters = OrthogonalizationParameters()
+    content_hash = parameters.content_hash()
+
+    assert content_hash == OrthogonalizationParameters().content_hash()
+    parameters.outer_iterations = 3
+    assert parameters.content_hash() != content_hash
+
+
+def test_content_hash_survives_pickling():
+    """Tests an unpickled mesh has the same hash and stays equal."""
+    mesh2d = Mesh2d(node_x=np.arange(4.0), node_y=np.zeros(4))
+    mesh2d.content_hash()
+
+    unpickled = pickle.loads(pickle.dumps(mesh2d, protocol=5))
+
+    assert unpickled.content_hash() == mesh2d.content_hash()
+    assert unpickled == mesh2d
+
+
+def test_region_refinement_faces_added():
+    """Tests the face growth of a region refinement."""
+    refinement = RegionRefinement(2, 10, 25, 0.5)
+
+    assert refinement.faces_added == 15
+    assert "region_index=2" in repr(refinement)
+
+
+@pytest.mark.parametrize(
+    "reducer, expected",
+    [
+        ("mean", [3, 5, 6, 10, 12, 14]),
+        ("min", [0, 2, 4, 10, 12, 14]),
+        ("max", [6, 8, 9, 11, 13, 14]),
+    ],
+)
+def test_gridded_samples_build_pyramid(reducer: str, expected: list):
+    """Tests the pyramid levels reduce blocks of 2x2 samples, including the odd last row and column."""
+    gridded_samples = GriddedSamples(
+        num_x=5,
+        num_y=3,
+        x_origin=10.0,
+        y_origin=20.0,
+        cell_size=1.0,
+        values=np.arange(15, dtype=np.int16),
+    )
+
+    pyramid = gridded_samples.build_pyramid(10, reducer)
+
+    assert [level.shape for level in pyramid] == [(3, 5), (2, 3), (1, 2), (1, 1)]
+    assert pyramid[0] is gridded_samples
+    assert pyramid[1].values.tolist() == expected
+    assert pyramid[1].values.dtype == np.int16
+    # The odd last row and column are located at their own samples
+    assert pyramid[1].x_coordinates.tolist() == [10.5, 12.5, 14.0]
+    assert pyramid[1].y_coordinates.tolist() == [20.5, 22.0]
+    assert [level.spacing for level in pyramid] == [1.0, 2.0, 2.5, 5.0]
+
+
+def test_gridded_samples_build_pyramid_even():
+    """Tests the levels of uniform gridded samples with an even number of rows and columns stay uniform."""
+    gridded_samples = GriddedSamples(
+        num_x=4,
+        num_y=2,
+        x_origin=10.0,
+        y_origin=20.0,
+        cell_size=1.0,
+        values=np.arange(8, dtype=np.float32),
+    )
+
+    level = gridded_samples.build_pyramid(2)[1]
+
+    assert level.x_coordinates.size == 0 and level.y_coordinates.size == 0
+    assert level.x_origin == 10.5 and level.y_origin == 20.5
+    assert level.cell_size == 2.0
+    assert level.values.tolist() == [2.5, 4.5]
+
+
+@pytest.mark.parametrize(
+    "reducer, expected",
+    [("mean", [2.0, -999.0]), ("min", [1.0, -999.0]), ("max", [3.0, -999.0])],
+)
+def test_gridded_samples_build_pyramid_invalid_values(reducer: str, expected: list):
+    """Tests the invalid values are left out of the blocks, and blocks without valid values are invalid."""
+    gridded_samples = GriddedSamples(
+        num_x=4,
+        num_y=2,
+        cell_size=1.0,
+        values=np.array(
+            [-999.0, 1.0, -999.0, np.nan, 3.0, np.nan, -999.0, -999.0],
+            dtype=np.float32,
+        ),
+    )
+
+    level = gridded_samples.build_pyramid(2, reducer)[1]
+
+    assert level.values.tolist() == expected
+
+
+def test_gridded_samples_build_pyramid_non_uniform():
+    """Tests the coordinates of a non-uniform pyramid level are the block centers."""
+    gridded_samples = GriddedSamples(
+        x_coordinates=np.array([0.0, 1.0, 3.0, 7.0]),
+        y_coordinates=np.array([0.0, 2.0]),
+        values=np.arange(8, dtype=np.float32),
+    )
+
+    level = gridded_samples.build_pyramid(2)[1]
+
+    assert level.x_coordinates.tolist() == [0.5, 5.0]
+    assert level.y_coordinates.tolist() == [1.0]
+    assert level.values.tolist() == [2.5, 4.5]
+    assert level.spacing == 4.5
+
+    with pytest.raises(InputError):
+        gridded_samples.build_pyramid(0)
+    with pytest.raises(InputError):
+        gridded_samples.build_pyramid(2, "median")
@@ -0,0 +1,273 @@
+import numpy as np
+import pytest
+from mesh2d_factory import Mesh2dFactory
+
+from meshkernel import (
+    GeometryList,
+    GriddedSamples,
+    MakeGridParameters,
+    Mesh2d,
+    MeshKernel,
+    MeshRefinementParameters,
+    ProjectionType,
+    RefinementType,
+)
+from meshkernel.refinement import (
+    casulli_refine_to_target,
+    edge_lengths,
+    estimate_refinement,
+    face_sizes,
+    refine_gridded_samples_to_target,
+    refine_with_pyramid,
+    refine_within_budget,
+)
+
+
+def _unit_squares(num_x: int, num_y: int, size: float) -> Mesh2d:
+    """Creates a mesh2d of square faces, with its face centers, without edges."""
+    node_x, node_y = np.meshgrid(
+        np.arange(num_x + 1) * size, np.arange(num_y + 1) * size
+    )
+    first = (np.arange(num_y)[:, np.newaxis] * (num_x + 1) + np.arange(num_x)).reshape(
+        -1
+    )
+    face_nodes = np.stack(
+        [first, first + 1, first + num_x + 2, first + num_x + 1], axis=1
+    ).reshape(-1)
+    face_x, face_y = np.meshgrid(
+        (np.arange(num_x) + 0.5) * size, (np.arange(num_y) + 0.5) * size
+    )
+    return Mesh2d(
+        node_x=node_x.reshape(-1).astype(np.double),
+        node_y=node_y.reshape(-1).astype(np.double),
+        face_nodes=face_nodes.astype(np.int32),
+        nodes_per_face=np.full(num_x * num_y, 4, dtype=np.int32),
+        face_x=face_x.reshape(-1),
+        face_y=face_y.reshape(-1),
+    )
+
+
+def test_face_sizes():
+    """Tests the face sizes are the square roots of the face areas."""
+    mesh2d = Mesh2d(
+        node_x=np.array([0.0, 2.0, 2.0, 0.0, 4.0]),
+        node_y=np.array([0.0, 0.0, 2.0, 2.0, 0.0]),
+        face_nodes=np.array([0, 1, 2, 3, 1, 4, 2]),
+        nodes_per_face=np.array([4, 3]),
+    )
+
+    assert np.allclose(face_sizes(mesh2d), [2.0, np.sqrt(2.0)])
+    assert face_sizes(Mesh2d()).size == 0
+
+
+def test_refine_with_pyramid():
+    """Tests the pyramid refinement uses coarser levels for the coarser faces and refines the mesh2d."""
+    mk = MeshKernel()
+    mk.mesh2d_set(Mesh2dFactory.create(10, 10, spacing_x=100.0, spacing_y=100.0))
+
+    gridded_samples = GriddedSamples(
+        num_x=257,
+        num_y=257,
+        x_origin=-20.0,
+        y_origin=-20.0,
+        cell_size=4.0,
+        values=np.full(257 * 257, -10.0, dtype=np.float32),
+    )
+    pyramid = gridded_samples.build_pyramid(6)
+    # A wave travels about 20 m in 2 s, all faces larger than 20 m are refined
+    parameters = MeshRefinementParameters(
+        min_edge_size=10.0,
+        refinement_type=RefinementType.WAVE_COURANT,
+        max_refinement_iterations=3,
+        max_courant_time=2.0,
+    )
+
+    steps = refine_with_pyramid(mk, pyramid, parameters)
+
+    assert [step.level for step in steps] == [3, 2, 1]
+    assert [step.face_size for step in steps] == pytest.approx([100.0, 50.0, 25.0])
+    assert [step.num_faces_before for step in steps] == [100, 400, 1600]
+    assert [step.num_faces_after for step in steps] == [400, 1600, 6400]
+    for step in steps:
+        assert step.sample_spacing <= step.face_size / 2.0
+        assert step.sample_spacing > step.face_size / 4.0
+    assert mk.mesh2d_get().face_x.size == 6400
+
+
+def test_estimate_refinement_levels():
+    """Tests the estimate with refinement levels is bounded by the iterations and the minimum edge size."""
+    mesh2d = _unit_squares(2, 1, 100.0)
+    gridded_samples = GriddedSamples(
+        x_coordinates=np.array([0.0, 100.0, 200.0]),
+        y_coordinates=np.array([0.0, 100.0]),
+        values=np.array([3.0, 3.0, 0.0, 3.0, 3.0, 0.0]),
+    )
+    parameters = MeshRefinementParameters(
+        min_edge_size=10.0,
+        refinement_type=RefinementType.REFINEMENT_LEVELS,
+        max_refinement_iterations=5,
+    )
+
+    estimate = estimate_refinement(mesh2d, gridded_samples, parameters)
+
+    # The second face center interpolates to 1.5 levels
+    assert estimate.splits.tolist() == [3, 1]
+    assert estimate.num_faces == 64 + 4
+
+    parameters.max_refinement_iterations = 2
+    assert estimate_refinement(mesh2d, gridded_samples, parameters).num_faces == 20
+
+    parameters.max_refinement_iterations = 5
+    parameters.min_edge_size = 30.0
+    assert estimate_refinement(mesh2d, gridded_samples, parameters).num_faces == 8
+
+
+def test_estimate_refinement_wave_courant():
+    """Tests the estimate with the wave Courant criterion, and no refinement outside the samples."""
+    mesh2d = _unit_squares(2, 1, 100.0)
+    gridded_samples = GriddedSamples(
+        num_x=2,
+        num_y=2,
+        x_origin=0.0,
+        y_origin=0.0,
+        cell_size=100.0,
+        values=np.full(4, -10.0),
+    )
+    parameters = MeshRefinementParameters(
+        min_edge_size=1.0,
+        refinement_type=RefinementType.WAVE_COURANT,
+        max_courant_time=2.0,
+        max_refinement_iterations=10,
+    )
+
+    estimate = estimate_refinement(mesh2d, gridded_samples, parameters)
+
+    # The target size is 2 * sqrt(9.81 * 10) = 19.8, reached after 3 splits of 100
+    assert estimate.splits.tolist() == [3, 0]
+    assert estimate.num_faces_before == 2
+
+    spherical = estimate_refinement(
+        mesh2d, gridded_samples, parameters, ProjectionType.SPHERICAL
+    )
+    assert spherical.splits[0] == 10
+
+
+def test_refine_within_budget():
+    """Tests the refinement parameters are adjusted to keep the faces within the budget."""
+    mk = MeshKernel()
+    mk.mesh2d_set(Mesh2dFactory.create(4, 4, spacing_x=100.0, spacing_y=100.0))
+    gridded_samples = GriddedSamples(
+        num_x=5,
+        num_y=5,
+        x_origin=0.0,
+        y_origin=0.0,
+        cell_size=100.0,
+        values=np.full(25, 4.0),
+    )
+    parameters = MeshRefinementParameters(
+        min_edge_size=1.0,
+        refinement_type=RefinementType.REFINEMENT_LEVELS,
+        max_refinement_iterations=4,
+    )
+
+    used = refine_within_budget(mk, gridded_samples, parameters, max_faces=1000)
+
+    assert used.max_refinement_iterations == 2
+    assert parameters.max_refinement_iterations == 4
+    assert mk.mesh2d_get().face_x.size == 256
+
+    with pytest.raises(ValueError):
+        refine_within_budget(mk, gridded_samples, parameters, max_faces=10)
+
+
+def test_edge_lengths():
+    """Tests the edge lengths are computed from the edge nodes."""
+    mesh2d = Mesh2d(
+        node_x=np.array([0.0, 3.0, 3.0]),
+        node_y=np.array([0.0, 0.0, 4.0]),
+        edge_nodes=np.array([0, 1, 1, 2, 2, 0]),
+    )
+
+    assert np.allclose(edge_lengths(mesh2d), [3.0, 4.0, 5.0])
+
+
+def test_refine_gridded_samples_to_target():
+    """Tests the search converges on the target number of faces and keeps the best candidate."""
+    mk = MeshKernel()
+    mk.mesh2d_set(Mesh2dFactory.create(4, 4, spacing_x=100.0, spacing_y=100.0))
+    gridded_samples = GriddedSamples(
+        num_x=5,
+        num_y=5,
+        x_origin=0.0,
+        y_origin=0.0,
+        cell_size=100.0,
+        values=np.full(25, 4.0),
+    )
+    parameters = MeshRefinementParameters(
+        min_edge_size=1.0,
+        refinement_type=RefinementType.WAVE_COURANT,
+        max_refinement_iterations=4,
+        max_courant_time=1.0,
+    )
+
+    result = refine_gridded_samples_to_target(
+        mk,
+        gridded_samples,
+        parameters,
+        target_faces=256,
+        parameter="max_courant_time",
+        num_candidates=2,
+    )
+
+    assert result.parameter == "max_courant_time"
+    assert abs(result.error) <= 0.02
+    assert min(abs(trial.error) for trial in result.trials) == abs(result.error)
+    assert mk.mesh2d_get().nodes_per_face.size == result.num_faces
+    assert parameters.max_courant_time == 1.0
+
+    with pytest.raises(ValueError):
+        refine_gridded_samples_to_target(mk, gridded_samples, parameters)
+
+
+def test_refine_to_target_flat_response():
+    """Tests the search raises when the refinement ignores the searched parameter."""
+    mk = MeshKernel()
+    mk.mesh2d_set(Mesh2dFactory.create(4, 4, spacing_x=100.0, spacing_y=100.0))
+    gridded_samples = GriddedSamples(
+        num_x=5,
+        num_y=5,
+        x_origin=0.0,
+        y_origin=0.0,
+        cell_size=100.0,
+        values=np.full(25, 4.0),
+    )
+    # The refinement levels do not depend on the minimum edge size
+    parameters = MeshRefinementParameters(
+        min_edge_size=1.0,
+        refinement_type=RefinementType.REFINEMENT_LEVELS,
+        max_refinement_iterations=4,
+    )
+
+    with pytest.raises(ValueError):
+        refine_gridded_samples_to_target(
+            mk, gridded_samples, parameters, target_faces=256, num_candidates=2
+        )
+
+
+def test_casulli_refine_to_target():
+    """Tests the Casulli passes stop once the target number of faces is reached."""
+    mk = MeshKernel()
+    mk.mesh2d_make_rectangular_mesh(
+        MakeGridParameters(num_columns=10, num_rows=10, block_size_x=1, block_size_y=1)
+    )
+    polygon = GeometryList(
+        np.array([2.5, 7.5, 5.5, 2.5], dtype=np.double),
+        np.array([2.5, 4.5, 8.5, 2.5], dtype=np.double),
+    )
+
+    result = casulli_refine_to_target(mk, polygon, target_faces=200, max_passes=3)
+
+    assert result.parameter == "passes"
+    assert result.trials[0].num_faces == 100
+    assert result.trials[-1].num_faces >= 200 or len(result.trials) == 4
+    assert mk.mesh2d_get().nodes_per_face.size == result.num_faces
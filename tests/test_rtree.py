@@ -0,0 +1,125 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from meshkernel import GeometryList
+from meshkernel.polygons import PolygonRings, polygon_index_of_points
+from meshkernel.rtree import PackedRTree
+
+
+def random_boxes(rng, count):
+    """Creates random boxes in the unit square."""
+    x_min = rng.random(count)
+    y_min = rng.random(count)
+    return (
+        x_min,
+        y_min,
+        x_min + 0.1 * rng.random(count),
+        y_min + 0.1 * rng.random(count),
+    )
+
+
+def brute_force_pairs(boxes, queries):
+    """Finds the intersecting query-box pairs by testing all of them."""
+    x_min, y_min, x_max, y_max = boxes
+    q_x_min, q_y_min, q_x_max, q_y_max = queries
+    pairs = set()
+    for query in range(q_x_min.size):
+        hits = np.flatnonzero(
+            (x_min <= q_x_max[query])
+            & (x_max >= q_x_min[query])
+            & (y_min <= q_y_max[query])
+            & (y_max >= q_y_min[query])
+        )
+        pairs.update((query, int(item)) for item in hits)
+    return pairs
+
+
+@pytest.mark.parametrize(
+    "count, node_capacity", [(1, 16), (15, 4), (1000, 16), (1000, 2)]
+)
+def test_packed_rtree_query_boxes(count: int, node_capacity: int):
+    """Tests the box queries give the same pairs as a brute force search, sorted by query."""
+    rng = np.random.default_rng(42)
+    boxes = random_boxes(rng, count)
+    queries = random_boxes(rng, 200)
+
+    rtree = PackedRTree(*boxes, node_capacity=node_capacity)
+    query_index, item_index = rtree.query_boxes(*queries)
+
+    assert np.all(np.diff(query_index) >= 0)
+    assert set(zip(query_index.tolist(), item_index.tolist())) == brute_force_pairs(
+        boxes, queries
+    )
+
+
+def test_packed_rtree_query_points():
+    """Tests the point queries find the boxes containing the points."""
+    rtree = PackedRTree(
+        np.array([0.0, 5.0]),
+        np.array([0.0, 5.0]),
+        np.array([10.0, 6.0]),
+        np.array([10.0, 6.0]),
+    )
+
+    point_index, item_index = rtree.query_points(
+        np.array([5.5, 1.0, 20.0]), np.array([5.5, 1.0, 20.0])
+    )
+
+    assert point_index.tolist() == [0, 0, 1]
+    assert item_index.tolist() == [0, 1, 0]
+
+
+def test_packed_rtree_empty():
+    """Tests an empty tree and empty queries give no pairs."""
+    empty = np.empty(0)
+    rtree = PackedRTree(empty, empty, empty, empty)
+
+    point_index, item_index = rtree.query_points(np.array([0.0]), np.array([0.0]))
+    assert point_index.size == 0 and item_index.size == 0
+
+    with pytest.raises(ValueError):
+        PackedRTree(empty, empty, empty, empty, node_capacity=1)
+
+
+def test_polygon_rings_cached_with_geometry_list():
+    """Tests the rings and their R-tree are cached with the GeometryList until it is modified,
+    and are not pickled with it."""
+    polygons = GeometryList(
+        x_coordinates=np.array([0.0, 1.0, 1.0, 0.0]),
+        y_coordinates=np.array([0.0, 0.0, 1.0, 1.0]),
+    )
+
+    rings = PolygonRings.of(polygons)
+    assert PolygonRings.of(polygons) is rings
+    assert rings.rtree is rings.rtree
+    assert "_derived_values" not in pickle.loads(pickle.dumps(polygons)).__dict__
+
+    polygons.x_coordinates = polygons.x_coordinates + 10.0
+    assert PolygonRings.of(polygons) is not rings
+    assert PolygonRings.of(polygons).x_min.tolist() == [10.0]
+
+
+def test_polygon_index_of_points_many_rings():
+    """Tests the point in polygon selection over many small polygons."""
+    x, y = [], []
+    for i in range(50):
+        for j in range(50):
+            if x:
+                x.append(-999.0)
+                y.append(-999.0)
+            x += [i, i + 0.5, i + 0.5, i]
+            y += [j, j, j + 0.5, j + 0.5]
+    polygons = GeometryList(x_coordinates=np.array(x), y_coordinates=np.array(y))
+
+    rng = np.random.default_rng(0)
+    points_x = rng.random(5000) * 50.0
+    points_y = rng.random(5000) * 50.0
+    index = polygon_index_of_points(polygons, points_x, points_y)
+
+    inside = (points_x % 1.0 < 0.5) & (points_y % 1.0 < 0.5)
+    expected = np.where(
+        inside, np.floor(points_x) * 50 + np.floor(points_y), -1
+    ).astype(np.int64)
+    assert np.array_equal(index, expected)
@@ -0,0 +1,67 @@
+import pickle
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from meshkernel import Mesh2d
+from meshkernel.c_structures import CMesh2d
+from meshkernel.shared_memory import pack_arrays, packed_nbytes, unpack_arrays
+
+
+def test_pack_arrays_roundtrip():
+    """Tests `unpack_arrays` gets aligned views of the arrays written by `pack_arrays`."""
+    arrays = {
+        "a": np.arange(5, dtype=np.int32),
+        "b": np.linspace(0.0, 1.0, 3),
+        "empty": np.empty(0, dtype=np.double),
+    }
+    buffer = bytearray(packed_nbytes(arrays))
+
+    pack_arrays(buffer, arrays)
+    unpacked = unpack_arrays(buffer)
+    start = np.frombuffer(buffer, dtype=np.uint8).ctypes.data
+
+    assert list(unpacked) == ["a", "b", "empty"]
+    for name, array in arrays.items():
+        assert_array_equal(unpacked[name], array)
+        assert unpacked[name].dtype == array.dtype
+        assert (unpacked[name].ctypes.data - start) % 64 == 0
+
+
+def test_unpack_arrays_invalid_buffer():
+    """Tests `unpack_arrays` raises for a buffer without packed arrays."""
+    with pytest.raises(ValueError):
+        unpack_arrays(bytearray(128))
+
+
+def test_mesh2d_shared_memory():
+    """Tests a `Mesh2d` shared through a segment is not copied and the segment is unlinked
+    when the last handle is closed."""
+    mesh2d = Mesh2d(
+        node_x=np.array([0.0, 1.0, 1.0, 0.0], dtype=np.double),
+        node_y=np.array([0.0, 0.0, 1.0, 1.0], dtype=np.double),
+        edge_nodes=np.array([0, 1, 1, 2, 2, 3, 3, 0], dtype=np.int32),
+    )
+
+    handle = mesh2d.to_shared_memory()
+    worker_handle = pickle.loads(pickle.dumps(handle))
+    assert not worker_handle.attached
+
+    shared_mesh2d = Mesh2d.from_shared_memory(worker_handle)
+    assert handle.refcount == 2
+    assert shared_mesh2d == mesh2d
+
+    # The views are passed to the C structure without copies
+    c_mesh2d = CMesh2d.from_mesh2d(shared_mesh2d)
+    shared_mesh2d.node_x[1] = 5.0
+    assert c_mesh2d.node_x[1] == 5.0
+    assert Mesh2d.from_shared_memory(handle).node_x[1] == 5.0
+
+    worker_handle.close()
+    assert handle.refcount == 1
+    handle.close()
+
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=handle.name)